@@ -0,0 +1 @@
+"""Micro-benchmarks for the webhook pipeline; run with ``python -m benchmarks.<name>``."""
@@ -0,0 +1,115 @@
+"""
+Compares the single-pass changelog index against the previous per-classifier
+scans on payloads with long ``changelog.histories``.
+
+Usage: ``python -m benchmarks.bench_changelog_index [--histories N]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+
+from jira_events import classify_issue_update
+from jira_events.changelog import changelog_index
+
+
+def build_payload(histories: int, changed_field: str = "status") -> dict:
+    entries = [
+        {
+            "created": f"2025-10-18T12:{index % 60:02d}:00.000+0000",
+            "author": {"displayName": f"User {index}"},
+            "items": [
+                {"field": "description", "fromString": "a", "toString": "b"},
+                {"field": "Sprint", "fromString": "1", "toString": "2"},
+                {"field": "Story Points", "fromString": "3", "toString": "5"},
+            ],
+        }
+        for index in range(histories)
+    ]
+    entries.append(
+        {
+            "created": "2025-10-18T13:00:00.000+0000",
+            "author": {"displayName": "Release Manager"},
+            "items": [{"field": changed_field, "fromString": "a", "toString": "b"}],
+        }
+    )
+    return {
+        "webhookEvent": "jira:issue_updated",
+        "issue": {"key": "BENCH-1", "fields": {}},
+        "changelog": {"histories": entries},
+    }
+
+
+def _legacy_extract(data: dict, field_id: str):
+    changelog = data.get("changelog") or (data.get("issue") or {}).get("changelog")
+    if not isinstance(changelog, dict):
+        return None, None
+    for item in changelog.get("items") or []:
+        if field_id in ((item.get("field") or "").lower(), item.get("fieldId")):
+            return item, changelog
+    for history in changelog.get("histories") or []:
+        for item in history.get("items", []):
+            if field_id in ((item.get("field") or "").lower(), item.get("fieldId")):
+                return item, {"created": history.get("created")}
+    return None, None
+
+
+def legacy_classify_and_handle(data: dict):
+    # Status, assignee, due date, reopened and labels classifiers each
+    # rescanned the changelog until one matched, then the handler scanned the
+    # log once more for its own change.
+    for field_id in ("status", "assignee", "duedate", "status", "labels"):
+        if _legacy_extract(data, field_id)[0]:
+            return _legacy_extract(data, field_id)
+    return None, None
+
+
+def indexed_classify_and_handle(data: dict):
+    classify_issue_update(data)
+    index = changelog_index(data)
+    for field_id in ("status", "assignee"):
+        if field_id in index:
+            return index.get(field_id)
+    return None, None
+
+
+SCENARIOS = (
+    ("status change", "status"),
+    ("assignee change", "assignee"),
+    ("unclassified change", "Fix Version"),
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--histories", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    per_payload = 1e6 / args.repeat
+    print(f"histories per payload: {args.histories}")
+    for label, field_id in SCENARIOS:
+        payloads = [build_payload(args.histories, field_id) for _ in range(args.repeat)]
+        assert (
+            legacy_classify_and_handle(payloads[0])[0]
+            == indexed_classify_and_handle(payloads[0])[0]
+        )
+
+        legacy = timeit.timeit(
+            lambda: [legacy_classify_and_handle(payload) for payload in payloads],
+            number=1,
+        )
+        indexed = timeit.timeit(
+            lambda: [indexed_classify_and_handle(payload) for payload in payloads],
+            number=1,
+        )
+        print(
+            f"{label:<20} legacy {legacy * per_payload:9.1f} us"
+            f"  indexed {indexed * per_payload:9.1f} us"
+            f"  speedup {legacy / indexed:5.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
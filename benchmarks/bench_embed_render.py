@@ -0,0 +1,123 @@
+"""
+Measures embeds rendered per second by the status transition handler with
+precompiled templates, palettes and the escape cache, against the previous
+build-everything-per-event implementation.
+
+Usage: ``python -m benchmarks.bench_embed_render [--events N]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+
+import discord
+from discord.utils import escape_markdown, format_dt
+
+from jira_events.changelog import changelog_index
+from jira_events.common import build_issue_url, parse_jira_datetime
+from jira_events.status_transition import handle_status_transition
+
+PROJECTS = ("Discord Bot", "Platform_Core", "Mobile *App*", "Billing")
+USERS = ("Jane Doe", "sam_lee", "Ops Bot", "Priya R.", "alex*")
+STATUSES = ("To Do", "In Progress", "In Review", "Done", "Blocked")
+
+
+def build_payloads(count: int) -> list:
+    return [
+        {
+            "webhookEvent": "jira:issue_updated",
+            "timestamp": 1700000000000 + index,
+            "user": {"displayName": USERS[index % len(USERS)]},
+            "issue": {
+                "key": f"BENCH-{index}",
+                "self": f"https://example.atlassian.net/rest/api/2/issue/{index}",
+                "fields": {
+                    "summary": f"Benchmark issue number {index}",
+                    "project": {"name": PROJECTS[index % len(PROJECTS)]},
+                    "priority": {"name": "High"},
+                    "assignee": {"displayName": USERS[(index + 1) % len(USERS)]},
+                },
+            },
+            "changelog": {
+                "items": [
+                    {
+                        "field": "status",
+                        "fromString": STATUSES[index % len(STATUSES)],
+                        "toString": STATUSES[(index + 1) % len(STATUSES)],
+                    }
+                ]
+            },
+        }
+        for index in range(count)
+    ]
+
+
+def legacy_handle_status_transition(data: dict) -> discord.Embed:
+    # The handler as it was before templates: palettes, escapes and the
+    # embed skeleton were rebuilt for every event.
+    issue = data["issue"]
+    fields = issue.get("fields", {})
+    change, audit_info = changelog_index(data).get("status")
+    summary = f"> {escape_markdown(fields['summary'].strip())}"
+    issue_url = build_issue_url(issue)
+    palette = {
+        "to do": discord.Color.from_rgb(148, 163, 184),
+        "selected for development": discord.Color.from_rgb(96, 165, 250),
+        "in progress": discord.Color.from_rgb(234, 179, 8),
+        "in review": discord.Color.from_rgb(249, 115, 22),
+        "blocked": discord.Color.from_rgb(220, 38, 38),
+        "done": discord.Color.from_rgb(34, 197, 94),
+        "closed": discord.Color.from_rgb(22, 163, 74),
+    }
+    embed = discord.Embed(
+        title=f"[{issue.get('key')}] Status Updated",
+        description=summary,
+        color=palette.get(change["toString"].lower(), discord.Color.blurple()),
+    )
+    embed.url = issue_url
+    embed.set_author(name=fields["project"]["name"], url=issue_url)
+    embed.add_field(name="From", value=escape_markdown(change["fromString"]))
+    embed.add_field(name="To", value=escape_markdown(change["toString"]))
+    embed.add_field(
+        name="Changed by", value=escape_markdown(str(data["user"]["displayName"]))
+    )
+    footer_parts = [
+        f"Priority: {escape_markdown(fields['priority']['name'])}",
+        f"Assignee: {escape_markdown(fields['assignee']['displayName'])}",
+    ]
+    parsed_timestamp = parse_jira_datetime(data.get("timestamp"))
+    embed.timestamp = parsed_timestamp
+    footer_parts.append(f"Updated {format_dt(parsed_timestamp, 'R')}")
+    embed.set_footer(text=" | ".join(footer_parts))
+    return embed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    payloads = build_payloads(args.events)
+    assert (
+        legacy_handle_status_transition(payloads[0]).to_dict()
+        == handle_status_transition(payloads[0]).to_dict()
+    )
+
+    for label, render in (
+        ("legacy", legacy_handle_status_transition),
+        ("templated", handle_status_transition),
+    ):
+        best = min(
+            timeit.repeat(
+                lambda: [render(payload) for payload in payloads],
+                number=1,
+                repeat=args.rounds,
+            )
+        )
+        print(f"{label:<10} {args.events / best:12,.0f} embeds/s")
+
+
+if __name__ == "__main__":
+    main()
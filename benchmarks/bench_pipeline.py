@@ -0,0 +1,277 @@
+"""
+Load-tests the webhook pipeline with a generated Jira corpus: rendering alone
+and the full aiohttp ingest path into a stubbed Discord channel.
+
+Usage: ``python -m benchmarks.bench_pipeline [--events N] [--concurrency N] [--output results.json] [--baseline results.json]``
+
+Results are written as JSON. Pass a previous file as ``--baseline`` to
+compare: the command exits with status 1 when events/sec drops, or p99
+latency grows, by more than ``--tolerance``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import platform
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Mapping, Optional, Sequence
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from jira_events import registry
+from ourdiscordbot.aiohttp_app import create_aiohttp_app
+from ourdiscordbot.discord_client import DiscordNotifier
+from ourdiscordbot.jira_handler import process_jira_event, render_jira_events
+from ourdiscordbot.outbound import OutboundDispatcher
+from ourdiscordbot.payloads import PayloadParser, encode_json
+from ourdiscordbot.pipeline import JiraEventPipeline
+
+from .corpus import generate_corpus
+
+PERCENTILES = (50, 90, 99)
+SECRET = "bench"
+CHANNEL_ID = 1
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: List[float], elapsed: float) -> Dict[str, object]:
+    """Events/sec over ``elapsed`` plus latency percentiles in milliseconds."""
+    latencies = sorted(latencies)
+    summary = {f"p{pct}": percentile(latencies, pct) * 1e3 for pct in PERCENTILES}
+    summary["max"] = latencies[-1] * 1e3 if latencies else 0.0
+    return {
+        "events": len(latencies),
+        "events_per_second": len(latencies) / elapsed if elapsed else 0.0,
+        "latency_ms": summary,
+    }
+
+
+def bench_render(corpus) -> Dict[str, object]:
+    """Times ``process_jira_event`` on every payload, per scenario and overall."""
+    latencies: List[float] = []
+    by_scenario: Dict[str, List[float]] = defaultdict(list)
+    started = time.perf_counter()
+    for scenario, payload in corpus:
+        call_started = time.perf_counter()
+        process_jira_event(payload)
+        latency = time.perf_counter() - call_started
+        latencies.append(latency)
+        by_scenario[scenario].append(latency)
+    result = summarize(latencies, time.perf_counter() - started)
+    result["scenarios"] = {
+        scenario: summarize(values, sum(values))
+        for scenario, values in sorted(by_scenario.items())
+    }
+    return result
+
+
+class StubChannel:
+    """Discord channel double that accepts every message after ``latency``."""
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.messages = 0
+        self.embeds = 0
+
+    async def send(self, content=None, embeds=None):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.messages += 1
+        self.embeds += len(embeds or ())
+
+
+class StubDiscordClient:
+    """The parts of ``discord.Client`` the notifier uses."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, channel: StubChannel):
+        self.loop = loop
+        self._channel = channel
+
+    def get_channel(self, channel_id: int) -> Optional[StubChannel]:
+        return self._channel if channel_id == CHANNEL_ID else None
+
+
+async def _bench_http(
+    bodies: List[bytes], concurrency: int, discord_latency: float
+) -> Dict[str, object]:
+    channel = StubChannel(discord_latency)
+    client = StubDiscordClient(asyncio.get_running_loop(), channel)
+    # Discord's per-channel budget is lifted so the stub measures this code.
+    dispatcher = OutboundDispatcher(
+        lambda channel_id: client.get_channel(channel_id),
+        rate_limit=1_000_000,
+        rate_period=1.0,
+    )
+    notifier = DiscordNotifier(client, CHANNEL_ID, dispatcher)
+    pipeline = JiraEventPipeline(render_jira_events, notifier)
+    app = create_aiohttp_app(
+        jira_secret=SECRET,
+        handle_event=pipeline.handle,
+        parser=PayloadParser(registry=registry),
+    )
+
+    latencies: List[float] = []
+    statuses: Dict[int, int] = defaultdict(int)
+    pending = iter(bodies)
+
+    async def worker(http: TestClient) -> None:
+        for body in pending:
+            started = time.perf_counter()
+            response = await http.post(
+                f"/webhooks/jira?secret={SECRET}",
+                data=body,
+                headers={"Content-Type": "application/json"},
+            )
+            await response.read()
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status] += 1
+
+    async with TestClient(TestServer(app)) as http:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(http) for _ in range(concurrency)))
+        accepted = time.perf_counter() - started
+        await dispatcher.join()
+        delivered = time.perf_counter() - started
+
+    result = summarize(latencies, accepted)
+    result.update(
+        {
+            "statuses": {str(status): count for status, count in statuses.items()},
+            "delivered_seconds": delivered,
+            "discord_messages": channel.messages,
+            "discord_embeds": channel.embeds,
+        }
+    )
+    return result
+
+
+def bench_http(
+    corpus, *, concurrency: int = 8, discord_latency: float = 0.0
+) -> Dict[str, object]:
+    """
+    Posts every payload to the aiohttp app over a local socket and waits for
+    the outbound dispatcher to drain into :class:`StubChannel`. Webhooks are
+    handled inline, so request latency covers parsing through dispatch.
+    """
+    bodies = [encode_json(payload) for _, payload in corpus]
+    return asyncio.run(_bench_http(bodies, concurrency, discord_latency))
+
+
+def run_suite(
+    events: int,
+    *,
+    seed: int = 0,
+    concurrency: int = 8,
+    discord_latency: float = 0.0,
+) -> Dict[str, object]:
+    corpus = generate_corpus(events, seed=seed)
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {
+            "events": events,
+            "seed": seed,
+            "concurrency": concurrency,
+            "discord_latency_ms": discord_latency * 1e3,
+        },
+        "benchmarks": {
+            "render": bench_render(corpus),
+            "http": bench_http(
+                corpus, concurrency=concurrency, discord_latency=discord_latency
+            ),
+        },
+    }
+
+
+def compare(
+    results: Mapping[str, object],
+    baseline: Mapping[str, object],
+    tolerance: float = 0.15,
+) -> List[str]:
+    """Describes every benchmark that regressed beyond ``tolerance``."""
+    regressions = []
+    for name, current in results["benchmarks"].items():
+        previous = baseline.get("benchmarks", {}).get(name)
+        if not previous:
+            continue
+        throughput = current["events_per_second"]
+        previous_throughput = previous["events_per_second"]
+        if throughput < previous_throughput * (1 - tolerance):
+            regressions.append(
+                f"{name}: {throughput:,.0f} events/s "
+                f"(baseline {previous_throughput:,.0f})"
+            )
+        p99 = current["latency_ms"]["p99"]
+        previous_p99 = previous["latency_ms"]["p99"]
+        if p99 > previous_p99 * (1 + tolerance):
+            regressions.append(
+                f"{name}: p99 {p99:.2f} ms (baseline {previous_p99:.2f} ms)"
+            )
+    return regressions
+
+
+def _report(results: Mapping[str, object]) -> None:
+    for name, result in results["benchmarks"].items():
+        latency = result["latency_ms"]
+        print(
+            f"{name:8s} {result['events_per_second']:10,.0f} events/s  "
+            + "  ".join(f"{key} {value:7.3f} ms" for key, value in latency.items())
+        )
+        for scenario, summary in result.get("scenarios", {}).items():
+            print(
+                f"  {scenario:14s} {summary['events_per_second']:10,.0f} events/s  "
+                f"p99 {summary['latency_ms']['p99']:7.3f} ms"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--discord-latency-ms",
+        type=float,
+        default=0.0,
+        help="simulated round trip of the stubbed Discord channel",
+    )
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against a previous results file")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args()
+
+    results = run_suite(
+        args.events,
+        seed=args.seed,
+        concurrency=args.concurrency,
+        discord_latency=args.discord_latency_ms / 1e3,
+    )
+    _report(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            regressions = compare(results, json.load(handle), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
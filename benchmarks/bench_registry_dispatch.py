@@ -0,0 +1,100 @@
+"""
+Compares registry dispatch through precompiled call shims against the
+previous flag-based dispatch, in dispatches per second.
+
+Usage: ``python -m benchmarks.bench_registry_dispatch [--dispatches N]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+
+from jira_events.registry import JiraEventRegistry
+
+
+def positional(data, event_type):
+    return data
+
+
+def keyword_only(data, *, event_type):
+    return data
+
+
+def payload_only(data):
+    return data
+
+
+HANDLERS = (
+    ("positional event_type", positional),
+    ("keyword event_type", keyword_only),
+    ("payload only", payload_only),
+)
+
+
+class LegacyRegistry:
+    # Normalized every event type and chose the calling convention from four
+    # signature flags on each dispatch.
+    def __init__(self) -> None:
+        self._handlers = {}
+
+    def register(self, event_type: str, handler) -> None:
+        registration = {
+            "func": handler,
+            "positional": handler is positional,
+            "keyword": handler is keyword_only,
+            "varargs": False,
+            "varkw": False,
+        }
+        self._handlers[event_type.strip().lower()] = registration
+
+    def get_handler(self, event_type: str):
+        if not event_type:
+            return None
+        return self._handlers.get(event_type.strip().lower())
+
+    def dispatch(self, event_type: str, data: dict):
+        registration = self.get_handler(event_type)
+        if registration:
+            return self._call(registration, event_type, data)
+        return None
+
+    @staticmethod
+    def _call(registration, event_type, data):
+        handler = registration["func"]
+        if registration["positional"] or registration["varargs"]:
+            return handler(data, event_type)
+        if registration["keyword"] or registration["varkw"]:
+            return handler(data, event_type=event_type)
+        return handler(data)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dispatches", type=int, default=500_000)
+    args = parser.parse_args()
+
+    event_type = "jira:issue_status_changed"
+    data: dict = {}
+    for label, handler in HANDLERS:
+        legacy = LegacyRegistry()
+        legacy.register(event_type, handler)
+        shimmed = JiraEventRegistry()
+        shimmed.register([event_type], handler)
+        assert legacy.dispatch(event_type, data) is shimmed.dispatch(event_type, data)
+
+        legacy_seconds = timeit.timeit(
+            lambda: legacy.dispatch(event_type, data), number=args.dispatches
+        )
+        shimmed_seconds = timeit.timeit(
+            lambda: shimmed.dispatch(event_type, data), number=args.dispatches
+        )
+        print(
+            f"{label:<22} legacy {args.dispatches / legacy_seconds / 1e6:6.2f} M/s"
+            f"  shimmed {args.dispatches / shimmed_seconds / 1e6:6.2f} M/s"
+            f"  speedup {legacy_seconds / shimmed_seconds:5.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Measures routing lookups per second for a compiled RoutingTable with
+thousands of rules, uncached and through its LRU, against a linear scan
+over the same rules.
+
+Usage: ``python -m benchmarks.bench_routing [--rules N] [--events N]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import timeit
+
+from ourdiscordbot.routing import RoutingTable, route_key
+
+EVENTS = (
+    "jira:issue_created",
+    "jira:issue_updated",
+    "jira:issue_status_changed",
+    "jira:issue_assignee_changed",
+    "comment_created",
+)
+ISSUE_TYPES = ("Bug", "Story", "Task", "Epic", "Incident")
+PRIORITIES = ("Highest", "High", "Medium", "Low", "Lowest")
+LABELS = tuple(f"team-{index}" for index in range(40))
+
+
+def build_config(rule_count: int, projects: int, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    routes = []
+    for index in range(rule_count):
+        route = {
+            "name": f"rule-{index}",
+            "channels": [1000 + rng.randrange(500)],
+            "project": f"P{rng.randrange(projects)}",
+        }
+        if rng.random() < 0.5:
+            route["issue_type"] = rng.choice(ISSUE_TYPES)
+        if rng.random() < 0.3:
+            route["priority"] = rng.sample(PRIORITIES, 2)
+        if rng.random() < 0.4:
+            route["label"] = rng.choice(LABELS)
+        if rng.random() < 0.2:
+            route["event"] = rng.choice(EVENTS)
+        routes.append(route)
+    return {"default_channels": [1], "routes": routes}
+
+
+def build_events(count: int, projects: int, seed: int = 11) -> list:
+    rng = random.Random(seed)
+    return [
+        (
+            rng.choice(EVENTS),
+            {
+                "issue": {
+                    "key": f"P{index % projects}-{index}",
+                    "fields": {
+                        "project": {"key": f"P{rng.randrange(projects)}"},
+                        "issuetype": {"name": rng.choice(ISSUE_TYPES)},
+                        "priority": {"name": rng.choice(PRIORITIES)},
+                        "labels": rng.sample(LABELS, rng.randrange(3)),
+                    },
+                }
+            },
+        )
+        for index in range(count)
+    ]
+
+
+def linear_route(config: dict, event_type: str, data: dict) -> tuple:
+    # The straightforward alternative: test every rule against the event.
+    event, projects, issue_type, priority, labels = route_key(event_type, data)
+    channels = {}
+    for route in config["routes"]:
+        if not _accepts(route.get("project"), projects):
+            continue
+        if not _accepts(route.get("issue_type"), {issue_type}):
+            continue
+        if not _accepts(route.get("priority"), {priority}):
+            continue
+        if not _accepts(route.get("label"), labels):
+            continue
+        if not _accepts(route.get("event"), {event}):
+            continue
+        for channel_id in route["channels"]:
+            channels[channel_id] = None
+    return tuple(channels) or tuple(config["default_channels"])
+
+
+def _accepts(wanted, values) -> bool:
+    if wanted is None:
+        return True
+    wanted = [wanted] if isinstance(wanted, str) else wanted
+    return any(value.lower() in values for value in wanted)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rules", type=int, default=10000)
+    parser.add_argument("--projects", type=int, default=100)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    config = build_config(args.rules, args.projects)
+    events = build_events(args.events, args.projects)
+    table = RoutingTable.from_config(config)
+    for event_type, data in events[:200]:
+        assert table.route(event_type, data) == linear_route(config, event_type, data)
+
+    scans = [
+        ("linear", lambda e, d: linear_route(config, e, d), max(args.events // 20, 1)),
+        ("compiled", lambda e, d: table._lookup(route_key(e, d)), args.events),
+        ("cached", table.route, args.events),
+    ]
+    print(f"{args.rules:,} rules, {args.projects:,} projects")
+    for label, route, count in scans:
+        sample = events[:count]
+        best = min(
+            timeit.repeat(
+                lambda: [route(event_type, data) for event_type, data in sample],
+                number=1,
+                repeat=args.rounds,
+            )
+        )
+        print(f"{label:<10} {count / best:12,.0f} lookups/s")
+
+
+if __name__ == "__main__":
+    main()
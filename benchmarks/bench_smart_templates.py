@@ -0,0 +1,59 @@
+"""
+Compares embeds per second from compiled ``jira_smart_templates`` against the
+hand-written handlers for the same events.
+
+Usage: ``python -m benchmarks.bench_smart_templates [--events N]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+from pathlib import Path
+
+from jira_events.assignee_changed import handle_assignee_changed
+from jira_events.smart_templates import load_smart_templates
+from jira_events.status_transition import handle_status_transition
+
+from .bench_embed_render import build_payloads
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "jira_smart_templates"
+
+
+def _with_changed_field(payloads: list, field: str) -> list:
+    for payload in payloads:
+        payload["changelog"]["items"][0]["field"] = field
+    return payloads
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    compile_time = timeit.timeit(lambda: load_smart_templates(TEMPLATE_DIR), number=1)
+    templates = {
+        template.name: template for template in load_smart_templates(TEMPLATE_DIR)
+    }
+    print(f"compiled {len(templates)} templates in {compile_time * 1e3:.1f} ms")
+
+    scenarios = (
+        ("status", "issue_status_changed", handle_status_transition),
+        ("assignee", "issue_assignee_changed", handle_assignee_changed),
+    )
+    for field, name, handler in scenarios:
+        payloads = _with_changed_field(build_payloads(args.events), field)
+        for label, render in (("handler", handler), ("template", templates[name])):
+            best = min(
+                timeit.repeat(
+                    lambda: [render(payload) for payload in payloads],
+                    number=1,
+                    repeat=args.rounds,
+                )
+            )
+            print(f"{field:<9} {label:<9} {args.events / best:12,.0f} embeds/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Measures durable spool appends per second under concurrent webhook bursts,
+with and without group commit.
+
+Usage: ``python -m benchmarks.bench_spool [--events N] [--threads N]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ourdiscordbot.spool import EventSpool
+
+PAYLOAD = {
+    "webhookEvent": "jira:issue_updated",
+    "issue": {"key": "BENCH-1", "fields": {"summary": "x" * 200}},
+    "changelog": {"items": [{"field": "status", "toString": "Done"}]},
+}
+
+
+def run(events: int, threads: int, commit_interval: float) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        spool = EventSpool(
+            os.path.join(directory, "spool.db"),
+            commit_interval=commit_interval,
+            max_pending=events,
+        )
+        started = time.perf_counter()
+        with ThreadPoolExecutor(threads) as pool:
+            list(pool.map(lambda _: spool.append(PAYLOAD), range(events)))
+        elapsed = time.perf_counter() - started
+        stats = spool.stats()
+        spool.close()
+
+    print(
+        f"commit window {commit_interval * 1e3:4.1f} ms  "
+        f"{events / elapsed:10,.0f} appends/s  "
+        f"{stats.commits:6d} fsyncs  largest batch {stats.batch_max}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=32)
+    args = parser.parse_args()
+
+    for commit_interval in (0.0, 0.002, 0.005):
+        run(args.events, args.threads, commit_interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Compares the Jira-format timestamp fast path and its LRU cache against the
+general ISO parser, on timestamps repeated the way history entries repeat them.
+
+Usage: ``python -m benchmarks.bench_timestamps [--timestamps N] [--distinct N]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import timeit
+
+from jira_events import common
+
+
+def build_timestamps(count: int, distinct: int) -> list:
+    rng = random.Random(20251018)
+    pool = [
+        f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        f"T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}"
+        f".{rng.randint(0, 999):03d}{rng.choice(('+0000', '+0800', '-0500'))}"
+        for _ in range(distinct)
+    ]
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--timestamps", type=int, default=100_000)
+    parser.add_argument("--distinct", type=int, default=2000)
+    args = parser.parse_args()
+
+    timestamps = build_timestamps(args.timestamps, args.distinct)
+    for value in timestamps[:100]:
+        assert common._parse_jira_format(value) == common._parse_iso_timestamp(value)
+
+    def cached() -> None:
+        common._parse_timestamp_cached.cache_clear()
+        for value in timestamps:
+            common.parse_jira_datetime(value)
+
+    runs = (
+        ("general", lambda: [common._parse_iso_timestamp(v) for v in timestamps]),
+        ("fast path", lambda: [common._parse_jira_format(v) for v in timestamps]),
+        ("fast path + cache", cached),
+    )
+    general = None
+    print(f"timestamps: {args.timestamps}, distinct: {args.distinct}")
+    for label, run in runs:
+        seconds = timeit.timeit(run, number=1)
+        general = general or seconds
+        print(
+            f"{label:<18} {args.timestamps / seconds / 1e6:6.2f} M/s"
+            f"  speedup {general / seconds:5.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""
+Generates a reproducible corpus of realistic Jira webhook payloads from the
+payload shapes in ``jira_smart_templates`` for the load and replay tools.
+
+Usage: ``python -m benchmarks.corpus [--events N] [--seed N] [--output corpus.ndjson]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import random
+import re
+import sys
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+
+TEMPLATES_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "jira_smart_templates",
+)
+
+# Relative share of each scenario among the generated events.
+DEFAULT_MIX = {
+    "created": 30,
+    "status_change": 40,
+    "bulk_edit": 20,
+    "oversized": 10,
+}
+
+BULK_EDIT_BURST = 25
+HISTORY_LENGTHS = (20, 200)
+OVERSIZED_DESCRIPTION_BYTES = (64 * 1024, 512 * 1024)
+
+PROJECTS = (("DCBOT", "Discord Bot"), ("CORE", "Platform Core"), ("MOB", "Mobile App"))
+USERS = ("Jane Doe", "sam_lee", "Ops Bot", "Priya R.", "Alex Kim")
+STATUSES = ("To Do", "In Progress", "In Review", "Blocked", "Done")
+PRIORITIES = ("Highest", "High", "Medium", "Low")
+ISSUE_TYPES = ("Task", "Bug", "Story", "Incident")
+LABELS = ("backend", "frontend", "security", "ops", "ui")
+
+_PLACEHOLDER = re.compile(r"\{\{\s*([^}]+?)\s*\}\}")
+
+Scenario = Tuple[str, dict]
+
+
+def load_skeletons(directory: str = TEMPLATES_DIR) -> Dict[str, dict]:
+    """Payload skeletons from each smart template, without ``discordTemplate``."""
+    skeletons = {}
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".json"):
+            continue
+        with open(os.path.join(directory, name), encoding="utf-8") as handle:
+            document = json.load(handle)
+        document.pop("discordTemplate", None)
+        skeletons[name[: -len(".json")]] = document
+    return skeletons
+
+
+def fill(skeleton, values: Mapping[str, object]):
+    """
+    Replaces ``{{path}}`` placeholders with ``values[path]``. A string that
+    is a single placeholder takes the value as-is, so lists and objects keep
+    their JSON type; ``.join(...)`` suffixes resolve to the underlying list.
+    """
+    if isinstance(skeleton, dict):
+        return {key: fill(value, values) for key, value in skeleton.items()}
+    if isinstance(skeleton, list):
+        return [fill(value, values) for value in skeleton]
+    if not isinstance(skeleton, str):
+        return skeleton
+
+    whole = _PLACEHOLDER.fullmatch(skeleton)
+    if whole:
+        return values.get(_value_path(whole.group(1)))
+    return _PLACEHOLDER.sub(
+        lambda match: str(values.get(_value_path(match.group(1)), "")), skeleton
+    )
+
+
+def _value_path(expression: str) -> str:
+    return expression.split(".join(", 1)[0]
+
+
+def generate_corpus(
+    count: int,
+    *,
+    seed: int = 0,
+    mix: Optional[Mapping[str, int]] = None,
+    templates_dir: str = TEMPLATES_DIR,
+) -> List[Scenario]:
+    """Returns ``count`` ``(scenario, payload)`` pairs; equal seeds give equal corpora."""
+    return list(iter_corpus(count, seed=seed, mix=mix, templates_dir=templates_dir))
+
+
+def iter_corpus(
+    count: int,
+    *,
+    seed: int = 0,
+    mix: Optional[Mapping[str, int]] = None,
+    templates_dir: str = TEMPLATES_DIR,
+) -> Iterator[Scenario]:
+    rng = random.Random(seed)
+    skeletons = load_skeletons(templates_dir)
+    mix = dict(mix or DEFAULT_MIX)
+    unknown = set(mix) - set(DEFAULT_MIX)
+    if unknown:
+        raise ValueError(f"Unknown corpus scenarios: {', '.join(sorted(unknown))}")
+    scenarios = tuple(mix)
+    # A bulk edit pick yields a whole burst, so it is drawn less often.
+    weights = [
+        mix[name] / BULK_EDIT_BURST if name == "bulk_edit" else mix[name]
+        for name in scenarios
+    ]
+
+    produced = 0
+    while produced < count:
+        scenario = rng.choices(scenarios, weights)[0]
+        if scenario == "bulk_edit":
+            # Bulk edits arrive as a burst of the same change across issues.
+            burst = min(BULK_EDIT_BURST, count - produced)
+            for payload in _bulk_edit(rng, skeletons, produced, burst):
+                yield scenario, payload
+            produced += burst
+            continue
+        if scenario == "created":
+            payload = _created(rng, skeletons, produced)
+        elif scenario == "status_change":
+            payload = _status_change(rng, skeletons, produced)
+        else:
+            payload = _oversized(rng, skeletons, produced)
+        yield scenario, payload
+        produced += 1
+
+
+def _issue_values(rng: random.Random, index: int) -> Dict[str, object]:
+    project_key, project_name = rng.choice(PROJECTS)
+    reporter = rng.choice(USERS)
+    assignee = rng.choice(USERS)
+    created = 1700000000000 + index * 1000
+    return {
+        "webhookEventCreated": created,
+        "now": created,
+        "user.displayName": reporter,
+        "user.accountId": _account(reporter),
+        "issue.self": f"https://example.atlassian.net/rest/api/2/issue/{10000 + index}",
+        "issue.id": str(10000 + index),
+        "issue.key": f"{project_key}-{index + 1}",
+        "issue.fields.summary": f"Load test issue {index + 1}",
+        "issue.fields.description": "Steps to reproduce the problem.",
+        "issue.fields.reporter.displayName": reporter,
+        "issue.fields.reporter.accountId": _account(reporter),
+        "issue.fields.assignee.displayName": assignee,
+        "issue.fields.assignee.accountId": _account(assignee),
+        "issue.fields.issuetype.name": rng.choice(ISSUE_TYPES),
+        "issue.fields.status.name": rng.choice(STATUSES),
+        "issue.fields.priority.name": rng.choice(PRIORITIES),
+        "issue.fields.project.key": project_key,
+        "issue.fields.project.name": project_name,
+        "issue.fields.labels": rng.sample(LABELS, rng.randint(0, 3)),
+        "issue.fields.created": "2023-11-14T22:13:20.000+0000",
+    }
+
+
+def _account(name: str) -> str:
+    return "acct-" + re.sub(r"\W+", "-", name.lower())
+
+
+def _created(rng: random.Random, skeletons, index: int) -> dict:
+    values = _issue_values(rng, index)
+    values["webhookEvent"] = "jira:issue_created"
+    return fill(skeletons["issue_created"], values)
+
+
+def _oversized(rng: random.Random, skeletons, index: int) -> dict:
+    payload = _created(rng, skeletons, index)
+    size = rng.randint(*OVERSIZED_DESCRIPTION_BYTES)
+    paragraph = "Log output pasted into the description. " * 32
+    payload["issue"]["fields"]["description"] = (
+        paragraph * (size // len(paragraph) + 1)
+    )[:size]
+    return payload
+
+
+def _status_change(rng: random.Random, skeletons, index: int) -> dict:
+    values = _issue_values(rng, index)
+    previous, current = rng.sample(STATUSES, 2)
+    values.update(
+        {
+            "webhookEvent": "jira:issue_updated",
+            "changelog.created": values["webhookEventCreated"],
+            "changelog.items.first.fromString": previous,
+            "changelog.items.first.toString": current,
+            "issue.fields.status.name": current,
+        }
+    )
+    payload = fill(skeletons["issue_status_changed"], values)
+    payload["changelog"]["id"] = str(50000 + index)
+    # Issues fetched with expand=changelog carry their whole history.
+    payload["issue"]["changelog"] = _history(rng, rng.randint(*HISTORY_LENGTHS))
+    return payload
+
+
+def _history(rng: random.Random, length: int) -> dict:
+    histories = []
+    for number in range(length):
+        previous, current = rng.sample(STATUSES, 2)
+        histories.append(
+            {
+                "id": str(number + 1),
+                "author": {"displayName": rng.choice(USERS)},
+                "created": "2023-11-14T22:13:20.000+0000",
+                "items": [
+                    {"field": "status", "fromString": previous, "toString": current}
+                ],
+            }
+        )
+    return {"startAt": 0, "maxResults": length, "total": length, "histories": histories}
+
+
+def _bulk_edit(rng: random.Random, skeletons, start: int, burst: int) -> Iterator[dict]:
+    actor = rng.choice(USERS)
+    previous, current = rng.sample(USERS, 2)
+    for index in range(start, start + burst):
+        values = _issue_values(rng, index)
+        values.update(
+            {
+                "webhookEvent": "jira:issue_updated",
+                "user.displayName": actor,
+                "user.accountId": _account(actor),
+                "issue.fields.assignee.displayName": current,
+                "issue.fields.assignee.accountId": _account(current),
+                "changelog": {
+                    "id": str(50000 + index),
+                    "items": [
+                        {
+                            "field": "assignee",
+                            "fromString": previous,
+                            "toString": current,
+                        }
+                    ],
+                },
+            }
+        )
+        yield fill(skeletons["issue_assignee_changed"], values)
+
+
+def write_ndjson(corpus, path: str) -> None:
+    """Writes payloads one JSON document per line, gzip-compressed for ``.gz``."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "wt", encoding="utf-8") as handle:
+        for _, payload in corpus:
+            handle.write(json.dumps(payload, separators=(",", ":")))
+            handle.write("\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--output", help="NDJSON file (.gz to compress); stdout if omitted"
+    )
+    args = parser.parse_args()
+
+    corpus = iter_corpus(args.events, seed=args.seed)
+    if args.output:
+        write_ndjson(corpus, args.output)
+    else:
+        for _, payload in corpus:
+            sys.stdout.write(json.dumps(payload, separators=(",", ":")) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,17 @@
 from .registry import JiraEventRegistry
-from .classifiers import classify_issue_update, register_issue_update_classifier
+from .issue_state import (
+    TENANT_KEY,
+    IssueState,
+    IssueStateStore,
+    StatusChange,
+    issue_states,
+    scoped_key,
+)
+from .classifiers import (
+    classify_issue_update,
+    classify_issue_update_all,
+    register_issue_update_classifier,
+)
 
 registry = JiraEventRegistry()
 
@@ -24,6 +36,13 @@ comment_created.register(registry)
 __all__ = [
     "JiraEventRegistry",
     "registry",
+    "IssueState",
+    "IssueStateStore",
+    "StatusChange",
+    "issue_states",
+    "scoped_key",
+    "TENANT_KEY",
     "classify_issue_update",
+    "classify_issue_update_all",
     "register_issue_update_classifier",
 ]
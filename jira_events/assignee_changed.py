@@ -4,7 +4,10 @@ from typing import Optional, Tuple
 import discord
 from discord.utils import escape_markdown, format_dt
 
+from .changelog import changelog_index
 from .common import build_issue_url, parse_jira_datetime
+from .embed_templates import EmbedTemplate, escape_name
+from .issue_state import issue_states, payload_tenant
 
 logger = logging.getLogger(__name__)
 
@@ -14,11 +17,28 @@ ASSIGNEE_CHANGED_EVENT_TYPES = (
     "assignee_changed",
 )
 
+ASSIGNEE_CHANGED_ISSUE_FIELDS = ("summary", "project", "priority", "status")
+
+ASSIGNEE_CHANGED_TEMPLATE = EmbedTemplate(
+    "[{key}] Assignee Updated",
+    fields=(
+        ("Previous assignee", True),
+        ("New assignee", True),
+        ("Updated by", True),
+        ("Reassignments", False),
+    ),
+    color=discord.Color.from_rgb(59, 130, 246),
+)
+
 
 def register(registry, register_classifier=None) -> None:
-    registry.register(ASSIGNEE_CHANGED_EVENT_TYPES, handle_assignee_changed)
+    registry.register(
+        ASSIGNEE_CHANGED_EVENT_TYPES,
+        handle_assignee_changed,
+        fields=ASSIGNEE_CHANGED_ISSUE_FIELDS,
+    )
     if register_classifier:
-        register_classifier(classify_assignee_changed)
+        register_classifier(classify_assignee_changed, "assignee")
 
 
 def classify_assignee_changed(data: dict) -> Optional[str]:
@@ -50,32 +70,19 @@ def handle_assignee_changed(data: dict, event_type=None) -> Optional[discord.Emb
     summary = _format_summary(fields.get("summary"))
     issue_url = build_issue_url(issue)
 
-    embed = discord.Embed(
-        title=f"[{issue_key}] Assignee Updated",
-        description=summary,
-        color=discord.Color.from_rgb(59, 130, 246),
-    )
-    if issue_url:
-        embed.url = issue_url
-
     project_name = (fields.get("project") or {}).get("name", "Unknown Project")
-    embed.set_author(name=project_name, url=issue_url or discord.Embed.Empty)
 
     previous = _derive_user_label(change.get("fromString"))
     new = _derive_user_label(change.get("toString"))
-    embed.add_field(name="Previous assignee", value=previous, inline=True)
-    embed.add_field(name="New assignee", value=new, inline=True)
-
     updated_by = _resolve_actor(data, audit_info)
-    embed.add_field(name="Updated by", value=updated_by, inline=True)
 
     footer_entries = []
     priority = (fields.get("priority") or {}).get("name")
     status = (fields.get("status") or {}).get("name")
     if priority:
-        footer_entries.append(f"Priority: {escape_markdown(priority)}")
+        footer_entries.append(f"Priority: {escape_name(priority)}")
     if status:
-        footer_entries.append(f"Status: {escape_markdown(status)}")
+        footer_entries.append(f"Status: {escape_name(status)}")
 
     timestamp = (
         (audit_info or {}).get("created")
@@ -84,52 +91,37 @@ def handle_assignee_changed(data: dict, event_type=None) -> Optional[discord.Emb
     )
     parsed_timestamp = parse_jira_datetime(timestamp)
     if parsed_timestamp:
-        embed.timestamp = parsed_timestamp
         footer_entries.append(f"Updated {format_dt(parsed_timestamp, 'R')}")
 
-    if footer_entries:
-        embed.set_footer(text=" | ".join(footer_entries))
-
-    return embed
+    return ASSIGNEE_CHANGED_TEMPLATE.render(
+        issue_key,
+        description=summary,
+        values=(previous, new, updated_by, _reassignment_churn(data, issue, change)),
+        url=issue_url,
+        author=project_name,
+        footer=" | ".join(footer_entries),
+        timestamp=parsed_timestamp,
+    )
 
 
 def _extract_change(data: dict) -> Tuple[Optional[dict], Optional[dict]]:
-    changelog = data.get("changelog") or (data.get("issue") or {}).get("changelog")
-    if not changelog:
-        return None, None
-
-    if not isinstance(changelog, dict):
-        return None, None
-
-    items = changelog.get("items")
-    if isinstance(items, list):
-        for item in items:
-            if _is_assignee_field(item):
-                return item, changelog
+    return changelog_index(data).get("assignee")
 
-    histories = changelog.get("histories")
-    if isinstance(histories, list):
-        for history in histories:
-            for item in history.get("items", []):
-                if _is_assignee_field(item):
-                    audit = {
-                        "created": history.get("created"),
-                        "author": history.get("author"),
-                    }
-                    return item, audit
 
-    return None, changelog if changelog else None
-
-
-def _is_assignee_field(item: dict) -> bool:
-    field = (item.get("field") or "").lower()
-    field_id = (item.get("fieldId") or "").lower()
-    return field == "assignee" or field_id == "assignee"
+def _reassignment_churn(data: dict, issue: dict, change: dict) -> Optional[str]:
+    # A single hand-over is what the embed already shows; report churn only.
+    state = issue_states.get(issue.get("key"), payload_tenant(data))
+    if state is None or state.assignee != change.get("toString"):
+        return None
+    if state.reassignments < 2:
+        return None
+    trail = " → ".join(escape_name(name) for name in state.assignees[-4:])
+    return f"{state.reassignments} ({trail})"
 
 
 def _derive_user_label(raw_value: Optional[str]) -> str:
     if raw_value:
-        return escape_markdown(raw_value)
+        return escape_name(raw_value)
     return "Unassigned"
 
 
@@ -139,12 +131,12 @@ def _resolve_actor(data: dict, audit_info: Optional[dict]) -> str:
             "name"
         )
         if label:
-            return escape_markdown(str(label))
+            return escape_name(label)
 
     user = data.get("user") or {}
     display = user.get("displayName") or user.get("name") or user.get("emailAddress")
     if display:
-        return escape_markdown(str(display))
+        return escape_name(display)
 
     return "Unknown"
 
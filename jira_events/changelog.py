@@ -0,0 +1,132 @@
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+FieldChange = Tuple[Optional[dict], Optional[dict]]
+
+_NO_CHANGE: FieldChange = (None, None)
+_local = threading.local()
+
+
+class ChangelogIndex:
+    """
+    Field id -> changelog item map built in one pass over a payload's
+    ``changelog.items`` and ``changelog.histories[*].items``.
+
+    Items in ``changelog.items`` win over history entries, and within each
+    section the first matching item wins, mirroring the order the original
+    per-handler scans used. ``get`` returns ``(item, audit)`` where the audit
+    info is the changelog itself for ``items`` matches and
+    ``{"created", "author"}`` of the owning history otherwise.
+    """
+
+    __slots__ = ("_changes", "_changelog")
+
+    def __init__(
+        self,
+        changes: Dict[str, Tuple[dict, Optional[dict]]],
+        changelog: Optional[dict] = None,
+    ) -> None:
+        self._changes = changes
+        self._changelog = changelog
+
+    def get(self, field_id: str) -> FieldChange:
+        entry = self._changes.get(field_id)
+        if entry is None:
+            return _NO_CHANGE
+        item, history = entry
+        if history is None:
+            return item, self._changelog
+        return item, {
+            "created": history.get("created"),
+            "author": history.get("author"),
+        }
+
+    def fields(self) -> Iterable[str]:
+        return self._changes.keys()
+
+    def __contains__(self, field_id: object) -> bool:
+        return field_id in self._changes
+
+    def __len__(self) -> int:
+        return len(self._changes)
+
+
+def build_changelog_index(data) -> ChangelogIndex:
+    """
+    Scans the payload's changelog once and indexes every changed field by
+    its lower-cased ``field`` name and ``fieldId``.
+    """
+    changelog = _changelog_of(data)
+    if not isinstance(changelog, dict):
+        return ChangelogIndex({})
+
+    # Walk both sections back to front so that plain assignment leaves the
+    # first occurrence in place, with ``items`` overriding ``histories``.
+    changes: Dict[str, Tuple[dict, Optional[dict]]] = {}
+
+    histories = changelog.get("histories")
+    if isinstance(histories, list):
+        for history in reversed(histories):
+            _index_items(changes, history.get("items"), history)
+
+    _index_items(changes, changelog.get("items"), None)
+
+    return ChangelogIndex(changes, changelog)
+
+
+def changelog_index(data) -> ChangelogIndex:
+    """
+    Returns the changelog index for ``data``, reusing the one built for the
+    same payload object on this thread so classifiers and handlers share it.
+    Payloads are treated as read-only once they enter the pipeline.
+    """
+    changelog = _changelog_of(data)
+    sections = _sections_of(changelog)
+    cached = getattr(_local, "entry", None)
+    if cached is not None and cached[0] is data and _same_sections(cached[1], sections):
+        return cached[2]
+
+    index = build_changelog_index(data)
+    _local.entry = (data, sections, index)
+    return index
+
+
+def clear_changelog_index() -> None:
+    """
+    Forgets this thread's cached index, so a long-lived worker thread does
+    not keep its last payload alive between events.
+    """
+    _local.entry = None
+
+
+def _changelog_of(data):
+    if not isinstance(data, dict):
+        return None
+    return data.get("changelog") or (data.get("issue") or {}).get("changelog")
+
+
+def _sections_of(changelog) -> tuple:
+    # The changelog and its lists, so replacing any of them invalidates the
+    # cached index; holding the references keeps identity checks reliable.
+    if not isinstance(changelog, dict):
+        return (changelog, None, None)
+    return (changelog, changelog.get("items"), changelog.get("histories"))
+
+
+def _same_sections(left: tuple, right: tuple) -> bool:
+    return all(a is b for a, b in zip(left, right))
+
+
+def _index_items(changes, items, history) -> None:
+    if not isinstance(items, list):
+        return
+    for item in reversed(items):
+        if not isinstance(item, dict):
+            continue
+        entry = (item, history)
+        field = item.get("field")
+        if field:
+            changes[field.lower()] = entry
+        field_id = item.get("fieldId")
+        if field_id:
+            changes[field_id.lower()] = entry
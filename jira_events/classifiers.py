@@ -1,25 +1,72 @@
-from typing import Callable, Optional
+from itertools import count
+from typing import Callable, Dict, List, Optional, Tuple
+
+from . import profiling
+from .changelog import changelog_index
+from .profiling import callable_name
 
 Classifier = Callable[[dict], Optional[str]]
 
-_issue_update_classifiers: list[Classifier] = []
+_registration_order = count()
+_issue_update_classifiers: List[Tuple[int, Classifier]] = []
+_field_classifiers: Dict[str, List[Tuple[int, Classifier]]] = {}
 
 
-def register_issue_update_classifier(classifier: Classifier) -> None:
+def register_issue_update_classifier(
+    classifier: Classifier, field: Optional[str] = None
+) -> None:
     """
     Registers a classifier that attempts to map an issue-updated payload
     to a more specific event type.
+
+    Classifiers registered with a changelog ``field`` id (e.g. ``"status"``)
+    are looked up from the payload's changelog index and only run when that
+    field changed.
     """
-    _issue_update_classifiers.append(classifier)
+    entry = (next(_registration_order), classifier)
+    if field:
+        _field_classifiers.setdefault(field.lower(), []).append(entry)
+    else:
+        _issue_update_classifiers.append(entry)
 
 
 def classify_issue_update(data: dict) -> Optional[str]:
     """
-    Executes registered classifiers in order until one returns a non-None
-    event type identifier.
+    Executes the applicable classifiers in registration order until one
+    returns a non-None event type identifier.
     """
-    for classifier in _issue_update_classifiers:
+    for classifier in _candidate_classifiers(data):
         event_type = classifier(data)
         if event_type:
             return event_type
     return None
+
+
+def classify_issue_update_all(data: dict) -> List[str]:
+    """
+    Executes every applicable classifier and returns all distinct event
+    types they report, in registration order.
+    """
+    event_types: List[str] = []
+    for classifier in _candidate_classifiers(data):
+        event_type = classifier(data)
+        if event_type and event_type not in event_types:
+            event_types.append(event_type)
+    return event_types
+
+
+def _candidate_classifiers(data: dict) -> List[Classifier]:
+    selected = dict(_issue_update_classifiers)
+    if _field_classifiers:
+        for field in changelog_index(data).fields():
+            selected.update(_field_classifiers.get(field, ()))
+    candidates = [selected[order] for order in sorted(selected)]
+    profiler = profiling.active
+    if profiler is not None:
+        return [_timed(profiler, classifier) for classifier in candidates]
+    return candidates
+
+
+def _timed(profiler, classifier: Classifier) -> Classifier:
+    name = callable_name(classifier)
+    return lambda data: profiler.timed("classifier", name, classifier, data)
@@ -11,9 +11,15 @@ COMMENT_CREATED_EVENT_TYPES = (
     "jira:issue_comment_created",
 )
 
+COMMENT_CREATED_ISSUE_FIELDS = ("summary", "project")
+
 
 def register(registry, register_classifier=None) -> None:
-    registry.register(COMMENT_CREATED_EVENT_TYPES, handle_comment_created)
+    registry.register(
+        COMMENT_CREATED_EVENT_TYPES,
+        handle_comment_created,
+        fields=COMMENT_CREATED_ISSUE_FIELDS,
+    )
 
 
 def handle_comment_created(data: dict, event_type=None) -> Optional[discord.Embed]:
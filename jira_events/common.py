@@ -1,9 +1,20 @@
 import logging
-from datetime import datetime, timezone
-from typing import Optional
+import sys
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, Optional
 
 logger = logging.getLogger(__name__)
 
+TIMESTAMP_CACHE_SIZE = 4096
+
+# Digit values by character. Single-character strings are interned, so
+# indexing a timestamp and looking the character up allocates nothing.
+_DIGITS: Dict[str, int] = {str(digit): digit for digit in range(10)}
+_OFFSETS: Dict[int, timezone] = {0: timezone.utc}
+# ``fromisoformat`` reads ``+hhmm`` offsets itself from Python 3.11.
+_NATIVE_BASIC_OFFSETS = sys.version_info >= (3, 11)
+
 
 def parse_jira_datetime(raw_value) -> Optional[datetime]:
     """
@@ -24,31 +35,109 @@ def parse_jira_datetime(raw_value) -> Optional[datetime]:
             return None
 
     if isinstance(raw_value, str):
-        candidate = raw_value.strip()
-        if not candidate:
-            return None
+        return _parse_timestamp_cached(raw_value)
 
-        if candidate.endswith("Z"):
-            candidate = candidate[:-1] + "+00:00"
-        if (
-            len(candidate) > 5
-            and candidate[-5] in ("+", "-")
-            and candidate[-4:].isdigit()
-        ):
-            candidate = f"{candidate[:-5]}{candidate[-5:-2]}:{candidate[-2:]}"
+    return None
 
+
+@lru_cache(maxsize=TIMESTAMP_CACHE_SIZE)
+def _parse_timestamp_cached(raw_value: str) -> Optional[datetime]:
+    """
+    Jira repeats the same timestamps across a payload's history entries and
+    handlers, so results are memoised in a bounded LRU. Datetimes are
+    immutable and safe to share.
+    """
+    if len(raw_value) == 28:
+        parsed = _parse_jira_format(raw_value)
+        if parsed is not None:
+            return parsed
+    return _parse_iso_timestamp(raw_value)
+
+
+def _parse_jira_format(value: str) -> Optional[datetime]:
+    """
+    Parses Jira's own ``yyyy-MM-ddTHH:mm:ss.SSS±hhmm`` format without
+    rewriting it. Returns ``None`` for anything else, including out-of-range
+    values, so the general parser decides those.
+    """
+    if (
+        value[4] != "-"
+        or value[7] != "-"
+        or value[10] != "T"
+        or value[13] != ":"
+        or value[16] != ":"
+        or value[19] != "."
+    ):
+        return None
+    sign = value[23]
+    if sign != "+" and sign != "-":
+        return None
+    if _NATIVE_BASIC_OFFSETS:
         try:
-            return datetime.fromisoformat(candidate)
+            return datetime.fromisoformat(value)
         except ValueError:
-            base_part = candidate.split(".")[0]
-            base_part = base_part.split("+")[0]
-            try:
-                return datetime.fromisoformat(base_part)
-            except ValueError as exc:
-                logger.debug("ISO timestamp parsing failed: %s", exc)
-                return None
+            return None
+    return _read_jira_digits(value)
 
-    return None
+
+def _read_jira_digits(value: str) -> Optional[datetime]:
+    """Reads the digits of a Jira-format ``value`` in place."""
+    digits = _DIGITS
+    try:
+        year = (
+            digits[value[0]] * 1000
+            + digits[value[1]] * 100
+            + digits[value[2]] * 10
+            + digits[value[3]]
+        )
+        month = digits[value[5]] * 10 + digits[value[6]]
+        day = digits[value[8]] * 10 + digits[value[9]]
+        hour = digits[value[11]] * 10 + digits[value[12]]
+        minute = digits[value[14]] * 10 + digits[value[15]]
+        second = digits[value[17]] * 10 + digits[value[18]]
+        millisecond = (
+            digits[value[20]] * 100 + digits[value[21]] * 10 + digits[value[22]]
+        )
+        offset_hours = digits[value[24]] * 10 + digits[value[25]]
+        offset_minutes = digits[value[26]] * 10 + digits[value[27]]
+    except KeyError:
+        return None
+
+    offset = offset_hours * 60 + offset_minutes
+    if value[23] == "-":
+        offset = -offset
+    try:
+        tzinfo = _OFFSETS.get(offset)
+        if tzinfo is None:
+            tzinfo = _OFFSETS[offset] = timezone(timedelta(minutes=offset))
+        return datetime(
+            year, month, day, hour, minute, second, millisecond * 1000, tzinfo
+        )
+    except ValueError:
+        return None
+
+
+def _parse_iso_timestamp(raw_value: str) -> Optional[datetime]:
+    """General ISO 8601 parsing for timestamps not in Jira's own format."""
+    candidate = raw_value.strip()
+    if not candidate:
+        return None
+
+    if candidate.endswith("Z"):
+        candidate = candidate[:-1] + "+00:00"
+    if len(candidate) > 5 and candidate[-5] in ("+", "-") and candidate[-4:].isdigit():
+        candidate = f"{candidate[:-5]}{candidate[-5:-2]}:{candidate[-2:]}"
+
+    try:
+        return datetime.fromisoformat(candidate)
+    except ValueError:
+        base_part = candidate.split(".")[0]
+        base_part = base_part.split("+")[0]
+        try:
+            return datetime.fromisoformat(base_part)
+        except ValueError as exc:
+            logger.debug("ISO timestamp parsing failed: %s", exc)
+            return None
 
 
 def build_issue_url(issue: dict) -> Optional[str]:
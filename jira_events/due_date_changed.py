@@ -11,11 +11,17 @@ DUE_DATE_CHANGED_EVENT_TYPES = (
     "due_date_changed",
 )
 
+DUE_DATE_CHANGED_ISSUE_FIELDS = ("summary", "project", "duedate")
+
 
 def register(registry, register_classifier=None) -> None:
-    registry.register(DUE_DATE_CHANGED_EVENT_TYPES, handle_due_date_changed)
+    registry.register(
+        DUE_DATE_CHANGED_EVENT_TYPES,
+        handle_due_date_changed,
+        fields=DUE_DATE_CHANGED_ISSUE_FIELDS,
+    )
     if register_classifier:
-        register_classifier(classify_due_date_changed)
+        register_classifier(classify_due_date_changed, "duedate")
 
 
 def classify_due_date_changed(data: dict) -> Optional[str]:
@@ -0,0 +1,115 @@
+from datetime import datetime
+from functools import lru_cache
+from typing import Mapping, Optional, Sequence, Tuple
+
+import discord
+from discord.utils import escape_markdown
+
+ESCAPE_CACHE_SIZE = 4096
+
+DEFAULT_COLOR = discord.Color.blurple()
+
+PRIORITY_COLORS: Mapping[str, discord.Color] = {
+    "highest": discord.Color.from_rgb(220, 38, 38),
+    "high": discord.Color.from_rgb(249, 115, 22),
+    "medium": discord.Color.from_rgb(234, 179, 8),
+    "low": discord.Color.from_rgb(34, 197, 94),
+    "lowest": discord.Color.from_rgb(79, 70, 229),
+}
+
+STATUS_COLORS: Mapping[str, discord.Color] = {
+    "to do": discord.Color.from_rgb(148, 163, 184),
+    "selected for development": discord.Color.from_rgb(96, 165, 250),
+    "in progress": discord.Color.from_rgb(234, 179, 8),
+    "in review": discord.Color.from_rgb(249, 115, 22),
+    "blocked": discord.Color.from_rgb(220, 38, 38),
+    "done": discord.Color.from_rgb(34, 197, 94),
+    "closed": discord.Color.from_rgb(22, 163, 74),
+}
+
+
+@lru_cache(maxsize=ESCAPE_CACHE_SIZE)
+def _escape_cached(text: str) -> str:
+    return escape_markdown(text)
+
+
+def escape_name(value) -> str:
+    """
+    Escapes Discord markdown in short, frequently repeated values such as
+    project, user, priority and status names. Results are memoised in a
+    bounded LRU; free text like summaries should use ``escape_markdown``.
+    """
+    return _escape_cached(value if isinstance(value, str) else str(value))
+
+
+def palette_color(palette: Mapping[str, discord.Color], name) -> discord.Color:
+    """
+    Looks up ``name`` case-insensitively in a precomputed palette.
+    """
+    return palette.get((name or "").lower(), DEFAULT_COLOR)
+
+
+class EmbedTemplate:
+    """
+    Static structure of an event embed, compiled once when the handler
+    module is registered: the title pattern, the ordered field names with
+    their inline flags, and the default colour. ``render`` fills the
+    variable slots only.
+    """
+
+    __slots__ = ("_title_prefix", "_title_suffix", "_fields", "_color")
+
+    def __init__(
+        self,
+        title: str,
+        fields: Sequence[Tuple[str, bool]] = (),
+        color: Optional[discord.Color] = None,
+    ) -> None:
+        prefix, marker, suffix = title.partition("{key}")
+        if not marker:
+            raise ValueError("Embed template titles must contain '{key}'.")
+        self._title_prefix = prefix
+        self._title_suffix = suffix
+        self._fields = tuple((name, bool(inline)) for name, inline in fields)
+        self._color = color or DEFAULT_COLOR
+
+    @property
+    def field_names(self) -> Tuple[str, ...]:
+        return tuple(name for name, _ in self._fields)
+
+    def render(
+        self,
+        issue_key: str,
+        *,
+        description: Optional[str] = None,
+        values: Sequence[Optional[str]] = (),
+        url: Optional[str] = None,
+        author: Optional[str] = None,
+        color: Optional[discord.Color] = None,
+        footer: Optional[str] = None,
+        timestamp: Optional[datetime] = None,
+    ) -> discord.Embed:
+        """
+        Builds the embed. ``values`` line up with the template's fields and a
+        ``None`` value omits that field.
+        """
+        if len(values) != len(self._fields):
+            raise ValueError(
+                f"Expected {len(self._fields)} field values, got {len(values)}."
+            )
+
+        embed = discord.Embed(
+            title=f"{self._title_prefix}{issue_key}{self._title_suffix}",
+            description=description,
+            color=color or self._color,
+            url=url,
+            timestamp=timestamp,
+        )
+        if author is not None:
+            embed.set_author(name=author, url=url)
+        for (name, inline), value in zip(self._fields, values):
+            if value is not None:
+                embed.add_field(name=name, value=value, inline=inline)
+        if footer:
+            embed.set_footer(text=footer)
+        return embed
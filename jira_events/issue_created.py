@@ -5,6 +5,7 @@ import discord
 from discord.utils import escape_markdown, format_dt
 
 from .common import build_issue_url, parse_jira_datetime
+from .embed_templates import EmbedTemplate, PRIORITY_COLORS, escape_name, palette_color
 
 logger = logging.getLogger(__name__)
 
@@ -14,12 +15,40 @@ ISSUE_CREATED_EVENT_TYPES = (
     "task_created",
 )
 
+ISSUE_CREATED_ISSUE_FIELDS = (
+    "summary",
+    "reporter",
+    "issuetype",
+    "priority",
+    "status",
+    "assignee",
+    "project",
+    "labels",
+    "created",
+)
+
+ISSUE_CREATED_TEMPLATE = EmbedTemplate(
+    "[{key}] New Issue Created",
+    fields=(
+        ("Type", True),
+        ("Status", True),
+        ("Priority", True),
+        ("Reporter", True),
+        ("Assignee", True),
+        ("Labels", False),
+    ),
+)
+
 
 def register(registry, register_classifier=None) -> None:
     """
     Registers the handler for issue-created style events.
     """
-    registry.register(ISSUE_CREATED_EVENT_TYPES, handle_issue_created)
+    registry.register(
+        ISSUE_CREATED_EVENT_TYPES,
+        handle_issue_created,
+        fields=ISSUE_CREATED_ISSUE_FIELDS,
+    )
 
 
 def handle_issue_created(data: dict) -> Optional[discord.Embed]:
@@ -41,43 +70,33 @@ def handle_issue_created(data: dict) -> Optional[discord.Embed]:
         status_name = (fields.get("status") or {}).get("name")
         assignee = _format_user(fields.get("assignee") or {})
 
-        embed = discord.Embed(
-            title=f"[{issue_key}] New Issue Created",
-            description=_format_summary(summary),
-            color=_color_from_priority(priority),
-        )
-
         issue_url = build_issue_url(issue)
-        if issue_url:
-            embed.url = issue_url
-
         project = fields.get("project") or {}
         project_name = project.get("name", "Unknown Project")
-        embed.set_author(name=project_name, url=issue_url or discord.Embed.Empty)
-
-        embed.add_field(name="Type", value=_safe_text(issue_type), inline=True)
-        if status_name:
-            embed.add_field(name="Status", value=_safe_text(status_name), inline=True)
-        embed.add_field(name="Priority", value=_safe_text(priority), inline=True)
-
-        embed.add_field(name="Reporter", value=_safe_text(reporter), inline=True)
-        embed.add_field(
-            name="Assignee", value=_safe_text(assignee or "Unassigned"), inline=True
-        )
 
-        labels = _normalize_labels(fields.get("labels"))
-        if labels:
-            embed.add_field(name="Labels", value=labels, inline=False)
-
-        created_timestamp = fields.get("created")
-        parsed_timestamp = parse_jira_datetime(created_timestamp)
+        parsed_timestamp = parse_jira_datetime(fields.get("created"))
         if parsed_timestamp:
-            embed.timestamp = parsed_timestamp
-            embed.set_footer(text=f"Created {format_dt(parsed_timestamp, 'R')}")
+            footer = f"Created {format_dt(parsed_timestamp, 'R')}"
         else:
-            embed.set_footer(text="Created date unavailable")
+            footer = "Created date unavailable"
 
-        return embed
+        return ISSUE_CREATED_TEMPLATE.render(
+            issue_key,
+            description=_format_summary(summary),
+            values=(
+                _safe_text(issue_type),
+                _safe_text(status_name) if status_name else None,
+                _safe_text(priority),
+                _safe_text(reporter),
+                _safe_text(assignee or "Unassigned"),
+                _normalize_labels(fields.get("labels")),
+            ),
+            url=issue_url,
+            author=project_name,
+            color=_color_from_priority(priority),
+            footer=footer,
+            timestamp=parsed_timestamp,
+        )
 
     except KeyError as exc:
         logger.error("Error parsing Jira 'issue_created' payload: Missing key %s", exc)
@@ -95,31 +114,23 @@ def _format_summary(summary: str) -> str:
 
 def _format_user(user_info) -> Optional[str]:
     if isinstance(user_info, str):
-        return escape_markdown(user_info)
+        return escape_name(user_info)
     if isinstance(user_info, dict):
         for key in ("displayName", "nickname", "name", "emailAddress"):
             value = user_info.get(key)
             if value:
-                return escape_markdown(str(value))
+                return escape_name(value)
     return None
 
 
 def _safe_text(value: Optional[str]) -> str:
     if not value:
         return "--"
-    return escape_markdown(str(value))
+    return escape_name(value)
 
 
 def _color_from_priority(priority: str) -> discord.Color:
-    normalized = (priority or "").lower()
-    palette = {
-        "highest": discord.Color.from_rgb(220, 38, 38),
-        "high": discord.Color.from_rgb(249, 115, 22),
-        "medium": discord.Color.from_rgb(234, 179, 8),
-        "low": discord.Color.from_rgb(34, 197, 94),
-        "lowest": discord.Color.from_rgb(79, 70, 229),
-    }
-    return palette.get(normalized, discord.Color.blurple())
+    return palette_color(PRIORITY_COLORS, priority)
 
 
 def _normalize_labels(raw_labels) -> Optional[str]:
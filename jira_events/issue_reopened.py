@@ -11,11 +11,17 @@ ISSUE_REOPENED_EVENT_TYPES = (
     "issue_reopen",
 )
 
+ISSUE_REOPENED_ISSUE_FIELDS = ("summary", "project", "status")
+
 
 def register(registry, register_classifier=None) -> None:
-    registry.register(ISSUE_REOPENED_EVENT_TYPES, handle_issue_reopened)
+    registry.register(
+        ISSUE_REOPENED_EVENT_TYPES,
+        handle_issue_reopened,
+        fields=ISSUE_REOPENED_ISSUE_FIELDS,
+    )
     if register_classifier:
-        register_classifier(classify_issue_reopened)
+        register_classifier(classify_issue_reopened, "status")
 
 
 def classify_issue_reopened(data: dict) -> Optional[str]:
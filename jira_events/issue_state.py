@@ -0,0 +1,515 @@
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from datetime import timezone
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from .changelog import changelog_index
+from .common import parse_jira_datetime
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ISSUES = 50000
+ASSIGNEE_HISTORY = 10
+STATE_FORMAT_VERSION = 1
+
+# Payloads accepted on a tenant endpoint carry their tenant id under this key
+# through the ingest queue and the spool, so routing can find the tenant and
+# history is kept per tenant.
+TENANT_KEY = "_tenant"
+
+# What :meth:`IssueStateStore.observe` reads from a payload.
+_OBSERVED_KEYS = ("webhookEvent", "timestamp", "webhookEventCreated", TENANT_KEY)
+_OBSERVED_FIELDS = ("status", "assignee", "labels", "created")
+_OBSERVED_CHANGES = ("status", "assignee", "labels")
+
+
+class StatusChange(NamedTuple):
+    """
+    A status change applied to an issue's state. ``previous`` is ``None``
+    when the issue was first seen already in ``current``; ``category`` is
+    the Jira status category key of ``current`` when the payload carried it.
+    ``created`` and ``started`` are copied from the issue's state, and
+    ``tenant`` is the tenant the payload arrived for, if any.
+    """
+
+    issue_key: str
+    previous: Optional[str]
+    current: Optional[str]
+    at: float
+    seconds_in_previous: Optional[float]
+    category: Optional[str]
+    created: Optional[float]
+    started: Optional[float]
+    tenant: Optional[str] = None
+
+
+def scoped_key(key: str, tenant: Optional[str] = None) -> str:
+    """``key`` qualified by the tenant it belongs to, e.g. ``acme/DCBOT-1``."""
+    return f"{tenant}/{key}" if tenant else key
+
+
+def payload_tenant(data) -> Optional[str]:
+    """The tenant a payload was accepted for, or ``None`` for untagged ones."""
+    tenant = data.get(TENANT_KEY) if isinstance(data, dict) else None
+    return tenant if isinstance(tenant, str) else None
+
+
+class IssueState:
+    """
+    What the bot has seen of one issue across webhooks: its current status
+    and when it was entered, the time spent in the status it just left, the
+    recent assignees with a reassignment count, and the label set. ``created``
+    comes from the issue itself; ``started`` is the first status change the
+    bot saw.
+    """
+
+    __slots__ = (
+        "status",
+        "status_since",
+        "status_entered",
+        "previous_status",
+        "previous_status_seconds",
+        "assignee",
+        "assignees",
+        "reassignments",
+        "labels",
+        "updated",
+        "created",
+        "started",
+    )
+
+    def __init__(self) -> None:
+        self.status: Optional[str] = None
+        self.status_since: Optional[float] = None
+        # Status name -> epoch seconds of the latest entry into it.
+        self.status_entered: Dict[str, float] = {}
+        self.previous_status: Optional[str] = None
+        self.previous_status_seconds: Optional[float] = None
+        self.assignee: Optional[str] = None
+        self.assignees: List[str] = []
+        self.reassignments = 0
+        self.labels: frozenset = frozenset()
+        self.updated = 0.0
+        self.created: Optional[float] = None
+        self.started: Optional[float] = None
+
+    def seconds_in_status(self, now: Optional[float] = None) -> Optional[float]:
+        if self.status_since is None:
+            return None
+        return max((time.time() if now is None else now) - self.status_since, 0.0)
+
+
+class IssueStateStore:
+    """
+    Bounded map of issue key -> :class:`IssueState`, updated from every
+    webhook by :meth:`observe` so handlers can enrich embeds with history
+    the payload does not carry. Issues of payloads tagged with a tenant are
+    kept under :func:`scoped_key`, so tenants sharing project keys never
+    see each other's history.
+
+    Lookups are a single dict access. When more than ``max_issues`` issues
+    are tracked, the least recently updated one is evicted. :meth:`save`
+    writes a zlib-compressed snapshot with a shared string table.
+    Listeners added with :meth:`add_listener` are told about every status
+    change that is applied, in order; observers added with
+    :meth:`add_observer` get every payload that was folded in, e.g. to
+    forward it to the process that owns the persisted store.
+    """
+
+    def __init__(self, max_issues: int = DEFAULT_MAX_ISSUES) -> None:
+        self._states: "OrderedDict[str, IssueState]" = OrderedDict()
+        self._max_issues = max(max_issues, 1)
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._listeners: List[Callable[[StatusChange], None]] = []
+        self._observers: List[Callable[[dict], None]] = []
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def get(
+        self, issue_key: Optional[str], tenant: Optional[str] = None
+    ) -> Optional[IssueState]:
+        if not issue_key:
+            return None
+        return self._states.get(scoped_key(issue_key, tenant))
+
+    def resize(self, max_issues: int) -> None:
+        with self._lock:
+            self._max_issues = max(max_issues, 1)
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._states.clear()
+            self._dirty = False
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    def add_listener(self, listener: Callable[[StatusChange], None]) -> None:
+        """Calls ``listener`` under the store lock for each applied change."""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[StatusChange], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def add_observer(self, observer: Callable[[dict], None]) -> None:
+        """Calls ``observer`` outside the store lock for each observed payload."""
+        if observer not in self._observers:
+            self._observers.append(observer)
+
+    def remove_observer(self, observer: Callable[[dict], None]) -> None:
+        if observer in self._observers:
+            self._observers.remove(observer)
+
+    def items(self) -> List[Tuple[str, IssueState]]:
+        with self._lock:
+            return list(self._states.items())
+
+    def observe(self, data) -> Optional[IssueState]:
+        """
+        Folds one webhook payload into its issue's state and returns it.
+        Status and assignee changes older than what is already recorded are
+        ignored so out-of-order deliveries cannot rewind the state, and a
+        change to the value already recorded is ignored so observing the
+        same payload twice changes nothing.
+        """
+        if not isinstance(data, dict):
+            return None
+        issue = data.get("issue")
+        if not isinstance(issue, dict) or not issue.get("key"):
+            return None
+        fields = issue.get("fields")
+        if not isinstance(fields, dict):
+            fields = {}
+        index = changelog_index(data)
+        status_change, status_audit = index.get("status")
+        assignee_change, assignee_audit = index.get("assignee")
+        labels_change, _ = index.get("labels")
+        now = time.time()
+
+        tenant = payload_tenant(data)
+        key = scoped_key(issue["key"], tenant)
+        change: Optional[StatusChange] = None
+
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                state = self._states[key] = IssueState()
+            else:
+                self._states.move_to_end(key)
+            if state.created is None:
+                state.created = _created_time(data, fields)
+
+            if status_change:
+                at = _event_time(data, status_audit, now)
+                if _apply_status(state, status_change, at):
+                    change = StatusChange(
+                        issue["key"],
+                        state.previous_status,
+                        state.status,
+                        at,
+                        state.previous_status_seconds,
+                        _category(fields, state.status),
+                        state.created,
+                        state.started,
+                        tenant,
+                    )
+            elif state.status is None:
+                status = _name(fields.get("status"))
+                if status:
+                    at = _event_time(data, None, now)
+                    state.status = status
+                    state.status_since = at
+                    state.status_entered[status] = at
+                    change = StatusChange(
+                        issue["key"],
+                        None,
+                        status,
+                        at,
+                        None,
+                        _category(fields, status),
+                        state.created,
+                        state.started,
+                        tenant,
+                    )
+
+            if assignee_change:
+                at = _event_time(data, assignee_audit, now)
+                _apply_assignee(state, assignee_change, at)
+            elif state.assignee is None and "assignee" in fields:
+                assignee = _name(fields.get("assignee"))
+                if assignee:
+                    state.assignee = assignee
+                    state.assignees.append(assignee)
+
+            if labels_change:
+                state.labels = frozenset((labels_change.get("toString") or "").split())
+            elif isinstance(fields.get("labels"), list):
+                state.labels = frozenset(map(str, fields["labels"]))
+
+            state.updated = max(state.updated, _event_time(data, None, now))
+            self._dirty = True
+            self._evict()
+            if change is not None:
+                for listener in self._listeners:
+                    try:
+                        listener(change)
+                    except Exception:  # pragma: no cover - listener bug
+                        logger.exception("Issue state listener failed.")
+        for observer in self._observers:
+            try:
+                observer(data)
+            except Exception:
+                logger.exception("Issue state observer failed.")
+        return state
+
+    def _evict(self) -> None:
+        while len(self._states) > self._max_issues:
+            self._states.popitem(last=False)
+
+    def save(self, path: str) -> None:
+        """Atomically writes a compressed snapshot of every tracked issue."""
+        with self._lock:
+            strings: Dict[str, int] = {}
+            records = [
+                _encode_state(key, state, strings)
+                for key, state in self._states.items()
+            ]
+            self._dirty = False
+        document = {
+            "version": STATE_FORMAT_VERSION,
+            "strings": list(strings),
+            "issues": records,
+        }
+        body = zlib.compress(
+            json.dumps(document, separators=(",", ":")).encode("utf-8"), 6
+        )
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as handle:
+            handle.write(body)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, path)
+
+    def load(self, path: str) -> int:
+        """
+        Replaces the tracked issues with a snapshot written by :meth:`save`.
+        A missing or unreadable file leaves the store empty. Returns the
+        number of issues loaded.
+        """
+        try:
+            with open(path, "rb") as handle:
+                document = json.loads(zlib.decompress(handle.read()))
+            if document.get("version") != STATE_FORMAT_VERSION:
+                raise ValueError(f"unsupported version {document.get('version')}")
+            strings = document["strings"]
+            states = [_decode_state(record, strings) for record in document["issues"]]
+        except FileNotFoundError:
+            return 0
+        except (
+            OSError,
+            ValueError,
+            KeyError,
+            IndexError,
+            TypeError,
+            zlib.error,
+        ) as exc:
+            logger.error("Could not load issue state from %s: %s", path, exc)
+            return 0
+
+        with self._lock:
+            self._states = OrderedDict(states)
+            self._dirty = False
+            self._evict()
+            return len(self._states)
+
+
+def compact_observation(data) -> Optional[dict]:
+    """
+    Returns just the parts of a webhook payload that
+    :meth:`IssueStateStore.observe` reads, with each field change in a
+    history entry of its own, or ``None`` when the payload names no issue.
+    Observing the result has the same effect as observing the payload.
+    """
+    if not isinstance(data, dict):
+        return None
+    issue = data.get("issue")
+    if not isinstance(issue, dict) or not issue.get("key"):
+        return None
+    fields = issue.get("fields")
+    if not isinstance(fields, dict):
+        fields = {}
+    compact = {key: data[key] for key in _OBSERVED_KEYS if data.get(key) is not None}
+    compact["issue"] = {
+        "key": issue["key"],
+        "fields": {name: fields[name] for name in _OBSERVED_FIELDS if name in fields},
+    }
+    index = changelog_index(data)
+    histories = []
+    for field_id in _OBSERVED_CHANGES:
+        item, audit = index.get(field_id)
+        if item is not None:
+            histories.append({"created": (audit or {}).get("created"), "items": [item]})
+    if histories:
+        compact["changelog"] = {"histories": histories}
+    return compact
+
+
+def _apply_status(state: IssueState, change: dict, at: float) -> bool:
+    if state.status_since is not None and at < state.status_since:
+        return False
+    current = change.get("toString")
+    # A transition into the status the issue is already in is a redelivery
+    # (a retry, replay, or dedup miss) of a change that was applied.
+    if state.status is not None and current == state.status:
+        return False
+    previous = change.get("fromString") or state.status
+    if previous and previous == state.status and state.status_since is not None:
+        entered = state.status_since
+    else:
+        entered = state.status_entered.get(previous) if previous else None
+    state.previous_status = previous
+    state.previous_status_seconds = at - entered if entered is not None else None
+    state.status = current
+    state.status_since = at
+    if current:
+        state.status_entered[current] = at
+    if state.started is None:
+        state.started = at
+    return True
+
+
+def _apply_assignee(state: IssueState, change: dict, at: float) -> None:
+    if at < state.updated:
+        return
+    previous = change.get("fromString")
+    current = change.get("toString")
+    if state.assignees and current == state.assignee:
+        return
+    if not state.assignees and previous:
+        state.assignees.append(previous)
+    if previous:
+        state.reassignments += 1
+    state.assignee = current
+    if current:
+        state.assignees.append(current)
+        del state.assignees[:-ASSIGNEE_HISTORY]
+
+
+def _event_time(data: dict, audit: Optional[dict], default: float) -> float:
+    for raw in (
+        (audit or {}).get("created"),
+        data.get("timestamp"),
+        data.get("webhookEventCreated"),
+    ):
+        parsed = parse_jira_datetime(raw) if raw is not None else None
+        if parsed is not None:
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            return parsed.timestamp()
+    return default
+
+
+def _created_time(data: dict, fields: dict) -> Optional[float]:
+    created = parse_jira_datetime(fields.get("created"))
+    if created is not None:
+        if created.tzinfo is None:
+            created = created.replace(tzinfo=timezone.utc)
+        return created.timestamp()
+    if data.get("webhookEvent") == "jira:issue_created":
+        return _event_time(data, None, time.time())
+    return None
+
+
+def _category(fields: dict, status: Optional[str]) -> Optional[str]:
+    current = fields.get("status")
+    if not isinstance(current, dict) or _name(current) != status:
+        return None
+    category = current.get("statusCategory")
+    return category.get("key") if isinstance(category, dict) else None
+
+
+def _name(value) -> Optional[str]:
+    if isinstance(value, dict):
+        return value.get("name") or value.get("displayName")
+    return value if isinstance(value, str) else None
+
+
+def _intern(value: Optional[str], strings: Dict[str, int]) -> int:
+    if value is None:
+        return -1
+    index = strings.get(value)
+    if index is None:
+        index = strings[value] = len(strings)
+    return index
+
+
+def _encode_state(key: str, state: IssueState, strings: Dict[str, int]) -> list:
+    return [
+        _intern(key, strings),
+        _intern(state.status, strings),
+        state.status_since,
+        [
+            [_intern(name, strings), entered]
+            for name, entered in state.status_entered.items()
+        ],
+        _intern(state.previous_status, strings),
+        state.previous_status_seconds,
+        _intern(state.assignee, strings),
+        [_intern(name, strings) for name in state.assignees],
+        state.reassignments,
+        [_intern(label, strings) for label in sorted(state.labels)],
+        state.updated,
+        state.created,
+        state.started,
+    ]
+
+
+def _decode_state(record: list, strings: List[str]) -> Tuple[str, IssueState]:
+    def text(index: int) -> Optional[str]:
+        return strings[index] if index >= 0 else None
+
+    state = IssueState()
+    state.status = text(record[1])
+    state.status_since = record[2]
+    state.status_entered = {strings[name]: entered for name, entered in record[3]}
+    state.previous_status = text(record[4])
+    state.previous_status_seconds = record[5]
+    state.assignee = text(record[6])
+    state.assignees = [strings[index] for index in record[7]]
+    state.reassignments = int(record[8])
+    state.labels = frozenset(strings[index] for index in record[9])
+    state.updated = float(record[10])
+    state.created, state.started = record[11], record[12]
+    return strings[record[0]], state
+
+
+def format_duration(seconds: Optional[float]) -> Optional[str]:
+    """Renders a duration with its two largest units, e.g. ``3d 4h``."""
+    if seconds is None or seconds < 0:
+        return None
+    remaining = int(seconds)
+    parts: List[str] = []
+    for unit, size in (("d", 86400), ("h", 3600), ("m", 60)):
+        if remaining >= size:
+            parts.append(f"{remaining // size}{unit}")
+            remaining %= size
+        if len(parts) == 2:
+            break
+    if not parts:
+        return f"{remaining}s"
+    return " ".join(parts)
+
+
+# Process-wide store updated by ``ourdiscordbot.jira_handler`` for every webhook.
+issue_states = IssueStateStore()
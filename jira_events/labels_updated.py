@@ -11,11 +11,17 @@ LABELS_UPDATED_EVENT_TYPES = (
     "labels_changed",
 )
 
+LABELS_UPDATED_ISSUE_FIELDS = ("summary", "project", "labels")
+
 
 def register(registry, register_classifier=None) -> None:
-    registry.register(LABELS_UPDATED_EVENT_TYPES, handle_labels_updated)
+    registry.register(
+        LABELS_UPDATED_EVENT_TYPES,
+        handle_labels_updated,
+        fields=LABELS_UPDATED_ISSUE_FIELDS,
+    )
     if register_classifier:
-        register_classifier(classify_labels_updated)
+        register_classifier(classify_labels_updated, "labels")
 
 
 def classify_labels_updated(data: dict) -> Optional[str]:
@@ -0,0 +1,96 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class StageTiming:
+    kind: str
+    name: str
+    calls: int
+    wall_seconds: float
+    cpu_seconds: float
+
+
+class StageProfiler:
+    """
+    Accumulates calls, wall time and thread CPU time per ``(kind, name)``,
+    e.g. ``("handler", "handle_status_transition")`` or
+    ``("classifier", "classify_status_transition")``. CPU time comes from
+    :func:`time.thread_time`, so time spent waiting on other threads is not
+    counted against a stage.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._totals: Dict[Tuple[str, str], List[float]] = {}
+
+    def timed(self, kind: str, name: str, func, *args, **kwargs):
+        wall_started = time.perf_counter()
+        cpu_started = time.thread_time()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.record(
+                kind,
+                name,
+                time.perf_counter() - wall_started,
+                time.thread_time() - cpu_started,
+            )
+
+    def record(self, kind: str, name: str, wall: float, cpu: float) -> None:
+        with self._lock:
+            totals = self._totals.get((kind, name))
+            if totals is None:
+                totals = self._totals[(kind, name)] = [0, 0.0, 0.0]
+            totals[0] += 1
+            totals[1] += wall
+            totals[2] += cpu
+
+    def timings(self) -> List[StageTiming]:
+        """Every stage seen so far, most wall time first."""
+        with self._lock:
+            items = [(key, list(totals)) for key, totals in self._totals.items()]
+        return sorted(
+            (
+                StageTiming(kind, name, int(calls), wall, cpu)
+                for (kind, name), (calls, wall, cpu) in items
+            ),
+            key=lambda timing: timing.wall_seconds,
+            reverse=True,
+        )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._totals.clear()
+
+
+# The profiler stage hooks report to, or ``None`` when profiling is off.
+# Hooks read it once per call, so the disabled cost is one attribute load.
+active: Optional[StageProfiler] = None
+
+
+def enable_stage_profiling(registry) -> StageProfiler:
+    """
+    Starts timing ``registry`` handlers, issue-update classifiers, and the
+    stages of ``ourdiscordbot.jira_handler.render_jira_events``. Returns the
+    profiler already running when called twice.
+    """
+    global active
+    if active is None:
+        active = StageProfiler()
+    registry.set_profiler(active)
+    return active
+
+
+def disable_stage_profiling(registry) -> Optional[StageProfiler]:
+    """Stops profiling and returns the profiler with what it recorded."""
+    global active
+    profiler, active = active, None
+    registry.set_profiler(None)
+    return profiler
+
+
+def callable_name(func) -> str:
+    return getattr(func, "__qualname__", None) or type(func).__qualname__
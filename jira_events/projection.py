@@ -0,0 +1,86 @@
+from typing import AbstractSet, Iterable, Optional, Sequence
+
+# Keys consulted while classifying, deduplicating, and routing a payload.
+TOP_LEVEL_KEYS = frozenset(
+    (
+        "webhookEvent",
+        "issue_event_type_name",
+        "event_type",
+        "eventType",
+        "timestamp",
+        "webhookEventCreated",
+        "user",
+        "changelog",
+        "comment",
+        "issue",
+    )
+)
+ISSUE_KEYS = frozenset(("id", "key", "self", "fields", "changelog"))
+USER_KEYS = frozenset(("accountId", "displayName", "name", "emailAddress"))
+
+# Issue fields the pipeline itself relies on regardless of handler needs.
+BASE_ISSUE_FIELDS = frozenset(
+    ("project", "issuetype", "priority", "status", "labels", "assignee")
+)
+
+
+def project_payload(data, issue_fields: Optional[AbstractSet[str]]):
+    """
+    Returns a copy of the webhook payload reduced to the keys the registered
+    handlers declared, dropping bulky values such as descriptions,
+    attachment metadata and custom fields. ``issue_fields=None`` disables
+    projection and returns the payload unchanged.
+    """
+    if issue_fields is None or not isinstance(data, dict):
+        return data
+
+    projected = {key: value for key, value in data.items() if key in TOP_LEVEL_KEYS}
+
+    user = projected.get("user")
+    if isinstance(user, dict):
+        projected["user"] = _pick(user, USER_KEYS)
+
+    issue = projected.get("issue")
+    if isinstance(issue, dict):
+        issue = _pick(issue, ISSUE_KEYS)
+        fields = issue.get("fields")
+        if isinstance(fields, dict):
+            issue["fields"] = {
+                key: value
+                for key, value in fields.items()
+                if key in issue_fields or key in BASE_ISSUE_FIELDS
+            }
+        projected["issue"] = issue
+
+    return projected
+
+
+def _pick(source: dict, keys: AbstractSet[str]) -> dict:
+    return {key: value for key, value in source.items() if key in keys}
+
+
+def issue_fields_for_paths(paths: Iterable[Sequence[str]]) -> Optional[frozenset]:
+    """
+    Derives the ``issue.fields`` keys needed by handlers that read payload
+    values by path (e.g. ``("issue", "fields", "summary")``). Returns
+    ``None`` when a path reaches data that projection would drop.
+    """
+    fields = set()
+    for path in paths:
+        if not path:
+            continue
+        root = path[0]
+        if root == "fieldChange" or root == "changelog":
+            continue
+        if root not in TOP_LEVEL_KEYS:
+            return None
+        if root == "user" and len(path) > 1 and path[1] not in USER_KEYS:
+            return None
+        if root == "issue" and len(path) > 1:
+            if path[1] == "fields":
+                if len(path) == 2:
+                    return None
+                fields.add(path[2])
+            elif path[1] not in ISSUE_KEYS and path[1] != "url":
+                return None
+    return frozenset(fields)
@@ -1,21 +1,39 @@
 from __future__ import annotations
 
 import inspect
-from dataclasses import dataclass
-from typing import Callable, Dict, Iterable, Optional
+from typing import AbstractSet, Callable, Dict, FrozenSet, Iterable, Optional, Tuple
 
 import discord
 
+from .profiling import callable_name
+
 EventHandler = Callable[..., Optional[discord.Embed]]
 
 
-@dataclass
+# Calls a handler as ``call(data, event_type)`` whatever its signature.
+CallShim = Callable[[dict, str], Optional[discord.Embed]]
+
+
 class RegisteredHandler:
-    func: EventHandler
-    accepts_positional_event_type: bool
-    accepts_keyword_event_type: bool
-    has_varargs: bool
-    has_varkw: bool
+    """
+    A handler together with the shim that calls it. The shim is chosen once
+    from the handler's signature, so dispatch never inspects the handler.
+    """
+
+    __slots__ = ("func", "call", "fields")
+
+    def __init__(
+        self,
+        func: EventHandler,
+        call: CallShim,
+        fields: Optional[FrozenSet[str]] = None,
+    ) -> None:
+        self.func = func
+        self.call = call
+        self.fields = fields
+
+    def __repr__(self) -> str:
+        return f"RegisteredHandler(func={self.func!r}, fields={self.fields!r})"
 
 
 class JiraEventRegistry:
@@ -26,18 +44,46 @@ class JiraEventRegistry:
 
     def __init__(self) -> None:
         self._handlers: Dict[str, RegisteredHandler] = {}
+        # Flat ``event type -> shim`` view of ``_handlers`` for dispatch.
+        self._calls: Dict[str, CallShim] = {}
+        self._known: FrozenSet[str] = frozenset()
+        # Shims by handler identity, so re-registering a handler (e.g. on a
+        # smart template reload) does not inspect its signature again. Only
+        # handlers that are still registered are kept.
+        self._shims: Dict[int, Tuple[EventHandler, CallShim]] = {}
+        self._required_fields: Optional[AbstractSet[str]] = None
+        self._required_fields_stale = True
+        self._profiler = None
 
     @staticmethod
     def _normalize(event_type: str) -> str:
         return event_type.strip().lower()
 
-    def register(self, event_types: Iterable[str], handler: EventHandler) -> None:
-        registration = self._analyze_handler(handler)
+    def register(
+        self,
+        event_types: Iterable[str],
+        handler: EventHandler,
+        fields: Optional[Iterable[str]] = None,
+    ) -> None:
+        """
+        Registers ``handler`` for ``event_types``. ``fields`` lists the
+        ``issue.fields`` keys the handler reads so that payloads can be
+        projected before rendering; ``None`` means the handler needs them all.
+        """
+        registration = RegisteredHandler(
+            handler,
+            self._shim(handler),
+            None if fields is None else frozenset(fields),
+        )
         for event_type in event_types:
             if not event_type:
                 continue
             key = self._normalize(event_type)
             self._handlers[key] = registration
+            self._calls[key] = registration.call
+        self._known = frozenset(self._handlers)
+        self._required_fields_stale = True
+        self._prune_shims()
 
     def get_handler(self, event_type: str) -> Optional[RegisteredHandler]:
         if not event_type:
@@ -45,58 +91,106 @@ class JiraEventRegistry:
         return self._handlers.get(self._normalize(event_type))
 
     def dispatch(self, event_type: str, data: dict):
+        # Classified event types are already normalized, so the first lookup
+        # almost always hits; only raw webhook names pay for normalizing.
+        call = self._calls.get(event_type)
+        if call is None:
+            if not event_type:
+                return None
+            call = self._calls.get(self._normalize(event_type))
+            if call is None:
+                return None
+        return call(data, event_type)
+
+    def set_profiler(self, profiler) -> None:
+        """
+        Times every handler call with ``profiler`` (a
+        :class:`jira_events.profiling.StageProfiler`); ``None`` stops. The
+        timed variant replaces :meth:`dispatch` on this instance only while
+        profiling, so the normal path carries no check.
+        """
+        self._profiler = profiler
+        if profiler is None:
+            self.__dict__.pop("dispatch", None)
+        else:
+            self.dispatch = self._profiled_dispatch
+
+    def _profiled_dispatch(self, event_type: str, data: dict):
         registration = self.get_handler(event_type)
-        if registration:
-            handler = registration.func
-            if registration.accepts_positional_event_type or registration.has_varargs:
-                return handler(data, event_type)
-            if registration.accepts_keyword_event_type or registration.has_varkw:
-                return handler(data, event_type=event_type)
-            return handler(data)
-        return None
-
-    def known_events(self) -> Iterable[str]:
-        return tuple(self._handlers.keys())
+        if not registration:
+            return None
+        return self._profiler.timed(
+            "handler",
+            f"{callable_name(registration.func)} [{self._normalize(event_type)}]",
+            registration.call,
+            data,
+            event_type,
+        )
+
+    def known_events(self) -> FrozenSet[str]:
+        return self._known
+
+    def required_issue_fields(self) -> Optional[AbstractSet[str]]:
+        """
+        Union of the ``issue.fields`` keys declared by registered handlers,
+        or ``None`` when any handler did not declare its requirements.
+        """
+        if self._required_fields_stale:
+            required = set()
+            for registration in self._handlers.values():
+                if registration.fields is None:
+                    required = None
+                    break
+                required |= registration.fields
+            self._required_fields = None if required is None else frozenset(required)
+            self._required_fields_stale = False
+        return self._required_fields
+
+    def _shim(self, handler: EventHandler) -> CallShim:
+        cached = self._shims.get(id(handler))
+        if cached is not None and cached[0] is handler:
+            return cached[1]
+        call = self._build_shim(handler)
+        self._shims[id(handler)] = (handler, call)
+        return call
+
+    def _prune_shims(self) -> None:
+        # Handlers replaced on every event type they served would otherwise
+        # stay alive in the cache for the life of the registry.
+        live = {id(registration.func) for registration in self._handlers.values()}
+        for handler_id in [key for key in self._shims if key not in live]:
+            del self._shims[handler_id]
 
     @staticmethod
-    def _analyze_handler(handler: EventHandler) -> RegisteredHandler:
+    def _build_shim(handler: EventHandler) -> CallShim:
+        """
+        Returns a callable taking ``(data, event_type)`` that calls
+        ``handler`` the way its signature expects. Handlers that take the
+        event type as a second positional argument are their own shim.
+        """
         try:
             signature = inspect.signature(handler)
         except (ValueError, TypeError):
-            return RegisteredHandler(
-                func=handler,
-                accepts_positional_event_type=True,
-                accepts_keyword_event_type=True,
-                has_varargs=True,
-                has_varkw=True,
-            )
-
-        accepts_positional = False
-        accepts_keyword = False
-        has_varargs = False
-        has_varkw = False
+            return handler
 
+        accepts_keyword = False
         for index, param in enumerate(signature.parameters.values()):
             if param.kind == inspect.Parameter.VAR_POSITIONAL:
-                has_varargs = True
-            elif param.kind == inspect.Parameter.VAR_KEYWORD:
-                has_varkw = True
+                return handler
+            if param.kind == inspect.Parameter.VAR_KEYWORD:
+                accepts_keyword = True
             elif param.kind in (
                 inspect.Parameter.POSITIONAL_ONLY,
                 inspect.Parameter.POSITIONAL_OR_KEYWORD,
             ):
                 if index >= 1:
-                    accepts_positional = True
+                    return handler
                 if param.name == "event_type":
                     accepts_keyword = True
             elif param.kind == inspect.Parameter.KEYWORD_ONLY:
                 if param.name == "event_type":
                     accepts_keyword = True
 
-        return RegisteredHandler(
-            func=handler,
-            accepts_positional_event_type=accepts_positional,
-            accepts_keyword_event_type=accepts_keyword,
-            has_varargs=has_varargs,
-            has_varkw=has_varkw,
-        )
+        if accepts_keyword:
+            return lambda data, event_type: handler(data, event_type=event_type)
+        return lambda data, event_type: handler(data)
@@ -0,0 +1,339 @@
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Tuple, Union
+
+import discord
+from discord.utils import escape_markdown
+
+from .changelog import changelog_index
+from .common import build_issue_url
+from .embed_templates import escape_name
+from .projection import issue_fields_for_paths
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_KEY = "discordTemplate"
+
+_PLACEHOLDER = re.compile(r"\{\{\s*(.*?)\s*\}\}")
+_STEP = re.compile(r'(?:join\("((?:[^"\\]|\\.)*)"\)|(\w+))(?:\.|$)')
+
+# Paths whose value is derived from the payload rather than read from it.
+_COMPUTED_PATHS = {
+    ("issue", "url"): lambda data, change: build_issue_url(data.get("issue") or {}),
+}
+
+
+class SmartTemplateError(ValueError):
+    """Raised when a smart template file cannot be compiled."""
+
+
+class Accessor:
+    """
+    A ``{{a.b.c}}`` placeholder compiled into a fixed sequence of lookup
+    steps. ``first``/``last`` and integer steps index into lists and a
+    trailing ``join("sep")`` joins a list into one string.
+    """
+
+    __slots__ = ("path", "_root", "_steps", "_computed")
+
+    def __init__(self, expression: str) -> None:
+        steps = _parse_steps(expression)
+        self.path = tuple(value for kind, value in steps if kind == "key")
+        self._computed = _COMPUTED_PATHS.get(self.path)
+        self._root = steps[0][1]
+        self._steps = tuple(steps[1:])
+
+    def __call__(self, data: dict, change: Optional[dict]):
+        if self._computed is not None:
+            return self._computed(data, change)
+
+        value = change if self._root == "fieldChange" else data.get(self._root)
+        for kind, step in self._steps:
+            if value is None:
+                return None
+            if kind == "key":
+                if isinstance(value, dict):
+                    value = value.get(step)
+                elif isinstance(value, list):
+                    value = _list_item(value, step)
+                else:
+                    return None
+            else:
+                if not isinstance(value, (list, tuple)):
+                    return None
+                value = step.join(str(item) for item in value if item is not None)
+        return value
+
+
+class CompiledText:
+    """A template string split once into literal text and accessors."""
+
+    __slots__ = ("_parts", "accessors", "constant")
+
+    def __init__(self, text: str) -> None:
+        parts: List[Union[str, Accessor]] = []
+        position = 0
+        for match in _PLACEHOLDER.finditer(text):
+            if match.start() > position:
+                parts.append(text[position : match.start()])
+            parts.append(Accessor(match.group(1)))
+            position = match.end()
+        if position < len(text):
+            parts.append(text[position:])
+        self._parts = tuple(parts)
+        self.accessors = tuple(part for part in parts if isinstance(part, Accessor))
+        # Text without placeholders is resolved here rather than per event.
+        self.constant = None if self.accessors else text.strip()
+
+    def render(
+        self,
+        data: dict,
+        change: Optional[dict],
+        escape: Callable[[str], str] = escape_name,
+    ) -> str:
+        """
+        Substitutes the placeholders, escaping their values. Placeholders
+        that resolve to nothing (or to an object) render as empty text.
+        """
+        if self.constant is not None:
+            return self.constant
+        rendered = []
+        for part in self._parts:
+            if isinstance(part, str):
+                rendered.append(part)
+                continue
+            value = part(data, change)
+            if value is None or isinstance(value, (dict, list)):
+                continue
+            rendered.append(escape(str(value)))
+        return "".join(rendered).strip()
+
+
+class SmartTemplate:
+    """
+    The ``discordTemplate`` block of a ``jira_smart_templates`` file,
+    compiled once and rendered into a :class:`discord.Embed` per event.
+    """
+
+    def __init__(self, name: str, spec: dict) -> None:
+        if not isinstance(spec, dict) or not spec.get("title"):
+            raise SmartTemplateError(f"{name}: '{TEMPLATE_KEY}' needs a title.")
+
+        self.name = name
+        event_types = spec.get("eventTypes") or (name,)
+        if isinstance(event_types, str):
+            event_types = (event_types,)
+        self.event_types: Tuple[str, ...] = _classified_event_types(event_types)
+        self.changelog_field: Optional[str] = spec.get("changelogField")
+
+        self._title = _compile(name, "title", spec["title"])
+        self._url = _compile(name, "url", spec.get("url"))
+        self._description = _compile(name, "description", spec.get("description"))
+        self._author = _compile(name, "author", spec.get("author"))
+        self._footer = _compile(name, "footer", spec.get("footer"))
+        self._color = _parse_color(name, spec.get("color"))
+
+        self._fields: List[Tuple[CompiledText, CompiledText, bool]] = []
+        for entry in spec.get("fields") or ():
+            if not isinstance(entry, dict) or "name" not in entry:
+                raise SmartTemplateError(f"{name}: every field needs a name.")
+            self._fields.append(
+                (
+                    _compile(name, "field name", entry["name"]),
+                    _compile(name, "field value", entry.get("value", "")),
+                    bool(entry.get("inline", False)),
+                )
+            )
+
+    @property
+    def paths(self) -> List[Tuple[str, ...]]:
+        texts = [self._title, self._url, self._description, self._author]
+        texts.append(self._footer)
+        for name, value, _ in self._fields:
+            texts.extend((name, value))
+        return [
+            accessor.path
+            for text in texts
+            if text is not None
+            for accessor in text.accessors
+        ]
+
+    def issue_fields(self) -> Optional[frozenset]:
+        """``issue.fields`` keys the template reads, for payload projection."""
+        return issue_fields_for_paths(self.paths)
+
+    def __call__(self, data: dict) -> Optional[discord.Embed]:
+        return self.render(data)
+
+    def render(self, data: dict) -> Optional[discord.Embed]:
+        if not isinstance(data, dict):
+            return None
+        change = None
+        if self.changelog_field:
+            change, _ = changelog_index(data).get(self.changelog_field)
+            if change is None:
+                logger.debug(
+                    "%s: no %s change in payload.", self.name, self.changelog_field
+                )
+                return None
+
+        title = self._title.render(data, change)
+        if not title:
+            return None
+
+        url = _render_plain(self._url, data, change)
+        embed = discord.Embed(
+            title=title[:256],
+            # Free text is escaped uncached so it does not churn the name cache.
+            description=_render(self._description, data, change, escape_markdown),
+            url=url,
+            color=self._color,
+        )
+        author = _render(self._author, data, change)
+        if author:
+            embed.set_author(name=author, url=url)
+        for name, value, inline in self._fields:
+            rendered_value = value.render(data, change)
+            if rendered_value:
+                embed.add_field(
+                    name=name.render(data, change) or "\u200b",
+                    value=rendered_value[:1024],
+                    inline=inline,
+                )
+        footer = _render(self._footer, data, change)
+        if footer:
+            embed.set_footer(text=footer)
+        return embed
+
+
+def load_smart_templates(directory: Union[str, Path]) -> List[SmartTemplate]:
+    """
+    Compiles the ``discordTemplate`` block of every ``*.json`` file in
+    ``directory``. Files without one are skipped; malformed files are
+    logged and skipped so one bad template does not block startup.
+    """
+    templates: List[SmartTemplate] = []
+    for path in sorted(Path(directory).glob("*.json")):
+        try:
+            document = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            logger.error("Could not read smart template %s: %s", path, exc)
+            continue
+
+        spec = document.get(TEMPLATE_KEY) if isinstance(document, dict) else None
+        if spec is None:
+            continue
+        try:
+            templates.append(SmartTemplate(path.stem, spec))
+        except SmartTemplateError as exc:
+            logger.error("Invalid smart template %s: %s", path, exc)
+    return templates
+
+
+def register_smart_templates(
+    registry, templates: Iterable[SmartTemplate], override: bool = False
+) -> List[str]:
+    """
+    Registers compiled templates as handlers. Event types that already have
+    a hand-written handler keep it unless ``override`` is set. Returns the
+    event types the templates now handle.
+    """
+    registered: List[str] = []
+    for template in templates:
+        event_types = [
+            event_type
+            for event_type in template.event_types
+            if override or registry.get_handler(event_type) is None
+        ]
+        if not event_types:
+            logger.info(
+                "Smart template %s skipped; its events already have handlers.",
+                template.name,
+            )
+            continue
+        registry.register(event_types, template, fields=template.issue_fields())
+        registered.extend(event_types)
+    return registered
+
+
+def _classified_event_types(event_types: Iterable[str]) -> Tuple[str, ...]:
+    # Issue updates dispatch under the ``jira:`` types the classifiers emit,
+    # so a bare ``issue_*`` name also claims its classified type, as the
+    # hand-written handlers do.
+    classified: List[str] = []
+    for event_type in event_types:
+        name = event_type.strip().lower() if isinstance(event_type, str) else ""
+        if name.startswith("issue_"):
+            classified.append(f"jira:{name}")
+        classified.append(event_type)
+    return tuple(classified)
+
+
+def _parse_steps(expression: str) -> List[Tuple[str, str]]:
+    steps: List[Tuple[str, str]] = []
+    position = 0
+    while position < len(expression):
+        match = _STEP.match(expression, position)
+        if not match or match.end() == position:
+            raise SmartTemplateError(f"Unsupported placeholder '{{{{{expression}}}}}'.")
+        separator, key = match.groups()
+        if key is not None:
+            steps.append(("key", key))
+        else:
+            steps.append(("join", separator.replace('\\"', '"')))
+        position = match.end()
+    if not steps or steps[0][0] != "key":
+        raise SmartTemplateError(f"Unsupported placeholder '{{{{{expression}}}}}'.")
+    return steps
+
+
+def _list_item(values: list, step: str):
+    if not values:
+        return None
+    if step == "first":
+        return values[0]
+    if step == "last":
+        return values[-1]
+    if step.isdigit():
+        index = int(step)
+        return values[index] if index < len(values) else None
+    return None
+
+
+def _compile(name: str, slot: str, text) -> Optional[CompiledText]:
+    if text is None:
+        return None
+    if not isinstance(text, str):
+        raise SmartTemplateError(f"{name}: {slot} must be a string.")
+    return CompiledText(text)
+
+
+def _parse_color(name: str, raw) -> discord.Color:
+    if raw is None:
+        return discord.Color.blurple()
+    try:
+        if isinstance(raw, str):
+            return discord.Color(int(raw.lstrip("#"), 16))
+        return discord.Color(int(raw))
+    except (TypeError, ValueError):
+        raise SmartTemplateError(f"{name}: invalid color {raw!r}.") from None
+
+
+def _render(
+    text: Optional[CompiledText],
+    data: dict,
+    change,
+    escape: Callable[[str], str] = escape_name,
+) -> Optional[str]:
+    if text is None:
+        return None
+    return text.render(data, change, escape) or None
+
+
+def _render_plain(text: Optional[CompiledText], data: dict, change) -> Optional[str]:
+    # URLs must not be markdown-escaped.
+    if text is None:
+        return None
+    return text.render(data, change, escape=str) or None
@@ -4,7 +4,10 @@ from typing import Optional, Tuple
 import discord
 from discord.utils import escape_markdown, format_dt
 
+from .changelog import changelog_index
 from .common import build_issue_url, parse_jira_datetime
+from .embed_templates import EmbedTemplate, STATUS_COLORS, escape_name, palette_color
+from .issue_state import format_duration, issue_states, payload_tenant
 
 logger = logging.getLogger(__name__)
 
@@ -14,11 +17,27 @@ STATUS_TRANSITION_EVENT_TYPES = (
     "issue_status_transitioned",
 )
 
+STATUS_TRANSITION_ISSUE_FIELDS = ("summary", "project", "priority", "assignee")
+
+STATUS_TRANSITION_TEMPLATE = EmbedTemplate(
+    "[{key}] Status Updated",
+    fields=(
+        ("From", True),
+        ("To", True),
+        ("Changed by", True),
+        ("Time in previous status", True),
+    ),
+)
+
 
 def register(registry, register_classifier=None) -> None:
-    registry.register(STATUS_TRANSITION_EVENT_TYPES, handle_status_transition)
+    registry.register(
+        STATUS_TRANSITION_EVENT_TYPES,
+        handle_status_transition,
+        fields=STATUS_TRANSITION_ISSUE_FIELDS,
+    )
     if register_classifier:
-        register_classifier(classify_status_transition)
+        register_classifier(classify_status_transition, "status")
 
 
 def classify_status_transition(data: dict) -> Optional[str]:
@@ -50,26 +69,12 @@ def handle_status_transition(data: dict, event_type=None) -> Optional[discord.Em
     summary = _format_summary(fields.get("summary"))
     issue_url = build_issue_url(issue)
 
-    embed = discord.Embed(
-        title=f"[{issue_key}] Status Updated",
-        description=summary,
-        color=_status_color(change.get("toString")),
-    )
-    if issue_url:
-        embed.url = issue_url
-
     project = fields.get("project") or {}
     project_name = project.get("name", "Unknown Project")
-    embed.set_author(name=project_name, url=issue_url or discord.Embed.Empty)
 
     from_value = _normalize_status_label(change.get("fromString"))
     to_value = _normalize_status_label(change.get("toString"))
-
-    embed.add_field(name="From", value=from_value, inline=True)
-    embed.add_field(name="To", value=to_value, inline=True)
-    embed.add_field(
-        name="Changed by", value=_resolve_actor(data, audit_info), inline=True
-    )
+    changed_by = _resolve_actor(data, audit_info)
 
     priority = (fields.get("priority") or {}).get("name")
     assignee_info = fields.get("assignee") or {}
@@ -77,9 +82,9 @@ def handle_status_transition(data: dict, event_type=None) -> Optional[discord.Em
 
     footer_parts = []
     if priority:
-        footer_parts.append(f"Priority: {escape_markdown(priority)}")
+        footer_parts.append(f"Priority: {escape_name(priority)}")
     if assignee:
-        footer_parts.append(f"Assignee: {escape_markdown(assignee)}")
+        footer_parts.append(f"Assignee: {escape_name(assignee)}")
 
     timestamp = (
         (audit_info or {}).get("created")
@@ -88,52 +93,44 @@ def handle_status_transition(data: dict, event_type=None) -> Optional[discord.Em
     )
     parsed_timestamp = parse_jira_datetime(timestamp)
     if parsed_timestamp:
-        embed.timestamp = parsed_timestamp
         footer_parts.append(f"Updated {format_dt(parsed_timestamp, 'R')}")
 
-    if footer_parts:
-        embed.set_footer(text=" | ".join(footer_parts))
-
-    return embed
+    return STATUS_TRANSITION_TEMPLATE.render(
+        issue_key,
+        description=summary,
+        values=(
+            from_value,
+            to_value,
+            changed_by,
+            _time_in_previous_status(data, issue, change),
+        ),
+        url=issue_url,
+        author=project_name,
+        color=_status_color(change.get("toString")),
+        footer=" | ".join(footer_parts),
+        timestamp=parsed_timestamp,
+    )
 
 
 def _extract_status_change(data: dict) -> Tuple[Optional[dict], Optional[dict]]:
-    changelog = data.get("changelog") or (data.get("issue") or {}).get("changelog")
-    if not changelog:
-        return None, None
-
-    if not isinstance(changelog, dict):
-        return None, None
+    return changelog_index(data).get("status")
 
-    items = changelog.get("items")
-    if isinstance(items, list):
-        for item in items:
-            if _is_status_field(item):
-                return item, changelog
 
-    histories = changelog.get("histories")
-    if isinstance(histories, list):
-        for history in histories:
-            for item in history.get("items", []):
-                if _is_status_field(item):
-                    audit = {
-                        "created": history.get("created"),
-                        "author": history.get("author"),
-                    }
-                    return item, audit
-
-    return None, changelog if changelog else None
-
-
-def _is_status_field(item: dict) -> bool:
-    field = (item.get("field") or "").lower()
-    field_id = (item.get("fieldId") or "").lower()
-    return field == "status" or field_id == "status"
+def _time_in_previous_status(data: dict, issue: dict, change: dict) -> Optional[str]:
+    # Only trust the store when it recorded this very transition.
+    state = issue_states.get(issue.get("key"), payload_tenant(data))
+    if (
+        state is None
+        or state.status != change.get("toString")
+        or state.previous_status != change.get("fromString")
+    ):
+        return None
+    return format_duration(state.previous_status_seconds)
 
 
 def _normalize_status_label(value: Optional[str]) -> str:
     if value:
-        return escape_markdown(value)
+        return escape_name(value)
     return "Unknown"
 
 
@@ -143,28 +140,18 @@ def _resolve_actor(data: dict, audit_info: Optional[dict]) -> str:
             "name"
         )
         if label:
-            return escape_markdown(str(label))
+            return escape_name(label)
 
     user = data.get("user") or {}
     display = user.get("displayName") or user.get("name") or user.get("emailAddress")
     if display:
-        return escape_markdown(str(display))
+        return escape_name(display)
 
     return "Unknown"
 
 
 def _status_color(status: Optional[str]) -> discord.Color:
-    normalized = (status or "").lower()
-    palette = {
-        "to do": discord.Color.from_rgb(148, 163, 184),
-        "selected for development": discord.Color.from_rgb(96, 165, 250),
-        "in progress": discord.Color.from_rgb(234, 179, 8),
-        "in review": discord.Color.from_rgb(249, 115, 22),
-        "blocked": discord.Color.from_rgb(220, 38, 38),
-        "done": discord.Color.from_rgb(34, 197, 94),
-        "closed": discord.Color.from_rgb(22, 163, 74),
-    }
-    return palette.get(normalized, discord.Color.blurple())
+    return palette_color(STATUS_COLORS, status)
 
 
 def _format_summary(summary) -> str:
@@ -0,0 +1,196 @@
+"""aiohttp application factory sharing the Discord client's event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import time
+from typing import Callable, Optional
+
+from aiohttp import web
+
+from .dedup import DeliveryCache, SQLiteDedupCache, delivery_key
+from .health import HEALTH, HealthMonitor
+from .ingest import AsyncIngestQueue
+from .metrics import (
+    CONTENT_TYPE,
+    RATE_LIMITED,
+    STAGE_SECONDS,
+    WEBHOOKS,
+    MetricsRegistry,
+)
+from .payloads import PayloadParser
+from .spool import SpoolDeliveryWorker
+from .tenants import TENANT_KEY, Tenant, TenantRegistry, secret_matches
+
+logger = logging.getLogger(__name__)
+
+PayloadHandler = Callable[[dict], object]
+
+INGEST_KEY = web.AppKey("jira_ingest", object)
+SPOOL_KEY = web.AppKey("jira_spool", object)
+
+
+def create_aiohttp_app(
+    *,
+    jira_secret: Optional[str],
+    handle_event: PayloadHandler,
+    ingest: Optional[AsyncIngestQueue] = None,
+    dedup: Optional[DeliveryCache] = None,
+    parser: Optional[PayloadParser] = None,
+    spool: Optional[SpoolDeliveryWorker] = None,
+    tenants: Optional[TenantRegistry] = None,
+    metrics: Optional[MetricsRegistry] = None,
+    health: Optional[HealthMonitor] = None,
+) -> web.Application:
+    """
+    Create the aiohttp app used for webhook ingestion.
+
+    Exposes the same ``/health`` and ``/webhooks/jira`` contracts as
+    :func:`ourdiscordbot.http_app.create_flask_app`, but runs on the loop that
+    also drives ``discord.Client`` so no cross-thread hop is needed to send.
+    With ``tenants`` it also serves ``/webhooks/jira/{tenant}``, and with
+    ``metrics`` it serves ``/metrics``.
+    """
+    health = health or HEALTH
+    parser = parser or PayloadParser()
+    # Bodies above the cap are refused with 413 before they are buffered.
+    app = web.Application(client_max_size=parser.max_bytes)
+    app[INGEST_KEY] = ingest
+    app[SPOOL_KEY] = spool
+    # SQLite lookups and synchronous handlers (the pipeline renders and sends
+    # on the calling thread) run in the default executor, so a webhook never
+    # blocks the loop that also drives discord.Client.
+    dedup_blocks = isinstance(dedup, SQLiteDedupCache)
+    handler_blocks = not inspect.iscoroutinefunction(handle_event)
+
+    async def _call(blocking: bool, func, *args):
+        if blocking:
+            return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+        return func(*args)
+
+    async def health_check(request: web.Request) -> web.Response:
+        snapshot = health.snapshot()
+        if request.query.get("details"):
+            return web.json_response(snapshot.to_dict())
+        return web.Response(text="OK" if snapshot.ok else "DEGRADED")
+
+    async def jira_webhook(request: web.Request) -> web.Response:
+        auth_token = request.query.get("secret")
+        if not secret_matches(auth_token, jira_secret):
+            logger.warning(
+                "Invalid secret provided for Jira webhook. Provided: %s", auth_token
+            )
+            WEBHOOKS.inc("forbidden")
+            raise web.HTTPForbidden()
+        return await _accept(request, None)
+
+    async def tenant_webhook(request: web.Request) -> web.Response:
+        tenant_id = request.match_info["tenant"]
+        tenant = tenants.authenticate(tenant_id, request.query.get("secret"))
+        if tenant is None:
+            logger.warning("Invalid secret provided for Jira tenant %s.", tenant_id)
+            WEBHOOKS.inc("forbidden")
+            raise web.HTTPForbidden()
+        if not tenant.admit():
+            tenants.record_throttled()
+            RATE_LIMITED.inc("tenant")
+            retry_after = tenant.limiter.retry_after()
+            logger.warning("Jira tenant %s exceeded its rate limit.", tenant_id)
+            WEBHOOKS.inc("throttled")
+            raise web.HTTPTooManyRequests(headers={"Retry-After": str(retry_after)})
+        return await _accept(request, tenant)
+
+    async def _accept(request: web.Request, tenant: Optional[Tenant]) -> web.Response:
+        raw_data = await request.read()
+        logger.info("Received Jira webhook payload (%d bytes).", len(raw_data))
+
+        started = time.perf_counter()
+        try:
+            data = parser.parse(raw_data)
+        except ValueError as exc:
+            logger.error("Failed to parse JSON from Jira webhook: %s", exc)
+            WEBHOOKS.inc("invalid")
+            raise web.HTTPBadRequest(text="Could not parse JSON payload.")
+
+        STAGE_SECONDS.observe(time.perf_counter() - started, "parse")
+
+        if isinstance(data, dict):
+            # Only the tenant endpoints may say which tenant a payload is for.
+            if tenant is not None:
+                data[TENANT_KEY] = tenant.id
+            else:
+                data.pop(TENANT_KEY, None)
+
+        dedup_key = None
+        if dedup is not None:
+            dedup_key = delivery_key(data, raw_data)
+            if tenant is not None:
+                dedup_key = f"{tenant.id}|{dedup_key}"
+            if await _call(dedup_blocks, dedup.seen, dedup_key):
+                logger.info("Ignoring duplicate Jira webhook delivery.")
+                WEBHOOKS.inc("duplicate")
+                return web.Response(text="Duplicate")
+
+        if isinstance(data, dict) and "issue" in data:
+            issue_key = (data.get("issue") or {}).get("key")
+            logger.info("Processing Jira event for issue: %s", issue_key)
+        else:
+            logger.warning("Jira webhook payload did not contain issue data.")
+
+        if spool is not None:
+            # The spool blocks until the payload is fsynced; keep that off the loop.
+            loop = asyncio.get_running_loop()
+            if not await loop.run_in_executor(None, spool.submit, data):
+                if dedup_key is not None:
+                    await _call(dedup_blocks, dedup.forget, dedup_key)
+                logger.warning("Event spool unavailable; rejecting Jira webhook.")
+                WEBHOOKS.inc("unavailable")
+                raise web.HTTPServiceUnavailable(
+                    text="Event spool is full; retry later."
+                )
+            WEBHOOKS.inc("accepted")
+            return web.Response(text="Accepted", status=202)
+
+        if ingest is not None:
+            if not ingest.submit(data):
+                if dedup_key is not None:
+                    # Let Jira's retry through once the queue has room again.
+                    await _call(dedup_blocks, dedup.forget, dedup_key)
+                logger.warning(
+                    "Ingest queue full (policy %s); rejecting Jira webhook.",
+                    ingest.policy,
+                )
+                WEBHOOKS.inc("unavailable")
+                raise web.HTTPServiceUnavailable(
+                    text="Ingest queue is full; retry later."
+                )
+            WEBHOOKS.inc("accepted")
+            return web.Response(text="Accepted", status=202)
+
+        try:
+            result = await _call(handler_blocks, handle_event, data)
+            if inspect.isawaitable(result):
+                await result
+        except Exception:
+            if dedup_key is not None:
+                # Jira retries failed deliveries; let the retry through.
+                await _call(dedup_blocks, dedup.forget, dedup_key)
+            raise
+        WEBHOOKS.inc("handled")
+        return web.Response(text="OK")
+
+    async def metrics_endpoint(request: web.Request) -> web.Response:
+        return web.Response(
+            body=metrics.render().encode("utf-8"),
+            headers={"Content-Type": CONTENT_TYPE},
+        )
+
+    app.router.add_get("/health", health_check)
+    if metrics is not None:
+        app.router.add_get("/metrics", metrics_endpoint)
+    app.router.add_post("/webhooks/jira", jira_webhook)
+    if tenants is not None:
+        app.router.add_post("/webhooks/jira/{tenant}", tenant_webhook)
+    return app
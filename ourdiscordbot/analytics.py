@@ -0,0 +1,525 @@
+"""Cycle-time and throughput analytics aggregated from issue status changes."""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Collection, Dict, Iterable, List, Optional, Tuple
+
+from jira_events import StatusChange, scoped_key
+from jira_events.issue_state import DEFAULT_MAX_ISSUES, format_duration
+
+logger = logging.getLogger(__name__)
+
+BUCKET_SECONDS = 3600
+BUCKETS_PER_DAY = 86400 // BUCKET_SECONDS
+DEFAULT_RETENTION_DAYS = 30
+DEFAULT_WINDOW_SECONDS = 7 * 86400
+DEFAULT_DONE_STATUSES = ("Done", "Closed", "Resolved")
+PERCENTILES = (50, 85, 95)
+SKETCH_RELATIVE_ACCURACY = 0.01
+ANALYTICS_FORMAT_VERSION = 1
+
+_WINDOW_PATTERN = re.compile(r"^(\d+)([hdw]?)$")
+_WINDOW_UNITS = {"h": 3600, "d": 86400, "w": 7 * 86400, "": 86400}
+_GAMMA = (1 + SKETCH_RELATIVE_ACCURACY) / (1 - SKETCH_RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch over durations in seconds. Values fall into
+    logarithmic bins, so estimates are within ``SKETCH_RELATIVE_ACCURACY``
+    of the true value and a year of durations needs under a thousand bins.
+    Values under a second are counted as zero.
+    """
+
+    __slots__ = ("bins", "zeros")
+
+    def __init__(self) -> None:
+        self.bins: Dict[int, int] = {}
+        self.zeros = 0
+
+    def __len__(self) -> int:
+        return self.zeros + sum(self.bins.values())
+
+    def add(self, value: float) -> None:
+        if value < 1.0:
+            self.zeros += 1
+            return
+        index = math.ceil(math.log(value) / _LOG_GAMMA)
+        self.bins[index] = self.bins.get(index, 0) + 1
+
+    def merge(self, other: "QuantileSketch") -> None:
+        self.zeros += other.zeros
+        bins = self.bins
+        for index, count in other.bins.items():
+            bins[index] = bins.get(index, 0) + count
+
+    def quantile(self, q: float) -> Optional[float]:
+        count = len(self)
+        if not count:
+            return None
+        rank = q * (count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if seen > rank:
+                return 2 * _GAMMA**index / (_GAMMA + 1)
+        return None  # pragma: no cover - rank is always below count
+
+    def encode(self) -> list:
+        return [self.zeros, [item for pair in self.bins.items() for item in pair]]
+
+    @classmethod
+    def decode(cls, record: list) -> "QuantileSketch":
+        sketch = cls()
+        sketch.zeros = int(record[0])
+        flat = record[1]
+        sketch.bins = {int(flat[i]): int(flat[i + 1]) for i in range(0, len(flat), 2)}
+        return sketch
+
+
+class _Bucket:
+    """One hour (or one day) of one project's status changes."""
+
+    __slots__ = ("entered", "completed", "cycle", "lead", "in_status")
+
+    def __init__(self) -> None:
+        self.entered: Dict[str, int] = {}
+        self.completed = 0
+        self.cycle = QuantileSketch()
+        self.lead = QuantileSketch()
+        self.in_status: Dict[str, QuantileSketch] = {}
+
+    def add(
+        self,
+        previous: str,
+        current: Optional[str],
+        seconds_in_previous: Optional[float],
+        completed: bool,
+        cycle: Optional[float],
+        lead: Optional[float],
+    ) -> None:
+        if current:
+            self.entered[current] = self.entered.get(current, 0) + 1
+        if seconds_in_previous is not None:
+            sketch = self.in_status.get(previous)
+            if sketch is None:
+                sketch = self.in_status[previous] = QuantileSketch()
+            sketch.add(seconds_in_previous)
+        if completed:
+            self.completed += 1
+        if cycle is not None:
+            self.cycle.add(cycle)
+        if lead is not None:
+            self.lead.add(lead)
+
+    def merge(self, other: "_Bucket") -> None:
+        self.completed += other.completed
+        for status, count in other.entered.items():
+            self.entered[status] = self.entered.get(status, 0) + count
+        self.cycle.merge(other.cycle)
+        self.lead.merge(other.lead)
+        for status, sketch in other.in_status.items():
+            merged = self.in_status.get(status)
+            if merged is None:
+                merged = self.in_status[status] = QuantileSketch()
+            merged.merge(sketch)
+
+
+class _Project:
+    __slots__ = ("hours", "days", "wip")
+
+    def __init__(self) -> None:
+        self.hours: Dict[int, _Bucket] = {}
+        # Rollups of ``hours`` so long windows merge few buckets.
+        self.days: Dict[int, _Bucket] = {}
+        # Status -> issues currently in it, as far as this process has seen.
+        self.wip: Dict[str, int] = {}
+
+
+@dataclass(frozen=True)
+class ProjectStats:
+    """Sprint metrics for one project over a trailing window."""
+
+    project: str
+    window_seconds: float
+    completed: int
+    entered: Dict[str, int]
+    cycle_time: Dict[int, Optional[float]]
+    lead_time: Dict[int, Optional[float]]
+    time_in_status: Dict[str, Dict[int, Optional[float]]]
+    wip: Dict[str, int]
+
+
+class AnalyticsEngine:
+    """
+    Aggregates issue status changes into hourly buckets per project as they
+    arrive: transitions into each status, completions, and quantile sketches
+    of cycle time, lead time, and time in each status. Each change is also
+    added to a daily rollup, so a query merges the whole days in its window
+    plus at most 46 hours at the edges; its cost does not grow with the
+    number of events. WIP is a running count per status.
+
+    Feed it from :meth:`jira_events.IssueStateStore.add_listener`. An issue
+    counts as done when Jira reports its status category as ``done`` or its
+    status is one of ``done_statuses``; cycle time runs from the first
+    status change the bot saw, lead time from the issue's creation. A change
+    repeating the last one recorded for its issue (same time and status) is
+    a redelivery and is ignored. Changes tagged with a tenant are kept under
+    the tenant's own project key (``scoped_key``), so tenants sharing
+    project keys are reported separately.
+    """
+
+    def __init__(
+        self,
+        *,
+        retention_days: int = DEFAULT_RETENTION_DAYS,
+        done_statuses: Iterable[str] = DEFAULT_DONE_STATUSES,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._projects: Dict[str, _Project] = {}
+        self._categories: Dict[str, str] = {}
+        # Issue key -> (at, status) of the last change recorded, so repeats
+        # of it are not counted twice.
+        self._last: "OrderedDict[str, Tuple[float, Optional[str]]]" = OrderedDict()
+        self._dirty = False
+        self.configure(retention_days=retention_days, done_statuses=done_statuses)
+
+    def configure(self, *, retention_days: int, done_statuses: Iterable[str]) -> None:
+        with self._lock:
+            self._retention_buckets = max(retention_days, 1) * 86400 // BUCKET_SECONDS
+            self._done = frozenset(status.strip().lower() for status in done_statuses)
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    def projects(
+        self, tenants: Optional[Collection[Optional[str]]] = None
+    ) -> List[str]:
+        """
+        Project keys with data, tenant projects as ``tenant/PROJECT``; only
+        those of ``tenants`` (``None`` standing for untagged changes) when
+        given.
+        """
+        with self._lock:
+            keys = sorted(self._projects)
+        if tenants is None:
+            return keys
+        return [key for key in keys if _tenant_of(key) in tenants]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._projects.clear()
+            self._categories.clear()
+            self._last.clear()
+            self._dirty = False
+
+    def record(self, change: StatusChange) -> None:
+        """Folds one applied status change into its project's aggregates."""
+        project_key = scoped_key(
+            change.issue_key.rsplit("-", 1)[0].upper(), change.tenant
+        )
+        issue_key = scoped_key(change.issue_key, change.tenant)
+        previous, current = change.previous, change.current
+        with self._lock:
+            last = (change.at, current)
+            if self._last.get(issue_key) == last:
+                return
+            self._last[issue_key] = last
+            self._last.move_to_end(issue_key)
+            if len(self._last) > DEFAULT_MAX_ISSUES:
+                self._last.popitem(last=False)
+
+            project = self._projects.get(project_key)
+            if project is None:
+                project = self._projects[project_key] = _Project()
+            if current and change.category:
+                self._categories[current.lower()] = change.category
+
+            wip = project.wip
+            # Without a known entry time the issue was never counted in
+            # ``previous``; see ``StatusChange.seconds_in_previous``.
+            if change.seconds_in_previous is not None and wip.get(previous):
+                wip[previous] -= 1
+                if not wip[previous]:
+                    del wip[previous]
+            if current:
+                wip[current] = wip.get(current, 0) + 1
+            self._dirty = True
+
+            if previous is None:
+                return
+            completed = self._is_done(current) and not self._is_done(previous)
+            cycle = lead = None
+            if completed:
+                # ``started`` equals ``at`` when this is the first change seen.
+                if change.started is not None and change.started < change.at:
+                    cycle = change.at - change.started
+                if change.created is not None and change.created <= change.at:
+                    lead = change.at - change.created
+            for bucket in self._buckets(project, int(change.at // BUCKET_SECONDS)):
+                bucket.add(
+                    previous,
+                    current,
+                    change.seconds_in_previous,
+                    completed,
+                    cycle,
+                    lead,
+                )
+
+    def _buckets(self, project: _Project, hour: int) -> Tuple[_Bucket, ...]:
+        """The hour and day buckets for ``hour``; none past the retention."""
+        oldest = int(time.time() // BUCKET_SECONDS) - self._retention_buckets
+        if hour <= oldest:
+            return ()
+        hourly = project.hours.get(hour)
+        if hourly is None:
+            for stale in [key for key in project.hours if key <= oldest]:
+                del project.hours[stale]
+            for stale in [
+                key for key in project.days if (key + 1) * BUCKETS_PER_DAY <= oldest
+            ]:
+                del project.days[stale]
+            hourly = project.hours[hour] = _Bucket()
+        day = hour // BUCKETS_PER_DAY
+        daily = project.days.get(day)
+        if daily is None:
+            daily = project.days[day] = _Bucket()
+        return hourly, daily
+
+    def _is_done(self, status: Optional[str]) -> bool:
+        if not status:
+            return False
+        lowered = status.lower()
+        return self._categories.get(lowered) == "done" or lowered in self._done
+
+    def summary(
+        self,
+        project_key: str,
+        window_seconds: float = DEFAULT_WINDOW_SECONDS,
+        now: Optional[float] = None,
+        tenant: Optional[str] = None,
+    ) -> Optional[ProjectStats]:
+        """Merges the buckets inside the window; ``None`` for unknown projects."""
+        now = time.time() if now is None else now
+        first = int((now - window_seconds) // BUCKET_SECONDS) + 1
+        last = int(now // BUCKET_SECONDS)
+        # Whole days come from the rollups, the partial days at either edge
+        # from the hourly buckets.
+        first_day = -(-first // BUCKETS_PER_DAY)
+        end_day = max((last + 1) // BUCKETS_PER_DAY, first_day)
+        total = _Bucket()
+
+        with self._lock:
+            project = self._projects.get(scoped_key(project_key.upper(), tenant))
+            if project is None:
+                return None
+            sources = [
+                (project.days, range(first_day, end_day)),
+                (
+                    project.hours,
+                    range(first, min(first_day * BUCKETS_PER_DAY, last + 1)),
+                ),
+                (project.hours, range(max(end_day * BUCKETS_PER_DAY, first), last + 1)),
+            ]
+            for buckets, indexes in sources:
+                for index in indexes:
+                    bucket = buckets.get(index)
+                    if bucket is not None:
+                        total.merge(bucket)
+            wip = {
+                status: count
+                for status, count in project.wip.items()
+                if not self._is_done(status)
+            }
+
+        return ProjectStats(
+            project=project_key.upper(),
+            window_seconds=window_seconds,
+            completed=total.completed,
+            entered=total.entered,
+            cycle_time=_percentiles(total.cycle),
+            lead_time=_percentiles(total.lead),
+            time_in_status={
+                status: _percentiles(sketch)
+                for status, sketch in total.in_status.items()
+            },
+            wip=wip,
+        )
+
+    def save(self, path: str) -> None:
+        """Atomically writes a compressed snapshot of every project."""
+        with self._lock:
+            document = {
+                "version": ANALYTICS_FORMAT_VERSION,
+                "categories": dict(self._categories),
+                "projects": {
+                    key: {
+                        "wip": dict(project.wip),
+                        "buckets": [
+                            _encode_bucket(index, bucket)
+                            for index, bucket in project.hours.items()
+                        ],
+                    }
+                    for key, project in self._projects.items()
+                },
+            }
+            self._dirty = False
+        body = zlib.compress(
+            json.dumps(document, separators=(",", ":")).encode("utf-8"), 6
+        )
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as handle:
+            handle.write(body)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, path)
+
+    def load(self, path: str) -> int:
+        """
+        Replaces the aggregates with a snapshot written by :meth:`save`. A
+        missing or unreadable file leaves them unchanged. Returns the number
+        of projects loaded.
+        """
+        try:
+            with open(path, "rb") as handle:
+                document = json.loads(zlib.decompress(handle.read()))
+            if document.get("version") != ANALYTICS_FORMAT_VERSION:
+                raise ValueError(f"unsupported version {document.get('version')}")
+            projects = {}
+            for key, record in document["projects"].items():
+                project = projects[key] = _Project()
+                project.wip = {str(k): int(v) for k, v in record["wip"].items()}
+                project.hours = dict(map(_decode_bucket, record["buckets"]))
+                for index, bucket in project.hours.items():
+                    daily = project.days.get(index // BUCKETS_PER_DAY)
+                    if daily is None:
+                        daily = project.days[index // BUCKETS_PER_DAY] = _Bucket()
+                    daily.merge(bucket)
+            categories = dict(document.get("categories") or {})
+        except FileNotFoundError:
+            return 0
+        except (
+            OSError,
+            ValueError,
+            KeyError,
+            IndexError,
+            TypeError,
+            AttributeError,
+            zlib.error,
+        ) as exc:
+            logger.error("Could not load analytics from %s: %s", path, exc)
+            return 0
+
+        with self._lock:
+            self._projects = projects
+            self._categories = categories
+            self._dirty = False
+            return len(projects)
+
+
+def _tenant_of(project_key: str) -> Optional[str]:
+    tenant, separator, _ = project_key.rpartition("/")
+    return tenant if separator else None
+
+
+def _percentiles(sketch: QuantileSketch) -> Dict[int, Optional[float]]:
+    return {p: sketch.quantile(p / 100) for p in PERCENTILES}
+
+
+def _encode_bucket(index: int, bucket: _Bucket) -> list:
+    return [
+        index,
+        bucket.entered,
+        bucket.completed,
+        bucket.cycle.encode(),
+        bucket.lead.encode(),
+        {status: sketch.encode() for status, sketch in bucket.in_status.items()},
+    ]
+
+
+def _decode_bucket(record: list) -> Tuple[int, _Bucket]:
+    bucket = _Bucket()
+    bucket.entered = {str(k): int(v) for k, v in record[1].items()}
+    bucket.completed = int(record[2])
+    bucket.cycle = QuantileSketch.decode(record[3])
+    bucket.lead = QuantileSketch.decode(record[4])
+    bucket.in_status = {
+        str(status): QuantileSketch.decode(sketch)
+        for status, sketch in record[5].items()
+    }
+    return int(record[0]), bucket
+
+
+def parse_window(text: Optional[str]) -> Optional[float]:
+    """Parses ``24h``, ``7d``, ``2w`` or a bare number of days into seconds."""
+    if not text:
+        return float(DEFAULT_WINDOW_SECONDS)
+    match = _WINDOW_PATTERN.match(text.strip().lower())
+    if not match or int(match.group(1)) <= 0:
+        return None
+    return float(int(match.group(1)) * _WINDOW_UNITS[match.group(2)])
+
+
+def format_stats(stats: ProjectStats) -> str:
+    """Renders :class:`ProjectStats` as a Discord message."""
+    days = stats.window_seconds / 86400
+    lines = [f"**{stats.project} · last {format_duration(stats.window_seconds)}**"]
+    lines.append(
+        f"Completed: **{stats.completed}** ({stats.completed / days:.1f}/day)"
+        if days
+        else f"Completed: **{stats.completed}**"
+    )
+    lines.append(f"Cycle time: {_format_percentiles(stats.cycle_time)}")
+    lines.append(f"Lead time: {_format_percentiles(stats.lead_time)}")
+    if stats.entered:
+        lines.append(
+            "Throughput: "
+            + " · ".join(
+                f"{status} {count}" for status, count in _by_count(stats.entered)
+            )
+        )
+    if stats.time_in_status:
+        lines.append("Time in status (p50 / p85):")
+        for status, values in sorted(stats.time_in_status.items()):
+            lines.append(
+                f"- {status}: {format_duration(values[50]) or '–'} / "
+                f"{format_duration(values[85]) or '–'}"
+            )
+    if stats.wip:
+        lines.append(
+            f"WIP: **{sum(stats.wip.values())}** ("
+            + " · ".join(f"{status} {count}" for status, count in _by_count(stats.wip))
+            + ")"
+        )
+    else:
+        lines.append("WIP: 0")
+    return "\n".join(lines)[:2000]
+
+
+def _format_percentiles(values: Dict[int, Optional[float]]) -> str:
+    if all(value is None for value in values.values()):
+        return "no completed issues"
+    return " · ".join(f"p{p} {format_duration(value)}" for p, value in values.items())
+
+
+def _by_count(counts: Dict[str, int]) -> List[Tuple[str, int]]:
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+
+
+# Process-wide engine fed by ``jira_events.issue_states`` once the runtime
+# registers it; ``!stats`` reads from it.
+analytics = AnalyticsEngine()
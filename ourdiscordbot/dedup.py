@@ -0,0 +1,186 @@
+"""Idempotency cache that drops repeated Jira webhook deliveries."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DedupStats:
+    """Point-in-time view of the dedup cache counters."""
+
+    hits: int
+    misses: int
+    size: int
+
+
+def delivery_key(data, raw_body: Optional[Union[bytes, str]] = None) -> str:
+    """
+    Derives the identity of a webhook delivery.
+
+    Uses ``(webhookEvent, issue id, changelog id, timestamp)`` when Jira
+    supplies them and falls back to a SHA-1 of the body otherwise.
+    """
+    if isinstance(data, dict):
+        event = data.get("webhookEvent")
+        issue = data.get("issue")
+        issue_id = issue.get("id") if isinstance(issue, dict) else None
+        timestamp = data.get("timestamp")
+        if event and issue_id and timestamp:
+            changelog = data.get("changelog")
+            changelog_id = changelog.get("id") if isinstance(changelog, dict) else ""
+            changelog_id = changelog_id or ""
+            return f"{event}|{issue_id}|{changelog_id}|{timestamp}"
+
+    if raw_body is None:
+        raw_body = json.dumps(data, sort_keys=True, separators=(",", ":"))
+    if isinstance(raw_body, str):
+        raw_body = raw_body.encode("utf-8")
+    return "sha1:" + hashlib.sha1(raw_body).hexdigest()
+
+
+class DedupCache:
+    """Bounded LRU of recently seen delivery keys with a time-to-live."""
+
+    def __init__(self, *, max_entries: int = 10000, ttl_seconds: float = 600.0) -> None:
+        self._max_entries = max(max_entries, 1)
+        self._ttl = ttl_seconds
+        self._entries: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def seen(self, key: str) -> bool:
+        """Returns True if ``key`` was recorded within the TTL; records it otherwise."""
+        now = time.monotonic()
+        with self._lock:
+            expires_at = self._entries.get(key)
+            if expires_at is not None and expires_at > now:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return True
+
+            self._entries[key] = now + self._ttl
+            self._entries.move_to_end(key)
+            self._misses += 1
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+            return False
+
+    def forget(self, key: str) -> None:
+        """Drops ``key`` so that a redelivery is processed again."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self) -> DedupStats:
+        with self._lock:
+            return DedupStats(
+                hits=self._hits, misses=self._misses, size=len(self._entries)
+            )
+
+
+class SQLiteDedupCache:
+    """
+    Dedup cache persisted to SQLite so that it survives restarts.
+
+    Keys are stored with a wall-clock expiry; expired rows are purged every
+    ``purge_interval`` insertions and the table is trimmed to ``max_entries``.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        max_entries: int = 10000,
+        ttl_seconds: float = 600.0,
+        purge_interval: int = 500,
+    ) -> None:
+        self._max_entries = max(max_entries, 1)
+        self._ttl = ttl_seconds
+        self._purge_interval = max(purge_interval, 1)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._inserts = 0
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS deliveries ("
+            "key TEXT PRIMARY KEY, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS deliveries_expiry ON deliveries(expires_at)"
+        )
+        self._conn.commit()
+
+    def seen(self, key: str) -> bool:
+        """Returns True if ``key`` was recorded within the TTL; records it otherwise."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT expires_at FROM deliveries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and row[0] > now:
+                self._hits += 1
+                return True
+
+            self._conn.execute(
+                "INSERT OR REPLACE INTO deliveries (key, expires_at) VALUES (?, ?)",
+                (key, now + self._ttl),
+            )
+            self._misses += 1
+            self._inserts += 1
+            if self._inserts % self._purge_interval == 0:
+                self._purge(now)
+            self._conn.commit()
+            return False
+
+    def forget(self, key: str) -> None:
+        """Drops ``key`` so that a redelivery is processed again."""
+        with self._lock:
+            self._conn.execute("DELETE FROM deliveries WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def stats(self) -> DedupStats:
+        with self._lock:
+            (size,) = self._conn.execute("SELECT COUNT(*) FROM deliveries").fetchone()
+            return DedupStats(hits=self._hits, misses=self._misses, size=size)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _purge(self, now: float) -> None:
+        self._conn.execute("DELETE FROM deliveries WHERE expires_at <= ?", (now,))
+        self._conn.execute(
+            "DELETE FROM deliveries WHERE key IN ("
+            "SELECT key FROM deliveries ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self._max_entries,),
+        )
+
+
+DeliveryCache = Union[DedupCache, SQLiteDedupCache]
+
+
+def create_dedup_cache(
+    *, ttl_seconds: float, max_entries: int, path: Optional[str] = None
+) -> Optional[DeliveryCache]:
+    """Builds the configured dedup backend, or None when deduplication is off."""
+    if ttl_seconds <= 0:
+        return None
+    if path:
+        logger.info("Persisting webhook dedup cache to %s", path)
+        return SQLiteDedupCache(path, max_entries=max_entries, ttl_seconds=ttl_seconds)
+    return DedupCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
@@ -0,0 +1,303 @@
+"""Aggregation stage that collapses Jira bulk edits into digest embeds."""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+import discord
+from discord.utils import escape_markdown
+
+from jira_events.changelog import changelog_index
+from jira_events.common import build_issue_url
+from jira_events.issue_state import payload_tenant
+
+logger = logging.getLogger(__name__)
+
+EmbedSink = Callable[..., object]
+# (tenant, project, event type, actor, from, to)
+DigestKey = Tuple[Optional[str], str, str, str, Optional[str], Optional[str]]
+Channels = Optional[Tuple[int, ...]]
+
+MAX_LISTED_KEYS = 60
+MAX_JQL_KEYS = 100
+
+_EVENT_FIELDS = {
+    "jira:issue_status_changed": "status",
+    "jira:issue_assignee_changed": "assignee",
+    "jira:issue_due_date_changed": "duedate",
+    "jira:issue_labels_changed": "labels",
+}
+
+_EVENT_LABELS = {
+    "jira:issue_created": "issues created",
+    "jira:issue_status_changed": "status changes",
+    "jira:issue_assignee_changed": "assignee changes",
+    "jira:issue_due_date_changed": "due date changes",
+    "jira:issue_labels_changed": "label changes",
+}
+
+
+@dataclass
+class _DigestGroup:
+    key: DigestKey
+    deadline: float
+    channels: Channels = None
+    base_url: Optional[str] = None
+    issue_keys: List[str] = field(default_factory=list)
+    embeds: List[discord.Embed] = field(default_factory=list)
+
+
+class DigestAggregator:
+    """
+    Groups rendered events by (project, event type, actor, from, to).
+
+    The first event of a group is passed straight through so that isolated
+    updates are not delayed. Further events that arrive within
+    ``window_seconds`` are held back; when the window closes they are either
+    released individually (fewer than ``min_events``) or replaced by a single
+    digest embed. A group that reaches ``max_events`` is flushed early and
+    keeps collecting until its window closes.
+
+    Events routed to different channels are grouped separately; their
+    embeds are emitted as ``emit(embed, channels)``, unrouted ones as
+    ``emit(embed)``.
+    """
+
+    def __init__(
+        self,
+        emit: EmbedSink,
+        *,
+        window_seconds: float = 5.0,
+        min_events: int = 3,
+        max_events: int = 50,
+    ) -> None:
+        if window_seconds <= 0:
+            raise ValueError("Digest window must be positive.")
+        self._emit = emit
+        self._window = window_seconds
+        self._min_events = max(min_events, 1)
+        self._max_events = max(max_events, self._min_events)
+
+        self._groups: Dict[Tuple[DigestKey, Channels], _DigestGroup] = {}
+        self._deadlines: List[Tuple[float, int, Tuple[DigestKey, Channels]]] = []
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+        self.digests_emitted = 0
+        self.events_collapsed = 0
+
+    def offer(
+        self,
+        event_type: Optional[str],
+        data: dict,
+        embed: discord.Embed,
+        *,
+        channels: Channels = None,
+    ) -> bool:
+        """
+        Returns True when the aggregator took ownership of the embed, False
+        when the caller should deliver it immediately.
+        """
+        if not event_type or not isinstance(data, dict):
+            return False
+
+        key = digest_key(event_type, data)
+        group_id = (key, channels)
+        issue = data.get("issue") or {}
+        issue_key = issue.get("key") or "UNKNOWN-ISSUE"
+        ready: Optional[_DigestGroup] = None
+
+        with self._lock:
+            if self._closed:
+                return False
+            group = self._groups.get(group_id)
+            if group is None:
+                deadline = time.monotonic() + self._window
+                self._groups[group_id] = _DigestGroup(
+                    key=key,
+                    deadline=deadline,
+                    channels=channels,
+                    base_url=_base_url(issue),
+                )
+                self._sequence += 1
+                heapq.heappush(self._deadlines, (deadline, self._sequence, group_id))
+                self._ensure_thread()
+                self._wakeup.notify()
+                return False
+
+            group.issue_keys.append(issue_key)
+            group.embeds.append(embed)
+            if len(group.issue_keys) >= self._max_events:
+                # Keep the window open so the rest of the burst keeps collapsing.
+                ready = _DigestGroup(
+                    key=key,
+                    deadline=group.deadline,
+                    channels=channels,
+                    base_url=group.base_url,
+                    issue_keys=group.issue_keys,
+                    embeds=group.embeds,
+                )
+                group.issue_keys = []
+                group.embeds = []
+
+        if ready is not None:
+            self._release(ready)
+        return True
+
+    def flush(self) -> None:
+        """Release every pending group immediately."""
+        with self._lock:
+            groups = list(self._groups.values())
+            self._groups.clear()
+            self._deadlines.clear()
+        for group in groups:
+            self._release(group)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            self._wakeup.notify_all()
+        self.flush()
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(len(group.issue_keys) for group in self._groups.values())
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="jira-digest", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            expired: List[_DigestGroup] = []
+            with self._lock:
+                while not self._closed:
+                    if not self._deadlines:
+                        self._wakeup.wait()
+                        continue
+                    remaining = self._deadlines[0][0] - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._wakeup.wait(remaining)
+                if self._closed:
+                    return
+
+                now = time.monotonic()
+                while self._deadlines and self._deadlines[0][0] <= now:
+                    deadline, _, group_id = heapq.heappop(self._deadlines)
+                    group = self._groups.get(group_id)
+                    if group is not None and group.deadline == deadline:
+                        expired.append(self._groups.pop(group_id))
+
+            for group in expired:
+                self._release(group)
+
+    def _release(self, group: _DigestGroup) -> None:
+        try:
+            if len(group.issue_keys) < self._min_events:
+                for embed in group.embeds:
+                    self._emit_to(group, embed)
+                return
+
+            self._emit_to(
+                group, build_digest_embed(group.key, group.issue_keys, group.base_url)
+            )
+            self.digests_emitted += 1
+            self.events_collapsed += len(group.issue_keys)
+        except Exception as exc:
+            logger.exception("Failed to emit digest for %s: %s", group.key, exc)
+
+    def _emit_to(self, group: _DigestGroup, embed: discord.Embed) -> None:
+        if group.channels is None:
+            self._emit(embed)
+        else:
+            self._emit(embed, group.channels)
+
+
+def digest_key(event_type: str, data: dict) -> DigestKey:
+    """
+    Builds the grouping key for a rendered event. Tenants that share project
+    keys are kept apart, since each digest links to one Jira site.
+    """
+    issue = data.get("issue") or {}
+    fields = issue.get("fields") or {}
+    project = fields.get("project") or {}
+    project_label = project.get("key") or project.get("name") or "Unknown Project"
+
+    field_id = _EVENT_FIELDS.get(event_type)
+    change, audit = changelog_index(data).get(field_id) if field_id else (None, None)
+    actor = _actor_label(data, (audit or {}).get("author"))
+    from_value = (change or {}).get("fromString")
+    to_value = (change or {}).get("toString")
+    return (
+        payload_tenant(data),
+        project_label,
+        event_type,
+        actor,
+        from_value,
+        to_value,
+    )
+
+
+def build_digest_embed(
+    key: DigestKey, issue_keys: List[str], base_url: Optional[str]
+) -> discord.Embed:
+    """Renders one summary embed for a collapsed group of events."""
+    _, project, event_type, actor, from_value, to_value = key
+    count = len(issue_keys)
+
+    if from_value or to_value:
+        title = (
+            f"[{project}] {count} more issues: "
+            f"{from_value or 'None'} → {to_value or 'None'}"
+        )
+    else:
+        label = _EVENT_LABELS.get(event_type, event_type)
+        title = f"[{project}] {count} more {label}"
+
+    listed = ", ".join(issue_keys[:MAX_LISTED_KEYS])
+    if count > MAX_LISTED_KEYS:
+        listed += f" … and {count - MAX_LISTED_KEYS} more"
+
+    embed = discord.Embed(
+        title=escape_markdown(title[:256]),
+        description=listed,
+        color=discord.Color.from_rgb(100, 116, 139),
+        timestamp=datetime.now(timezone.utc),
+    )
+    if base_url:
+        jql = "key in ({})".format(",".join(issue_keys[:MAX_JQL_KEYS]))
+        embed.url = f"{base_url}/issues/?jql={quote(jql)}"
+    embed.add_field(name="Changed by", value=actor, inline=True)
+    embed.add_field(name="Issues", value=str(count), inline=True)
+    embed.set_footer(text="Bulk change digest")
+    return embed
+
+
+def _actor_label(data: dict, author: Optional[dict]) -> str:
+    for candidate in (author, data.get("user")):
+        if isinstance(candidate, dict):
+            label = candidate.get("displayName") or candidate.get("name")
+            if label:
+                return escape_markdown(str(label))
+    return "Unknown"
+
+
+def _base_url(issue: dict) -> Optional[str]:
+    issue_url = build_issue_url(issue)
+    if not issue_url:
+        return None
+    return issue_url.split("/browse/")[0]
@@ -4,32 +4,91 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from typing import Optional
+import os
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Sequence
 
-import aiohttp
 import discord
 
+from jira_events import profiling, registry, scoped_key
+
+from .analytics import analytics, format_stats, parse_window
+from .health import HEALTH, format_health
+from .loopwatch import LoopWatchdog, shared_watchdog
+from .outbound import (
+    MAX_EMBEDS_PER_MESSAGE,
+    Countdown,
+    OutboundDispatcher,
+    OutboundMessage,
+)
+from .profiler import ProfileBusy, clamp_seconds, profile_to_file
+from .retry import DeadLetterStore, RetryPolicy
 from .settings import Settings
+from .tenants import TenantRegistry
 
 logger = logging.getLogger(__name__)
 
 
 class DiscordNotifier:
-    """Thin wrapper that schedules messages on the Discord client's loop."""
+    """
+    Queues messages for the outbound dispatcher on the Discord client's loop.
+
+    Messages go to the configured channel unless ``channel_ids`` names
+    others. Resolved channels are cached so routing to many channels does
+    not hit ``client.get_channel`` per message; call
+    :meth:`clear_channel_cache` when the guild's channels change.
+
+    ``on_done`` passed to :meth:`send` is called once every message it
+    queued was delivered or dead-lettered; it is not called when ``send``
+    returns False.
+    """
 
-    def __init__(self, client: discord.Client, channel_id: Optional[int]) -> None:
+    def __init__(
+        self,
+        client: discord.Client,
+        channel_id: Optional[int],
+        dispatcher: Optional[OutboundDispatcher] = None,
+    ) -> None:
         self._client = client
         self._channel_id = channel_id
+        self._channels: Dict[int, Any] = {}
+        self._dispatcher = dispatcher or OutboundDispatcher(self.resolve_channel)
 
     @property
     def channel_id(self) -> Optional[int]:
         return self._channel_id
 
+    @property
+    def dispatcher(self) -> OutboundDispatcher:
+        return self._dispatcher
+
+    def resolve_channel(self, channel_id: int):
+        """Returns the cached channel, asking the client only on a miss."""
+        channel = self._channels.get(channel_id)
+        if channel is None:
+            channel = self._client.get_channel(channel_id)
+            if channel is not None:
+                self._channels[channel_id] = channel
+        return channel
+
+    def clear_channel_cache(self) -> None:
+        self._channels.clear()
+
     def send(
-        self, *, content: Optional[str] = None, embed: Optional[discord.Embed] = None
+        self,
+        *,
+        content: Optional[str] = None,
+        embed: Optional[discord.Embed] = None,
+        embeds: Optional[Sequence[discord.Embed]] = None,
+        channel_ids: Optional[Sequence[int]] = None,
+        on_done: Optional[Callable[[], None]] = None,
     ) -> bool:
-        if self._channel_id is None:
-            logger.error("Cannot send Discord message; channel id not configured.")
+        if channel_ids is None:
+            if self._channel_id is None:
+                logger.error("Cannot send Discord message; channel id not configured.")
+                return False
+            channel_ids = (self._channel_id,)
+        elif not channel_ids:
+            logger.error("Cannot send Discord message; no channels routed.")
             return False
 
         loop = getattr(self._client, "loop", None)
@@ -37,35 +96,92 @@ class DiscordNotifier:
             logger.warning("Discord client loop not running; skipping message.")
             return False
 
-        channel = self._client.get_channel(self._channel_id)
-        if not channel:
-            logger.error(
-                "Discord channel %s not cached; unable to send message.",
-                self._channel_id,
-            )
+        targets = []
+        for channel_id in channel_ids:
+            if self.resolve_channel(channel_id):
+                targets.append(channel_id)
+            else:
+                logger.error(
+                    "Discord channel %s not cached; unable to send message.",
+                    channel_id,
+                )
+        if not targets:
             return False
 
-        try:
-            asyncio.run_coroutine_threadsafe(
-                channel.send(content=content, embed=embed),
-                loop,
+        all_embeds = [embed] if embed is not None else []
+        all_embeds.extend(embeds or ())
+        messages = [
+            OutboundMessage(
+                channel_id=channel_id,
+                content=content if start == 0 else None,
+                embeds=all_embeds[start : start + MAX_EMBEDS_PER_MESSAGE],
             )
+            for channel_id in targets
+            for start in range(0, max(len(all_embeds), 1), MAX_EMBEDS_PER_MESSAGE)
+        ]
+        if on_done is not None:
+            countdown = Countdown(on_done, len(messages))
+            for message in messages:
+                message.on_done = countdown.done
+        try:
+            if _running_loop() is loop:
+                self._submit(messages)
+            else:
+                loop.call_soon_threadsafe(self._submit, messages)
             return True
         except Exception as exc:  # pragma: no cover - safety net
             logger.exception("Failed to dispatch message to Discord: %s", exc)
             return False
 
+    def _submit(self, messages: List[OutboundMessage]) -> None:
+        for message in messages:
+            self._dispatcher.submit(message)
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
 
-def create_bot(settings: Settings) -> tuple[discord.Client, DiscordNotifier]:
-    """Instantiate the Discord client with event handlers."""
+def create_bot(
+    settings: Settings, tenants: Optional[TenantRegistry] = None
+) -> tuple[discord.Client, DiscordNotifier]:
+    """
+    Instantiate the Discord client with event handlers. With ``tenants``,
+    ``!stats``, ``!deadletters`` and ``!health`` only report on the tenants
+    whose channels are in the guild asking.
+    """
     intents = discord.Intents.default()
     intents.message_content = True
     client = discord.Client(intents=intents)
-    notifier = DiscordNotifier(client, settings.discord_channel_id)
+    # The dispatcher resolves channels through the notifier's cache.
+    dispatcher = OutboundDispatcher(
+        lambda channel_id: notifier.resolve_channel(channel_id),
+        retry_policy=RetryPolicy(
+            max_attempts=settings.retry_max_attempts,
+            base_delay=settings.retry_base_seconds,
+            max_delay=settings.retry_max_seconds,
+        ),
+        dead_letters=DeadLetterStore(settings.dead_letter_max),
+    )
+    notifier = DiscordNotifier(client, settings.discord_channel_id, dispatcher)
+    watchdog = (
+        shared_watchdog(
+            settings.loop_watchdog_threshold_ms / 1000, settings.loop_watchdog_log
+        )
+        if settings.loop_watchdog
+        else None
+    )
 
     @client.event
     async def on_ready():  # type: ignore[no-redef]
         logger.info("Logged in as %s", client.user)
+        notifier.clear_channel_cache()
+        HEALTH.watch_loop(asyncio.get_running_loop())
+        if watchdog is not None:
+            watchdog.start(asyncio.get_running_loop())
         if notifier.channel_id:
             logger.info(
                 "Ready to send notifications to channel ID: %s", notifier.channel_id
@@ -75,45 +191,324 @@ def create_bot(settings: Settings) -> tuple[discord.Client, DiscordNotifier]:
                 "Discord channel ID missing; outbound notifications disabled."
             )
 
+    @client.event
+    async def on_guild_channel_delete(channel):  # type: ignore[no-redef]
+        notifier.clear_channel_cache()
+
     @client.event
     async def on_message(message: discord.Message):  # type: ignore[no-redef]
         if message.author == client.user:
             return
 
-        if message.content.startswith("!health"):
-            await _respond_with_health(message, settings.port)
+        command = message.content.split(maxsplit=1)[0] if message.content else ""
+        if command not in ("!health", "!deadletters", "!stats", "!profile"):
+            return
+        scopes = _guild_tenants(message.guild, notifier, tenants)
+        if scopes is not None and not scopes and command != "!profile":
+            await message.channel.send(
+                ":no_entry: No Jira site sends notifications to this server."
+            )
+            return
+
+        if command == "!health":
+            await _respond_with_health(message, watchdog, scopes)
+        elif command == "!deadletters":
+            guild = message.guild
+            visible = (
+                None
+                if scopes is None
+                else lambda channel_id: _channel_in_guild(notifier, channel_id, guild)
+            )
+            await _respond_with_dead_letters(message, dispatcher, visible)
+        elif command == "!stats":
+            await _respond_with_stats(message, settings, scopes)
+        elif command == "!profile":
+            await _respond_with_profile(message, settings)
 
     return client, notifier
 
 
-async def _respond_with_health(message: discord.Message, port: int) -> None:
-    """Execute the local health check and respond in Discord."""
-    url = f"http://localhost:{port}/health"
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                body = await response.text()
-                if response.status == 200 and body == "OK":
-                    text = (
-                        ":white_check_mark: **Web Server Status: Online**\n"
-                        f"Health check endpoint `{url}` is responding correctly."
-                    )
-                elif response.status == 200:
-                    text = (
-                        ":warning: **Web Server Status: Unexpected Response**\n"
-                        f"Endpoint returned: `{body}`"
-                    )
-                else:
-                    text = (
-                        ":x: **Web Server Status: Error**\n"
-                        f"Endpoint returned status code: `{response.status}`"
-                    )
-    except aiohttp.ClientError as exc:
-        text = (
-            ":x: **Web Server Status: Unreachable**\n"
-            f"Could not connect to `{url}`. The server might be down.\n`{exc}`"
+def _guild_tenants(
+    guild, notifier: DiscordNotifier, tenants: Optional[TenantRegistry]
+) -> Optional[FrozenSet[Optional[str]]]:
+    """
+    Ids of the tenants with a channel in ``guild``, plus ``None`` when the
+    default channel (which untagged webhooks go to) is there. ``None``
+    without tenants, when every guild sees everything.
+    """
+    if tenants is None:
+        return None
+    owned = {
+        tenant.id
+        for tenant in tenants.tenants()
+        if any(
+            _channel_in_guild(notifier, channel_id, guild)
+            for channel_id in tenant.all_channels
         )
-    except Exception as exc:  # pragma: no cover - unexpected path
-        text = ":x: **An unexpected error occurred during health check:**\n" f"`{exc}`"
+    }
+    if notifier.channel_id is not None and _channel_in_guild(
+        notifier, notifier.channel_id, guild
+    ):
+        owned.add(None)
+    return frozenset(owned)
+
+
+def _channel_in_guild(notifier: DiscordNotifier, channel_id: int, guild) -> bool:
+    if guild is None:
+        return False
+    channel = notifier.resolve_channel(channel_id)
+    return getattr(getattr(channel, "guild", None), "id", None) == guild.id
+
 
+async def _respond_with_health(
+    message: discord.Message,
+    watchdog: Optional[LoopWatchdog] = None,
+    scopes: Optional[FrozenSet[Optional[str]]] = None,
+) -> None:
+    """
+    Answers from the cached health snapshot instead of probing over HTTP.
+    Guilds that only hold tenant channels get the status without the
+    process-wide figures, which cover every tenant's traffic.
+    """
+    if scopes is not None and None not in scopes:
+        await message.channel.send(format_health(HEALTH.snapshot(), detail=False))
+        return
+    text = format_health(HEALTH.snapshot())
+    if watchdog is not None:
+        lag = watchdog.stats()
+        text += (
+            f"\nLoop lag p50/p95/p99: {lag.p50 * 1000:.0f}/{lag.p95 * 1000:.0f}/"
+            f"{lag.p99 * 1000:.0f} ms · slow callbacks: {lag.slow_callbacks}"
+        )
     await message.channel.send(text)
+
+
+DEAD_LETTER_LIST_LIMIT = 10
+
+
+async def _respond_with_dead_letters(
+    message: discord.Message,
+    dispatcher: OutboundDispatcher,
+    visible: Optional[Callable[[int], bool]] = None,
+) -> None:
+    """
+    ``!deadletters`` lists recent failed deliveries; ``!deadletters replay
+    all`` or ``!deadletters replay <id> [<id> ...]`` queues them again.
+    With ``visible``, only dead letters for the channels it accepts are
+    listed or replayed.
+    """
+    store = dispatcher.dead_letters
+    args = message.content.split()[1:]
+    shown = store.list()
+    if visible is not None:
+        shown = [letter for letter in shown if visible(letter.channel_id)]
+
+    if args and args[0].lower() == "replay":
+        permissions = getattr(message.author, "guild_permissions", None)
+        if not getattr(permissions, "manage_messages", False):
+            await message.channel.send(
+                ":no_entry: Replaying dead letters requires Manage Messages."
+            )
+            return
+
+        targets = args[1:]
+        if targets == ["all"]:
+            letters = store.take(
+                None if visible is None else [letter.id for letter in shown]
+            )
+        else:
+            try:
+                ids = [int(target.lstrip("#")) for target in targets]
+            except ValueError:
+                ids = []
+            if not ids:
+                await message.channel.send(
+                    "Usage: `!deadletters replay all` or "
+                    "`!deadletters replay <id> [<id> ...]`"
+                )
+                return
+            if visible is not None:
+                allowed = {letter.id for letter in shown}
+                ids = [letter_id for letter_id in ids if letter_id in allowed]
+            letters = store.take(ids)
+
+        replayed = dispatcher.replay(letters)
+        await message.channel.send(
+            f":repeat: Requeued {replayed} dead letter(s) for delivery."
+        )
+        return
+
+    letters = shown[:DEAD_LETTER_LIST_LIMIT]
+    if not letters:
+        await message.channel.send(":white_check_mark: No dead letters.")
+        return
+
+    lines = [f"**Dead letters: {len(shown)}** (showing {len(letters)} most recent)"]
+    for letter in letters:
+        lines.append(
+            f"`#{letter.id}` <#{letter.channel_id}> · {letter.attempts} attempt(s)"
+            f" · {discord.utils.escape_markdown(letter.summary())}"
+            f" · `{letter.error[:120]}`"
+        )
+    lines.append("Replay with `!deadletters replay all` or `!deadletters replay <id>`.")
+    await message.channel.send("\n".join(lines)[:2000])
+
+
+async def _respond_with_stats(
+    message: discord.Message,
+    settings: Settings,
+    scopes: Optional[FrozenSet[Optional[str]]] = None,
+) -> None:
+    """
+    ``!stats <project> [window]`` reports cycle time, lead time, throughput,
+    time in status, and WIP for a project, e.g. ``!stats DCBOT 14d``. With
+    ``scopes``, only projects of those tenants are reported; a tenant's
+    project can be named ``<tenant>/<project>``.
+    """
+    args = message.content.split()[1:]
+    window = parse_window(args[1] if len(args) > 1 else None)
+    if not args or window is None:
+        projects = ", ".join(analytics.projects(scopes)) or "none yet"
+        await message.channel.send(
+            "Usage: `!stats <project> [window]` with a window such as `24h`, "
+            f"`7d` or `4w`. Projects with data: {projects}"
+        )
+        return
+
+    resolved = _stats_project(args[0], scopes)
+    stats = None
+    if resolved is not None:
+        stats = analytics.summary(resolved[1], window, tenant=resolved[0])
+    if stats is None:
+        await message.channel.send(
+            f":grey_question: No status changes recorded for `{args[0].upper()}`."
+        )
+        return
+    await message.channel.send(format_stats(stats))
+
+
+def _stats_project(
+    name: str, scopes: Optional[FrozenSet[Optional[str]]]
+) -> Optional[tuple[Optional[str], str]]:
+    """
+    Resolves ``PROJECT`` or ``tenant/PROJECT`` to ``(tenant, project)``, or
+    ``None`` when no tenant in ``scopes`` has that project.
+    """
+    tenant, separator, project = name.rpartition("/")
+    if separator:
+        if scopes is not None and tenant not in scopes:
+            return None
+        return tenant, project
+    if scopes is None:
+        return None, name
+    known = set(analytics.projects(scopes))
+    for scope in sorted(scopes, key=lambda scope: scope or ""):
+        if scoped_key(name.upper(), scope) in known:
+            return scope, name
+    return None
+
+
+DEFAULT_PROFILE_SECONDS = 10
+PROFILE_STAGE_LIMIT = 15
+# Discord's attachment limit without a boosted server.
+MAX_ATTACHMENT_BYTES = 8 * 1024 * 1024
+
+
+async def _respond_with_profile(message: discord.Message, settings: Settings) -> None:
+    """
+    ``!profile [seconds]`` samples every thread's stack and attaches the
+    collapsed stacks; ``!profile stages on|off|reset`` controls per-handler
+    and per-classifier timing, and ``!profile stages`` shows it. Profiles
+    show every tenant's code paths, so only operators may run it: users in
+    ``OPERATOR_USER_IDS``, or administrators of ``OPERATOR_GUILD_ID``.
+    """
+    if not _is_operator(message, settings):
+        await message.channel.send(
+            ":no_entry: Profiling is restricted to the bot's operators."
+        )
+        return
+
+    args = message.content.split()[1:]
+    if args and args[0].lower() == "stages":
+        await message.channel.send(_profile_stages(args[1:]))
+        return
+
+    try:
+        seconds = float(args[0]) if args else DEFAULT_PROFILE_SECONDS
+    except ValueError:
+        await message.channel.send(
+            "Usage: `!profile [seconds]` or `!profile stages [on|off|reset]`"
+        )
+        return
+
+    seconds = clamp_seconds(seconds)
+    await message.channel.send(f":stopwatch: Sampling stacks for {seconds:g}s...")
+    try:
+        result = await asyncio.to_thread(profile_to_file, seconds, settings.profile_dir)
+    except ProfileBusy as exc:
+        await message.channel.send(f":hourglass: {exc}")
+        return
+
+    attach = os.path.getsize(result.path) <= MAX_ATTACHMENT_BYTES
+    # Files too large to attach are kept for the operator to fetch.
+    kept = "" if attach else f" (kept at `{result.path}`)"
+    lines = [
+        f"**Profile: {result.samples} samples, {result.stacks} stacks over "
+        f"{result.seconds:g}s**{kept}"
+    ]
+    lines.extend(
+        f"`{count:>6}` {discord.utils.escape_markdown(frame)}"
+        for frame, count in result.top_frames
+    )
+    text = "\n".join(lines)[:2000]
+    if not attach:
+        await message.channel.send(text)
+        return
+    upload = discord.File(result.path)
+    try:
+        await message.channel.send(text, file=upload)
+    finally:
+        upload.close()
+        os.remove(result.path)
+
+
+def _is_operator(message: discord.Message, settings: Settings) -> bool:
+    """Nobody is an operator until one of the operator settings is set."""
+    if getattr(message.author, "id", None) in settings.operator_user_ids:
+        return True
+    guild = getattr(message, "guild", None)
+    if settings.operator_guild_id is None or guild is None:
+        return False
+    if guild.id != settings.operator_guild_id:
+        return False
+    permissions = getattr(message.author, "guild_permissions", None)
+    return bool(getattr(permissions, "administrator", False))
+
+
+def _profile_stages(args: List[str]) -> str:
+    action = args[0].lower() if args else "show"
+    if action == "on":
+        profiling.enable_stage_profiling(registry)
+        return ":white_check_mark: Stage profiling on."
+    if action == "off":
+        profiling.disable_stage_profiling(registry)
+        return ":white_check_mark: Stage profiling off."
+    profiler = profiling.active
+    if profiler is None:
+        return "Stage profiling is off. Turn it on with `!profile stages on`."
+    if action == "reset":
+        profiler.reset()
+        return ":white_check_mark: Stage timings cleared."
+
+    timings = profiler.timings()[:PROFILE_STAGE_LIMIT]
+    if not timings:
+        return "No stages timed yet."
+    lines = ["**Stage timings** (calls · wall ms · CPU ms · wall µs/call)"]
+    for timing in timings:
+        lines.append(
+            f"{timing.kind} `{timing.name}` · "
+            f"{timing.calls} · {timing.wall_seconds * 1000:.1f} · "
+            f"{timing.cpu_seconds * 1000:.1f} · "
+            f"{timing.wall_seconds / timing.calls * 1e6:.0f}"
+        )
+    return "\n".join(lines)[:2000]
@@ -0,0 +1,189 @@
+"""Cached in-process health snapshot behind ``/health`` and ``!health``."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, Optional, Tuple
+
+from .metrics import QUEUE_DEPTH, WEBHOOKS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 2.0
+LOOP_LAG_INTERVAL = 1.0
+LOOP_LAG_DEGRADED_SECONDS = 0.5
+# Messages waiting this long without any delivery mean Discord is not draining.
+DELIVERY_STALL_SECONDS = 300.0
+
+
+@dataclass(frozen=True)
+class HealthSnapshot:
+    """Point-in-time view of the pipeline's health."""
+
+    status: str
+    taken_at: float
+    uptime_seconds: float
+    loop_lag_seconds: Optional[float]
+    queue_depths: Dict[str, float] = field(default_factory=dict)
+    last_delivery_seconds_ago: Optional[float] = None
+    webhooks_per_second: float = 0.0
+    problems: Tuple[str, ...] = ()
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class HealthMonitor:
+    """
+    Builds :class:`HealthSnapshot` values from state the pipeline already
+    keeps: queue depths from the ``queue_depth`` gauge, the webhook rate
+    from the ``webhooks`` counter, the last Discord delivery reported by the
+    outbound dispatcher, and loop lag from a sampler on the Discord loop
+    (the worst sample since the previous snapshot, so spikes between probes
+    are not missed).
+
+    :meth:`snapshot` reuses the last snapshot for ``ttl`` seconds, so
+    frequent probes from load balancers and users cost a clock read.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float = DEFAULT_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._started = clock()
+        self._snapshot: Optional[HealthSnapshot] = None
+        self._snapshot_at = 0.0
+        self._webhooks_seen = self._webhook_total()
+        self._webhooks_at = self._started
+        self._last_delivery: Optional[float] = None
+        self._loop_lag: Optional[float] = None
+        self._loop_lag_peak: Optional[float] = None
+        self._sampler: Optional[asyncio.Task] = None
+
+    def record_delivery(self) -> None:
+        """Called by the outbound dispatcher after Discord accepts a message."""
+        self._last_delivery = self._clock()
+
+    def watch_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Samples the lag of ``loop`` every ``LOOP_LAG_INTERVAL`` seconds."""
+        if self._sampler is not None and not self._sampler.done():
+            return
+        self._sampler = loop.create_task(self._sample_loop_lag())
+
+    async def _sample_loop_lag(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + LOOP_LAG_INTERVAL
+            await asyncio.sleep(LOOP_LAG_INTERVAL)
+            lag = max(loop.time() - expected, 0.0)
+            self._loop_lag = lag
+            if self._loop_lag_peak is None or lag > self._loop_lag_peak:
+                self._loop_lag_peak = lag
+
+    def snapshot(self) -> HealthSnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and self._clock() - self._snapshot_at < self._ttl:
+            return snapshot
+        with self._lock:
+            # Another thread may have refreshed it while this one waited.
+            now = self._clock()
+            if self._snapshot is None or now - self._snapshot_at >= self._ttl:
+                self._snapshot = self._take(now)
+                self._snapshot_at = now
+            return self._snapshot
+
+    def _take(self, now: float) -> HealthSnapshot:
+        depths = {labels[0]: value for labels, value in QUEUE_DEPTH.values().items()}
+
+        webhooks = self._webhook_total()
+        elapsed = now - self._webhooks_at
+        rate = (webhooks - self._webhooks_seen) / elapsed if elapsed > 0 else 0.0
+        self._webhooks_seen, self._webhooks_at = webhooks, now
+
+        last_delivery = (
+            now - self._last_delivery if self._last_delivery is not None else None
+        )
+        lag, self._loop_lag_peak = self._loop_lag_peak, None
+        if lag is None:
+            lag = self._loop_lag
+        problems = []
+        if lag is not None and lag >= LOOP_LAG_DEGRADED_SECONDS:
+            problems.append(f"event loop lagging {lag:.2f}s")
+        waiting = depths.get("outbound", 0.0) + depths.get("outbound_retry", 0.0)
+        stalled_for = (
+            last_delivery if last_delivery is not None else now - self._started
+        )
+        if waiting and stalled_for >= DELIVERY_STALL_SECONDS:
+            problems.append(
+                f"{int(waiting)} message(s) waiting, no Discord delivery "
+                f"for {int(stalled_for)}s"
+            )
+
+        return HealthSnapshot(
+            status="degraded" if problems else "ok",
+            taken_at=time.time(),
+            uptime_seconds=now - self._started,
+            loop_lag_seconds=lag,
+            queue_depths=depths,
+            last_delivery_seconds_ago=last_delivery,
+            webhooks_per_second=rate,
+            problems=tuple(problems),
+        )
+
+    @staticmethod
+    def _webhook_total() -> float:
+        return sum(WEBHOOKS.values().values())
+
+
+def format_health(snapshot: HealthSnapshot, detail: bool = True) -> str:
+    """
+    Renders a snapshot as a Discord message; without ``detail`` only the
+    status and its problems, leaving out the process-wide traffic figures.
+    """
+    if snapshot.ok:
+        lines = [":white_check_mark: **Pipeline Status: Healthy**"]
+    else:
+        lines = [":warning: **Pipeline Status: Degraded**"]
+        lines.extend(f"- {problem}" for problem in snapshot.problems)
+    if not detail:
+        return "\n".join(lines)
+
+    lag = snapshot.loop_lag_seconds
+    lines.append(
+        f"Loop lag: {lag * 1000:.0f} ms" if lag is not None else "Loop lag: not sampled"
+    )
+    last = snapshot.last_delivery_seconds_ago
+    lines.append(
+        f"Last Discord delivery: {last:.0f}s ago"
+        if last is not None
+        else "Last Discord delivery: none yet"
+    )
+    lines.append(f"Webhooks: {snapshot.webhooks_per_second:.2f}/s")
+    if snapshot.queue_depths:
+        lines.append(
+            "Queues: "
+            + " · ".join(
+                f"{name} {int(depth)}"
+                for name, depth in sorted(snapshot.queue_depths.items())
+            )
+        )
+    lines.append(f"Uptime: {snapshot.uptime_seconds / 3600:.1f} h")
+    return "\n".join(lines)
+
+
+# Process-wide monitor shared by the HTTP apps, ``!health``, and the
+# outbound dispatcher.
+HEALTH = HealthMonitor()
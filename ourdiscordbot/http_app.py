@@ -3,60 +3,177 @@
 from __future__ import annotations
 
 import logging
+import time
 from typing import Callable, Optional
 
-import discord
-from flask import Flask, abort, request
-
-from .discord_client import DiscordNotifier
+from flask import Flask, abort, jsonify, request
+
+from .dedup import DeliveryCache, delivery_key
+from .health import HEALTH, HealthMonitor
+from .ingest import IngestQueue
+from .metrics import (
+    CONTENT_TYPE,
+    RATE_LIMITED,
+    STAGE_SECONDS,
+    WEBHOOKS,
+    MetricsRegistry,
+)
+from .payloads import PayloadParser
+from .spool import SpoolDeliveryWorker
+from .tenants import TENANT_KEY, Tenant, TenantRegistry, secret_matches
 
 logger = logging.getLogger(__name__)
 
-EmbedFactory = Callable[[dict], Optional[discord.Embed]]
+PayloadHandler = Callable[[dict], object]
 
 
 def create_flask_app(
     *,
     jira_secret: Optional[str],
-    process_event: EmbedFactory,
-    notifier: DiscordNotifier,
+    handle_event: PayloadHandler,
+    ingest: Optional[IngestQueue] = None,
+    dedup: Optional[DeliveryCache] = None,
+    parser: Optional[PayloadParser] = None,
+    spool: Optional[SpoolDeliveryWorker] = None,
+    tenants: Optional[TenantRegistry] = None,
+    metrics: Optional[MetricsRegistry] = None,
+    health: Optional[HealthMonitor] = None,
 ) -> Flask:
-    """Create and configure the Flask app used for webhook ingestion."""
+    """
+    Create and configure the Flask app used for webhook ingestion.
+
+    When an ``ingest`` queue is supplied, payloads are acknowledged with
+    ``202 Accepted`` once queued and rendered by its workers; otherwise they
+    are handled inline before responding. Deliveries already recorded in
+    ``dedup`` are acknowledged without being processed again. Bodies larger
+    than the ``parser`` limit are refused with ``413``. With a ``spool``, the
+    payload is made durable before the ``202`` and delivered from the spool.
+    With ``tenants``, ``/webhooks/jira/<tenant>`` accepts payloads checked
+    against that tenant's secret and rate limit. With ``metrics``,
+    ``/metrics`` serves them in the Prometheus text format. ``/health``
+    answers from the cached ``health`` snapshot (the process-wide monitor by
+    default): ``OK`` or ``DEGRADED``, always with ``200`` so a slow Discord
+    does not take the webhook endpoint out of rotation, and the full
+    snapshot as JSON with ``?details=1``.
+    """
+    health = health or HEALTH
+    parser = parser or PayloadParser()
     app = Flask(__name__)
+    app.config["MAX_CONTENT_LENGTH"] = parser.max_bytes
+    app.extensions["jira_ingest"] = ingest
+    app.extensions["jira_spool"] = spool
 
     @app.route("/health")
     def health_check():
-        return "OK", 200
+        snapshot = health.snapshot()
+        if request.args.get("details"):
+            return jsonify(snapshot.to_dict())
+        return ("OK" if snapshot.ok else "DEGRADED"), 200
+
+    if metrics is not None:
+
+        @app.route("/metrics")
+        def metrics_endpoint():
+            return metrics.render(), 200, {"Content-Type": CONTENT_TYPE}
 
     @app.route("/webhooks/jira", methods=["POST"])
     def jira_webhook():
         auth_token = request.args.get("secret")
-        if not jira_secret or auth_token != jira_secret:
+        if not secret_matches(auth_token, jira_secret):
             logger.warning(
                 "Invalid secret provided for Jira webhook. Provided: %s", auth_token
             )
+            WEBHOOKS.inc("forbidden")
             abort(403)
-
-        raw_data = request.get_data(as_text=True)
-        logger.info("Received Jira webhook payload: %s", raw_data)
-
+        return _accept(None)
+
+    if tenants is not None:
+
+        @app.route("/webhooks/jira/<tenant_id>", methods=["POST"])
+        def tenant_webhook(tenant_id: str):
+            tenant = tenants.authenticate(tenant_id, request.args.get("secret"))
+            if tenant is None:
+                logger.warning("Invalid secret provided for Jira tenant %s.", tenant_id)
+                WEBHOOKS.inc("forbidden")
+                abort(403)
+            if not tenant.admit():
+                tenants.record_throttled()
+                RATE_LIMITED.inc("tenant")
+                retry_after = tenant.limiter.retry_after()
+                logger.warning("Jira tenant %s exceeded its rate limit.", tenant_id)
+                WEBHOOKS.inc("throttled")
+                return "Too Many Requests", 429, {"Retry-After": str(retry_after)}
+            return _accept(tenant)
+
+    def _accept(tenant: Optional[Tenant]):
+        raw_data = request.get_data()
+        logger.info("Received Jira webhook payload (%d bytes).", len(raw_data))
+
+        started = time.perf_counter()
         try:
-            data = request.get_json()
-        except Exception as exc:
+            data = parser.parse(raw_data)
+        except ValueError as exc:
             logger.error("Failed to parse JSON from Jira webhook: %s", exc)
+            WEBHOOKS.inc("invalid")
             abort(400, description="Could not parse JSON payload.")
 
+        STAGE_SECONDS.observe(time.perf_counter() - started, "parse")
+
+        if isinstance(data, dict):
+            # Only the tenant endpoints may say which tenant a payload is for.
+            if tenant is not None:
+                data[TENANT_KEY] = tenant.id
+            else:
+                data.pop(TENANT_KEY, None)
+
+        dedup_key = None
+        if dedup is not None:
+            dedup_key = delivery_key(data, raw_data)
+            if tenant is not None:
+                dedup_key = f"{tenant.id}|{dedup_key}"
+            if dedup.seen(dedup_key):
+                logger.info("Ignoring duplicate Jira webhook delivery.")
+                WEBHOOKS.inc("duplicate")
+                return "Duplicate", 200
+
         if data and "issue" in data:
             issue_key = data.get("issue", {}).get("key")
             logger.info("Processing Jira event for issue: %s", issue_key)
         else:
             logger.warning("Jira webhook payload did not contain issue data.")
 
-        embed = process_event(data)
-        if isinstance(embed, discord.Embed):
-            notifier.send(embed=embed)
-            logger.info("Successfully sent Jira notification to Discord.")
+        if spool is not None:
+            if not spool.submit(data):
+                if dedup_key is not None:
+                    dedup.forget(dedup_key)
+                logger.warning("Event spool unavailable; rejecting Jira webhook.")
+                WEBHOOKS.inc("unavailable")
+                abort(503, description="Event spool is full; retry later.")
+            WEBHOOKS.inc("accepted")
+            return "Accepted", 202
+
+        if ingest is not None:
+            if not ingest.submit(data):
+                if dedup_key is not None:
+                    # Let Jira's retry through once the queue has room again.
+                    dedup.forget(dedup_key)
+                logger.warning(
+                    "Ingest queue full (policy %s); rejecting Jira webhook.",
+                    ingest.policy,
+                )
+                WEBHOOKS.inc("unavailable")
+                abort(503, description="Ingest queue is full; retry later.")
+            WEBHOOKS.inc("accepted")
+            return "Accepted", 202
 
+        try:
+            handle_event(data)
+        except Exception:
+            if dedup_key is not None:
+                # Jira retries failed deliveries; let the retry through.
+                dedup.forget(dedup_key)
+            raise
+        WEBHOOKS.inc("handled")
         return "OK", 200
 
     return app
@@ -0,0 +1,337 @@
+"""In-process ingest queues that decouple webhook acknowledgement from delivery."""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, List, Optional, Tuple
+
+from .metrics import STAGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+BACKPRESSURE_POLICIES = ("reject", "shed_oldest")
+
+PayloadHandler = Callable[[Any], Any]
+
+
+@dataclass(frozen=True)
+class IngestStats:
+    """Point-in-time view of the ingest queue counters."""
+
+    depth: int
+    in_flight: int
+    capacity: int
+    high_watermark: int
+    accepted: int
+    rejected: int
+    shed: int
+    processed: int
+    failed: int
+    wait_avg: float
+    wait_max: float
+
+
+class _BoundedIngest:
+    """Buffer, backpressure policy and counters shared by the ingest queues."""
+
+    def __init__(
+        self,
+        handler: PayloadHandler,
+        *,
+        workers: int,
+        capacity: int,
+        policy: str,
+        name: str,
+    ) -> None:
+        if workers < 1:
+            raise ValueError("Ingest queues require at least one worker.")
+        if capacity < 1:
+            raise ValueError("Ingest queue capacity must be positive.")
+        if policy not in BACKPRESSURE_POLICIES:
+            raise ValueError(
+                f"Unknown backpressure policy {policy!r}; "
+                f"expected one of {', '.join(BACKPRESSURE_POLICIES)}."
+            )
+
+        self._handler = handler
+        self._workers = workers
+        self._capacity = capacity
+        self._policy = policy
+        self._name = name
+
+        self._buffer: Deque[Tuple[float, Any]] = deque()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._in_flight = 0
+
+        self._accepted = 0
+        self._rejected = 0
+        self._shed = 0
+        self._processed = 0
+        self._failed = 0
+        self._high_watermark = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @property
+    def policy(self) -> str:
+        return self._policy
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def depth(self) -> int:
+        return len(self._buffer)
+
+    def stats(self) -> IngestStats:
+        with self._lock:
+            dequeued = self._processed + self._failed + self._in_flight
+            return IngestStats(
+                depth=len(self._buffer),
+                in_flight=self._in_flight,
+                capacity=self._capacity,
+                high_watermark=self._high_watermark,
+                accepted=self._accepted,
+                rejected=self._rejected,
+                shed=self._shed,
+                processed=self._processed,
+                failed=self._failed,
+                wait_avg=self._wait_total / dequeued if dequeued else 0.0,
+                wait_max=self._wait_max,
+            )
+
+    def _offer(self, payload: Any) -> bool:
+        """Apply the backpressure policy and buffer the payload; lock must be held."""
+        if self._closed:
+            self._rejected += 1
+            return False
+
+        if len(self._buffer) >= self._capacity:
+            if self._policy == "reject":
+                self._rejected += 1
+                return False
+            self._buffer.popleft()
+            self._shed += 1
+            logger.warning(
+                "Ingest queue %s full; shedding oldest queued payload.", self._name
+            )
+
+        self._buffer.append((time.monotonic(), payload))
+        self._accepted += 1
+        depth = len(self._buffer)
+        if depth > self._high_watermark:
+            self._high_watermark = depth
+        return True
+
+    def _take(self) -> Any:
+        """Pop the oldest payload and record its queue wait; lock must be held."""
+        enqueued_at, payload = self._buffer.popleft()
+        self._in_flight += 1
+        waited = time.monotonic() - enqueued_at
+        self._wait_total += waited
+        if waited > self._wait_max:
+            self._wait_max = waited
+        STAGE_SECONDS.observe(waited, "queue_wait")
+        return payload
+
+    def _finish(self, failed: bool) -> None:
+        """Record the outcome of a handled payload; lock must be held."""
+        self._in_flight -= 1
+        if failed:
+            self._failed += 1
+        else:
+            self._processed += 1
+
+    def _log_started(self) -> None:
+        logger.info(
+            "Started %s ingest worker(s) for %s (capacity %s, policy %s).",
+            self._workers,
+            self._name,
+            self._capacity,
+            self._policy,
+        )
+
+
+class IngestQueue(_BoundedIngest):
+    """
+    Bounded buffer of webhook payloads drained by a pool of worker threads.
+
+    When the buffer is full the configured policy either rejects the new
+    payload (``"reject"``) or drops the oldest queued one (``"shed_oldest"``).
+    Workers are started lazily on the first submission so that building the
+    runtime stays free of side effects.
+    """
+
+    def __init__(
+        self,
+        handler: PayloadHandler,
+        *,
+        workers: int = 2,
+        capacity: int = 1000,
+        policy: str = "reject",
+        name: str = "jira-ingest",
+    ) -> None:
+        super().__init__(
+            handler, workers=workers, capacity=capacity, policy=policy, name=name
+        )
+        self._not_empty = threading.Condition(self._lock)
+        self._idle = threading.Condition(self._lock)
+        self._threads: List[threading.Thread] = []
+
+    def submit(self, payload: Any) -> bool:
+        """Queue a payload for processing; returns False when it was rejected."""
+        with self._lock:
+            if not self._offer(payload):
+                return False
+            if not self._threads:
+                self._start_workers()
+            self._not_empty.notify()
+        return True
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Block until every queued payload has been handled."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while self._buffer or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Stop accepting payloads and wait for the workers to drain the buffer."""
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+            threads = list(self._threads)
+        for thread in threads:
+            thread.join(timeout)
+
+    def _start_workers(self) -> None:
+        for index in range(self._workers):
+            thread = threading.Thread(
+                target=self._run_worker,
+                name=f"{self._name}-{index}",
+                daemon=True,
+            )
+            self._threads.append(thread)
+            thread.start()
+        self._log_started()
+
+    def _run_worker(self) -> None:
+        while True:
+            with self._lock:
+                while not self._buffer and not self._closed:
+                    self._not_empty.wait()
+                if not self._buffer:
+                    return
+                payload = self._take()
+
+            failed = False
+            try:
+                self._handler(payload)
+            except Exception as exc:
+                failed = True
+                logger.exception("Ingest worker failed to handle payload: %s", exc)
+            finally:
+                with self._lock:
+                    self._finish(failed)
+                    if not self._buffer and not self._in_flight:
+                        self._idle.notify_all()
+
+
+class AsyncIngestQueue(_BoundedIngest):
+    """
+    Ingest queue drained by worker tasks on the running event loop.
+
+    Used by the aiohttp ingestion server so that webhook handling and Discord
+    delivery share the ``discord.Client`` loop. ``submit`` must be called from
+    that loop; handlers may be plain callables or coroutine functions.
+    """
+
+    def __init__(
+        self,
+        handler: PayloadHandler,
+        *,
+        workers: int = 2,
+        capacity: int = 1000,
+        policy: str = "reject",
+        name: str = "jira-ingest",
+    ) -> None:
+        super().__init__(
+            handler, workers=workers, capacity=capacity, policy=policy, name=name
+        )
+        self._tasks: List[asyncio.Task] = []
+        self._not_empty: Optional[asyncio.Event] = None
+        self._idle: Optional[asyncio.Event] = None
+
+    def submit(self, payload: Any) -> bool:
+        """Queue a payload for processing; returns False when it was rejected."""
+        with self._lock:
+            if not self._offer(payload):
+                return False
+        if not self._tasks:
+            self._start_workers()
+        self._idle.clear()
+        self._not_empty.set()
+        return True
+
+    async def join(self) -> None:
+        """Wait until every queued payload has been handled."""
+        if self._idle is not None:
+            await self._idle.wait()
+
+    async def aclose(self) -> None:
+        """Stop accepting payloads and wait for the workers to drain the buffer."""
+        with self._lock:
+            self._closed = True
+        if self._not_empty is not None:
+            self._not_empty.set()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _start_workers(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._not_empty = asyncio.Event()
+        self._idle = asyncio.Event()
+        for index in range(self._workers):
+            self._tasks.append(
+                loop.create_task(self._run_worker(), name=f"{self._name}-{index}")
+            )
+        self._log_started()
+
+    async def _run_worker(self) -> None:
+        while True:
+            while not self._buffer:
+                if self._closed:
+                    return
+                self._not_empty.clear()
+                await self._not_empty.wait()
+
+            with self._lock:
+                payload = self._take()
+
+            failed = False
+            try:
+                result = self._handler(payload)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as exc:
+                failed = True
+                logger.exception("Ingest worker failed to handle payload: %s", exc)
+            finally:
+                with self._lock:
+                    self._finish(failed)
+                    drained = not self._buffer and not self._in_flight
+                if drained:
+                    self._idle.set()
+            # Yield between payloads so request handlers are not starved.
+            await asyncio.sleep(0)
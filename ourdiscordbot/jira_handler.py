@@ -1,9 +1,13 @@
 import logging
-from typing import Optional
+import time
+from typing import List, Optional, Tuple
 
 import discord
 
-from jira_events import classify_issue_update, registry
+from jira_events import classify_issue_update_all, issue_states, profiling, registry
+from jira_events.changelog import clear_changelog_index
+
+from .metrics import EVENTS, STAGE_SECONDS
 
 logger = logging.getLogger(__name__)
 
@@ -13,29 +17,89 @@ def process_jira_event(data: dict) -> Optional[discord.Embed]:
     Routes the Jira webhook payload to the appropriate formatting function
     based on the inferred event type.
     """
-    event_type = _determine_event_type(data)
-    if not event_type:
-        logger.info("Ignoring unhandled Jira event: None")
-        return None
+    _, embed = render_jira_event(data)
+    return embed
 
-    embed = registry.dispatch(event_type, data)
-    if embed:
-        return embed
 
-    logger.info(
-        "Ignoring unhandled Jira event: %s (registered events: %s)",
-        event_type,
-        ", ".join(registry.known_events()) or "none",
-    )
-    return None
+def render_jira_event(data: dict) -> Tuple[Optional[str], Optional[discord.Embed]]:
+    """
+    Resolves the primary event type for the payload and renders it, returning
+    both so that later pipeline stages can group notifications by event.
+    """
+    rendered = render_jira_events(data)
+    return rendered[0] if rendered else (None, None)
+
+
+def render_jira_events(data: dict) -> List[Tuple[str, discord.Embed]]:
+    """
+    Renders every event type the payload represents. An issue update that
+    changes several fields yields one ``(event_type, embed)`` pair per
+    recognised change, all from a single parse of the payload.
+    """
+    profiler = profiling.active
+    try:
+        if profiler is not None:
+            return profiler.timed(
+                "stage", "render_jira_events", _render, data, profiler
+            )
+        return _render(data)
+    finally:
+        clear_changelog_index()
+
+
+def _render(data: dict, profiler=None) -> List[Tuple[str, discord.Embed]]:
+    started = time.perf_counter()
+    if profiler is None:
+        event_types = _determine_event_types(data)
+    else:
+        event_types = profiler.timed(
+            "stage", "determine_event_types", _determine_event_types, data
+        )
+    classified = time.perf_counter()
+    STAGE_SECONDS.observe(classified - started, "classify")
+    if not event_types:
+        EVENTS.inc("none", "ignored")
+        logger.info("Ignoring unhandled Jira event: None")
+        return []
+
+    # Handlers read the issue's history, so record this payload first.
+    issue_states.observe(data)
+
+    rendered: List[Tuple[str, discord.Embed]] = []
+    for event_type in event_types:
+        embed = registry.dispatch(event_type, data)
+        if embed:
+            rendered.append((event_type, embed))
+            EVENTS.inc(event_type, "rendered")
+            continue
+
+        # Unregistered types share one label so payloads cannot mint series.
+        label = event_type if registry.get_handler(event_type) else "unregistered"
+        EVENTS.inc(label, "ignored")
+        logger.info(
+            "Ignoring unhandled Jira event: %s (registered events: %s)",
+            event_type,
+            ", ".join(sorted(registry.known_events())) or "none",
+        )
+    STAGE_SECONDS.observe(time.perf_counter() - classified, "render")
+    return rendered
 
 
 def _determine_event_type(data):
     """
     Attempts to determine the Jira event type from varying webhook payloads.
     """
+    event_types = _determine_event_types(data)
+    return event_types[0] if event_types else None
+
+
+def _determine_event_types(data) -> List[str]:
+    """
+    Determines every Jira event type a webhook payload represents; issue
+    updates may classify into several specific events at once.
+    """
     if not isinstance(data, dict):
-        return None
+        return []
 
     event_keys = (
         "webhookEvent",
@@ -48,28 +112,28 @@ def _determine_event_type(data):
         if key in data and data[key]:
             normalized = _normalize_event_type(key, data[key])
             if normalized == "jira:issue_updated":
-                specific = classify_issue_update(data)
-                return specific or normalized
-            return normalized
+                specific = classify_issue_update_all(data)
+                return specific or [normalized]
+            return [normalized] if normalized else []
 
     if "comment" in data:
-        return "comment_created"
+        return ["comment_created"]
 
     issue = data.get("issue")
     if issue:
         changelog = data.get("changelog") or issue.get("changelog")
         if changelog:
-            specific = classify_issue_update(data)
+            specific = classify_issue_update_all(data)
             if specific:
                 return specific
 
             histories = changelog.get("histories") or []
             total = changelog.get("total")
             if histories or (isinstance(total, int) and total > 0):
-                return "jira:issue_updated"
-        return "jira:issue_created"
+                return ["jira:issue_updated"]
+        return ["jira:issue_created"]
 
-    return None
+    return []
 
 
 def _normalize_event_type(source_key, value):
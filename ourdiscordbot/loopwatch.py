@@ -0,0 +1,194 @@
+"""Opt-in watchdog that measures event-loop lag and captures blocking stacks."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import logging.handlers
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+from .metrics import LOOP_LAG_SECONDS, SLOW_CALLBACKS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL_SECONDS = 0.05
+DEFAULT_THRESHOLD_SECONDS = 0.1
+DEFAULT_LOG_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_LOG_BACKUPS = 3
+# Samples kept for :meth:`LoopWatchdog.stats`; a minute at the default interval.
+LAG_WINDOW = 1200
+
+
+@dataclass(frozen=True)
+class LoopLagStats:
+    """Lag percentiles over the recent samples, in seconds."""
+
+    samples: int
+    p50: float
+    p95: float
+    p99: float
+    max: float
+    slow_callbacks: int
+
+
+class LoopWatchdog:
+    """
+    Measures how late the event loop runs a heartbeat scheduled every
+    ``interval`` seconds and records each lag in the ``loop_lag_seconds``
+    histogram.
+
+    A watcher thread checks the heartbeat. When it is more than
+    ``threshold`` seconds overdue, something on the loop thread is blocking.
+    The watcher then captures that thread's stack with
+    ``sys._current_frames()`` while the blocking code is still running, and
+    writes one report per stall. Reports go to a rotating ``log_path``, or
+    to this module's logger without one. The loop itself does no work
+    beyond the heartbeat.
+    """
+
+    def __init__(
+        self,
+        *,
+        threshold: float = DEFAULT_THRESHOLD_SECONDS,
+        interval: float = DEFAULT_INTERVAL_SECONDS,
+        log_path: Optional[str] = None,
+        log_max_bytes: int = DEFAULT_LOG_MAX_BYTES,
+        log_backups: int = DEFAULT_LOG_BACKUPS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._threshold = threshold
+        self._interval = interval
+        self._clock = clock
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._beat = 0.0
+        self._reported_beat: Optional[float] = None
+        self._samples: Deque[float] = deque(maxlen=LAG_WINDOW)
+        self._slow_callbacks = 0
+        self._stopped = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self._reports = self._report_logger(log_path, log_max_bytes, log_backups)
+
+    @staticmethod
+    def _report_logger(
+        path: Optional[str], max_bytes: int, backups: int
+    ) -> logging.Logger:
+        if not path:
+            return logger
+        reports = logging.getLogger(f"{__name__}.reports.{path}")
+        reports.propagate = False
+        reports.setLevel(logging.WARNING)
+        if not reports.handlers:
+            handler = logging.handlers.RotatingFileHandler(
+                path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8"
+            )
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            reports.addHandler(handler)
+        return reports
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Starts watching ``loop``; call from a coroutine running on it."""
+        if self._heartbeat is not None and not self._heartbeat.done():
+            return
+        self._loop = loop
+        self._loop_thread = threading.get_ident()
+        self._beat = self._clock()
+        self._reported_beat = None
+        self._heartbeat = loop.create_task(self._run_heartbeat())
+        if self._watcher is None or not self._watcher.is_alive():
+            self._stopped.clear()
+            self._watcher = threading.Thread(
+                target=self._watch, name="loop-watchdog", daemon=True
+            )
+            self._watcher.start()
+        logger.info(
+            "Loop watchdog reporting callbacks blocking over %.0f ms.",
+            self._threshold * 1000,
+        )
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+
+    async def _run_heartbeat(self) -> None:
+        while True:
+            expected = self._clock() + self._interval
+            await asyncio.sleep(self._interval)
+            now = self._clock()
+            lag = max(now - expected, 0.0)
+            self._beat = now
+            self._samples.append(lag)
+            LOOP_LAG_SECONDS.observe(lag)
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self._interval / 2):
+            self.check()
+
+    def check(self) -> bool:
+        """Reports the loop thread's stack if the heartbeat is overdue."""
+        loop, heartbeat = self._loop, self._heartbeat
+        if loop is None or heartbeat is None or heartbeat.done():
+            return False
+        if not loop.is_running():
+            return False
+        beat = self._beat
+        overdue = self._clock() - beat - self._interval
+        if overdue < self._threshold or self._reported_beat == beat:
+            return False
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is None:
+            return False
+        self._reported_beat = beat
+        self._slow_callbacks += 1
+        SLOW_CALLBACKS.inc()
+        stack = "".join(traceback.format_stack(frame))
+        self._reports.warning(
+            "Event loop blocked for at least %.0f ms in:\n%s",
+            overdue * 1000,
+            stack,
+        )
+        return True
+
+    def stats(self) -> LoopLagStats:
+        samples = sorted(self._samples)
+        if not samples:
+            return LoopLagStats(0, 0.0, 0.0, 0.0, 0.0, self._slow_callbacks)
+
+        def rank(percent: float) -> float:
+            return samples[min(int(percent / 100 * len(samples)), len(samples) - 1)]
+
+        return LoopLagStats(
+            samples=len(samples),
+            p50=rank(50),
+            p95=rank(95),
+            p99=rank(99),
+            max=samples[-1],
+            slow_callbacks=self._slow_callbacks,
+        )
+
+
+_shared: Dict[Tuple[float, Optional[str]], LoopWatchdog] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_watchdog(threshold: float, log_path: Optional[str]) -> LoopWatchdog:
+    """
+    Returns one watchdog per configuration for the whole process, so a
+    sender that recreates its Discord client each leadership term keeps a
+    single heartbeat and watcher thread.
+    """
+    with _shared_lock:
+        watchdog = _shared.get((threshold, log_path))
+        if watchdog is None:
+            watchdog = _shared[(threshold, log_path)] = LoopWatchdog(
+                threshold=threshold, log_path=log_path
+            )
+        return watchdog
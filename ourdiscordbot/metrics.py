@@ -0,0 +1,342 @@
+"""In-process metrics rendered in the Prometheus text exposition format."""
+
+from __future__ import annotations
+
+import abc
+import logging
+import math
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; spans sub-millisecond parsing up to slow Discord round trips.
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+Labels = Tuple[str, ...]
+
+
+class _Sharded(abc.ABC):
+    """
+    Per-thread storage for a metric. Each thread updates its own dict, so
+    recording never takes a lock; the scrape merges every shard. Shards of
+    threads that have exited are folded into ``_retired`` so per-request
+    threads do not accumulate.
+    """
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._shards: List[Tuple[threading.Thread, dict]] = []
+        self._retired: dict = {}
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard: dict = {}
+            with self._shards_lock:
+                self._retire_dead_shards()
+                self._shards.append((threading.current_thread(), shard))
+            self._local.shard = shard
+            return shard
+
+    def _snapshots(self) -> List[dict]:
+        with self._shards_lock:
+            self._retire_dead_shards()
+            shards = [shard for _, shard in self._shards]
+            retired = dict(self._retired)
+        # Copying a dict is atomic under the GIL, so writers need no lock.
+        return [dict(shard) for shard in shards] + [retired]
+
+    def _retire_dead_shards(self) -> None:
+        """Merges shards of exited threads; ``_shards_lock`` must be held."""
+        alive = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                alive.append((thread, shard))
+            else:
+                self._merge_into(self._retired, shard)
+        self._shards = alive
+
+    @abc.abstractmethod
+    def _merge_into(self, target: dict, shard: dict) -> None:
+        """Adds the values of ``shard`` into ``target``."""
+
+
+class Counter(_Sharded):
+    """Monotonic count per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+        super().__init__()
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0.0) + amount
+
+    def values(self) -> Dict[Labels, float]:
+        merged: Dict[Labels, float] = {}
+        for shard in self._snapshots():
+            self._merge_into(merged, shard)
+        return merged
+
+    def _merge_into(self, target: dict, shard: dict) -> None:
+        for labels, value in shard.items():
+            target[labels] = target.get(labels, 0.0) + value
+
+    def samples(self) -> Iterable[Tuple[str, Labels, float]]:
+        for labels, value in sorted(self.values().items()):
+            yield self.name + "_total", labels, value
+
+
+class Histogram(_Sharded):
+    """
+    Bucketed observations per label set. Each shard keeps plain bucket
+    counts plus the sum; cumulative ``le`` counts are built when scraped.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__()
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str) -> None:
+        shard = self._shard()
+        cells = shard.get(labels)
+        if cells is None:
+            # One cell per bucket, one for +Inf, then the running sum.
+            cells = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        cells[bisect_left(self.buckets, value)] += 1
+        cells[-1] += value
+
+    def values(self) -> Dict[Labels, List[float]]:
+        merged: Dict[Labels, List[float]] = {}
+        for shard in self._snapshots():
+            self._merge_into(merged, shard)
+        return merged
+
+    def _merge_into(self, target: dict, shard: dict) -> None:
+        for labels, cells in shard.items():
+            cells = list(cells)
+            current = target.get(labels)
+            if current is None:
+                target[labels] = cells
+            else:
+                for index, value in enumerate(cells):
+                    current[index] += value
+
+    def samples(self) -> Iterable[Tuple[str, Labels, float]]:
+        bounds = [_format_value(bound) for bound in self.buckets] + ["+Inf"]
+        for labels, cells in sorted(self.values().items()):
+            cumulative = 0
+            for bound, count in zip(bounds, cells):
+                cumulative += count
+                yield self.name + "_bucket", labels + (bound,), cumulative
+            yield self.name + "_sum", labels, cells[-1]
+            yield self.name + "_count", labels, cumulative
+
+
+class Gauge:
+    """
+    Values read from callables when scraped, such as queue depths, so the
+    code owning the value does no extra work between scrapes.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._sources: Dict[Labels, Callable[[], float]] = {}
+
+    def track(self, labels: Labels, source: Callable[[], float]) -> None:
+        """Reads ``source()`` for ``labels`` on each scrape, replacing any previous source."""
+        self._sources[tuple(labels)] = source
+
+    def untrack(self, labels: Labels) -> None:
+        self._sources.pop(tuple(labels), None)
+
+    def values(self) -> Dict[Labels, float]:
+        """Reads every source now; sources that fail are skipped."""
+        values: Dict[Labels, float] = {}
+        for labels, source in sorted(self._sources.items()):
+            try:
+                values[labels] = float(source())
+            except Exception as exc:
+                logger.warning("Could not read gauge %s%s: %s", self.name, labels, exc)
+        return values
+
+    def samples(self) -> Iterable[Tuple[str, Labels, float]]:
+        for labels, value in self.values().items():
+            yield self.name, labels, value
+
+
+class MetricsRegistry:
+    """Named counters, histograms and gauges with a text exposition renderer."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(
+            Histogram, name, documentation, labelnames, buckets=buckets
+        )
+
+    def gauge(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def get(self, name: str):
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Returns every metric in the Prometheus text format (version 0.0.4)."""
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {_escape_help(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            labelnames = metric.labelnames
+            if metric.kind == "histogram":
+                labelnames += ("le",)
+            for sample_name, labels, value in metric.samples():
+                names = (
+                    labelnames if len(labels) == len(labelnames) else labelnames[:-1]
+                )
+                lines.append(
+                    f"{sample_name}{_format_labels(names, labels)} {_format_value(value)}"
+                )
+        return "\n".join(lines) + "\n"
+
+    def _get_or_create(self, cls, name, documentation, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(
+                    name, documentation, labelnames, **kwargs
+                )
+            elif not isinstance(metric, cls):
+                raise ValueError(
+                    f"Metric {name} is already registered as a {metric.kind}."
+                )
+            return metric
+
+
+def _format_labels(names: Sequence[str], values: Labels) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape_label(str(value))}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escape_help(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+# Process-wide metrics for the webhook-to-Discord pipeline.
+METRICS = MetricsRegistry()
+
+STAGE_SECONDS = METRICS.histogram(
+    "ourdiscordbot_stage_seconds",
+    "Time spent in each webhook-to-Discord stage.",
+    ("stage",),
+)
+EVENTS = METRICS.counter(
+    "ourdiscordbot_jira_events",
+    "Jira events by event type and outcome.",
+    ("event_type", "outcome"),
+)
+WEBHOOKS = METRICS.counter(
+    "ourdiscordbot_webhooks",
+    "Webhook requests by response outcome.",
+    ("outcome",),
+)
+RATE_LIMITED = METRICS.counter(
+    "ourdiscordbot_rate_limited",
+    "Requests refused by a rate limit, by who applied it.",
+    ("scope",),
+)
+LOOP_LAG_SECONDS = METRICS.histogram(
+    "ourdiscordbot_loop_lag_seconds",
+    "How late the Discord event loop ran the loop watchdog's heartbeat.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+SLOW_CALLBACKS = METRICS.counter(
+    "ourdiscordbot_slow_callbacks",
+    "Loop stalls over the watchdog threshold whose stack was captured.",
+)
+QUEUE_DEPTH = METRICS.gauge(
+    "ourdiscordbot_queue_depth",
+    "Items waiting in each queue.",
+    ("queue",),
+)
+
+
+def track_queue_depth(queue: str, source: Optional[Callable[[], float]]) -> None:
+    """Reports ``source()`` as the depth of ``queue``; ``None`` stops reporting it."""
+    if source is None:
+        QUEUE_DEPTH.untrack((queue,))
+    else:
+        QUEUE_DEPTH.track((queue,), source)
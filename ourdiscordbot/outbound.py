@@ -0,0 +1,447 @@
+"""Outbound Discord delivery with per-channel queues and rate-limit awareness."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence
+
+import aiohttp
+import discord
+
+from .health import HEALTH
+from .metrics import RATE_LIMITED, STAGE_SECONDS
+from .retry import DeadLetter, DeadLetterStore, RetryPolicy, RetryScheduler
+
+logger = logging.getLogger(__name__)
+
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARACTERS = 6000
+
+ChannelResolver = Callable[[int], Optional[Any]]
+
+
+class Countdown:
+    """
+    Calls ``callback`` once :meth:`done` has been called as many times as
+    the count, which starts at ``count`` and grows with :meth:`add`. Safe to
+    use across threads; the callback runs once, on the thread that finished
+    the last part.
+    """
+
+    __slots__ = ("_callback", "_remaining", "_lock")
+
+    def __init__(self, callback: Callable[[], None], count: int = 1) -> None:
+        self._callback = callback
+        self._remaining = count
+        self._lock = threading.Lock()
+
+    def add(self, count: int = 1) -> None:
+        with self._lock:
+            self._remaining += count
+
+    def done(self) -> None:
+        with self._lock:
+            self._remaining -= 1
+            finished = self._remaining == 0
+        if finished:
+            self._callback()
+
+
+@dataclass
+class OutboundMessage:
+    """
+    A message waiting in a channel queue. ``on_done`` is called once the
+    message was delivered or dead-lettered.
+    """
+
+    channel_id: int
+    content: Optional[str] = None
+    embeds: List[discord.Embed] = field(default_factory=list)
+    enqueued_at: float = field(default_factory=time.monotonic)
+    attempts: int = 0
+    on_done: Optional[Callable[[], None]] = None
+
+    @property
+    def coalescable(self) -> bool:
+        return self.content is None and bool(self.embeds)
+
+
+@dataclass(frozen=True)
+class OutboundStats:
+    """Point-in-time view of the outbound dispatcher counters."""
+
+    queued: int
+    active_channels: int
+    messages_sent: int
+    embeds_sent: int
+    rate_limited: int
+    failed: int
+    retried: int
+    retry_pending: int
+    dead_lettered: int
+    latency_avg: float
+    latency_max: float
+    embeds_per_message: Dict[int, int]
+
+
+class RouteBudget:
+    """
+    Client-side mirror of a Discord rate-limit bucket.
+
+    Discord allows roughly five messages per five seconds per channel. The
+    budget refills at the start of each window and is zeroed when Discord
+    answers 429 so the queue waits for ``Retry-After`` before sending again.
+    """
+
+    __slots__ = ("limit", "period", "remaining", "reset_at")
+
+    def __init__(self, limit: int = 5, period: float = 5.0) -> None:
+        self.limit = limit
+        self.period = period
+        self.remaining = limit
+        self.reset_at = 0.0
+
+    def delay(self, now: float) -> float:
+        """Seconds to wait before the next request may be sent."""
+        if now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = now + self.period
+        if self.remaining > 0:
+            return 0.0
+        return self.reset_at - now
+
+    def consume(self) -> None:
+        self.remaining -= 1
+
+    def penalize(self, retry_after: float, now: float) -> None:
+        self.remaining = 0
+        self.reset_at = now + max(retry_after, 0.0)
+
+
+class OutboundDispatcher:
+    """
+    Drains one queue per Discord channel on the client's event loop.
+
+    When messages back up behind the rate-limit budget, consecutive
+    embed-only messages are packed into a single ``channel.send(embeds=[...])``
+    call (up to Discord's limit of ten embeds and 6000 characters).
+
+    Transient failures (5xx, timeouts, connection errors, an uncached
+    channel) are retried with jittered exponential backoff from a single
+    :class:`RetryScheduler` and rejoin the head of their channel queue when
+    due, so a channel's messages keep their order. Deliveries that run out
+    of attempts or that
+    Discord rejects outright land in :attr:`dead_letters`. Either way, each
+    message's ``on_done`` is then called, so durable callers know when they
+    can forget it.
+    """
+
+    def __init__(
+        self,
+        resolve_channel: ChannelResolver,
+        *,
+        max_embeds_per_message: int = MAX_EMBEDS_PER_MESSAGE,
+        rate_limit: int = 5,
+        rate_period: float = 5.0,
+        retry_policy: Optional[RetryPolicy] = None,
+        dead_letters: Optional[DeadLetterStore] = None,
+    ) -> None:
+        self._resolve_channel = resolve_channel
+        self._max_embeds = max(1, min(max_embeds_per_message, MAX_EMBEDS_PER_MESSAGE))
+        self._rate_limit = rate_limit
+        self._rate_period = rate_period
+
+        self._queues: Dict[int, Deque[OutboundMessage]] = {}
+        self._budgets: Dict[int, RouteBudget] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._retry_policy = retry_policy or RetryPolicy()
+        self._retries: RetryScheduler[List[OutboundMessage]] = RetryScheduler(
+            self._requeue
+        )
+        self._retry_pending = 0
+        self._dead_letters = dead_letters or DeadLetterStore()
+
+        self._messages_sent = 0
+        self._embeds_sent = 0
+        self._rate_limited = 0
+        self._failed = 0
+        self._retried = 0
+        self._dead_lettered = 0
+        self._latency_total = 0.0
+        self._latency_count = 0
+        self._latency_max = 0.0
+        self._embeds_per_message: Dict[int, int] = {}
+
+    def submit(self, message: OutboundMessage) -> None:
+        """Queue a message; must be called on the event loop."""
+        self._enqueue(message.channel_id, (message,))
+
+    def _requeue(self, batch: List[OutboundMessage]) -> None:
+        # Due retries go back to the head of their channel queue, ahead of
+        # messages that arrived while they waited, so a channel keeps its
+        # order (an issue's "resolved" does not post before its "updated").
+        self._retry_pending -= len(batch)
+        self._enqueue(batch[0].channel_id, batch, front=True)
+
+    def _enqueue(
+        self,
+        channel_id: int,
+        messages: Sequence[OutboundMessage],
+        *,
+        front: bool = False,
+    ) -> None:
+        queue = self._queues.get(channel_id)
+        if queue is None:
+            queue = self._queues[channel_id] = deque()
+        if front:
+            queue.extendleft(reversed(messages))
+        else:
+            queue.extend(messages)
+
+        if channel_id not in self._tasks:
+            loop = asyncio.get_running_loop()
+            self._tasks[channel_id] = loop.create_task(
+                self._drain(channel_id),
+                name=f"discord-outbound-{channel_id}",
+            )
+
+    @property
+    def dead_letters(self) -> DeadLetterStore:
+        return self._dead_letters
+
+    def replay(self, letters: List[DeadLetter]) -> int:
+        """Queues dead letters for a fresh round of attempts; runs on the loop."""
+        for letter in letters:
+            self.submit(
+                OutboundMessage(
+                    channel_id=letter.channel_id,
+                    content=letter.content,
+                    embeds=list(letter.embeds),
+                )
+            )
+        return len(letters)
+
+    def depth(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def stats(self) -> OutboundStats:
+        return OutboundStats(
+            queued=self.depth(),
+            active_channels=len(self._tasks),
+            messages_sent=self._messages_sent,
+            embeds_sent=self._embeds_sent,
+            rate_limited=self._rate_limited,
+            failed=self._failed,
+            retried=self._retried,
+            retry_pending=self._retry_pending,
+            dead_lettered=self._dead_lettered,
+            latency_avg=(
+                self._latency_total / self._latency_count
+                if self._latency_count
+                else 0.0
+            ),
+            latency_max=self._latency_max,
+            embeds_per_message=dict(self._embeds_per_message),
+        )
+
+    async def join(self) -> None:
+        """Wait until every channel queue and pending retry has been drained."""
+        while self._tasks or len(self._retries):
+            if self._tasks:
+                await asyncio.gather(
+                    *list(self._tasks.values()), return_exceptions=True
+                )
+            else:
+                await asyncio.sleep(self._retries.next_delay() or 0)
+
+    def _budget(self, channel_id: int) -> RouteBudget:
+        budget = self._budgets.get(channel_id)
+        if budget is None:
+            budget = self._budgets[channel_id] = RouteBudget(
+                self._rate_limit, self._rate_period
+            )
+        return budget
+
+    def _next_batch(self, queue: Deque[OutboundMessage]) -> List[OutboundMessage]:
+        first = queue.popleft()
+        batch = [first]
+        if not first.coalescable:
+            return batch
+
+        embed_count = len(first.embeds)
+        characters = sum(len(embed) for embed in first.embeds)
+        while queue and queue[0].coalescable:
+            candidate = queue[0]
+            extra_characters = sum(len(embed) for embed in candidate.embeds)
+            if embed_count + len(candidate.embeds) > self._max_embeds:
+                break
+            if characters + extra_characters > MAX_EMBED_CHARACTERS:
+                break
+            batch.append(queue.popleft())
+            embed_count += len(candidate.embeds)
+            characters += extra_characters
+        return batch
+
+    async def _drain(self, channel_id: int) -> None:
+        loop = asyncio.get_running_loop()
+        queue = self._queues[channel_id]
+        budget = self._budget(channel_id)
+        try:
+            while queue:
+                delay = budget.delay(loop.time())
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+
+                batch = self._next_batch(queue)
+                channel = self._resolve_channel(channel_id)
+                if channel is None:
+                    self._retry_or_dead_letter(
+                        channel_id, batch, f"channel {channel_id} not cached"
+                    )
+                    continue
+
+                budget.consume()
+                try:
+                    await self._send(channel, batch)
+                except discord.HTTPException as exc:
+                    if exc.status == 429:
+                        retry_after = _retry_after(exc, self._rate_period)
+                        self._rate_limited += 1
+                        RATE_LIMITED.inc("discord")
+                        budget.penalize(retry_after, loop.time())
+                        queue.extendleft(reversed(batch))
+                        logger.warning(
+                            "Discord rate limited channel %s; retrying in %.2fs.",
+                            channel_id,
+                            retry_after,
+                        )
+                        continue
+                    if exc.status >= 500:
+                        self._retry_or_dead_letter(channel_id, batch, str(exc))
+                        continue
+                    logger.error(
+                        "Discord rejected message for channel %s: %s", channel_id, exc
+                    )
+                    self._dead_letter(channel_id, batch, str(exc))
+                except (asyncio.TimeoutError, aiohttp.ClientError, OSError) as exc:
+                    self._retry_or_dead_letter(
+                        channel_id, batch, f"{type(exc).__name__}: {exc}"
+                    )
+                except Exception as exc:
+                    logger.exception(
+                        "Failed to deliver message to channel %s: %s", channel_id, exc
+                    )
+                    self._dead_letter(channel_id, batch, f"{type(exc).__name__}: {exc}")
+                else:
+                    self._record_delivery(batch)
+                    _finish(batch)
+        finally:
+            self._tasks.pop(channel_id, None)
+            if not queue:
+                self._queues.pop(channel_id, None)
+
+    def _retry_or_dead_letter(
+        self, channel_id: int, batch: List[OutboundMessage], error: str
+    ) -> None:
+        attempts = max(message.attempts for message in batch) + 1
+        if self._retry_policy.exhausted(attempts):
+            logger.error(
+                "Giving up on %s message(s) for channel %s after %s attempts: %s",
+                len(batch),
+                channel_id,
+                attempts,
+                error,
+            )
+            self._dead_letter(channel_id, batch, error)
+            return
+
+        # The batch is retried as one unit, keeping its messages together
+        # and in order for re-coalescing.
+        delay = self._retry_policy.delay(attempts)
+        for message in batch:
+            message.attempts = attempts
+        self._retries.schedule(batch, delay)
+        self._retry_pending += len(batch)
+        self._retried += len(batch)
+        logger.warning(
+            "Delivery to channel %s failed (%s); retry %s in %.2fs.",
+            channel_id,
+            error,
+            attempts,
+            delay,
+        )
+
+    def _dead_letter(
+        self, channel_id: int, batch: List[OutboundMessage], error: str
+    ) -> None:
+        self._failed += len(batch)
+        for message in batch:
+            self._dead_letters.add(
+                channel_id=channel_id,
+                content=message.content,
+                embeds=message.embeds,
+                error=error,
+                attempts=message.attempts + 1,
+            )
+        self._dead_lettered += len(batch)
+        _finish(batch)
+
+    @staticmethod
+    async def _send(channel: Any, batch: List[OutboundMessage]) -> None:
+        started = time.perf_counter()
+        try:
+            if len(batch) == 1:
+                message = batch[0]
+                if message.embeds:
+                    await channel.send(content=message.content, embeds=message.embeds)
+                else:
+                    await channel.send(content=message.content)
+                return
+
+            embeds = [embed for message in batch for embed in message.embeds]
+            await channel.send(embeds=embeds)
+        finally:
+            STAGE_SECONDS.observe(time.perf_counter() - started, "discord_rtt")
+
+    def _record_delivery(self, batch: List[OutboundMessage]) -> None:
+        now = time.monotonic()
+        HEALTH.record_delivery()
+        embed_count = sum(len(message.embeds) for message in batch)
+        self._messages_sent += 1
+        self._embeds_sent += embed_count
+        self._embeds_per_message[embed_count] = (
+            self._embeds_per_message.get(embed_count, 0) + 1
+        )
+        for message in batch:
+            latency = now - message.enqueued_at
+            STAGE_SECONDS.observe(latency, "outbound_latency")
+            self._latency_total += latency
+            self._latency_count += 1
+            if latency > self._latency_max:
+                self._latency_max = latency
+
+
+def _finish(batch: List[OutboundMessage]) -> None:
+    for message in batch:
+        if message.on_done is not None:
+            try:
+                message.on_done()
+            except Exception:  # pragma: no cover - callback bug
+                logger.exception("Outbound completion callback failed.")
+
+
+def _retry_after(exc: discord.HTTPException, default: float) -> float:
+    retry_after = getattr(exc, "retry_after", None)
+    if retry_after is None:
+        headers = getattr(exc.response, "headers", None) or {}
+        retry_after = headers.get("Retry-After")
+    try:
+        return float(retry_after)
+    except (TypeError, ValueError):
+        return default
@@ -0,0 +1,60 @@
+"""Webhook body decoding with a size limit and field projection."""
+
+from __future__ import annotations
+
+import json
+import logging
+from typing import Optional
+
+from jira_events.projection import project_payload
+from jira_events.registry import JiraEventRegistry
+
+try:  # Optional faster JSON backend
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+DEFAULT_MAX_PAYLOAD_BYTES = 1024 * 1024
+LOG_PREVIEW_BYTES = 2048
+
+
+def decode_json(raw: bytes):
+    """Decodes a JSON body with the fastest available backend."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def encode_json(data) -> bytes:
+    """Encodes ``data`` compactly with the fastest available backend."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+class PayloadParser:
+    """
+    Decodes a webhook body exactly once and, when a registry is supplied,
+    projects it down to the issue fields its handlers declared.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int = DEFAULT_MAX_PAYLOAD_BYTES,
+        registry: Optional[JiraEventRegistry] = None,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self._registry = registry
+
+    def parse(self, raw: bytes):
+        """Raises ``ValueError`` when the body is not valid JSON."""
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Jira webhook payload preview: %r", raw[:LOG_PREVIEW_BYTES])
+        data = decode_json(raw)
+        if self._registry is None:
+            return data
+        return project_payload(data, self._registry.required_issue_fields())
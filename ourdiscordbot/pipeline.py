@@ -0,0 +1,140 @@
+"""Delivery pipeline that turns Jira payloads into Discord notifications."""
+
+from __future__ import annotations
+
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+import discord
+
+from .digest import DigestAggregator
+from .discord_client import DiscordNotifier
+from .metrics import EVENTS
+from .outbound import Countdown
+from .routing import ChannelRouter
+
+logger = logging.getLogger(__name__)
+
+EventRenderer = Callable[[dict], List[Tuple[str, discord.Embed]]]
+_Batches = Dict[Optional[Tuple[int, ...]], List[discord.Embed]]
+
+
+class JiraEventPipeline:
+    """
+    Renders a payload through the Jira handlers and forwards the embeds,
+    optionally via a :class:`DigestAggregator` that collapses bulk edits.
+    Several embeds produced from one payload go out as a single message.
+    With a router such as :class:`~ourdiscordbot.routing.RoutingTable`,
+    each embed is sent to the channels its event routes to instead of the
+    notifier's default channel.
+
+    When the notifier refuses some of a payload's batches, only those are
+    kept, so :meth:`deliver` retrying the same payload object sends just the
+    batches that failed, without rendering the payload (and updating issue
+    state) or offering it to the digest again.
+    """
+
+    def __init__(
+        self,
+        render_event: EventRenderer,
+        notifier: DiscordNotifier,
+        *,
+        digest: Optional[DigestAggregator] = None,
+        router: Optional[ChannelRouter] = None,
+    ) -> None:
+        self._render_event = render_event
+        self._notifier = notifier
+        self._digest = digest
+        self._router = router
+        self._refused: Optional[Tuple[dict, _Batches, Optional[Countdown]]] = None
+
+    def handle(self, data: dict) -> bool:
+        """Process one payload; returns True when a notification was produced."""
+        produced, _ = self._process(data)
+        return produced
+
+    def deliver(
+        self, data: dict, on_delivered: Optional[Callable[[], None]] = None
+    ) -> bool:
+        """
+        Process one payload; returns False only when Discord could not accept
+        the notification, so durable callers know to retry it later.
+
+        ``on_delivered`` is called once every message sent for the payload was
+        delivered or dead-lettered (embeds held for a digest count as done
+        once the aggregator has them). It is not called while this returns
+        False; when a retry of the same payload succeeds, the callback given
+        to the first attempt is the one called.
+        """
+        _, accepted = self._process(data, on_delivered)
+        return accepted
+
+    def _process(
+        self, data: dict, on_delivered: Optional[Callable[[], None]] = None
+    ) -> Tuple[bool, bool]:
+        refused, self._refused = self._refused, None
+        if refused is not None and refused[0] is data:
+            _, batches, countdown = refused
+        else:
+            rendered = self._render_event(data)
+            countdown = Countdown(on_delivered) if on_delivered is not None else None
+            if not rendered:
+                if countdown is not None:
+                    countdown.done()
+                return False, True
+            batches = self._group(data, rendered)
+
+        failed: _Batches = {
+            channels: embeds
+            for channels, embeds in batches.items()
+            if not self._send(embeds, channels, countdown)
+        }
+        if failed:
+            self._refused = (data, failed, countdown)
+            return True, False
+        if batches:
+            logger.info("Successfully sent Jira notification to Discord.")
+        if countdown is not None:
+            countdown.done()
+        return True, True
+
+    def _group(self, data: dict, rendered: List[Tuple[str, discord.Embed]]) -> _Batches:
+        # Embeds are grouped by destination; without a router everything
+        # goes to the notifier's default channel (key None).
+        batches: _Batches = {}
+        for event_type, embed in rendered:
+            if not isinstance(embed, discord.Embed):
+                continue
+            channels = None
+            if self._router is not None:
+                channels = self._router.route(event_type, data)
+                if not channels:
+                    EVENTS.inc(event_type, "unrouted")
+                    logger.debug("No route for %s notification; dropped.", event_type)
+                    continue
+            if self._digest is not None and self._digest.offer(
+                event_type, data, embed, channels=channels
+            ):
+                EVENTS.inc(event_type, "digested")
+                logger.debug("Held %s notification for bulk digest.", event_type)
+                continue
+            batches.setdefault(channels, []).append(embed)
+        return batches
+
+    def _send(
+        self,
+        embeds: List[discord.Embed],
+        channels: Optional[Tuple[int, ...]],
+        countdown: Optional[Countdown] = None,
+    ) -> bool:
+        kwargs = {} if channels is None else {"channel_ids": channels}
+        if countdown is not None:
+            countdown.add()
+            kwargs["on_done"] = countdown.done
+        if len(embeds) == 1:
+            sent = bool(self._notifier.send(embed=embeds[0], **kwargs))
+        else:
+            sent = bool(self._notifier.send(embeds=embeds, **kwargs))
+        if not sent and countdown is not None:
+            countdown.done()
+        return sent
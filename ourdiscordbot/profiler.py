@@ -0,0 +1,153 @@
+"""On-demand sampling profiler that writes flamegraph collapsed stacks."""
+
+from __future__ import annotations
+
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL_SECONDS = 0.005
+MAX_PROFILE_SECONDS = 60
+TOP_FRAMES = 10
+# Leaf frames of threads that are parked rather than running; sampling them
+# would bury the busy stacks under idle time.
+IDLE_FRAMES = frozenset(
+    (
+        "selectors:select",
+        "threading:wait",
+        "threading:_wait_for_tstate_lock",
+        "queue:get",
+        "socketserver:serve_forever",
+    )
+)
+
+_running = threading.Lock()
+
+
+@dataclass(frozen=True)
+class ProfileResult:
+    path: str
+    seconds: float
+    samples: int
+    stacks: int
+    top_frames: Tuple[Tuple[str, int], ...]
+
+
+class ProfileBusy(RuntimeError):
+    """Raised when a profile is requested while another one is running."""
+
+
+class SamplingProfiler:
+    """
+    Samples the Python stack of every other thread every ``interval``
+    seconds from a background thread, using ``sys._current_frames()``.
+    Nothing is installed in the profiled threads, so only the sampling
+    thread costs anything, and only while it runs.
+
+    Samples are keyed by thread name and frames, root first, in the
+    collapsed format read by ``flamegraph.pl`` and speedscope:
+    ``thread;module:function;module:function count``.
+    """
+
+    def __init__(
+        self,
+        interval: float = DEFAULT_INTERVAL_SECONDS,
+        include_idle: bool = False,
+    ) -> None:
+        self._interval = interval
+        self._include_idle = include_idle
+
+    def sample(self, seconds: float) -> Counter:
+        own = threading.get_ident()
+        stacks: Counter = Counter()
+        names = {}
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                frames = _frames(frame)
+                if not self._include_idle and frames[-1] in IDLE_FRAMES:
+                    continue
+                name = names.get(ident)
+                if name is None:
+                    name = names[ident] = _thread_name(ident)
+                stacks[";".join([name, *frames])] += 1
+            time.sleep(self._interval)
+        return stacks
+
+
+def clamp_seconds(seconds: float) -> float:
+    """The sampling time :func:`profile_to_file` actually uses for ``seconds``."""
+    return min(max(seconds, 0.1), MAX_PROFILE_SECONDS)
+
+
+def profile_to_file(
+    seconds: float,
+    directory: Optional[str] = None,
+    interval: float = DEFAULT_INTERVAL_SECONDS,
+) -> ProfileResult:
+    """
+    Samples for ``seconds`` (capped at ``MAX_PROFILE_SECONDS``) and writes
+    the collapsed stacks to a timestamped file in ``directory``. Only one
+    profile runs at a time; a concurrent request raises :class:`ProfileBusy`.
+    """
+    seconds = clamp_seconds(seconds)
+    if not _running.acquire(blocking=False):
+        raise ProfileBusy("A profile is already running.")
+    try:
+        logger.info("Sampling stacks for %.1f s.", seconds)
+        stacks = SamplingProfiler(interval).sample(seconds)
+    finally:
+        _running.release()
+
+    directory = directory or tempfile.gettempdir()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(
+        directory, time.strftime("profile-%Y%m%d-%H%M%S.collapsed", time.gmtime())
+    )
+    with open(path, "w", encoding="utf-8") as handle:
+        for stack, count in sorted(stacks.items()):
+            handle.write(f"{stack} {count}\n")
+
+    return ProfileResult(
+        path=path,
+        seconds=seconds,
+        samples=sum(stacks.values()),
+        stacks=len(stacks),
+        top_frames=tuple(_top_frames(stacks)),
+    )
+
+
+def _frames(frame) -> List[str]:
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        module = frame.f_globals.get("__name__", "?")
+        frames.append(f"{module}:{code.co_name}")
+        frame = frame.f_back
+    frames.reverse()
+    return frames
+
+
+def _thread_name(ident: int) -> str:
+    for thread in threading.enumerate():
+        if thread.ident == ident:
+            return thread.name.replace(";", "_").replace(" ", "_")
+    return f"thread-{ident}"
+
+
+def _top_frames(stacks: Counter) -> List[Tuple[str, int]]:
+    """Leaf frames with the most samples, i.e. where the time was spent."""
+    leaves: Counter = Counter()
+    for stack, count in stacks.items():
+        leaves[stack.rsplit(";", 1)[-1]] += count
+    return leaves.most_common(TOP_FRAMES)
@@ -0,0 +1,480 @@
+"""Replays archived Jira webhook bodies through the handlers and into Discord."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gzip
+import json
+import logging
+import os
+import time
+from collections import Counter, deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import (
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import discord
+
+from jira_events import registry
+
+from .jira_handler import render_jira_events
+from .payloads import decode_json
+from .routing import ChannelRouter, RoutingError, load_routing_table
+from .settings import Settings
+
+logger = logging.getLogger(__name__)
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+Channels = Optional[Tuple[int, ...]]
+# One rendered notification: event type, ``Embed.to_dict()``, routed channels.
+RenderedEvent = Tuple[str, dict, Channels]
+RenderedLine = Tuple[int, List[RenderedEvent]]
+Deliver = Callable[[List[discord.Embed], Channels], bool]
+
+
+@dataclass(frozen=True)
+class ReplayStats:
+    """Totals for one replay run."""
+
+    lines: int
+    invalid: int
+    events: int
+    delivered: int
+    undelivered: int
+    elapsed: float
+    event_types: Dict[str, int]
+
+    @property
+    def lines_per_second(self) -> float:
+        return self.lines / self.elapsed if self.elapsed else 0.0
+
+
+def iter_archive(path: str, start: int = 0) -> Iterator[Tuple[int, bytes]]:
+    """
+    Lazily yields ``(line_number, body)`` for each non-empty line of an
+    NDJSON archive, gzip-compressed or not, skipping the first ``start``
+    lines. Line numbers start at 1.
+    """
+    with open(path, "rb") as probe:
+        compressed = probe.read(2) == GZIP_MAGIC
+    opener = gzip.open if compressed else open
+    with opener(path, "rb") as handle:
+        for number, line in enumerate(handle, start=1):
+            if number <= start:
+                continue
+            line = line.strip()
+            if line:
+                yield number, line
+
+
+class ReplayCheckpoint:
+    """
+    Last fully delivered line per archive, kept in a JSON file that is
+    replaced atomically so a crash mid-write leaves the previous state.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._positions: Dict[str, int] = {}
+        try:
+            with open(path, encoding="utf-8") as handle:
+                self._positions = {
+                    str(key): int(value)
+                    for key, value in json.load(handle).get("archives", {}).items()
+                }
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as exc:
+            logger.error("Ignoring unreadable replay checkpoint %s: %s", path, exc)
+
+    @staticmethod
+    def _key(archive: str) -> str:
+        return os.path.abspath(archive)
+
+    def position(self, archive: str) -> int:
+        return self._positions.get(self._key(archive), 0)
+
+    def advance(self, archive: str, line: int) -> None:
+        self._positions[self._key(archive)] = line
+        temporary = f"{self._path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as handle:
+            json.dump({"archives": self._positions}, handle, indent=2)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, self._path)
+
+
+# Per-process render state, set by ``configure_renderer`` in pool workers.
+_router: Optional[ChannelRouter] = None
+_event_types: Optional[frozenset] = None
+
+
+def configure_renderer(
+    settings: Optional[Settings] = None,
+    event_types: Optional[Iterable[str]] = None,
+) -> None:
+    """
+    Prepares this process to render: registers smart templates and loads
+    routing rules from ``settings``, and limits output to ``event_types``.
+    Runs once in each pool worker.
+    """
+    global _router, _event_types
+    _event_types = frozenset(event_types) if event_types else None
+    _router = None
+    if settings is None:
+        return
+    if settings.smart_templates_dir:
+        from jira_events.smart_templates import (
+            load_smart_templates,
+            register_smart_templates,
+        )
+
+        register_smart_templates(
+            registry,
+            load_smart_templates(settings.smart_templates_dir),
+            override=settings.smart_templates_override,
+        )
+    if settings.routing_config:
+        default = (
+            ()
+            if settings.discord_channel_id is None
+            else (settings.discord_channel_id,)
+        )
+        try:
+            _router = load_routing_table(settings.routing_config, default)
+        except RoutingError as exc:
+            logger.error("%s; replaying to the default channel.", exc)
+
+
+def render_lines(lines: Sequence[Tuple[int, bytes]]) -> Tuple[List[RenderedLine], int]:
+    """
+    Decodes and renders a chunk of archive lines. Returns the rendered
+    events per line and the number of lines that were not valid JSON.
+    Embeds travel as dicts so results pickle cheaply between processes.
+    """
+    rendered: List[RenderedLine] = []
+    invalid = 0
+    for number, body in lines:
+        try:
+            data = decode_json(body)
+        except ValueError:
+            invalid += 1
+            rendered.append((number, []))
+            continue
+        events = []
+        for event_type, embed in render_jira_events(data):
+            if _event_types is not None and event_type not in _event_types:
+                continue
+            channels = None
+            if _router is not None:
+                channels = _router.route(event_type, data)
+                if not channels:
+                    continue
+            events.append((event_type, embed.to_dict(), channels))
+        rendered.append((number, events))
+    return rendered, invalid
+
+
+class _InlineExecutor(Executor):
+    """Renders in the calling process; used when ``workers`` is 0."""
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as exc:
+            future.set_exception(exc)
+        return future
+
+
+class ReplayEngine:
+    """
+    Streams archives through a pool of render processes and hands each
+    line's embeds to ``deliver``, in archive order.
+
+    Lines are read lazily in chunks of ``chunk_size`` with at most two
+    chunks per worker in flight, so memory stays flat on large archives.
+    In live mode ``drain`` waits for the outbound dispatcher after every
+    ``batch_size`` lines; only then is the checkpoint advanced, so a crash
+    replays at most one unacknowledged batch.
+    """
+
+    def __init__(
+        self,
+        deliver: Deliver,
+        *,
+        drain: Optional[Callable[[], Awaitable[None]]] = None,
+        settings: Optional[Settings] = None,
+        event_types: Optional[Iterable[str]] = None,
+        workers: int = 0,
+        chunk_size: int = 200,
+        batch_size: int = 1000,
+        checkpoint: Optional[ReplayCheckpoint] = None,
+        progress_interval: float = 5.0,
+    ) -> None:
+        self._deliver = deliver
+        self._drain = drain
+        self._settings = settings
+        self._event_types = tuple(event_types) if event_types else None
+        self._workers = workers
+        self._chunk_size = max(chunk_size, 1)
+        self._batch_size = max(batch_size, 1)
+        self._checkpoint = checkpoint
+        self._progress_interval = progress_interval
+
+        self._lines = 0
+        self._invalid = 0
+        self._events = 0
+        self._delivered = 0
+        self._undelivered = 0
+        self._event_counts: Counter = Counter()
+        self._started = 0.0
+        self._reported = 0.0
+
+    def stats(self) -> ReplayStats:
+        return ReplayStats(
+            lines=self._lines,
+            invalid=self._invalid,
+            events=self._events,
+            delivered=self._delivered,
+            undelivered=self._undelivered,
+            elapsed=time.monotonic() - self._started if self._started else 0.0,
+            event_types=dict(self._event_counts),
+        )
+
+    async def replay(self, archives: Sequence[str]) -> ReplayStats:
+        self._started = self._reported = time.monotonic()
+        if self._workers > 0:
+            executor: Executor = ProcessPoolExecutor(
+                self._workers,
+                initializer=configure_renderer,
+                initargs=(self._settings, self._event_types),
+            )
+        else:
+            configure_renderer(self._settings, self._event_types)
+            executor = _InlineExecutor()
+        try:
+            for archive in archives:
+                await self._replay_archive(executor, archive)
+        finally:
+            executor.shutdown(cancel_futures=True)
+        stats = self.stats()
+        logger.info(
+            "Replayed %d lines (%d invalid) into %d events; %d delivered, "
+            "%d undelivered in %.1fs (%.0f lines/s).",
+            stats.lines,
+            stats.invalid,
+            stats.events,
+            stats.delivered,
+            stats.undelivered,
+            stats.elapsed,
+            stats.lines_per_second,
+        )
+        return stats
+
+    async def _replay_archive(self, executor: Executor, archive: str) -> None:
+        start = self._checkpoint.position(archive) if self._checkpoint else 0
+        if start:
+            logger.info("Resuming %s after line %d.", archive, start)
+        lines = iter_archive(archive, start)
+        in_flight: Deque[asyncio.Future] = deque()
+        window = max(self._workers, 1) * 2
+        since_drain = 0
+        last_line = start
+
+        def fill_window() -> None:
+            while len(in_flight) < window:
+                chunk = [line for _, line in zip(range(self._chunk_size), lines)]
+                if not chunk:
+                    return
+                in_flight.append(
+                    asyncio.wrap_future(executor.submit(render_lines, chunk))
+                )
+
+        fill_window()
+        while in_flight:
+            rendered, invalid = await in_flight.popleft()
+            fill_window()
+            self._invalid += invalid
+            for number, events in rendered:
+                self._deliver_line(events)
+                last_line = number
+            self._lines += len(rendered)
+            since_drain += len(rendered)
+            if since_drain >= self._batch_size:
+                await self._commit(archive, last_line)
+                since_drain = 0
+            self._maybe_report()
+        await self._commit(archive, last_line)
+
+    def _deliver_line(self, events: List[RenderedEvent]) -> None:
+        # Embeds of one payload sharing a destination go out together.
+        batches: Dict[Channels, List[discord.Embed]] = {}
+        for event_type, embed, channels in events:
+            self._events += 1
+            self._event_counts[event_type] += 1
+            batches.setdefault(channels, []).append(discord.Embed.from_dict(embed))
+        for channels, embeds in batches.items():
+            if self._deliver(embeds, channels):
+                self._delivered += len(embeds)
+            else:
+                self._undelivered += len(embeds)
+
+    async def _commit(self, archive: str, line: int) -> None:
+        if self._drain is not None:
+            await self._drain()
+        if self._checkpoint is not None and line:
+            self._checkpoint.advance(archive, line)
+
+    def _maybe_report(self) -> None:
+        now = time.monotonic()
+        if now - self._reported < self._progress_interval:
+            return
+        self._reported = now
+        elapsed = now - self._started
+        logger.info(
+            "Replay progress: %d lines, %d events, %d delivered (%.0f lines/s).",
+            self._lines,
+            self._events,
+            self._delivered,
+            self._lines / elapsed if elapsed else 0.0,
+        )
+
+
+def dry_run_delivery(show: bool = False) -> Deliver:
+    """Accepts every message without contacting Discord, optionally printing titles."""
+
+    def deliver(embeds: List[discord.Embed], channels: Channels) -> bool:
+        if show:
+            target = ",".join(map(str, channels)) if channels else "default"
+            for embed in embeds:
+                print(f"[{target}] {embed.title}")
+        return True
+
+    return deliver
+
+
+async def replay_live(
+    settings: Settings, archives: Sequence[str], **options
+) -> ReplayStats:
+    """
+    Connects to Discord and replays through the outbound dispatcher, which
+    honours Discord's per-channel rate limits and retries.
+    """
+    from .discord_client import create_bot
+
+    client, notifier = create_bot(settings)
+    ready = asyncio.Event()
+
+    async def on_ready() -> None:
+        ready.set()
+
+    client.add_listener(on_ready, "on_ready")
+
+    def deliver(embeds: List[discord.Embed], channels: Channels) -> bool:
+        if channels is None:
+            return notifier.send(embeds=embeds)
+        return notifier.send(embeds=embeds, channel_ids=channels)
+
+    engine = ReplayEngine(
+        deliver, drain=notifier.dispatcher.join, settings=settings, **options
+    )
+    gateway = asyncio.create_task(client.start(settings.discord_bot_token))
+    try:
+        waiter = asyncio.create_task(ready.wait())
+        await asyncio.wait({gateway, waiter}, return_when=asyncio.FIRST_COMPLETED)
+        if gateway.done():
+            waiter.cancel()
+            gateway.result()
+            raise RuntimeError("Discord client stopped before it was ready.")
+        return await engine.replay(archives)
+    finally:
+        await client.close()
+        gateway.cancel()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m ourdiscordbot.replay",
+        description="Replay archived Jira webhook bodies (NDJSON, optionally gzipped).",
+    )
+    parser.add_argument("archives", nargs="+", help="NDJSON or .gz archives")
+    parser.add_argument(
+        "--live",
+        action="store_true",
+        help="post to Discord (default is a dry run that only renders)",
+    )
+    parser.add_argument(
+        "--event-type",
+        action="append",
+        dest="event_types",
+        help="only replay these event types (repeatable)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        # The main process reads and delivers; one core is left for it.
+        default=max((os.cpu_count() or 1) - 1, 0),
+        help="render processes; 0 renders in the main process",
+    )
+    parser.add_argument("--chunk-size", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--checkpoint", help="JSON file used to resume after a crash")
+    parser.add_argument("--progress-seconds", type=float, default=5.0)
+    parser.add_argument(
+        "--show", action="store_true", help="print embed titles in a dry run"
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
+    settings = Settings.from_env()
+    options = dict(
+        event_types=args.event_types,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        batch_size=args.batch_size,
+        checkpoint=ReplayCheckpoint(args.checkpoint) if args.checkpoint else None,
+        progress_interval=args.progress_seconds,
+    )
+
+    if args.live:
+        if not settings.discord_bot_token:
+            print("FATAL: DISCORD_BOT_TOKEN is required for a live replay.")
+            return 2
+        stats = asyncio.run(replay_live(settings, args.archives, **options))
+    else:
+        if args.checkpoint:
+            # A dry run must not move a checkpoint that a live run relies on.
+            logger.warning("Ignoring --checkpoint for a dry run.")
+            options["checkpoint"] = None
+        engine = ReplayEngine(dry_run_delivery(args.show), settings=settings, **options)
+        stats = asyncio.run(engine.replay(args.archives))
+
+    for event_type, count in sorted(stats.event_types.items()):
+        print(f"{event_type:40s} {count:8d}")
+    print(
+        f"{stats.lines} lines, {stats.events} events, {stats.delivered} delivered, "
+        f"{stats.undelivered} undelivered, {stats.invalid} invalid lines "
+        f"in {stats.elapsed:.1f}s ({stats.lines_per_second:,.0f} lines/s)"
+    )
+    return 1 if stats.undelivered else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
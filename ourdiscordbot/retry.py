@@ -0,0 +1,172 @@
+"""Retry scheduling and dead-letter storage for failed Discord deliveries."""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Capped exponential backoff with full jitter: attempt ``n`` waits a
+    uniformly random time in ``[0, min(max_delay, base_delay * 2 ** (n - 1))]``
+    so that messages failing together do not retry in lockstep.
+    """
+
+    max_attempts: int = 5
+    base_delay: float = 1.0
+    max_delay: float = 300.0
+
+    def delay(self, attempt: int, rng: Callable[[], float] = random.random) -> float:
+        ceiling = min(self.max_delay, self.base_delay * 2 ** max(attempt - 1, 0))
+        return ceiling * rng()
+
+    def exhausted(self, attempt: int) -> bool:
+        return attempt >= self.max_attempts
+
+
+class RetryScheduler(Generic[T]):
+    """
+    Heap of pending retries driven by a single loop timer.
+
+    Scheduling is ``O(log n)`` and only one ``call_at`` handle exists at any
+    time, armed for the earliest deadline, so thousands of pending retries
+    cost no more per tick than the items actually due. Must be used from the
+    event loop thread.
+    """
+
+    def __init__(self, fire: Callable[[T], None]) -> None:
+        self._fire = fire
+        self._heap: List[Tuple[float, int, T]] = []
+        self._order = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_due = float("inf")
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def schedule(self, item: T, delay: float) -> None:
+        loop = asyncio.get_running_loop()
+        due = loop.time() + max(delay, 0.0)
+        heapq.heappush(self._heap, (due, next(self._order), item))
+        if due < self._timer_due:
+            self._arm(loop, due)
+
+    def next_delay(self) -> Optional[float]:
+        """Seconds until the earliest retry is due, or ``None`` when idle."""
+        if not self._heap:
+            return None
+        return max(self._heap[0][0] - asyncio.get_running_loop().time(), 0.0)
+
+    def cancel(self) -> List[T]:
+        """Drops every pending retry and returns the items."""
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = None
+        self._timer_due = float("inf")
+        items = [item for _, _, item in sorted(self._heap)]
+        self._heap.clear()
+        return items
+
+    def _arm(self, loop: asyncio.AbstractEventLoop, due: float) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = loop.call_at(due, self._tick)
+        self._timer_due = due
+
+    def _tick(self) -> None:
+        self._timer = None
+        self._timer_due = float("inf")
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        while self._heap and self._heap[0][0] <= now:
+            _, _, item = heapq.heappop(self._heap)
+            self._fire(item)
+        if self._heap:
+            self._arm(loop, self._heap[0][0])
+
+
+@dataclass(frozen=True)
+class DeadLetter:
+    """A delivery that exhausted its retries or was rejected outright."""
+
+    id: int
+    channel_id: int
+    content: Optional[str]
+    embeds: Sequence[Any]
+    error: str
+    attempts: int
+    failed_at: float = field(default_factory=time.time)
+
+    def summary(self) -> str:
+        titles = [getattr(embed, "title", None) or "untitled" for embed in self.embeds]
+        subject = ", ".join(titles[:3]) or (self.content or "")[:80] or "empty"
+        if len(titles) > 3:
+            subject += f" (+{len(titles) - 3} more)"
+        return subject
+
+
+class DeadLetterStore:
+    """Bounded, inspectable store of failed deliveries, oldest evicted first."""
+
+    def __init__(self, max_entries: int = 1000) -> None:
+        self._max_entries = max(max_entries, 1)
+        self._entries: "OrderedDict[int, DeadLetter]" = OrderedDict()
+        self._ids = itertools.count(1)
+        self._evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def evicted(self) -> int:
+        return self._evicted
+
+    def add(
+        self,
+        *,
+        channel_id: int,
+        content: Optional[str],
+        embeds: Sequence[Any],
+        error: str,
+        attempts: int,
+    ) -> DeadLetter:
+        letter = DeadLetter(
+            id=next(self._ids),
+            channel_id=channel_id,
+            content=content,
+            embeds=tuple(embeds),
+            error=error,
+            attempts=attempts,
+        )
+        self._entries[letter.id] = letter
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self._evicted += 1
+        return letter
+
+    def list(self, limit: Optional[int] = None) -> List[DeadLetter]:
+        """Most recent dead letters first."""
+        letters = list(reversed(self._entries.values()))
+        return letters if limit is None else letters[:limit]
+
+    def take(self, ids: Optional[Sequence[int]] = None) -> List[DeadLetter]:
+        """Removes and returns the given dead letters (all when ``ids`` is None)."""
+        if ids is None:
+            letters = list(self._entries.values())
+            self._entries.clear()
+            return letters
+        return [
+            self._entries.pop(letter_id)
+            for letter_id in ids
+            if letter_id in self._entries
+        ]
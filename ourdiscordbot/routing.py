@@ -0,0 +1,290 @@
+"""Rule-based routing of Jira notifications to Discord channels."""
+
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import (
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple,
+)
+
+logger = logging.getLogger(__name__)
+
+ROUTING_DIMENSIONS = ("project", "issue_type", "priority", "label", "event")
+_MASKED = ("event", "issue_type", "priority", "label")
+
+RouteKey = Tuple[str, FrozenSet[str], Optional[str], Optional[str], FrozenSet[str]]
+
+
+class RoutingError(ValueError):
+    """Raised when a routing configuration cannot be compiled."""
+
+
+class ChannelRouter(Protocol):
+    """Anything that maps an event to the channel ids it should reach."""
+
+    def route(self, event_type: Optional[str], data) -> Tuple[int, ...]: ...
+
+
+@dataclass(frozen=True)
+class RouteRule:
+    """
+    Sends matching events to ``channels``. Each dimension lists accepted
+    values (case-insensitive); a dimension left out matches anything.
+    """
+
+    channels: Tuple[int, ...]
+    match: Mapping[str, FrozenSet[str]]
+    name: Optional[str] = None
+
+
+class _RulePartition:
+    """
+    Rules sharing a project (plus the project-agnostic ones) indexed by the
+    remaining dimensions: each value maps to a bitmask of the local rules
+    that accept it, and each dimension keeps a mask of the local rules that
+    do not constrain it.
+    """
+
+    __slots__ = ("positions", "index", "wildcard")
+
+    def __init__(self, positions: Sequence[int], rules: Sequence[RouteRule]) -> None:
+        self.positions = tuple(positions)
+        self.index: Dict[str, Dict[str, int]] = {dim: {} for dim in _MASKED}
+        self.wildcard: Dict[str, int] = {dim: 0 for dim in _MASKED}
+        for bit_index, position in enumerate(self.positions):
+            bit = 1 << bit_index
+            match = rules[position].match
+            for dimension in _MASKED:
+                values = match.get(dimension)
+                if not values:
+                    self.wildcard[dimension] |= bit
+                    continue
+                index = self.index[dimension]
+                for value in values:
+                    index[value] = index.get(value, 0) | bit
+
+    def matches(
+        self,
+        event: str,
+        issue_type: Optional[str],
+        priority: Optional[str],
+        labels: FrozenSet[str],
+    ) -> Iterable[int]:
+        mask = self._mask("event", (event,))
+        if mask:
+            mask &= self._mask("issue_type", (issue_type,))
+        if mask:
+            mask &= self._mask("priority", (priority,))
+        if mask:
+            mask &= self._mask("label", labels)
+        positions = self.positions
+        while mask:
+            lowest = mask & -mask
+            yield positions[lowest.bit_length() - 1]
+            mask ^= lowest
+
+    def _mask(self, dimension: str, values: Iterable[Optional[str]]) -> int:
+        index = self.index[dimension]
+        mask = self.wildcard[dimension]
+        for value in values:
+            if value is not None:
+                mask |= index.get(value, 0)
+        return mask
+
+
+class RoutingTable:
+    """
+    Routing rules compiled into hashed indexes.
+
+    Rules are partitioned by project, the dimension nearly every rule
+    names, and each partition indexes the other dimensions with bitmasks
+    over its own rules. A lookup is one hash probe per project value plus a
+    few mask operations per dimension, so its cost follows how many rules
+    share the event's project rather than the size of the whole table.
+    Results are memoised in an LRU keyed by the routed attributes. Events no
+    rule matches go to ``default_channels``.
+    """
+
+    def __init__(
+        self,
+        rules: Sequence[RouteRule],
+        default_channels: Sequence[int] = (),
+        *,
+        cache_size: int = 4096,
+    ) -> None:
+        self._rules = tuple(rules)
+        self._default = tuple(dict.fromkeys(default_channels))
+
+        anywhere: List[int] = []
+        by_project: Dict[str, List[int]] = {}
+        for position, rule in enumerate(self._rules):
+            projects = rule.match.get("project")
+            if not projects:
+                anywhere.append(position)
+            for project in projects or ():
+                by_project.setdefault(project, []).append(position)
+
+        self._anywhere = _RulePartition(anywhere, self._rules)
+        self._partitions: Dict[str, _RulePartition] = {
+            project: _RulePartition(sorted(positions + anywhere), self._rules)
+            for project, positions in by_project.items()
+        }
+        self._cached_lookup = lru_cache(maxsize=cache_size)(self._lookup)
+
+    @classmethod
+    def from_config(
+        cls,
+        config: Mapping,
+        default_channels: Sequence[int] = (),
+        *,
+        cache_size: int = 4096,
+    ) -> "RoutingTable":
+        """
+        Compiles ``{"default_channels": [...], "routes": [{"channels": [...],
+        "project": "DCBOT", "label": ["backend", "api"], ...}]}``.
+        """
+        if not isinstance(config, Mapping):
+            raise RoutingError("Routing config must be a JSON object.")
+
+        defaults = config.get("default_channels")
+        if defaults is not None:
+            default_channels = _parse_channels(defaults, "default_channels")
+
+        rules: List[RouteRule] = []
+        for position, entry in enumerate(config.get("routes") or ()):
+            if not isinstance(entry, Mapping):
+                raise RoutingError(f"Route {position} must be an object.")
+            unknown = set(entry) - set(ROUTING_DIMENSIONS) - {"channels", "name"}
+            if unknown:
+                raise RoutingError(
+                    f"Route {position} has unknown keys: {', '.join(sorted(unknown))}."
+                )
+            channels = _parse_channels(entry.get("channels"), f"route {position}")
+            if not channels:
+                raise RoutingError(f"Route {position} needs at least one channel.")
+            match = {
+                dimension: _parse_values(entry[dimension])
+                for dimension in ROUTING_DIMENSIONS
+                if entry.get(dimension) not in (None, "", [])
+            }
+            rules.append(RouteRule(channels, match, entry.get("name")))
+        return cls(rules, default_channels, cache_size=cache_size)
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    @property
+    def default_channels(self) -> Tuple[int, ...]:
+        return self._default
+
+    @property
+    def channels(self) -> FrozenSet[int]:
+        """Every channel a rule or the default can route to."""
+        routed = {channel for rule in self._rules for channel in rule.channels}
+        return frozenset(routed.union(self._default))
+
+    def route(self, event_type: Optional[str], data) -> Tuple[int, ...]:
+        """Channel ids for the event, in rule order and without duplicates."""
+        return self._cached_lookup(route_key(event_type, data))
+
+    def cache_info(self):
+        return self._cached_lookup.cache_info()
+
+    def _lookup(self, key: RouteKey) -> Tuple[int, ...]:
+        event, projects, issue_type, priority, labels = key
+        partitions = [
+            self._partitions[project]
+            for project in projects
+            if project in self._partitions
+        ] or [self._anywhere]
+
+        if len(partitions) == 1:
+            positions = partitions[0].matches(event, issue_type, priority, labels)
+        else:
+            positions = sorted(
+                {
+                    position
+                    for partition in partitions
+                    for position in partition.matches(
+                        event, issue_type, priority, labels
+                    )
+                }
+            )
+
+        channels: Dict[int, None] = {}
+        rules = self._rules
+        for position in positions:
+            for channel_id in rules[position].channels:
+                channels[channel_id] = None
+        return tuple(channels) or self._default
+
+
+def route_key(event_type: Optional[str], data) -> RouteKey:
+    """Extracts the routed attributes of an event, lower-cased."""
+    fields = (
+        ((data.get("issue") or {}).get("fields") or {})
+        if isinstance(data, dict)
+        else {}
+    )
+    project = fields.get("project") or {}
+    projects = frozenset(
+        str(value).lower()
+        for value in (project.get("key"), project.get("name"))
+        if value
+    )
+    labels = fields.get("labels") or ()
+    if isinstance(labels, str):
+        labels = labels.split(",")
+    return (
+        (event_type or "").lower(),
+        projects,
+        _lower((fields.get("issuetype") or {}).get("name")),
+        _lower((fields.get("priority") or {}).get("name")),
+        frozenset(str(label).strip().lower() for label in labels if str(label).strip()),
+    )
+
+
+def load_routing_table(path: str, default_channels: Sequence[int] = ()) -> RoutingTable:
+    """Reads and compiles a JSON routing config; raises :class:`RoutingError`."""
+    try:
+        with open(path, encoding="utf-8") as handle:
+            config = json.load(handle)
+    except (OSError, ValueError) as exc:
+        raise RoutingError(f"Could not read routing config {path}: {exc}") from exc
+    table = RoutingTable.from_config(config, default_channels)
+    logger.info("Compiled %d routing rules from %s", len(table), path)
+    return table
+
+
+def _lower(value) -> Optional[str]:
+    return str(value).lower() if value else None
+
+
+def _parse_values(raw) -> FrozenSet[str]:
+    values = [raw] if isinstance(raw, str) else raw
+    if not isinstance(values, (list, tuple)):
+        raise RoutingError(f"Route values must be a string or a list, not {raw!r}.")
+    return frozenset(
+        str(value).strip().lower() for value in values if str(value).strip()
+    )
+
+
+def _parse_channels(raw, where: str) -> Tuple[int, ...]:
+    values = [raw] if isinstance(raw, (int, str)) else raw
+    if not isinstance(values, (list, tuple)):
+        raise RoutingError(f"{where}: channels must be a list of ids.")
+    try:
+        return tuple(dict.fromkeys(int(value) for value in values))
+    except (TypeError, ValueError):
+        raise RoutingError(f"{where}: channel ids must be integers.") from None
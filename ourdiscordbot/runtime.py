@@ -2,56 +2,397 @@
 
 from __future__ import annotations
 
+import asyncio
+import atexit
 import logging
 import threading
-from typing import Optional, Tuple, TYPE_CHECKING
+import time
+from typing import Callable, Optional, Tuple, TYPE_CHECKING, Union
 
 import discord
 
+from jira_events import issue_states, profiling, registry
+
 if TYPE_CHECKING:
+    from aiohttp import web
     from flask import Flask
 
+from .analytics import analytics
 from .discord_client import DiscordNotifier, create_bot
-from .http_app import create_flask_app
-from .jira_handler import process_jira_event
+from .dedup import create_dedup_cache
+from .digest import DigestAggregator
+from .jira_handler import render_jira_events
+from .metrics import METRICS, MetricsRegistry, track_queue_depth
+from .payloads import PayloadParser
+from .pipeline import JiraEventPipeline
+from .routing import RoutingError, RoutingTable, load_routing_table
 from .settings import Settings
+from .spool import EventSpool, SpoolDeliveryWorker
+from .tenants import TenantRegistry, TenantRouter
+from .workqueue import (
+    LeaderLease,
+    QueueNotifier,
+    QueueSender,
+    WorkQueue,
+    open_work_queue,
+)
 
 logger = logging.getLogger(__name__)
 
 
 def build_runtime(
     settings: Optional[Settings] = None,
-) -> Tuple[Settings, discord.Client, DiscordNotifier, Flask]:
-    """Create settings, Discord client, notifier, and Flask app."""
-    from flask import Flask  # Imported lazily to avoid eager dependency at import time
+) -> Tuple[Settings, discord.Client, DiscordNotifier, Union[Flask, web.Application]]:
+    """
+    Create settings, Discord client, notifier, and the webhook app.
 
+    ``Settings.http_server`` selects between the Flask app (served from a
+    background thread) and the aiohttp app (served on the Discord loop).
+    """
     resolved_settings = settings or Settings.from_env()
-    client, notifier = create_bot(resolved_settings)
-    app = create_flask_app(
-        jira_secret=resolved_settings.jira_webhook_secret,
-        process_event=process_jira_event,
-        notifier=notifier,
-    )
+    if resolved_settings.smart_templates_dir:
+        _register_smart_templates(resolved_settings)
+    _load_issue_state(resolved_settings)
+    _configure_analytics(resolved_settings)
+    if resolved_settings.profile_stages:
+        profiling.enable_stage_profiling(registry)
+    tenants = _build_tenants(resolved_settings)
+    client, notifier = create_bot(resolved_settings, tenants)
+    _track_outbound(notifier)
+    pipeline = _build_pipeline(resolved_settings, notifier, tenants)
+    spool = _build_spool(resolved_settings, client, pipeline)
+
+    if resolved_settings.http_server == "aiohttp":
+        app = _build_aiohttp_app(resolved_settings, pipeline, spool, tenants)
+    else:
+        app = _build_flask_app(resolved_settings, pipeline, spool, tenants)
     return resolved_settings, client, notifier, app
 
 
+def build_ingest_app(
+    settings: Optional[Settings] = None,
+) -> Tuple[Settings, WorkQueue, Union[Flask, web.Application]]:
+    """
+    Create the webhook app for a stateless ingest worker
+    (``RUNTIME_ROLE=ingest``). Rendered messages are pushed onto the shared
+    work queue for the elected sender instead of being posted to Discord.
+
+    The sender owns issue state and analytics: each payload's history is
+    forwarded on the queue too, and the worker's own store is an unsaved
+    view of what it has seen, used only to enrich its embeds.
+    """
+    resolved_settings = settings or Settings.from_env()
+    if resolved_settings.smart_templates_dir:
+        _register_smart_templates(resolved_settings)
+    issue_states.resize(resolved_settings.issue_state_max_issues)
+    if resolved_settings.profile_stages:
+        profiling.enable_stage_profiling(registry)
+    queue = open_work_queue(resolved_settings.work_queue_url)
+    track_queue_depth("work", queue.depth)
+    notifier = QueueNotifier(queue)
+    issue_states.add_observer(notifier.observe)
+    tenants = _build_tenants(resolved_settings)
+    pipeline = _build_pipeline(resolved_settings, notifier, tenants)
+
+    if resolved_settings.http_server == "aiohttp":
+        app = _build_aiohttp_app(resolved_settings, pipeline, None, tenants)
+    else:
+        app = _build_flask_app(resolved_settings, pipeline, None, tenants)
+    return resolved_settings, queue, app
+
+
+def _build_tenants(settings: Settings) -> Optional[TenantRegistry]:
+    if not settings.tenants_config:
+        return None
+    return TenantRegistry(
+        settings.tenants_config,
+        reload_interval=settings.tenants_reload_seconds,
+    )
+
+
+def _build_pipeline(
+    settings: Settings, notifier, tenants: Optional[TenantRegistry] = None
+) -> JiraEventPipeline:
+    digest = None
+    if settings.digest_window_seconds > 0:
+        digest = DigestAggregator(
+            lambda embed, channels=None: notifier.send(
+                embed=embed, channel_ids=channels
+            ),
+            window_seconds=settings.digest_window_seconds,
+            min_events=settings.digest_min_events,
+            max_events=settings.digest_max_events,
+        )
+    router = _build_router(settings)
+    if tenants is not None:
+        router = TenantRouter(
+            tenants,
+            fallback=router,
+            default_channels=_default_channels(settings),
+        )
+    return JiraEventPipeline(render_jira_events, notifier, digest=digest, router=router)
+
+
+def _build_flask_app(
+    settings: Settings,
+    pipeline: JiraEventPipeline,
+    spool: Optional[SpoolDeliveryWorker] = None,
+    tenants: Optional[TenantRegistry] = None,
+) -> Flask:
+    # Imported lazily to avoid eager dependency at import time
+    from .http_app import create_flask_app
+    from .ingest import IngestQueue
+
+    # The spool's delivery worker takes the ingest queue's place.
+    ingest = None
+    if settings.ingest_workers > 0 and spool is None:
+        ingest = IngestQueue(
+            pipeline.handle,
+            workers=settings.ingest_workers,
+            capacity=settings.ingest_queue_size,
+            policy=settings.ingest_backpressure,
+        )
+
+    track_queue_depth("ingest", ingest.depth if ingest is not None else None)
+    return create_flask_app(
+        jira_secret=settings.jira_webhook_secret,
+        handle_event=pipeline.handle,
+        ingest=ingest,
+        dedup=_build_dedup(settings),
+        parser=_build_parser(settings),
+        spool=spool,
+        tenants=tenants,
+        metrics=_metrics(settings),
+    )
+
+
+def _build_aiohttp_app(
+    settings: Settings,
+    pipeline: JiraEventPipeline,
+    spool: Optional[SpoolDeliveryWorker] = None,
+    tenants: Optional[TenantRegistry] = None,
+) -> web.Application:
+    from .aiohttp_app import create_aiohttp_app
+    from .ingest import AsyncIngestQueue
+
+    # The spool's delivery worker takes the ingest queue's place.
+    ingest = None
+    if settings.ingest_workers > 0 and spool is None:
+        ingest = AsyncIngestQueue(
+            pipeline.handle,
+            workers=settings.ingest_workers,
+            capacity=settings.ingest_queue_size,
+            policy=settings.ingest_backpressure,
+        )
+
+    track_queue_depth("ingest", ingest.depth if ingest is not None else None)
+    return create_aiohttp_app(
+        jira_secret=settings.jira_webhook_secret,
+        handle_event=pipeline.handle,
+        ingest=ingest,
+        dedup=_build_dedup(settings),
+        parser=_build_parser(settings),
+        spool=spool,
+        tenants=tenants,
+        metrics=_metrics(settings),
+    )
+
+
+def _build_spool(
+    settings: Settings, client: discord.Client, pipeline: JiraEventPipeline
+) -> Optional[SpoolDeliveryWorker]:
+    if not settings.spool_path:
+        return None
+
+    spool = EventSpool(
+        settings.spool_path,
+        commit_interval=settings.spool_commit_interval,
+        max_pending=settings.spool_max_pending,
+    )
+    worker = SpoolDeliveryWorker(spool, pipeline.deliver)
+    track_queue_depth("spool", spool.pending)
+
+    async def replay_spool() -> None:
+        # Deliver anything spooled before a restart or outage now that the
+        # channel cache is populated.
+        worker.start()
+        worker.wake()
+
+    client.add_listener(replay_spool, "on_ready")
+    logger.info(
+        "Spooling Jira webhooks to %s (%d pending).",
+        settings.spool_path,
+        spool.pending(),
+    )
+    return worker
+
+
+def _build_router(settings: Settings) -> Optional[RoutingTable]:
+    if not settings.routing_config:
+        return None
+    try:
+        return load_routing_table(settings.routing_config, _default_channels(settings))
+    except RoutingError as exc:
+        logger.error("%s; sending every notification to the default channel.", exc)
+        return None
+
+
+def _metrics(settings: Settings) -> Optional[MetricsRegistry]:
+    return METRICS if settings.metrics_enabled else None
+
+
+def _track_outbound(notifier: DiscordNotifier) -> None:
+    dispatcher = notifier.dispatcher
+    track_queue_depth("outbound", dispatcher.depth)
+    track_queue_depth("outbound_retry", lambda: dispatcher.stats().retry_pending)
+
+
+def _default_channels(settings: Settings) -> Tuple[int, ...]:
+    if settings.discord_channel_id is None:
+        return ()
+    return (settings.discord_channel_id,)
+
+
+def _load_issue_state(settings: Settings) -> None:
+    issue_states.resize(settings.issue_state_max_issues)
+    if settings.issue_state_path:
+        loaded = issue_states.load(settings.issue_state_path)
+        logger.info(
+            "Loaded state for %d issues from %s.", loaded, settings.issue_state_path
+        )
+
+
+def _configure_analytics(settings: Settings) -> None:
+    analytics.configure(
+        retention_days=settings.analytics_retention_days,
+        done_statuses=settings.analytics_done_statuses,
+    )
+    if settings.analytics_path:
+        loaded = analytics.load(settings.analytics_path)
+        logger.info(
+            "Loaded analytics for %d projects from %s.",
+            loaded,
+            settings.analytics_path,
+        )
+    issue_states.add_listener(analytics.record)
+
+
+def _start_state_saver(
+    settings: Settings, owned: Optional[Callable[[], bool]] = None
+) -> Optional[Callable[[], None]]:
+    """
+    Snapshots the issue state store and analytics periodically and at exit,
+    and returns the function that saves them. With ``owned`` given, nothing
+    is saved while it returns False, so a standby sender never overwrites
+    the snapshots of the current one.
+    """
+    stores = [
+        (store, path, name)
+        for store, path, name in (
+            (issue_states, settings.issue_state_path, "issue state"),
+            (analytics, settings.analytics_path, "analytics"),
+        )
+        if path
+    ]
+    if not stores:
+        return None
+
+    def save() -> None:
+        if owned is not None and not owned():
+            return
+        for store, path, name in stores:
+            # Clean stores are skipped so an early exit never overwrites the file.
+            if not store.dirty:
+                continue
+            try:
+                store.save(path)
+            except OSError as exc:
+                logger.error("Could not save %s to %s: %s", name, path, exc)
+
+    def save_periodically() -> None:
+        while True:
+            time.sleep(max(settings.issue_state_save_seconds, 1.0))
+            save()
+
+    threading.Thread(target=save_periodically, name="state-saver", daemon=True).start()
+    atexit.register(save)
+    return save
+
+
+def _build_dedup(settings: Settings):
+    return create_dedup_cache(
+        ttl_seconds=settings.dedup_ttl_seconds,
+        max_entries=settings.dedup_max_entries,
+        path=settings.dedup_path,
+    )
+
+
+def _register_smart_templates(settings: Settings) -> None:
+    from jira_events.smart_templates import (
+        load_smart_templates,
+        register_smart_templates,
+    )
+
+    templates = load_smart_templates(settings.smart_templates_dir)
+    event_types = register_smart_templates(
+        registry, templates, override=settings.smart_templates_override
+    )
+    logger.info(
+        "Loaded %d smart templates from %s handling: %s",
+        len(templates),
+        settings.smart_templates_dir,
+        ", ".join(event_types) or "none",
+    )
+
+
+def _build_parser(settings: Settings) -> PayloadParser:
+    return PayloadParser(
+        max_bytes=settings.max_payload_bytes,
+        registry=registry if settings.payload_projection else None,
+    )
+
+
 def run_bot() -> None:
-    """Launch the Flask webhook receiver and Discord client."""
+    """Launch the webhook receiver and Discord client."""
     logging.basicConfig(
         level=logging.INFO,
         format="%(asctime)s - %(levelname)s - %(message)s",
     )
 
-    settings, client, notifier, app = build_runtime()
+    settings = Settings.from_env()
     missing = settings.requires_secrets()
     if missing:
         print(f"FATAL: Missing required environment variables: {', '.join(missing)}")
         return
 
+    if settings.runtime_role == "all":
+        _start_state_saver(settings)
+
+    if settings.runtime_role == "ingest":
+        _run_ingest(settings)
+        return
+
     if settings.discord_bot_token is None:
         print("FATAL: Discord bot token missing.")
         return
 
+    try:
+        if settings.runtime_role == "sender":
+            asyncio.run(_serve_sender(settings))
+            return
+        settings, client, notifier, app = build_runtime(settings)
+        if settings.http_server == "aiohttp":
+            asyncio.run(_serve_aiohttp(settings, client, app))
+        else:
+            _start_flask_thread(settings, app)
+            client.run(settings.discord_bot_token)
+    except discord.errors.LoginFailure:
+        print("FATAL: Improper Discord bot token has been passed.")
+    except Exception as exc:  # pragma: no cover - safety net
+        print(f"An error occurred while running the bot: {exc}")
+
+
+def _start_flask_thread(settings: Settings, app: Flask) -> None:
     def run_flask():
         logger.info("Starting Flask server on port %s", settings.port)
         app.run(host="0.0.0.0", port=settings.port)
@@ -60,9 +401,134 @@ def run_bot() -> None:
     flask_thread.start()
     logger.info("Flask server thread started.")
 
+
+async def _serve_aiohttp(
+    settings: Settings, client: discord.Client, app: web.Application
+) -> None:
+    """Serve the aiohttp app and the Discord client on one event loop."""
+    from aiohttp import web
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host="0.0.0.0", port=settings.port)
+    await site.start()
+    logger.info("aiohttp ingestion server listening on port %s", settings.port)
+
     try:
-        client.run(settings.discord_bot_token)
-    except discord.errors.LoginFailure:
-        print("FATAL: Improper Discord bot token has been passed.")
-    except Exception as exc:  # pragma: no cover - safety net
-        print(f"An error occurred while running the bot: {exc}")
+        async with client:
+            await client.start(settings.discord_bot_token)
+    finally:
+        await runner.cleanup()
+
+
+def _run_ingest(settings: Settings) -> None:
+    """Serve webhooks only; a separate sender process posts to Discord."""
+    settings, queue, app = build_ingest_app(settings)
+    logger.info("Ingest worker queueing messages to %s", settings.work_queue_url)
+    try:
+        if settings.http_server == "aiohttp":
+            from aiohttp import web
+
+            web.run_app(app, host="0.0.0.0", port=settings.port)
+        else:
+            app.run(host="0.0.0.0", port=settings.port)
+    finally:
+        queue.close()
+
+
+async def _serve_sender(settings: Settings) -> None:
+    """
+    Stand by until this process holds the sender lease, then own the
+    Discord gateway and drain the work queue. Losing the lease closes the
+    client and returns to standby, so only one sender posts at a time.
+
+    The leader also owns issue state and analytics: it loads the snapshots
+    when its term starts, applies the history the ingest workers forward,
+    and is the only process that saves them.
+    """
+    from aiohttp import web
+
+    from .aiohttp_app import create_aiohttp_app
+
+    queue = open_work_queue(settings.work_queue_url)
+    track_queue_depth("work", queue.depth)
+    lease = LeaderLease(queue, ttl=settings.leader_lease_seconds)
+    # Only used to scope the bot commands to each guild's tenants.
+    tenants = _build_tenants(settings)
+
+    # Webhooks go to the ingest workers; the sender only answers /health
+    # and /metrics.
+    runner = web.AppRunner(
+        create_aiohttp_app(
+            jira_secret=None,
+            handle_event=lambda data: None,
+            metrics=_metrics(settings),
+        )
+    )
+    await runner.setup()
+    await web.TCPSite(runner, host="0.0.0.0", port=settings.port).start()
+    leading = threading.Event()
+    save = _start_state_saver(settings, owned=leading.is_set)
+
+    try:
+        while True:
+            while not await asyncio.to_thread(lease.acquire):
+                await asyncio.sleep(lease.ttl / 3)
+            logger.info("Elected Discord sender %s.", lease.owner)
+            # A previous leader may have saved newer snapshots.
+            await asyncio.to_thread(_load_issue_state, settings)
+            await asyncio.to_thread(_configure_analytics, settings)
+            leading.set()
+            try:
+                lost = await _run_elected_sender(settings, queue, lease, tenants)
+            finally:
+                if save is not None:
+                    await asyncio.to_thread(save)
+                leading.clear()
+            if not lost:
+                return
+            logger.warning("Lost the sender lease; standing by.")
+    finally:
+        await asyncio.to_thread(lease.release)
+        await runner.cleanup()
+        queue.close()
+
+
+async def _run_elected_sender(
+    settings: Settings,
+    queue: WorkQueue,
+    lease: LeaderLease,
+    tenants: Optional[TenantRegistry] = None,
+) -> bool:
+    """Runs one leadership term; returns True when the lease was lost."""
+    client, notifier = create_bot(settings, tenants)
+    _track_outbound(notifier)
+    sender = QueueSender(queue, notifier.send, observe=issue_states.observe)
+
+    async def start_sender() -> None:
+        sender.start()
+
+    client.add_listener(start_sender, "on_ready")
+
+    async def hold_lease() -> None:
+        while True:
+            await asyncio.sleep(lease.ttl / 3)
+            if not await asyncio.to_thread(lease.acquire):
+                return
+
+    holder = asyncio.create_task(hold_lease())
+    gateway = asyncio.create_task(client.start(settings.discord_bot_token))
+    try:
+        done, _ = await asyncio.wait(
+            {holder, gateway}, return_when=asyncio.FIRST_COMPLETED
+        )
+    finally:
+        # Stop sending before the gateway closes so nothing is left half-sent.
+        await asyncio.to_thread(sender.close, lease.ttl)
+        holder.cancel()
+        await client.close()
+    if gateway in done:
+        gateway.result()
+        return False
+    gateway.cancel()
+    return True
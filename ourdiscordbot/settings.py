@@ -4,7 +4,12 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Tuple
+
+from .ingest import BACKPRESSURE_POLICIES
+
+HTTP_SERVERS = ("flask", "aiohttp")
+RUNTIME_ROLES = ("all", "ingest", "sender")
 
 
 @dataclass(frozen=True)
@@ -15,6 +20,47 @@ class Settings:
     discord_channel_id: Optional[int]
     jira_webhook_secret: Optional[str]
     port: int
+    ingest_workers: int = 2
+    ingest_queue_size: int = 1000
+    ingest_backpressure: str = "reject"
+    http_server: str = "flask"
+    digest_window_seconds: float = 0.0
+    digest_min_events: int = 3
+    digest_max_events: int = 50
+    dedup_ttl_seconds: float = 300.0
+    dedup_max_entries: int = 10000
+    dedup_path: Optional[str] = None
+    max_payload_bytes: int = 1024 * 1024
+    payload_projection: bool = True
+    smart_templates_dir: Optional[str] = None
+    smart_templates_override: bool = False
+    spool_path: Optional[str] = None
+    spool_commit_interval: float = 0.0
+    spool_max_pending: int = 100000
+    retry_max_attempts: int = 5
+    retry_base_seconds: float = 1.0
+    retry_max_seconds: float = 300.0
+    dead_letter_max: int = 1000
+    routing_config: Optional[str] = None
+    tenants_config: Optional[str] = None
+    tenants_reload_seconds: float = 5.0
+    runtime_role: str = "all"
+    work_queue_url: Optional[str] = None
+    leader_lease_seconds: float = 15.0
+    metrics_enabled: bool = True
+    issue_state_path: Optional[str] = None
+    issue_state_max_issues: int = 50000
+    issue_state_save_seconds: float = 60.0
+    analytics_path: Optional[str] = None
+    analytics_retention_days: int = 30
+    analytics_done_statuses: Tuple[str, ...] = ("Done", "Closed", "Resolved")
+    loop_watchdog: bool = False
+    loop_watchdog_threshold_ms: int = 100
+    loop_watchdog_log: Optional[str] = None
+    profile_dir: Optional[str] = None
+    profile_stages: bool = False
+    operator_guild_id: Optional[int] = None
+    operator_user_ids: Tuple[int, ...] = ()
 
     @staticmethod
     def _parse_channel_id(raw_value: Optional[str]) -> Optional[int]:
@@ -25,6 +71,68 @@ class Settings:
         except (TypeError, ValueError):
             return None
 
+    @staticmethod
+    def _parse_int(raw_value: Optional[str], default: int, minimum: int = 0) -> int:
+        if not raw_value:
+            return default
+        try:
+            value = int(raw_value.strip())
+        except (TypeError, ValueError):
+            return default
+        return max(value, minimum)
+
+    @staticmethod
+    def _parse_float(raw_value: Optional[str], default: float) -> float:
+        if not raw_value:
+            return default
+        try:
+            return max(float(raw_value.strip()), 0.0)
+        except (TypeError, ValueError):
+            return default
+
+    @staticmethod
+    def _parse_bool(raw_value: Optional[str], default: bool) -> bool:
+        value = (raw_value or "").strip().lower()
+        if value in ("1", "true", "yes", "on"):
+            return True
+        if value in ("0", "false", "no", "off"):
+            return False
+        return default
+
+    @staticmethod
+    def _parse_list(
+        raw_value: Optional[str], default: Tuple[str, ...]
+    ) -> Tuple[str, ...]:
+        values = tuple(
+            item.strip() for item in (raw_value or "").split(",") if item.strip()
+        )
+        return values or default
+
+    @staticmethod
+    def _parse_id_list(raw_value: Optional[str]) -> Tuple[int, ...]:
+        ids = []
+        for item in (raw_value or "").split(","):
+            try:
+                ids.append(int(item.strip()))
+            except ValueError:
+                continue
+        return tuple(ids)
+
+    @staticmethod
+    def _parse_backpressure(raw_value: Optional[str]) -> str:
+        policy = (raw_value or "").strip().lower()
+        return policy if policy in BACKPRESSURE_POLICIES else "reject"
+
+    @staticmethod
+    def _parse_http_server(raw_value: Optional[str]) -> str:
+        server = (raw_value or "").strip().lower()
+        return server if server in HTTP_SERVERS else "flask"
+
+    @staticmethod
+    def _parse_runtime_role(raw_value: Optional[str]) -> str:
+        role = (raw_value or "").strip().lower()
+        return role if role in RUNTIME_ROLES else "all"
+
     @classmethod
     def from_env(cls) -> "Settings":
         """Load settings from environment variables."""
@@ -39,15 +147,102 @@ class Settings:
             discord_channel_id=cls._parse_channel_id(os.getenv("DISCORD_CHANNEL_ID")),
             jira_webhook_secret=os.getenv("JIRA_WEBHOOK_SECRET"),
             port=port,
+            ingest_workers=cls._parse_int(os.getenv("INGEST_WORKERS"), 2),
+            ingest_queue_size=cls._parse_int(
+                os.getenv("INGEST_QUEUE_SIZE"), 1000, minimum=1
+            ),
+            ingest_backpressure=cls._parse_backpressure(
+                os.getenv("INGEST_BACKPRESSURE")
+            ),
+            http_server=cls._parse_http_server(os.getenv("HTTP_SERVER")),
+            digest_window_seconds=cls._parse_float(
+                os.getenv("DIGEST_WINDOW_SECONDS"), 0.0
+            ),
+            digest_min_events=cls._parse_int(
+                os.getenv("DIGEST_MIN_EVENTS"), 3, minimum=1
+            ),
+            digest_max_events=cls._parse_int(
+                os.getenv("DIGEST_MAX_EVENTS"), 50, minimum=1
+            ),
+            dedup_ttl_seconds=cls._parse_float(os.getenv("DEDUP_TTL_SECONDS"), 300.0),
+            dedup_max_entries=cls._parse_int(
+                os.getenv("DEDUP_MAX_ENTRIES"), 10000, minimum=1
+            ),
+            dedup_path=os.getenv("DEDUP_PATH") or None,
+            max_payload_bytes=cls._parse_int(
+                os.getenv("MAX_PAYLOAD_BYTES"), 1024 * 1024, minimum=1024
+            ),
+            payload_projection=cls._parse_bool(os.getenv("PAYLOAD_PROJECTION"), True),
+            smart_templates_dir=os.getenv("SMART_TEMPLATES_DIR") or None,
+            smart_templates_override=cls._parse_bool(
+                os.getenv("SMART_TEMPLATES_OVERRIDE"), False
+            ),
+            spool_path=os.getenv("SPOOL_PATH") or None,
+            spool_commit_interval=cls._parse_float(
+                os.getenv("SPOOL_COMMIT_INTERVAL_SECONDS"), 0.0
+            ),
+            spool_max_pending=cls._parse_int(
+                os.getenv("SPOOL_MAX_PENDING"), 100000, minimum=1
+            ),
+            retry_max_attempts=cls._parse_int(
+                os.getenv("RETRY_MAX_ATTEMPTS"), 5, minimum=1
+            ),
+            retry_base_seconds=cls._parse_float(os.getenv("RETRY_BASE_SECONDS"), 1.0),
+            retry_max_seconds=cls._parse_float(os.getenv("RETRY_MAX_SECONDS"), 300.0),
+            dead_letter_max=cls._parse_int(
+                os.getenv("DEAD_LETTER_MAX"), 1000, minimum=1
+            ),
+            routing_config=os.getenv("ROUTING_CONFIG") or None,
+            tenants_config=os.getenv("TENANTS_CONFIG") or None,
+            tenants_reload_seconds=cls._parse_float(
+                os.getenv("TENANTS_RELOAD_SECONDS"), 5.0
+            ),
+            runtime_role=cls._parse_runtime_role(os.getenv("RUNTIME_ROLE")),
+            work_queue_url=os.getenv("WORK_QUEUE_URL") or None,
+            leader_lease_seconds=cls._parse_float(
+                os.getenv("LEADER_LEASE_SECONDS"), 15.0
+            ),
+            metrics_enabled=cls._parse_bool(os.getenv("METRICS_ENABLED"), True),
+            issue_state_path=os.getenv("ISSUE_STATE_PATH") or None,
+            issue_state_max_issues=cls._parse_int(
+                os.getenv("ISSUE_STATE_MAX_ISSUES"), 50000, minimum=1
+            ),
+            issue_state_save_seconds=cls._parse_float(
+                os.getenv("ISSUE_STATE_SAVE_SECONDS"), 60.0
+            ),
+            analytics_path=os.getenv("ANALYTICS_PATH") or None,
+            analytics_retention_days=cls._parse_int(
+                os.getenv("ANALYTICS_RETENTION_DAYS"), 30, minimum=1
+            ),
+            analytics_done_statuses=cls._parse_list(
+                os.getenv("ANALYTICS_DONE_STATUSES"), ("Done", "Closed", "Resolved")
+            ),
+            loop_watchdog=cls._parse_bool(os.getenv("LOOP_WATCHDOG"), False),
+            loop_watchdog_threshold_ms=cls._parse_int(
+                os.getenv("LOOP_WATCHDOG_THRESHOLD_MS"), 100, minimum=1
+            ),
+            loop_watchdog_log=os.getenv("LOOP_WATCHDOG_LOG") or None,
+            profile_dir=os.getenv("PROFILE_DIR") or None,
+            profile_stages=cls._parse_bool(os.getenv("PROFILE_STAGES"), False),
+            operator_guild_id=cls._parse_channel_id(os.getenv("OPERATOR_GUILD_ID")),
+            operator_user_ids=cls._parse_id_list(os.getenv("OPERATOR_USER_IDS")),
         )
 
     def requires_secrets(self) -> list[str]:
-        """List missing critical configuration keys."""
+        """
+        List missing critical configuration keys for the runtime role. With
+        ``TENANTS_CONFIG`` the channel and webhook secret come from the
+        tenant file instead.
+        """
         missing: list[str] = []
-        if not self.discord_bot_token:
+        if self.runtime_role != "ingest" and not self.discord_bot_token:
             missing.append("DISCORD_BOT_TOKEN")
-        if self.discord_channel_id is None:
+        if self.runtime_role != "all" and not self.work_queue_url:
+            missing.append("WORK_QUEUE_URL")
+        if self.tenants_config:
+            return missing
+        if self.runtime_role != "ingest" and self.discord_channel_id is None:
             missing.append("DISCORD_CHANNEL_ID")
-        if not self.jira_webhook_secret:
+        if self.runtime_role != "sender" and not self.jira_webhook_secret:
             missing.append("JIRA_WEBHOOK_SECRET")
         return missing
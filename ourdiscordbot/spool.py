@@ -0,0 +1,383 @@
+"""Durable write-ahead spool that keeps accepted webhooks until Discord has them."""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Set, Tuple
+
+from .payloads import decode_json, encode_json
+
+logger = logging.getLogger(__name__)
+
+# deliver(data, acknowledge) -> accepted; acknowledge() is called once the
+# payload's notifications were delivered or dead-lettered.
+DeliverFn = Callable[[dict, Callable[[], None]], bool]
+
+
+@dataclass(frozen=True)
+class SpoolStats:
+    """Point-in-time view of the spool counters."""
+
+    pending: int
+    appended: int
+    delivered: int
+    rejected: int
+    commits: int
+    batch_max: int
+    retries: int
+
+
+class _PendingWrite:
+    __slots__ = ("body", "seq", "done")
+
+    def __init__(self, body: bytes) -> None:
+        self.body = body
+        self.seq: Optional[int] = None
+        self.done = threading.Event()
+
+
+class EventSpool:
+    """
+    Append-only SQLite log (WAL mode) of accepted webhook payloads.
+
+    :meth:`append` returns only once the payload is fsynced. Concurrent
+    appends are group-committed by a writer thread: everything queued while
+    the previous batch was being fsynced goes out in the next commit (up to
+    ``max_batch``), optionally held open for ``commit_interval`` seconds.
+    Delivered rows are deleted and the WAL is checkpointed and vacuumed
+    every ``compact_every`` deliveries.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        commit_interval: float = 0.0,
+        max_batch: int = 256,
+        max_pending: int = 100000,
+        compact_every: int = 1000,
+    ) -> None:
+        self._path = path
+        self._commit_interval = max(commit_interval, 0.0)
+        self._max_batch = max(max_batch, 1)
+        self._max_pending = max(max_pending, 1)
+        self._compact_every = max(compact_every, 1)
+
+        # Appends commit with synchronous=FULL on their own connection;
+        # reads and delivery acknowledgements use a NORMAL connection, since
+        # losing an acknowledgement only causes a redelivery.
+        self._append_conn = self._connect("FULL")
+        self._conn = self._connect("NORMAL")
+        self._conn_lock = threading.Lock()
+
+        self._lock = threading.Lock()
+        self._has_writes = threading.Condition(self._lock)
+        self._queue: List[_PendingWrite] = []
+        self._closed = False
+        self._writer: Optional[threading.Thread] = None
+
+        (self._pending,) = self._conn.execute("SELECT COUNT(*) FROM events").fetchone()
+        self._appended = 0
+        self._delivered = 0
+        self._rejected = 0
+        self._commits = 0
+        self._batch_max = 0
+        self._retries = 0
+        self._since_compaction = 0
+
+    def _connect(self, synchronous: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._path, check_same_thread=False, timeout=5.0)
+        # auto_vacuum only takes effect before the first table is created.
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={synchronous}")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "received_at REAL NOT NULL, body BLOB NOT NULL)"
+        )
+        conn.commit()
+        return conn
+
+    def append(self, data) -> Optional[int]:
+        """
+        Durably records ``data`` and returns its sequence number, or ``None``
+        when the spool is full, closed, or the write failed.
+        """
+        write = _PendingWrite(encode_json(data))
+        with self._lock:
+            if self._closed or self._pending >= self._max_pending:
+                self._rejected += 1
+                return None
+            self._pending += 1
+            self._queue.append(write)
+            self._has_writes.notify()
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._write_loop, name="event-spool-writer", daemon=True
+                )
+                self._writer.start()
+
+        write.done.wait()
+        return write.seq
+
+    def read(self, after: int = 0, limit: int = 100) -> List[Tuple[int, bytes]]:
+        """Returns up to ``limit`` undelivered ``(seq, body)`` rows after ``after``."""
+        with self._conn_lock:
+            return self._conn.execute(
+                "SELECT seq, body FROM events WHERE seq > ? ORDER BY seq LIMIT ?",
+                (after, limit),
+            ).fetchall()
+
+    def mark_delivered(self, seq: int) -> None:
+        with self._conn_lock:
+            deleted = self._conn.execute(
+                "DELETE FROM events WHERE seq = ?", (seq,)
+            ).rowcount
+            self._conn.commit()
+            if deleted:
+                self._since_compaction += 1
+                if self._since_compaction >= self._compact_every:
+                    self._compact()
+        if deleted:
+            with self._lock:
+                self._pending -= 1
+                self._delivered += 1
+
+    def record_retry(self) -> None:
+        with self._lock:
+            self._retries += 1
+
+    def compact(self) -> None:
+        """Truncates the WAL and returns pages freed by delivered rows."""
+        with self._conn_lock:
+            self._compact()
+
+    def pending(self) -> int:
+        return self._pending
+
+    def stats(self) -> SpoolStats:
+        with self._lock:
+            return SpoolStats(
+                pending=self._pending,
+                appended=self._appended,
+                delivered=self._delivered,
+                rejected=self._rejected,
+                commits=self._commits,
+                batch_max=self._batch_max,
+                retries=self._retries,
+            )
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Commits queued appends and closes the database."""
+        with self._lock:
+            self._closed = True
+            self._has_writes.notify_all()
+            writer = self._writer
+        if writer is not None:
+            writer.join(timeout)
+        with self._conn_lock:
+            self._conn.close()
+        self._append_conn.close()
+
+    def _write_loop(self) -> None:
+        while True:
+            with self._lock:
+                while not self._queue and not self._closed:
+                    self._has_writes.wait()
+                if not self._queue:
+                    return
+                # Optionally give concurrent requests a moment to join.
+                deadline = time.monotonic() + self._commit_interval
+                while len(self._queue) < self._max_batch and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._has_writes.wait(remaining)
+                batch = self._queue[: self._max_batch]
+                del self._queue[: self._max_batch]
+
+            self._commit(batch)
+
+    def _commit(self, batch: List[_PendingWrite]) -> None:
+        now = time.time()
+        try:
+            with self._append_conn:
+                for write in batch:
+                    write.seq = self._append_conn.execute(
+                        "INSERT INTO events (received_at, body) VALUES (?, ?)",
+                        (now, write.body),
+                    ).lastrowid
+        except sqlite3.Error as exc:
+            logger.error("Failed to append %d payloads to spool: %s", len(batch), exc)
+            for write in batch:
+                write.seq = None
+            with self._lock:
+                self._pending -= len(batch)
+                self._rejected += len(batch)
+        else:
+            with self._lock:
+                self._appended += len(batch)
+                self._commits += 1
+                if len(batch) > self._batch_max:
+                    self._batch_max = len(batch)
+        for write in batch:
+            write.done.set()
+
+    def _compact(self) -> None:
+        self._since_compaction = 0
+        self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self._conn.execute("PRAGMA incremental_vacuum")
+        self._conn.commit()
+
+
+class SpoolDeliveryWorker:
+    """
+    Drains an :class:`EventSpool` in order on one background thread.
+
+    ``deliver`` returning False (Discord not ready, channel not cached)
+    keeps the payload spooled and retries it with exponential backoff up to
+    ``retry_max`` seconds; :meth:`wake` retries immediately. Payloads whose
+    delivery raises are logged and dropped so they cannot block the spool.
+
+    An accepted payload is only handed to the outbound queue, so its row is
+    deleted when ``deliver`` acknowledges it (Discord has the message or it
+    was dead-lettered). Rows that were accepted but never acknowledged, e.g.
+    because the process stopped, are delivered again after a restart.
+    """
+
+    def __init__(
+        self,
+        spool: EventSpool,
+        deliver: DeliverFn,
+        *,
+        retry_initial: float = 0.5,
+        retry_max: float = 30.0,
+        batch_size: int = 100,
+    ) -> None:
+        self._spool = spool
+        self._deliver = deliver
+        self._retry_initial = retry_initial
+        self._retry_max = retry_max
+        self._batch_size = batch_size
+
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._idle = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Sequence numbers handed to ``deliver`` and not yet acknowledged,
+        # and those acknowledged since the loop last marked them delivered.
+        self._outstanding: Set[int] = set()
+        self._acknowledged: List[int] = []
+
+    @property
+    def spool(self) -> EventSpool:
+        return self._spool
+
+    def submit(self, data) -> bool:
+        """Durably spools ``data``; returns False when it could not be recorded."""
+        if self._spool.append(data) is None:
+            return False
+        self.start()
+        self.wake()
+        return True
+
+    def start(self) -> None:
+        """Starts the delivery thread, replaying anything left from a previous run."""
+        with self._lock:
+            if self._thread is not None or self._closed:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="event-spool-delivery", daemon=True
+            )
+            self._thread.start()
+
+    def wake(self) -> None:
+        self._idle.clear()
+        self._wakeup.set()
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until the spool is drained (or ``timeout`` elapses)."""
+        return self._idle.wait(timeout)
+
+    def stats(self) -> SpoolStats:
+        return self._spool.stats()
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        self._closed = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        cursor = 0
+        delay = self._retry_initial
+        # The payload being retried is decoded once and passed again as the
+        # same object, so the pipeline can reuse what it already rendered.
+        held: Optional[Tuple[int, dict]] = None
+        while not self._closed:
+            self._wakeup.clear()
+            self._mark_acknowledged()
+            rows = self._spool.read(after=cursor, limit=self._batch_size)
+            if not rows:
+                with self._lock:
+                    if not self._outstanding and not self._acknowledged:
+                        self._idle.set()
+                self._wakeup.wait()
+                continue
+
+            for seq, body in rows:
+                if self._closed:
+                    return
+                if held is None or held[0] != seq:
+                    try:
+                        held = (seq, decode_json(body))
+                    except Exception:
+                        logger.exception("Dropping spooled event that is not JSON.")
+                        self._spool.mark_delivered(seq)
+                        cursor = seq
+                        continue
+                if not self._deliver_one(seq, held[1]):
+                    self._spool.record_retry()
+                    logger.warning(
+                        "Discord unavailable; retrying spooled events in %.1fs.", delay
+                    )
+                    self._wakeup.wait(delay)
+                    delay = min(delay * 2, self._retry_max)
+                    break
+                delay = self._retry_initial
+                cursor = seq
+
+    def _deliver_one(self, seq: int, data) -> bool:
+        with self._lock:
+            self._outstanding.add(seq)
+        try:
+            accepted = bool(self._deliver(data, lambda: self._acknowledge(seq)))
+        except Exception:
+            logger.exception("Dropping spooled Jira event that failed to render.")
+            self._acknowledge(seq)
+            return True
+        if not accepted:
+            with self._lock:
+                self._outstanding.discard(seq)
+        return accepted
+
+    def _acknowledge(self, seq: int) -> None:
+        # Called from the event loop thread; rows are deleted by the worker.
+        with self._lock:
+            if seq not in self._outstanding:
+                return
+            self._outstanding.discard(seq)
+            self._acknowledged.append(seq)
+        self._wakeup.set()
+
+    def _mark_acknowledged(self) -> None:
+        with self._lock:
+            acknowledged, self._acknowledged = self._acknowledged, []
+        for seq in acknowledged:
+            self._spool.mark_delivered(seq)
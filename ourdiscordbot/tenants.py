@@ -0,0 +1,304 @@
+"""Tenant registry for serving several Jira sites from one process."""
+
+from __future__ import annotations
+
+import hmac
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+from jira_events import TENANT_KEY
+
+from .routing import RoutingError, RoutingTable
+
+logger = logging.getLogger(__name__)
+
+TENANT_ID_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,63}$")
+TENANT_ROUTE_CACHE_SIZE = 256
+
+
+def secret_matches(provided: Optional[str], expected: Optional[str]) -> bool:
+    """Compares shared secrets in constant time."""
+    if not expected:
+        return False
+    return hmac.compare_digest(
+        (provided or "").encode("utf-8"), expected.encode("utf-8")
+    )
+
+
+class RateLimiter:
+    """
+    Token bucket admitting ``rate`` events per second with bursts of up to
+    ``burst``. Safe to share between request threads.
+    """
+
+    __slots__ = ("rate", "burst", "_tokens", "_updated", "_lock")
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def retry_after(self) -> int:
+        """Whole seconds until the next event would be admitted."""
+        with self._lock:
+            missing = 1 - self._tokens
+        if self.rate <= 0:
+            return 60
+        return max(math.ceil(missing / self.rate), 1)
+
+
+@dataclass(frozen=True)
+class Tenant:
+    """One Jira site: its webhook secret, destination channels and limits."""
+
+    id: str
+    secret: str = field(repr=False)
+    channels: Tuple[int, ...]
+    router: Optional[RoutingTable] = None
+    limiter: Optional[RateLimiter] = None
+
+    @property
+    def all_channels(self) -> FrozenSet[int]:
+        """Every channel this tenant's notifications can go to."""
+        if self.router is not None:
+            return self.router.channels.union(self.channels)
+        return frozenset(self.channels)
+
+    def route(self, event_type: Optional[str], data) -> Tuple[int, ...]:
+        if self.router is not None:
+            return self.router.route(event_type, data)
+        return self.channels
+
+    def admit(self) -> bool:
+        """False when the tenant exceeded its ingestion rate."""
+        return self.limiter is None or self.limiter.acquire()
+
+
+@dataclass(frozen=True)
+class TenantStats:
+    """Point-in-time view of the tenant registry counters."""
+
+    tenants: int
+    reloads: int
+    reload_errors: int
+    rejected: int
+    throttled: int
+
+
+class TenantRegistry:
+    """
+    Tenants loaded from a JSON file and re-read when it changes.
+
+    The file is checked at most every ``reload_interval`` seconds while
+    requests arrive; a file that fails to parse keeps the previous tenants.
+    The tenant table is replaced in one assignment, so lookups never lock.
+    """
+
+    def __init__(self, path: str, *, reload_interval: float = 5.0) -> None:
+        self._path = path
+        self._reload_interval = reload_interval
+        self._tenants: Dict[str, Tenant] = {}
+        self._signature: Optional[Tuple[int, int]] = None
+        self._checked_at = 0.0
+        self._reload_lock = threading.Lock()
+        # Unknown tenants are compared against this so that a missing tenant
+        # takes as long to reject as a wrong secret.
+        self._decoy = os.urandom(16).hex()
+
+        self._reloads = 0
+        self._reload_errors = 0
+        self._rejected = 0
+        self._throttled = 0
+        self.reload()
+
+    def __len__(self) -> int:
+        return len(self._tenants)
+
+    def get(self, tenant_id: str) -> Optional[Tenant]:
+        self._maybe_reload()
+        return self._tenants.get(tenant_id)
+
+    def tenants(self) -> List[Tenant]:
+        self._maybe_reload()
+        return list(self._tenants.values())
+
+    def authenticate(self, tenant_id: str, secret: Optional[str]) -> Optional[Tenant]:
+        """Returns the tenant when ``secret`` is its webhook secret."""
+        tenant = self.get(tenant_id)
+        expected = tenant.secret if tenant is not None else self._decoy
+        if secret_matches(secret, expected) and tenant is not None:
+            return tenant
+        self._rejected += 1
+        return None
+
+    def record_throttled(self) -> None:
+        self._throttled += 1
+
+    def stats(self) -> TenantStats:
+        return TenantStats(
+            tenants=len(self._tenants),
+            reloads=self._reloads,
+            reload_errors=self._reload_errors,
+            rejected=self._rejected,
+            throttled=self._throttled,
+        )
+
+    def reload(self) -> bool:
+        """Re-reads the tenant file; returns False when it was rejected."""
+        with self._reload_lock:
+            self._checked_at = time.monotonic()
+            try:
+                signature = self._file_signature()
+                with open(self._path, encoding="utf-8") as handle:
+                    config = json.load(handle)
+                tenants = parse_tenants(config, previous=self._tenants)
+            except (OSError, ValueError) as exc:
+                self._reload_errors += 1
+                logger.error(
+                    "Could not load tenants from %s; keeping %d tenants: %s",
+                    self._path,
+                    len(self._tenants),
+                    exc,
+                )
+                return False
+            self._tenants = tenants
+            self._signature = signature
+            self._reloads += 1
+            logger.info("Loaded %d tenants from %s", len(tenants), self._path)
+            return True
+
+    def _maybe_reload(self) -> None:
+        if time.monotonic() - self._checked_at < self._reload_interval:
+            return
+        self._checked_at = time.monotonic()
+        try:
+            signature = self._file_signature()
+        except OSError:
+            return
+        if signature != self._signature:
+            self.reload()
+
+    def _file_signature(self) -> Tuple[int, int]:
+        stat = os.stat(self._path)
+        return stat.st_mtime_ns, stat.st_size
+
+
+class TenantRouter:
+    """
+    Routes payloads tagged with :data:`TENANT_KEY` through their tenant's
+    rules and everything else through ``fallback`` (or ``default_channels``).
+    """
+
+    def __init__(
+        self,
+        registry: TenantRegistry,
+        *,
+        fallback: Optional[RoutingTable] = None,
+        default_channels: Tuple[int, ...] = (),
+    ) -> None:
+        self._registry = registry
+        self._fallback = fallback
+        self._default = tuple(default_channels)
+
+    def route(self, event_type: Optional[str], data) -> Tuple[int, ...]:
+        tenant_id = data.get(TENANT_KEY) if isinstance(data, dict) else None
+        if tenant_id is None:
+            if self._fallback is not None:
+                return self._fallback.route(event_type, data)
+            return self._default
+        tenant = self._registry.get(tenant_id)
+        if tenant is None:
+            logger.warning("Tenant %s is no longer configured.", tenant_id)
+            return ()
+        return tenant.route(event_type, data)
+
+
+def parse_tenants(
+    config: Mapping, previous: Optional[Mapping[str, Tenant]] = None
+) -> Dict[str, Tenant]:
+    """
+    Builds tenants from ``{"tenants": {"<id>": {"secret": "...",
+    "channels": [...], "routes": [...], "rate_per_second": 5, "burst": 20}}}``.
+
+    ``secret_env`` may name an environment variable instead of ``secret``.
+    Invalid tenants are logged and skipped. Tenants whose limits did not
+    change keep their rate limiter, so a reload does not refill buckets.
+    """
+    if not isinstance(config, Mapping) or not isinstance(
+        config.get("tenants"), Mapping
+    ):
+        raise ValueError("Tenant config needs a 'tenants' object.")
+
+    previous = previous or {}
+    tenants: Dict[str, Tenant] = {}
+    for tenant_id, spec in config["tenants"].items():
+        try:
+            tenant = _parse_tenant(tenant_id, spec, previous.get(tenant_id))
+        except (RoutingError, TypeError, ValueError) as exc:
+            logger.error("Skipping tenant %s: %s", tenant_id, exc)
+            continue
+        tenants[tenant_id] = tenant
+    return tenants
+
+
+def _parse_tenant(tenant_id: str, spec, previous: Optional[Tenant]) -> Tenant:
+    if not TENANT_ID_PATTERN.match(str(tenant_id)):
+        raise ValueError("tenant ids may only contain letters, digits, '.', '_', '-'.")
+    if not isinstance(spec, Mapping):
+        raise ValueError("tenant entries must be objects.")
+
+    secret = spec.get("secret")
+    if not secret and spec.get("secret_env"):
+        secret = os.getenv(spec["secret_env"])
+    if not secret:
+        raise ValueError("no webhook secret configured.")
+
+    routing = RoutingTable.from_config(
+        {"default_channels": spec.get("channels") or [], "routes": spec.get("routes")},
+        cache_size=TENANT_ROUTE_CACHE_SIZE,
+    )
+    if not routing.default_channels and not len(routing):
+        raise ValueError("no channels configured.")
+
+    limiter = None
+    rate = spec.get("rate_per_second")
+    if rate is not None:
+        rate = float(rate)
+        burst = int(spec.get("burst") or max(rate, 1))
+        reusable = previous is not None and previous.limiter is not None
+        if reusable and (previous.limiter.rate, previous.limiter.burst) == (
+            rate,
+            burst,
+        ):
+            limiter = previous.limiter
+        else:
+            limiter = RateLimiter(rate, burst)
+
+    return Tenant(
+        id=tenant_id,
+        secret=str(secret),
+        channels=routing.default_channels,
+        router=routing if len(routing) else None,
+        limiter=limiter,
+    )
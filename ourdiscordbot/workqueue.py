@@ -0,0 +1,509 @@
+"""Shared work queue between stateless ingest workers and the Discord sender."""
+
+from __future__ import annotations
+
+import abc
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+import discord
+
+from jira_events.issue_state import compact_observation
+
+from .payloads import decode_json, encode_json
+
+logger = logging.getLogger(__name__)
+
+SQLITE_POLL_SECONDS = 0.05
+
+# Redis scripts that only touch a lease still held by the caller.
+RENEW_LEASE_SCRIPT = (
+    "if redis.call('get', KEYS[1]) == ARGV[1] then "
+    "return redis.call('pexpire', KEYS[1], ARGV[2]) else return 0 end"
+)
+RELEASE_LEASE_SCRIPT = (
+    "if redis.call('get', KEYS[1]) == ARGV[1] then "
+    "return redis.call('del', KEYS[1]) else return 0 end"
+)
+
+
+class WorkQueue(abc.ABC):
+    """
+    Durable FIFO of serialized Discord messages with at-least-once delivery,
+    plus the named leases used to elect the single consumer.
+
+    A claimed item stays in the queue until :meth:`ack`; :meth:`release`
+    puts it back at the head and :meth:`recover` returns every item claimed
+    by a previous consumer that died before acknowledging it.
+    """
+
+    @abc.abstractmethod
+    def put(self, body: bytes) -> None: ...
+
+    @abc.abstractmethod
+    def claim(self, timeout: float = 1.0) -> Optional[Tuple[Any, bytes]]:
+        """Waits up to ``timeout`` for the oldest item; returns ``(id, body)``."""
+
+    @abc.abstractmethod
+    def ack(self, item_id) -> None: ...
+
+    @abc.abstractmethod
+    def release(self, item_id) -> None: ...
+
+    @abc.abstractmethod
+    def recover(self) -> int: ...
+
+    @abc.abstractmethod
+    def depth(self) -> int: ...
+
+    @abc.abstractmethod
+    def acquire_lease(self, name: str, owner: str, ttl: float) -> bool:
+        """Takes or extends the lease; False while another owner holds it."""
+
+    @abc.abstractmethod
+    def release_lease(self, name: str, owner: str) -> None: ...
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """
+    Work queue in a SQLite file (WAL mode) shared by processes on one host.
+    Intended for local testing and single-machine deployments; claims are
+    polled every ``SQLITE_POLL_SECONDS``.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, timeout=5.0, isolation_level=None
+        )
+        self._lock = threading.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS work_items ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, body BLOB NOT NULL, "
+            "claimed INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS leases ("
+            "name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def put(self, body: bytes) -> None:
+        with self._lock:
+            self._conn.execute("INSERT INTO work_items (body) VALUES (?)", (body,))
+
+    def claim(self, timeout: float = 1.0) -> Optional[Tuple[int, bytes]]:
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                row = self._conn.execute(
+                    "UPDATE work_items SET claimed = 1 WHERE id = ("
+                    "SELECT id FROM work_items WHERE claimed = 0 ORDER BY id LIMIT 1"
+                    ") RETURNING id, body"
+                ).fetchone()
+            if row is not None:
+                return row[0], row[1]
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            time.sleep(min(SQLITE_POLL_SECONDS, remaining))
+
+    def ack(self, item_id: int) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM work_items WHERE id = ?", (item_id,))
+
+    def release(self, item_id: int) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE work_items SET claimed = 0 WHERE id = ?", (item_id,)
+            )
+
+    def recover(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "UPDATE work_items SET claimed = 0 WHERE claimed = 1"
+            ).rowcount
+
+    def depth(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM work_items").fetchone()
+        return count
+
+    def acquire_lease(self, name: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT owner, expires_at FROM leases WHERE name = ?", (name,)
+                ).fetchone()
+                acquired = row is None or row[0] == owner or row[1] <= now
+                if acquired:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO leases (name, owner, expires_at) "
+                        "VALUES (?, ?, ?)",
+                        (name, owner, now + ttl),
+                    )
+            finally:
+                self._conn.execute("COMMIT")
+        return acquired
+
+    def release_lease(self, name: str, owner: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner)
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RedisWorkQueue(WorkQueue):
+    """
+    Work queue on a Redis-compatible server, for ingest workers spread over
+    several hosts. ``client`` needs the redis-py command methods used here
+    (``lpush``, ``blmove``, ``lmove``, ``lrem``, ``llen``, ``set``, ``eval``),
+    so any compatible server or a local stand-in can be plugged in.
+
+    Items move from ``<prefix>:pending`` to ``<prefix>:processing`` when
+    claimed and are removed from there on acknowledgement.
+    """
+
+    def __init__(self, client, *, prefix: str = "ourdiscordbot") -> None:
+        self._client = client
+        self._pending = f"{prefix}:pending"
+        self._processing = f"{prefix}:processing"
+        self._lease_prefix = f"{prefix}:lease:"
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisWorkQueue":
+        try:
+            import redis
+        except ImportError as exc:  # pragma: no cover - depends on the environment
+            raise ImportError(
+                "WORK_QUEUE_URL uses Redis; install the 'redis' package."
+            ) from exc
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def put(self, body: bytes) -> None:
+        self._client.lpush(self._pending, body)
+
+    def claim(self, timeout: float = 1.0) -> Optional[Tuple[bytes, bytes]]:
+        body = self._client.blmove(
+            self._pending, self._processing, timeout, "RIGHT", "LEFT"
+        )
+        if body is None:
+            return None
+        return body, body
+
+    def ack(self, item_id: bytes) -> None:
+        self._client.lrem(self._processing, 1, item_id)
+
+    def release(self, item_id: bytes) -> None:
+        if self._client.lrem(self._processing, 1, item_id):
+            # The pending list is consumed from the right, so this is its head.
+            self._client.rpush(self._pending, item_id)
+
+    def recover(self) -> int:
+        recovered = 0
+        while self._client.lmove(self._processing, self._pending, "LEFT", "RIGHT"):
+            recovered += 1
+        return recovered
+
+    def depth(self) -> int:
+        return self._client.llen(self._pending) + self._client.llen(self._processing)
+
+    def acquire_lease(self, name: str, owner: str, ttl: float) -> bool:
+        key = self._lease_prefix + name
+        ttl_ms = max(int(ttl * 1000), 1)
+        if self._client.set(key, owner, nx=True, px=ttl_ms):
+            return True
+        return bool(self._client.eval(RENEW_LEASE_SCRIPT, 1, key, owner, ttl_ms))
+
+    def release_lease(self, name: str, owner: str) -> None:
+        self._client.eval(RELEASE_LEASE_SCRIPT, 1, self._lease_prefix + name, owner)
+
+
+def open_work_queue(url: str) -> WorkQueue:
+    """``redis://`` / ``rediss://`` URLs use Redis; anything else is a SQLite path."""
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisWorkQueue.from_url(url)
+    if url.startswith("sqlite:///"):
+        url = url[len("sqlite:///") :]
+    return SQLiteWorkQueue(url)
+
+
+def encode_message(
+    *,
+    content: Optional[str],
+    embeds: Sequence[discord.Embed],
+    channel_ids: Optional[Sequence[int]],
+) -> bytes:
+    return encode_json(
+        {
+            "content": content,
+            "embeds": [embed.to_dict() for embed in embeds],
+            "channel_ids": list(channel_ids) if channel_ids is not None else None,
+        }
+    )
+
+
+def decode_message(
+    body: bytes,
+) -> Tuple[Optional[str], List[discord.Embed], Optional[List[int]]]:
+    return _message_parts(decode_json(body))
+
+
+def encode_observation(data: dict) -> Optional[bytes]:
+    """Serializes what the issue state store needs from ``data``, if anything."""
+    observation = compact_observation(data)
+    if observation is None:
+        return None
+    return encode_json({"observe": observation})
+
+
+def _message_parts(
+    message: dict,
+) -> Tuple[Optional[str], List[discord.Embed], Optional[List[int]]]:
+    embeds = [discord.Embed.from_dict(embed) for embed in message.get("embeds") or ()]
+    return message.get("content"), embeds, message.get("channel_ids")
+
+
+class QueueNotifier:
+    """
+    Stands in for :class:`~ourdiscordbot.discord_client.DiscordNotifier` in
+    ingest workers: rendered messages are serialized onto the work queue
+    for the sender instead of being posted. Added as an issue state
+    observer, :meth:`observe` forwards each payload's history to the
+    sender, which owns the issue state and analytics stores.
+    """
+
+    def __init__(self, queue: WorkQueue) -> None:
+        self._queue = queue
+
+    def send(
+        self,
+        *,
+        content: Optional[str] = None,
+        embed: Optional[discord.Embed] = None,
+        embeds: Optional[Sequence[discord.Embed]] = None,
+        channel_ids: Optional[Sequence[int]] = None,
+        on_done: Optional[Callable[[], None]] = None,
+    ) -> bool:
+        all_embeds = [embed] if embed is not None else []
+        all_embeds.extend(embeds or ())
+        try:
+            self._queue.put(
+                encode_message(
+                    content=content, embeds=all_embeds, channel_ids=channel_ids
+                )
+            )
+        except Exception as exc:
+            logger.error("Failed to queue Discord message: %s", exc)
+            return False
+        # The work queue is durable, so the message is safe once queued.
+        if on_done is not None:
+            on_done()
+        return True
+
+    def observe(self, data: dict) -> None:
+        body = encode_observation(data)
+        if body is None:
+            return
+        try:
+            self._queue.put(body)
+        except Exception as exc:
+            logger.error("Failed to queue issue history: %s", exc)
+
+
+@dataclass(frozen=True)
+class SenderStats:
+    """Point-in-time view of the queue sender counters."""
+
+    sent: int
+    retries: int
+    dropped: int
+    recovered: int
+    observed: int
+
+
+class QueueSender:
+    """
+    Drains the work queue into ``notifier.send`` on one background thread.
+
+    Run only in the elected sender. Items are acknowledged once Discord
+    delivered or dead-lettered them (the notifier's ``on_done``), so items
+    still queued in the outbound dispatcher when leadership ends stay
+    claimed and :meth:`WorkQueue.recover` hands them to the next sender.
+    When the notifier refuses an item (Discord not ready, channel not
+    cached) it goes back to the head of the queue and is retried with
+    exponential backoff up to ``retry_max`` seconds. Items that cannot be
+    decoded are logged and dropped. Issue history forwarded by
+    :meth:`QueueNotifier.observe` is passed to ``observe`` in queue order.
+    """
+
+    def __init__(
+        self,
+        queue: WorkQueue,
+        send: Callable[..., bool],
+        *,
+        observe: Optional[Callable[[dict], Any]] = None,
+        claim_timeout: float = 1.0,
+        retry_initial: float = 0.5,
+        retry_max: float = 30.0,
+    ) -> None:
+        self._queue = queue
+        self._send = send
+        self._observe = observe
+        self._claim_timeout = claim_timeout
+        self._retry_initial = retry_initial
+        self._retry_max = retry_max
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        self._sent = 0
+        self._retries = 0
+        self._dropped = 0
+        self._recovered = 0
+        self._observed = 0
+
+    def start(self) -> None:
+        """Requeues items a previous sender left unacknowledged, then drains."""
+        if self._thread is not None:
+            return
+        self._recovered = self._queue.recover()
+        if self._recovered:
+            logger.info("Recovered %d unacknowledged messages.", self._recovered)
+        self._thread = threading.Thread(
+            target=self._run, name="work-queue-sender", daemon=True
+        )
+        self._thread.start()
+
+    def stats(self) -> SenderStats:
+        return SenderStats(
+            sent=self._sent,
+            retries=self._retries,
+            dropped=self._dropped,
+            recovered=self._recovered,
+            observed=self._observed,
+        )
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        delay = self._retry_initial
+        while not self._stop.is_set():
+            try:
+                claimed = self._queue.claim(self._claim_timeout)
+            except Exception as exc:
+                logger.error("Work queue unavailable: %s", exc)
+                self._stop.wait(delay)
+                delay = min(delay * 2, self._retry_max)
+                continue
+            if claimed is None:
+                continue
+
+            item_id, body = claimed
+            try:
+                message = decode_json(body)
+                observation = message.get("observe")
+                if observation is None:
+                    content, embeds, channel_ids = _message_parts(message)
+            except Exception:
+                logger.exception("Dropping queued message that could not be decoded.")
+                self._queue.ack(item_id)
+                self._dropped += 1
+                continue
+
+            if observation is not None:
+                self._apply(observation)
+                self._queue.ack(item_id)
+                continue
+
+            if self._send(
+                content=content,
+                embeds=embeds,
+                channel_ids=channel_ids,
+                on_done=lambda item_id=item_id: self._acknowledge(item_id),
+            ):
+                delay = self._retry_initial
+                continue
+
+            self._queue.release(item_id)
+            self._retries += 1
+            logger.warning(
+                "Discord unavailable; retrying queued messages in %.1fs.", delay
+            )
+            self._stop.wait(delay)
+            delay = min(delay * 2, self._retry_max)
+
+    def _acknowledge(self, item_id) -> None:
+        # Runs on the outbound dispatcher's thread once Discord is done.
+        try:
+            self._queue.ack(item_id)
+        except Exception as exc:
+            logger.error("Could not acknowledge a delivered message: %s", exc)
+            return
+        with self._lock:
+            self._sent += 1
+
+    def _apply(self, observation: dict) -> None:
+        if self._observe is None:
+            return
+        try:
+            self._observe(observation)
+        except Exception:
+            logger.exception("Dropping forwarded issue history that failed to apply.")
+            return
+        self._observed += 1
+
+
+class LeaderLease:
+    """
+    Time-limited lease on the work queue deciding which sender process owns
+    the Discord gateway. The holder must :meth:`acquire` again within
+    ``ttl`` seconds to keep it.
+    """
+
+    def __init__(
+        self,
+        queue: WorkQueue,
+        *,
+        name: str = "discord-sender",
+        ttl: float = 15.0,
+        owner: Optional[str] = None,
+    ) -> None:
+        self._queue = queue
+        self.name = name
+        self.ttl = ttl
+        self.owner = (
+            owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        )
+
+    def acquire(self) -> bool:
+        try:
+            return self._queue.acquire_lease(self.name, self.owner, self.ttl)
+        except Exception as exc:
+            logger.error("Could not reach the work queue for the sender lease: %s", exc)
+            return False
+
+    def release(self) -> None:
+        try:
+            self._queue.release_lease(self.name, self.owner)
+        except Exception as exc:  # pragma: no cover - best effort on shutdown
+            logger.warning("Could not release the sender lease: %s", exc)
@@ -3,6 +3,23 @@ from __future__ import annotations
 import sys
 from pathlib import Path
 
+import pytest
+
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
+
+
+@pytest.fixture(autouse=True)
+def _reset_issue_states():
+    """Issue history and analytics are process-wide; keep tests isolated."""
+    from jira_events import issue_states
+    from ourdiscordbot.analytics import analytics
+
+    observers = list(issue_states._observers)
+    issue_states.clear()
+    analytics.clear()
+    yield
+    issue_states.clear()
+    issue_states._observers[:] = observers
+    analytics.clear()
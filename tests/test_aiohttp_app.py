@@ -0,0 +1,157 @@
+import asyncio
+import threading
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from ourdiscordbot.aiohttp_app import create_aiohttp_app
+from ourdiscordbot.dedup import DedupCache, SQLiteDedupCache
+from ourdiscordbot.ingest import AsyncIngestQueue
+from ourdiscordbot.runtime import build_runtime
+from ourdiscordbot.settings import Settings
+
+
+def _run(app, scenario):
+    async def runner():
+        async with TestClient(TestServer(app)) as client:
+            return await scenario(client)
+
+    return asyncio.run(runner())
+
+
+def test_aiohttp_health_check():
+    app = create_aiohttp_app(jira_secret="secret", handle_event=lambda data: None)
+
+    async def scenario(client):
+        response = await client.get("/health")
+        return response.status, await response.text()
+
+    assert _run(app, scenario) == (200, "OK")
+
+
+def test_aiohttp_webhook_rejects_invalid_secret():
+    app = create_aiohttp_app(jira_secret="secret", handle_event=lambda data: None)
+
+    async def scenario(client):
+        response = await client.post("/webhooks/jira?secret=wrong", json={})
+        return response.status
+
+    assert _run(app, scenario) == 403
+
+
+def test_aiohttp_webhook_invalid_json_causes_400():
+    app = create_aiohttp_app(jira_secret="secret", handle_event=lambda data: None)
+
+    async def scenario(client):
+        response = await client.post(
+            "/webhooks/jira?secret=secret",
+            data="this is not valid json",
+            headers={"Content-Type": "application/json"},
+        )
+        return response.status
+
+    assert _run(app, scenario) == 400
+
+
+def test_aiohttp_webhook_handles_inline():
+    handled = []
+    app = create_aiohttp_app(jira_secret="secret", handle_event=handled.append)
+
+    async def scenario(client):
+        response = await client.post("/webhooks/jira?secret=secret", json={"n": 1})
+        return response.status, await response.text()
+
+    assert _run(app, scenario) == (200, "OK")
+    assert handled == [{"n": 1}]
+
+
+def test_aiohttp_webhook_queues_on_shared_loop():
+    handled = []
+
+    async def handler(data):
+        handled.append((data, asyncio.get_running_loop()))
+
+    queue = AsyncIngestQueue(handler, workers=2, capacity=10)
+    app = create_aiohttp_app(jira_secret="secret", handle_event=handler, ingest=queue)
+
+    async def scenario(client):
+        statuses = []
+        for index in range(3):
+            response = await client.post(
+                "/webhooks/jira?secret=secret", json={"n": index}
+            )
+            statuses.append(response.status)
+        await queue.join()
+        await queue.aclose()
+        return statuses, asyncio.get_running_loop()
+
+    statuses, app_loop = _run(app, scenario)
+
+    assert statuses == [202, 202, 202]
+    assert sorted(item["n"] for item, _ in handled) == [0, 1, 2]
+    assert all(loop is app_loop for _, loop in handled)
+
+
+def test_build_runtime_selects_aiohttp_app():
+    from aiohttp import web
+
+    settings = Settings(
+        discord_bot_token="token",
+        discord_channel_id=1,
+        jira_webhook_secret="secret",
+        port=8080,
+        http_server="aiohttp",
+    )
+
+    _, _, _, app = build_runtime(settings)
+
+    assert isinstance(app, web.Application)
+
+
+def test_aiohttp_webhook_forgets_deliveries_that_fail_inline():
+    handled = []
+
+    async def handle_event(data):
+        handled.append(data)
+        if len(handled) == 1:
+            raise RuntimeError("Discord unavailable")
+
+    app = create_aiohttp_app(
+        jira_secret="secret", handle_event=handle_event, dedup=DedupCache()
+    )
+    payload = {"webhookEvent": "jira:issue_updated", "issue": {"id": "1"}}
+
+    async def scenario(client):
+        statuses = []
+        for _ in range(2):
+            response = await client.post("/webhooks/jira?secret=secret", json=payload)
+            statuses.append(response.status)
+        return statuses
+
+    assert _run(app, scenario) == [500, 200]
+    assert len(handled) == 2
+
+
+def test_aiohttp_webhook_keeps_blocking_work_off_the_loop(tmp_path):
+    threads = []
+
+    class RecordingCache(SQLiteDedupCache):
+        def seen(self, key):
+            threads.append(("seen", threading.current_thread()))
+            return super().seen(key)
+
+    def handle_event(data):
+        threads.append(("handle", threading.current_thread()))
+
+    dedup = RecordingCache(str(tmp_path / "dedup.sqlite3"), ttl_seconds=60)
+    app = create_aiohttp_app(
+        jira_secret="secret", handle_event=handle_event, dedup=dedup
+    )
+
+    async def scenario(client):
+        response = await client.post("/webhooks/jira?secret=secret", json={"n": 1})
+        return response.status
+
+    assert _run(app, scenario) == 200
+    dedup.close()
+    assert [name for name, _ in threads] == ["seen", "handle"]
+    assert all(thread is not threading.main_thread() for _, thread in threads)
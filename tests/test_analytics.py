@@ -0,0 +1,235 @@
+import asyncio
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from jira_events import IssueStateStore, StatusChange, issue_states
+from ourdiscordbot.analytics import (
+    AnalyticsEngine,
+    QuantileSketch,
+    analytics,
+    parse_window,
+)
+from ourdiscordbot.discord_client import _respond_with_stats
+from ourdiscordbot.jira_handler import _render
+from ourdiscordbot.settings import Settings
+
+HOUR = 3600
+NOW = 1_800_000_000.0
+
+
+def _event(key, at, before=None, after=None, category=None, created=None):
+    status_field = {"name": after or "To Do"}
+    if category:
+        status_field["statusCategory"] = {"key": category}
+    data = {
+        "webhookEvent": "jira:issue_updated" if before else "jira:issue_created",
+        "timestamp": int(at * 1000),
+        "issue": {
+            "key": key,
+            "fields": {"status": status_field, "created": int((created or at) * 1000)},
+        },
+    }
+    if before:
+        data["changelog"] = {
+            "items": [{"field": "status", "fromString": before, "toString": after}]
+        }
+    return data
+
+
+def _feed(engine, events):
+    store = IssueStateStore()
+    store.add_listener(engine.record)
+    for data in events:
+        store.observe(data)
+    return store
+
+
+def _flow(key, start, cycle_hours, category=None):
+    return [
+        _event(key, start),
+        _event(key, start + HOUR, "To Do", "In Progress", created=start),
+        _event(
+            key,
+            start + HOUR * (1 + cycle_hours),
+            "In Progress",
+            "Done",
+            category=category,
+            created=start,
+        ),
+    ]
+
+
+def test_engine_reports_cycle_lead_throughput_and_wip(monkeypatch):
+    monkeypatch.setattr("time.time", lambda: NOW)
+    engine = AnalyticsEngine()
+    events = []
+    for index, cycle_hours in enumerate((10, 20, 30, 40)):
+        events += _flow(f"DCBOT-{index}", NOW - 100 * HOUR, cycle_hours)
+    events += [
+        _event("DCBOT-9", NOW - 5 * HOUR),
+        _event("DCBOT-9", NOW - 4 * HOUR, "To Do", "In Progress"),
+    ]
+    _feed(engine, events)
+
+    stats = engine.summary("dcbot", 7 * 86400, now=NOW)
+
+    assert stats.completed == 4
+    assert stats.entered == {"In Progress": 5, "Done": 4}
+    assert stats.cycle_time[50] == pytest.approx(20 * HOUR, rel=0.01)
+    assert stats.lead_time[95] == pytest.approx(31 * HOUR, rel=0.01)
+    assert stats.time_in_status["To Do"][50] == pytest.approx(HOUR, rel=0.01)
+    assert stats.wip == {"In Progress": 1}
+    assert engine.summary("DCBOT", 24 * HOUR, now=NOW).completed == 0
+    # Spans partial days at both edges and whole days in between.
+    assert engine.summary("DCBOT", 80 * HOUR, now=NOW).completed == 3
+    assert engine.summary("OTHER", now=NOW) is None
+
+
+def test_status_category_marks_custom_done_statuses(monkeypatch):
+    monkeypatch.setattr("time.time", lambda: NOW)
+    engine = AnalyticsEngine(done_statuses=())
+    _feed(engine, _flow("OPS-1", NOW - 10 * HOUR, 3, category="done"))
+
+    stats = engine.summary("OPS", now=NOW)
+
+    assert stats.completed == 1
+    assert stats.wip == {}
+
+
+def test_redelivered_changes_are_counted_once(monkeypatch):
+    monkeypatch.setattr("time.time", lambda: NOW)
+    issue_states.add_listener(analytics.record)
+    try:
+        for data in _flow("DCBOT-1", NOW - 10 * HOUR, 2):
+            # A retry or redelivery renders an identical payload again.
+            _render(data)
+            _render(dict(data))
+    finally:
+        issue_states.remove_listener(analytics.record)
+
+    stats = analytics.summary("DCBOT", now=NOW)
+    assert stats.completed == 1
+    assert stats.entered == {"In Progress": 1, "Done": 1}
+    assert stats.wip == {}
+
+    # The engine also ignores a repeated change on its own.
+    engine = AnalyticsEngine()
+    done = StatusChange(
+        "OPS-1", "In Progress", "Done", NOW - HOUR, HOUR, None, None, None
+    )
+    engine.record(done)
+    engine.record(done)
+    assert engine.summary("OPS", now=NOW).completed == 1
+
+
+def test_buckets_older_than_retention_are_dropped(monkeypatch):
+    monkeypatch.setattr("time.time", lambda: NOW)
+    engine = AnalyticsEngine(retention_days=2)
+    _feed(
+        engine,
+        _flow("DCBOT-1", NOW - 72 * HOUR, 1) + _flow("DCBOT-2", NOW - 5 * HOUR, 1),
+    )
+
+    assert engine.summary("DCBOT", 30 * 86400, now=NOW).completed == 1
+
+
+def test_sketch_quantiles_stay_within_relative_accuracy():
+    rng = random.Random(5)
+    values = sorted(rng.lognormvariate(10, 2) for _ in range(20000))
+    halves = QuantileSketch(), QuantileSketch()
+    for index, value in enumerate(values):
+        halves[index % 2].add(value)
+    merged = QuantileSketch()
+    for half in halves:
+        merged.merge(half)
+
+    for q in (0.5, 0.85, 0.95, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert merged.quantile(q) == pytest.approx(exact, rel=0.011)
+
+
+def test_snapshot_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr("time.time", lambda: NOW)
+    engine = AnalyticsEngine()
+    _feed(engine, _flow("DCBOT-1", NOW - 50 * HOUR, 12))
+    path = str(tmp_path / "analytics.state")
+    engine.save(path)
+
+    restored = AnalyticsEngine()
+    assert restored.load(path) == 1
+    assert restored.summary("DCBOT", now=NOW) == engine.summary("DCBOT", now=NOW)
+    assert not restored.dirty
+
+
+def test_parse_window():
+    assert parse_window(None) == 7 * 86400
+    assert parse_window("24h") == 86400
+    assert parse_window("2w") == 14 * 86400
+    assert parse_window("30") == 30 * 86400
+    assert parse_window("0d") is None
+    assert parse_window("soon") is None
+
+
+class _Channel:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, content):
+        self.sent.append(content)
+
+
+def test_stats_command(monkeypatch):
+    settings = Settings(
+        discord_bot_token="token",
+        discord_channel_id=1,
+        jira_webhook_secret="secret",
+        port=8080,
+    )
+    monkeypatch.setattr("time.time", lambda: NOW)
+    _feed(analytics, _flow("DCBOT-1", NOW - 10 * HOUR, 2))
+
+    async def ask(text):
+        message = SimpleNamespace(content=text, channel=_Channel())
+        await _respond_with_stats(message, settings)
+        return message.channel.sent[0]
+
+    report = asyncio.run(ask("!stats dcbot 24h"))
+    assert report.startswith("**DCBOT · last 1d**")
+    assert "Completed: **1**" in report
+    assert "Cycle time: p50 2h" in report
+    assert "Usage" in asyncio.run(ask("!stats"))
+    assert "No status changes" in asyncio.run(ask("!stats NOPE"))
+
+
+def test_tenants_sharing_project_keys_are_kept_apart(monkeypatch):
+    settings = Settings(
+        discord_bot_token="token",
+        discord_channel_id=1,
+        jira_webhook_secret="secret",
+        port=8080,
+    )
+    monkeypatch.setattr("time.time", lambda: NOW)
+    store = IssueStateStore()
+    store.add_listener(analytics.record)
+    for tenant, hours in (("team-a", 2), ("team-b", 8)):
+        for data in _flow("DCBOT-1", NOW - 20 * HOUR, hours):
+            store.observe(dict(data, _tenant=tenant))
+
+    assert store.get("DCBOT-1") is None
+    assert store.get("DCBOT-1", "team-a").status == "Done"
+    assert analytics.projects() == ["team-a/DCBOT", "team-b/DCBOT"]
+    assert analytics.projects({"team-b"}) == ["team-b/DCBOT"]
+
+    async def ask(text, scopes):
+        message = SimpleNamespace(content=text, channel=_Channel())
+        await _respond_with_stats(message, settings, scopes)
+        return message.channel.sent[0]
+
+    team_b = frozenset({"team-b"})
+    assert "Cycle time: p50 8h" in asyncio.run(ask("!stats dcbot 24h", team_b))
+    assert "No status changes" in asyncio.run(ask("!stats team-a/dcbot", team_b))
+    assert "team-a/DCBOT" not in asyncio.run(ask("!stats", team_b))
+    both = frozenset({"team-a", "team-b"})
+    assert "p50 8h" in asyncio.run(ask("!stats team-b/dcbot 24h", both))
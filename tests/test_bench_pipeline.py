@@ -0,0 +1,48 @@
+import copy
+
+from benchmarks.bench_pipeline import compare, percentile, run_suite
+from benchmarks.corpus import DEFAULT_MIX, fill, generate_corpus
+from ourdiscordbot.jira_handler import render_jira_events
+
+
+def test_corpus_is_reproducible_and_renders_every_scenario():
+    corpus = generate_corpus(120, seed=3)
+
+    assert corpus == generate_corpus(120, seed=3)
+    assert {scenario for scenario, _ in corpus} == set(DEFAULT_MIX)
+    for scenario, payload in corpus:
+        assert render_jira_events(payload), scenario
+
+
+def test_fill_keeps_json_types_of_whole_placeholders():
+    skeleton = {"labels": '{{issue.fields.labels.join(", ")}}', "key": "[{{key}}]"}
+
+    assert fill(skeleton, {"issue.fields.labels": ["a"], "key": "X-1"}) == {
+        "labels": ["a"],
+        "key": "[X-1]",
+    }
+
+
+def test_suite_delivers_every_event_and_flags_regressions():
+    results = run_suite(60, concurrency=4)
+    http = results["benchmarks"]["http"]
+
+    assert http["statuses"] == {"200": 60}
+    assert http["discord_embeds"] == 60
+    assert compare(results, results) == []
+
+    faster = copy.deepcopy(results)
+    for result in faster["benchmarks"].values():
+        result["events_per_second"] *= 2
+    assert [line.split(":")[0] for line in compare(results, faster)] == [
+        "render",
+        "http",
+    ]
+
+
+def test_percentile_uses_nearest_rank():
+    values = list(range(1, 101))
+
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([], 99) == 0.0
@@ -7,6 +7,7 @@ from unittest.mock import patch
 os.environ["DISCORD_BOT_TOKEN"] = "test_token"
 os.environ["DISCORD_CHANNEL_ID"] = "12345"
 os.environ["JIRA_WEBHOOK_SECRET"] = "secret"
+os.environ["INGEST_WORKERS"] = "0"
 
 from bot import app as flask_app
 
@@ -0,0 +1,104 @@
+from ourdiscordbot.dedup import DedupCache, SQLiteDedupCache, delivery_key
+from ourdiscordbot.http_app import create_flask_app
+
+
+def _update_payload():
+    return {
+        "webhookEvent": "jira:issue_updated",
+        "timestamp": 1760760000000,
+        "issue": {"id": "10001", "key": "DCBOT-30"},
+        "changelog": {"id": "20002", "items": []},
+    }
+
+
+def test_delivery_key_uses_jira_identity_fields():
+    assert (
+        delivery_key(_update_payload())
+        == "jira:issue_updated|10001|20002|1760760000000"
+    )
+
+
+def test_delivery_key_falls_back_to_content_hash():
+    key = delivery_key({"issue": {"key": "DCBOT-1"}}, b'{"issue":{"key":"DCBOT-1"}}')
+
+    assert key.startswith("sha1:")
+    assert key == delivery_key(
+        {"issue": {"key": "DCBOT-1"}}, '{"issue":{"key":"DCBOT-1"}}'
+    )
+
+
+def test_dedup_cache_counts_hits_and_evicts_lru():
+    cache = DedupCache(max_entries=2, ttl_seconds=60)
+
+    assert not cache.seen("a")
+    assert not cache.seen("b")
+    assert cache.seen("a")
+    assert not cache.seen("c")  # evicts "b", the least recently used key
+    assert not cache.seen("b")
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.size) == (1, 4, 2)
+
+
+def test_dedup_cache_expires_entries():
+    cache = DedupCache(ttl_seconds=0)
+
+    assert not cache.seen("a")
+    assert not cache.seen("a")
+
+
+def test_sqlite_dedup_cache_survives_reopen(tmp_path):
+    path = str(tmp_path / "dedup.sqlite3")
+    cache = SQLiteDedupCache(path, ttl_seconds=60)
+    assert not cache.seen("delivery")
+    cache.close()
+
+    reopened = SQLiteDedupCache(path, ttl_seconds=60)
+    assert reopened.seen("delivery")
+    assert reopened.stats().hits == 1
+    reopened.close()
+
+
+def test_flask_webhook_acknowledges_duplicates_without_processing():
+    handled = []
+    app = create_flask_app(
+        jira_secret="secret", handle_event=handled.append, dedup=DedupCache()
+    )
+
+    with app.test_client() as client:
+        first = client.post("/webhooks/jira?secret=secret", json=_update_payload())
+        second = client.post("/webhooks/jira?secret=secret", json=_update_payload())
+
+    assert (first.status_code, first.data) == (200, b"OK")
+    assert (second.status_code, second.data) == (200, b"Duplicate")
+    assert len(handled) == 1
+
+
+def test_delivery_key_ignores_non_object_issue_and_changelog():
+    payload = _update_payload()
+    payload["changelog"] = ["not", "an", "object"]
+    assert delivery_key(payload) == "jira:issue_updated|10001||1760760000000"
+
+    payload["issue"] = "DCBOT-30"
+    assert delivery_key(payload).startswith("sha1:")
+
+
+def test_flask_webhook_forgets_deliveries_that_fail_inline():
+    handled = []
+
+    def handle_event(data):
+        handled.append(data)
+        if len(handled) == 1:
+            raise RuntimeError("Discord unavailable")
+
+    app = create_flask_app(
+        jira_secret="secret", handle_event=handle_event, dedup=DedupCache()
+    )
+
+    with app.test_client() as client:
+        failed = client.post("/webhooks/jira?secret=secret", json=_update_payload())
+        retried = client.post("/webhooks/jira?secret=secret", json=_update_payload())
+
+    assert failed.status_code == 500
+    assert (retried.status_code, retried.data) == (200, b"OK")
+    assert len(handled) == 2
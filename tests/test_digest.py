@@ -0,0 +1,156 @@
+import discord
+
+from jira_events import TENANT_KEY
+from ourdiscordbot.digest import DigestAggregator, build_digest_embed, digest_key
+
+
+def _status_payload(issue_key, actor="Release Manager"):
+    return {
+        "webhookEvent": "jira:issue_updated",
+        "user": {"displayName": actor},
+        "issue": {
+            "self": "https://example.atlassian.net/rest/api/2/issue/1",
+            "key": issue_key,
+            "fields": {"project": {"key": "DCBOT", "name": "Discord Bot"}},
+        },
+        "changelog": {
+            "items": [
+                {"field": "status", "fromString": "In Review", "toString": "Done"}
+            ]
+        },
+    }
+
+
+def test_digest_key_groups_by_transition_and_actor():
+    key = digest_key("jira:issue_status_changed", _status_payload("DCBOT-1"))
+
+    assert key == (
+        None,
+        "DCBOT",
+        "jira:issue_status_changed",
+        "Release Manager",
+        "In Review",
+        "Done",
+    )
+
+
+def test_digest_collapses_bulk_transition():
+    emitted = []
+    aggregator = DigestAggregator(
+        emitted.append, window_seconds=60, min_events=3, max_events=100
+    )
+
+    passed_through = []
+    for index in range(1, 6):
+        taken = aggregator.offer(
+            "jira:issue_status_changed",
+            _status_payload(f"DCBOT-{index}"),
+            discord.Embed(title=f"DCBOT-{index}"),
+        )
+        passed_through.append(not taken)
+
+    assert passed_through == [True, False, False, False, False]
+    assert aggregator.pending() == 4
+
+    aggregator.close()
+
+    assert len(emitted) == 1
+    digest = emitted[0]
+    assert digest.title == "[DCBOT] 4 more issues: In Review → Done"
+    assert "DCBOT-2, DCBOT-3, DCBOT-4, DCBOT-5" == digest.description
+    assert digest.url.startswith("https://example.atlassian.net/issues/?jql=key%20in")
+
+
+def test_digest_releases_small_groups_individually():
+    emitted = []
+    aggregator = DigestAggregator(emitted.append, window_seconds=60, min_events=3)
+
+    for index in range(1, 3):
+        aggregator.offer(
+            "jira:issue_status_changed",
+            _status_payload(f"DCBOT-{index}"),
+            discord.Embed(title=f"DCBOT-{index}"),
+        )
+    aggregator.close()
+
+    assert [embed.title for embed in emitted] == ["DCBOT-2"]
+
+
+def test_digest_flushes_when_group_is_full():
+    emitted = []
+    aggregator = DigestAggregator(
+        emitted.append, window_seconds=60, min_events=2, max_events=3
+    )
+
+    for index in range(1, 7):
+        aggregator.offer(
+            "jira:issue_status_changed",
+            _status_payload(f"DCBOT-{index}"),
+            discord.Embed(title=f"DCBOT-{index}"),
+        )
+
+    assert len(emitted) == 1
+    assert emitted[0].fields[1].value == "3"
+    assert aggregator.pending() == 2
+    aggregator.close()
+    assert emitted[1].fields[1].value == "2"
+
+
+def test_build_digest_embed_truncates_long_key_lists():
+    keys = [f"DCBOT-{index}" for index in range(100)]
+
+    embed = build_digest_embed(
+        (None, "DCBOT", "jira:issue_created", "Importer", None, None), keys, None
+    )
+
+    assert embed.title == "[DCBOT] 100 more issues created"
+    assert embed.description.endswith("… and 40 more")
+
+
+def test_digest_groups_routed_events_per_channel_set():
+    emitted = []
+    aggregator = DigestAggregator(
+        lambda embed, channels=None: emitted.append((embed.title, channels)),
+        window_seconds=60,
+        min_events=1,
+    )
+
+    for index, channels in enumerate([(10,), (10,), (20,), (20,)]):
+        aggregator.offer(
+            "jira:issue_status_changed",
+            _status_payload(f"DCBOT-{index}"),
+            discord.Embed(title=f"DCBOT-{index}"),
+            channels=channels,
+        )
+    aggregator.close()
+
+    assert sorted(emitted) == [
+        ("[DCBOT] 1 more issues: In Review → Done", (10,)),
+        ("[DCBOT] 1 more issues: In Review → Done", (20,)),
+    ]
+
+
+def test_digest_keeps_tenants_sharing_a_project_key_apart():
+    emitted = []
+    aggregator = DigestAggregator(
+        lambda embed, channels=None: emitted.append(embed.url),
+        window_seconds=60,
+        min_events=1,
+    )
+
+    for index, tenant in enumerate(["acme", "acme", "globex", "globex"]):
+        payload = _status_payload(f"DCBOT-{index}")
+        payload[TENANT_KEY] = tenant
+        payload["issue"]["self"] = f"https://{tenant}.atlassian.net/rest/api/2/issue/1"
+        aggregator.offer(
+            "jira:issue_status_changed",
+            payload,
+            discord.Embed(title=f"DCBOT-{index}"),
+            channels=(10,),
+        )
+    aggregator.close()
+
+    assert sorted(url.split("/issues/")[0] for url in emitted) == [
+        "https://acme.atlassian.net",
+        "https://globex.atlassian.net",
+    ]
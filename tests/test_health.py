@@ -0,0 +1,142 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from ourdiscordbot import health as health_module
+from ourdiscordbot.aiohttp_app import create_aiohttp_app
+from ourdiscordbot.discord_client import _respond_with_health
+from ourdiscordbot.health import HealthMonitor, format_health
+from ourdiscordbot.http_app import create_flask_app
+from ourdiscordbot.metrics import WEBHOOKS, track_queue_depth
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def outbound_depth():
+    depth = {"value": 0, "reads": 0}
+
+    def read():
+        depth["reads"] += 1
+        return depth["value"]
+
+    track_queue_depth("outbound", read)
+    yield depth
+    track_queue_depth("outbound", None)
+
+
+def test_snapshot_is_cached_for_the_ttl(outbound_depth):
+    clock = _Clock()
+    monitor = HealthMonitor(ttl=2.0, clock=clock)
+
+    first = monitor.snapshot()
+    clock.now += 1.0
+    assert monitor.snapshot() is first
+    assert outbound_depth["reads"] == 1
+
+    clock.now += 1.5
+    assert monitor.snapshot() is not first
+    assert outbound_depth["reads"] == 2
+
+
+def test_stalled_deliveries_degrade_until_discord_drains(outbound_depth):
+    clock = _Clock()
+    monitor = HealthMonitor(ttl=0.0, clock=clock)
+    outbound_depth["value"] = 4
+    clock.now += 10
+    assert monitor.snapshot().ok
+
+    clock.now += health_module.DELIVERY_STALL_SECONDS
+    snapshot = monitor.snapshot()
+    assert snapshot.status == "degraded"
+    assert "4 message(s) waiting" in snapshot.problems[0]
+
+    monitor.record_delivery()
+    snapshot = monitor.snapshot()
+    assert snapshot.ok
+    assert snapshot.queue_depths["outbound"] == 4
+    assert snapshot.last_delivery_seconds_ago == 0.0
+
+
+def test_webhook_rate_is_measured_between_snapshots():
+    clock = _Clock()
+    monitor = HealthMonitor(ttl=0.0, clock=clock)
+    monitor.snapshot()
+
+    for _ in range(30):
+        WEBHOOKS.inc("handled")
+    clock.now += 10
+
+    assert monitor.snapshot().webhooks_per_second == pytest.approx(3.0)
+
+
+def test_loop_lag_sampler_reports_blocked_loop(monkeypatch):
+    monkeypatch.setattr(health_module, "LOOP_LAG_INTERVAL", 0.01)
+    monitor = HealthMonitor(ttl=0.0)
+
+    async def scenario():
+        monitor.watch_loop(asyncio.get_running_loop())
+        await asyncio.sleep(0)
+        time.sleep(0.6)  # blocks the loop past the sampler's deadline
+        await asyncio.sleep(0.05)
+        return monitor.snapshot()
+
+    snapshot = asyncio.run(scenario())
+
+    assert snapshot.loop_lag_seconds >= 0.5
+    assert snapshot.status == "degraded"
+    assert "Degraded" in format_health(snapshot)
+
+
+def test_flask_health_serves_snapshot(outbound_depth):
+    clock = _Clock()
+    monitor = HealthMonitor(ttl=0.0, clock=clock)
+    client = create_flask_app(
+        jira_secret="secret", handle_event=lambda data: None, health=monitor
+    ).test_client()
+
+    assert client.get("/health").data == b"OK"
+    details = client.get("/health?details=1").get_json()
+    assert details["status"] == "ok"
+    assert details["queue_depths"]["outbound"] == 0
+
+    outbound_depth["value"] = 1
+    clock.now += health_module.DELIVERY_STALL_SECONDS + 1
+    response = client.get("/health")
+    assert (response.status_code, response.data) == (200, b"DEGRADED")
+
+
+def test_aiohttp_health_details():
+    from aiohttp.test_utils import TestClient, TestServer
+
+    app = create_aiohttp_app(
+        jira_secret="secret", handle_event=lambda data: None, health=HealthMonitor()
+    )
+
+    async def scenario():
+        async with TestClient(TestServer(app)) as client:
+            response = await client.get("/health?details=1")
+            return await response.json()
+
+    assert asyncio.run(scenario())["status"] == "ok"
+
+
+def test_health_command_answers_from_snapshot():
+    sent = []
+
+    async def send(content):
+        sent.append(content)
+
+    message = SimpleNamespace(content="!health", channel=SimpleNamespace(send=send))
+    asyncio.run(_respond_with_health(message))
+
+    assert sent[0].startswith(":white_check_mark: **Pipeline Status: Healthy**")
+    assert "Webhooks:" in sent[0]
@@ -0,0 +1,108 @@
+import threading
+
+import pytest
+
+from ourdiscordbot.http_app import create_flask_app
+from ourdiscordbot.ingest import IngestQueue
+
+
+def _blocking_handler():
+    release = threading.Event()
+    handled = []
+
+    def handler(payload):
+        release.wait(timeout=5)
+        handled.append(payload)
+
+    return handler, release, handled
+
+
+def test_ingest_queue_processes_payloads_in_workers():
+    handled = []
+    queue = IngestQueue(handled.append, workers=2, capacity=10)
+
+    for index in range(5):
+        assert queue.submit({"n": index})
+
+    assert queue.join(timeout=5)
+    assert sorted(item["n"] for item in handled) == [0, 1, 2, 3, 4]
+    stats = queue.stats()
+    assert stats.accepted == 5
+    assert stats.processed == 5
+    assert stats.depth == 0
+    queue.close(timeout=5)
+
+
+def test_ingest_queue_rejects_when_full():
+    handler, release, handled = _blocking_handler()
+    queue = IngestQueue(handler, workers=1, capacity=1, policy="reject")
+
+    assert queue.submit({"n": 0})
+    # Wait for the worker to pick up the first payload so the buffer is empty.
+    while queue.stats().in_flight == 0:
+        pass
+    assert queue.submit({"n": 1})
+    assert not queue.submit({"n": 2})
+
+    release.set()
+    assert queue.join(timeout=5)
+    assert [item["n"] for item in handled] == [0, 1]
+    assert queue.stats().rejected == 1
+    queue.close(timeout=5)
+
+
+def test_ingest_queue_sheds_oldest_when_full():
+    handler, release, handled = _blocking_handler()
+    queue = IngestQueue(handler, workers=1, capacity=2, policy="shed_oldest")
+
+    assert queue.submit({"n": 0})
+    while queue.stats().in_flight == 0:
+        pass
+    for index in range(1, 4):
+        assert queue.submit({"n": index})
+
+    release.set()
+    assert queue.join(timeout=5)
+    assert [item["n"] for item in handled] == [0, 2, 3]
+    assert queue.stats().shed == 1
+    queue.close(timeout=5)
+
+
+def test_ingest_queue_rejects_unknown_policy():
+    with pytest.raises(ValueError):
+        IngestQueue(lambda payload: None, policy="drop_everything")
+
+
+def test_jira_webhook_returns_202_when_queued():
+    handled = []
+    queue = IngestQueue(handled.append, workers=1, capacity=10)
+    app = create_flask_app(
+        jira_secret="secret", handle_event=handled.append, ingest=queue
+    )
+
+    with app.test_client() as client:
+        response = client.post(
+            "/webhooks/jira?secret=secret", json={"webhookEvent": "jira:issue_created"}
+        )
+
+    assert response.status_code == 202
+    assert queue.join(timeout=5)
+    assert handled == [{"webhookEvent": "jira:issue_created"}]
+    queue.close(timeout=5)
+
+
+def test_jira_webhook_returns_503_when_queue_rejects():
+    handler, release, _ = _blocking_handler()
+    queue = IngestQueue(handler, workers=1, capacity=1, policy="reject")
+    app = create_flask_app(jira_secret="secret", handle_event=handler, ingest=queue)
+
+    with app.test_client() as client:
+        statuses = [
+            client.post("/webhooks/jira?secret=secret", json={"n": index}).status_code
+            for index in range(3)
+        ]
+
+    release.set()
+    assert statuses.count(503) >= 1
+    assert statuses[0] == 202
+    queue.close(timeout=5)
@@ -0,0 +1,162 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from jira_events import IssueStateStore, issue_states
+from jira_events.issue_state import format_duration
+from ourdiscordbot.jira_handler import render_jira_events
+from ourdiscordbot.pipeline import JiraEventPipeline
+
+HOUR_MS = 3600 * 1000
+START_MS = 1700000000000
+
+
+def _issue(key="DCBOT-1", status="To Do", assignee="Jane Doe", labels=("ui",)):
+    return {
+        "key": key,
+        "fields": {
+            "summary": "State",
+            "project": {"name": "Bot"},
+            "status": {"name": status},
+            "assignee": {"displayName": assignee} if assignee else None,
+            "labels": list(labels),
+        },
+    }
+
+
+def _change(field, before, after, hours, key="DCBOT-1"):
+    return {
+        "webhookEvent": "jira:issue_updated",
+        "timestamp": START_MS + hours * HOUR_MS,
+        "issue": _issue(key),
+        "changelog": {
+            "items": [{"field": field, "fromString": before, "toString": after}]
+        },
+    }
+
+
+def _fields(embed):
+    return {field.name: field.value for field in embed.fields}
+
+
+def test_status_embed_shows_time_in_previous_status():
+    render_jira_events(
+        {"webhookEvent": "jira:issue_created", "timestamp": START_MS, "issue": _issue()}
+    )
+    render_jira_events(_change("status", "To Do", "In Progress", 2))
+    [(_, embed)] = render_jira_events(_change("status", "In Progress", "Done", 29))
+
+    assert _fields(embed)["Time in previous status"] == "1d 3h"
+    state = issue_states.get("DCBOT-1")
+    assert (state.status, state.previous_status) == ("Done", "In Progress")
+    assert state.status_entered["To Do"] == START_MS / 1000
+    assert state.labels == frozenset({"ui"})
+
+
+def test_assignee_embed_reports_reassignment_churn():
+    [(_, embed)] = render_jira_events(_change("assignee", "Jane Doe", "Sam", 1))
+    assert "Reassignments" not in _fields(embed)
+
+    render_jira_events(_change("assignee", "Sam", "Jane Doe", 2))
+    render_jira_events(_change("assignee", "Jane Doe", "Sam", 3))
+    [(_, embed)] = render_jira_events(_change("assignee", "Sam", "Ops Bot", 4))
+
+    # Only the last four assignees are listed.
+    assert _fields(embed)["Reassignments"] == "4 (Sam → Jane Doe → Sam → Ops Bot)"
+
+
+def test_out_of_order_changes_do_not_rewind_state():
+    store = IssueStateStore()
+    store.observe(_change("status", "To Do", "Done", 5))
+    store.observe(_change("status", "To Do", "In Progress", 1))
+
+    assert store.get("DCBOT-1").status == "Done"
+
+
+def test_observing_the_same_payload_twice_applies_it_once():
+    store = IssueStateStore()
+    changes = []
+    store.add_listener(changes.append)
+    status = _change("status", "To Do", "In Progress", 1)
+    assignee = _change("assignee", "Jane Doe", "Sam", 2)
+
+    for payload in (status, status, assignee, assignee):
+        store.observe(payload)
+
+    assert [(c.previous, c.current) for c in changes] == [("To Do", "In Progress")]
+    state = store.get("DCBOT-1")
+    assert (state.assignees, state.reassignments) == (["Jane Doe", "Sam"], 1)
+
+
+def test_pipeline_retry_does_not_observe_the_payload_again():
+    changes = []
+    issue_states.add_listener(changes.append)
+    notifier = MagicMock()
+    notifier.send.side_effect = [False, False, True]
+    renders = []
+
+    def render(data):
+        renders.append(data)
+        return render_jira_events(data)
+
+    pipeline = JiraEventPipeline(render, notifier)
+    payload = _change("status", "To Do", "In Progress", 1)
+
+    try:
+        while not pipeline.deliver(payload):
+            pass
+    finally:
+        issue_states.remove_listener(changes.append)
+
+    assert notifier.send.call_count == 3
+    assert len(renders) == 1
+    assert len(changes) == 1
+
+
+def test_store_evicts_least_recently_updated_issue():
+    store = IssueStateStore(max_issues=2)
+    for key in ("A-1", "B-1", "A-1", "C-1"):
+        store.observe({"issue": _issue(key)})
+
+    assert store.get("B-1") is None
+    assert len(store) == 2
+
+
+def test_snapshot_round_trips_compactly(tmp_path):
+    store = IssueStateStore()
+    for index in range(500):
+        key = f"DCBOT-{index}"
+        store.observe(_change("status", "To Do", "In Progress", 1, key=key))
+        store.observe(_change("assignee", "Jane Doe", "Sam", 2, key=key))
+    path = str(tmp_path / "issues.state")
+    store.save(path)
+
+    restored = IssueStateStore()
+    assert restored.load(path) == 500
+    state = restored.get("DCBOT-42")
+    assert (state.status, state.assignees, state.reassignments) == (
+        "In Progress",
+        ["Jane Doe", "Sam"],
+        1,
+    )
+    assert not restored.dirty
+    # Shared names are stored once and the snapshot is compressed.
+    assert (tmp_path / "issues.state").stat().st_size < 500 * 40
+
+
+def test_unreadable_snapshot_is_ignored(tmp_path):
+    path = tmp_path / "issues.state"
+    path.write_text(json.dumps({"version": 1}))
+    store = IssueStateStore()
+
+    assert store.load(str(path)) == 0
+    assert store.load(str(tmp_path / "missing")) == 0
+
+
+@pytest.mark.parametrize(
+    "seconds, expected",
+    [(None, None), (42, "42s"), (3660, "1h 1m"), (90000, "1d 1h"), (86460, "1d 1m")],
+)
+def test_format_duration(seconds, expected):
+    assert format_duration(seconds) == expected
@@ -1,5 +1,6 @@
 import discord
 from jira_events import registry
+from jira_events.registry import JiraEventRegistry
 from ourdiscordbot.jira_handler import process_jira_event
 
 
@@ -101,6 +102,41 @@ def test_registry_dispatch_passes_event_type():
     assert captured["event"] == "custom:event"
 
 
+def test_registry_builds_one_shim_per_handler_signature():
+    local = JiraEventRegistry()
+
+    def positional(data, event_type):
+        return ("positional", event_type)
+
+    def keyword_only(data, *, event_type):
+        return ("keyword", event_type)
+
+    def var_keyword(data, **kwargs):
+        return ("kwargs", kwargs["event_type"])
+
+    def payload_only(data):
+        return ("payload", None)
+
+    local.register(["a"], positional)
+    local.register(["B "], keyword_only)
+    local.register(["c"], var_keyword)
+    local.register(["d", "e"], payload_only, fields=("summary",))
+
+    assert local.dispatch("a", {}) == ("positional", "a")
+    assert local.dispatch(" B", {}) == ("keyword", " B")
+    assert local.dispatch("c", {}) == ("kwargs", "c")
+    assert local.dispatch("e", {}) == ("payload", None)
+    assert local.dispatch("missing", {}) is None
+    assert local.dispatch("", {}) is None
+
+    # Positional handlers need no wrapper, and every record is flat.
+    assert local.get_handler("a").call is positional
+    assert local.get_handler("d") is local.get_handler("e")
+    assert local.get_handler("d").fields == frozenset({"summary"})
+    assert not hasattr(local.get_handler("a"), "__dict__")
+    assert local.known_events() == frozenset({"a", "b", "c", "d", "e"})
+
+
 def test_process_jira_event_formats_assignee_change():
     payload = _sample_assignee_change_payload()
 
@@ -177,3 +213,187 @@ def test_status_classifier_detects_history_items():
     result = status_transition.classify_status_transition(payload)
 
     assert result == "jira:issue_status_changed"
+
+
+def test_changelog_index_prefers_items_then_first_history():
+    from jira_events.changelog import build_changelog_index
+
+    payload = _sample_status_change_payload()
+    payload["changelog"]["histories"] = [
+        {
+            "created": "2025-10-18T11:00:00.000+0000",
+            "author": {"displayName": "Earlier"},
+            "items": [{"fieldId": "assignee", "fromString": "A", "toString": "B"}],
+        },
+        {
+            "created": "2025-10-18T11:30:00.000+0000",
+            "author": {"displayName": "Later"},
+            "items": [
+                {"field": "Status", "fromString": "To Do", "toString": "Done"},
+                {"field": "assignee", "fromString": "B", "toString": "C"},
+            ],
+        },
+    ]
+
+    index = build_changelog_index(payload)
+
+    status, status_audit = index.get("status")
+    assert status["toString"] == "In Review"
+    assert status_audit is payload["changelog"]
+    assignee, assignee_audit = index.get("assignee")
+    assert assignee["toString"] == "B"
+    assert assignee_audit["author"] == {"displayName": "Earlier"}
+    assert index.get("labels") == (None, None)
+
+
+def test_changelog_index_is_shared_for_the_same_payload():
+    from jira_events.changelog import changelog_index
+
+    payload = _sample_status_change_payload()
+
+    assert changelog_index(payload) is changelog_index(payload)
+    assert changelog_index(payload) is not changelog_index(dict(payload))
+
+
+def test_render_jira_events_does_not_keep_the_payload_alive():
+    import sys
+
+    from jira_events import changelog
+    from ourdiscordbot.jira_handler import render_jira_events
+
+    payload = _sample_status_change_payload()
+    references = sys.getrefcount(payload)
+
+    assert render_jira_events(payload)
+    assert getattr(changelog._local, "entry", None) is None
+    assert sys.getrefcount(payload) == references
+
+
+def test_field_classifiers_only_run_for_changed_fields():
+    from jira_events import classifiers
+
+    calls = []
+
+    def classify_story_points(data):
+        calls.append(data)
+        return "custom:story_points_changed"
+
+    classifiers.register_issue_update_classifier(classify_story_points, "story points")
+    try:
+        payload = _sample_status_change_payload()
+        assert classifiers.classify_issue_update(payload) == "jira:issue_status_changed"
+
+        payload["changelog"]["items"] = [
+            {"field": "Story Points", "fromString": "3", "toString": "5"}
+        ]
+        assert classifiers.classify_issue_update(payload) == (
+            "custom:story_points_changed"
+        )
+        assert len(calls) == 1
+    finally:
+        classifiers._field_classifiers.pop("story points")
+
+
+def _sample_multi_change_payload():
+    payload = _sample_status_change_payload()
+    payload["changelog"]["items"].append(
+        {"field": "assignee", "fromString": "Alice", "toString": "Bob"}
+    )
+    return payload
+
+
+def test_render_jira_events_fans_out_every_changed_field():
+    from ourdiscordbot.jira_handler import render_jira_events
+
+    rendered = render_jira_events(_sample_multi_change_payload())
+
+    assert [event_type for event_type, _ in rendered] == [
+        "jira:issue_status_changed",
+        "jira:issue_assignee_changed",
+    ]
+    assert [embed.title for _, embed in rendered] == [
+        "[DCBOT-30] Status Updated",
+        "[DCBOT-30] Assignee Updated",
+    ]
+
+
+def test_pipeline_sends_fanned_out_embeds_in_one_message():
+    from unittest.mock import Mock
+
+    from ourdiscordbot.jira_handler import render_jira_events
+    from ourdiscordbot.pipeline import JiraEventPipeline
+
+    notifier = Mock()
+    pipeline = JiraEventPipeline(render_jira_events, notifier)
+
+    assert pipeline.handle(_sample_multi_change_payload())
+
+    notifier.send.assert_called_once()
+    _, kwargs = notifier.send.call_args
+    assert len(kwargs["embeds"]) == 2
+
+
+def test_process_jira_event_keeps_primary_embed_for_multi_change():
+    embed = process_jira_event(_sample_multi_change_payload())
+
+    assert embed.title == "[DCBOT-30] Status Updated"
+
+
+def test_embed_template_fills_slots_and_skips_missing_fields():
+    from jira_events.embed_templates import EmbedTemplate
+
+    template = EmbedTemplate(
+        "[{key}] Something Happened", fields=(("A", True), ("B", False))
+    )
+
+    embed = template.render(
+        "DCBOT-1",
+        description="> hi",
+        values=(None, "b"),
+        url="https://example.atlassian.net/browse/DCBOT-1",
+        author="Discord Bot",
+        footer="footer",
+    )
+
+    assert embed.title == "[DCBOT-1] Something Happened"
+    assert [(field.name, field.value, field.inline) for field in embed.fields] == [
+        ("B", "b", False)
+    ]
+    assert embed.author.url == embed.url
+    assert embed.footer.text == "footer"
+
+
+def test_escape_name_is_memoised():
+    from jira_events import embed_templates
+    from jira_events.embed_templates import escape_name
+
+    embed_templates._escape_cached.cache_clear()
+
+    assert escape_name("sam_lee") == "sam\\_lee"
+    assert escape_name("sam_lee") == "sam\\_lee"
+
+    info = embed_templates._escape_cached.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+
+def test_registry_drops_shims_of_replaced_handlers():
+    local = JiraEventRegistry()
+
+    def first(data):
+        return "first"
+
+    def second(data):
+        return "second"
+
+    local.register(["a", "b"], first)
+    shim = local.get_handler("a").call
+    local.register(["a"], second)
+    local.register(["a", "b"], first)
+
+    # Re-registering a live handler reuses its shim.
+    assert local.get_handler("a").call is shim
+    assert set(local._shims) == {id(first)}
+
+    local.register(["a", "b"], second)
+    assert set(local._shims) == {id(second)}
+    assert local.dispatch("b", {}) == "second"
@@ -0,0 +1,51 @@
+import asyncio
+import time
+
+from ourdiscordbot.loopwatch import LoopWatchdog
+from ourdiscordbot.metrics import LOOP_LAG_SECONDS, SLOW_CALLBACKS
+
+
+def _blocking_callback():
+    time.sleep(0.3)
+
+
+def test_watchdog_captures_the_blocking_stack(tmp_path):
+    log_path = tmp_path / "loop.log"
+    watchdog = LoopWatchdog(threshold=0.1, interval=0.01, log_path=str(log_path))
+    slow_before = sum(SLOW_CALLBACKS.values().values())
+    lag_before = sum(sum(cells[:-1]) for cells in LOOP_LAG_SECONDS.values().values())
+
+    async def scenario():
+        watchdog.start(asyncio.get_running_loop())
+        await asyncio.sleep(0.05)
+        _blocking_callback()
+        await asyncio.sleep(0.05)
+        watchdog.stop()
+
+    asyncio.run(scenario())
+
+    report = log_path.read_text()
+    assert report.count("Event loop blocked") == 1
+    assert "_blocking_callback" in report
+    stats = watchdog.stats()
+    assert stats.slow_callbacks == 1
+    assert stats.max >= 0.25
+    assert stats.p50 < 0.1
+    assert sum(SLOW_CALLBACKS.values().values()) == slow_before + 1
+    assert (
+        sum(sum(cells[:-1]) for cells in LOOP_LAG_SECONDS.values().values())
+        > lag_before
+    )
+
+
+def test_check_ignores_a_stopped_loop():
+    watchdog = LoopWatchdog(threshold=0.0, interval=0.01)
+
+    async def scenario():
+        watchdog.start(asyncio.get_running_loop())
+        watchdog.stop()
+
+    asyncio.run(scenario())
+
+    assert watchdog.check() is False
+    assert watchdog.stats().samples == 0
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from ourdiscordbot.aiohttp_app import create_aiohttp_app
+from ourdiscordbot.http_app import create_flask_app
+from ourdiscordbot.jira_handler import render_jira_events
+from ourdiscordbot.metrics import (
+    CONTENT_TYPE,
+    EVENTS,
+    METRICS,
+    WEBHOOKS,
+    MetricsRegistry,
+)
+
+
+def test_counters_and_histograms_merge_thread_shards():
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs", "Jobs run.", ("kind",))
+    histogram = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1))
+
+    def work():
+        for _ in range(1000):
+            counter.inc("a")
+            histogram.observe(0.5)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counter.inc("b", amount=2)
+    histogram.observe(0.05)
+    histogram.observe(3)
+
+    assert counter.values() == {("a",): 4000, ("b",): 2}
+    text = registry.render()
+    assert '# TYPE jobs counter\njobs_total{kind="a"} 4000\n' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1\n' in text
+    assert 'latency_seconds_bucket{le="1"} 4001\n' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 4002\n' in text
+    assert "latency_seconds_count 4002\n" in text
+    assert "latency_seconds_sum 2003.05\n" in text
+
+
+def test_gauges_read_sources_when_scraped():
+    registry = MetricsRegistry()
+    gauge = registry.gauge("queue_depth", "Depth.", ("queue",))
+    items = [1, 2]
+    gauge.track(("ingest",), lambda: len(items))
+    gauge.track(("broken",), lambda: 1 / 0)
+    items.append(3)
+
+    text = registry.render()
+
+    assert 'queue_depth{queue="ingest"} 3\n' in text
+    assert "broken" not in text
+    assert registry.gauge("queue_depth", "Depth.") is gauge
+
+
+def test_flask_metrics_endpoint_counts_outcomes():
+    app = create_flask_app(
+        jira_secret="secret", handle_event=render_jira_events, metrics=METRICS
+    )
+    client = app.test_client()
+    events = EVENTS.values()
+    webhooks = WEBHOOKS.values()
+
+    client.post("/webhooks/jira?secret=secret", json={"webhookEvent": "jira:nope"})
+    client.post("/webhooks/jira?secret=wrong", json={})
+    client.post(
+        "/webhooks/jira?secret=secret",
+        data=b"{",
+        content_type="application/json",
+    )
+    response = client.get("/metrics")
+
+    def delta(counter, before, *labels):
+        return counter.values().get(labels, 0) - before.get(labels, 0)
+
+    assert delta(EVENTS, events, "unregistered", "ignored") == 1
+    assert delta(WEBHOOKS, webhooks, "handled") == 1
+    assert delta(WEBHOOKS, webhooks, "forbidden") == 1
+    assert delta(WEBHOOKS, webhooks, "invalid") == 1
+    assert response.headers["Content-Type"] == CONTENT_TYPE
+    body = response.get_data(as_text=True)
+    assert 'ourdiscordbot_stage_seconds_count{stage="parse"}' in body
+    assert 'ourdiscordbot_stage_seconds_count{stage="classify"}' in body
+
+
+def test_metrics_endpoint_is_opt_in():
+    app = create_flask_app(jira_secret="secret", handle_event=lambda data: None)
+
+    assert app.test_client().get("/metrics").status_code == 404
+
+
+def test_aiohttp_metrics_endpoint():
+    app = create_aiohttp_app(
+        jira_secret="secret", handle_event=lambda data: None, metrics=METRICS
+    )
+
+    async def runner():
+        async with TestClient(TestServer(app)) as client:
+            await client.post("/webhooks/jira?secret=secret", json={})
+            response = await client.get("/metrics")
+            return response.headers["Content-Type"], await response.text()
+
+    content_type, body = asyncio.run(runner())
+
+    assert content_type == CONTENT_TYPE
+    assert "# TYPE ourdiscordbot_webhooks counter" in body
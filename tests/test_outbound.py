@@ -0,0 +1,223 @@
+import asyncio
+
+import discord
+
+from ourdiscordbot.outbound import (
+    Countdown,
+    OutboundDispatcher,
+    OutboundMessage,
+    RouteBudget,
+)
+from ourdiscordbot.retry import RetryPolicy
+
+
+class _FakeResponse:
+    status = 429
+    reason = "Too Many Requests"
+    headers = {"Retry-After": "0"}
+
+
+class _ServerErrorResponse:
+    status = 503
+    reason = "Service Unavailable"
+    headers = {}
+
+
+class _ForbiddenResponse:
+    status = 403
+    reason = "Forbidden"
+    headers = {}
+
+
+class _FakeChannel:
+    def __init__(self, failures=()):
+        self.calls = []
+        self._failures = list(failures)
+
+    async def send(self, content=None, *, embeds=None):
+        if self._failures:
+            raise self._failures.pop(0)
+        self.calls.append({"content": content, "embeds": list(embeds or [])})
+
+
+def _embed(index):
+    return discord.Embed(title=f"Embed {index}")
+
+
+def test_dispatcher_coalesces_backlogged_embeds():
+    channel = _FakeChannel()
+    dispatcher = OutboundDispatcher({1: channel}.get)
+
+    async def scenario():
+        for index in range(12):
+            dispatcher.submit(OutboundMessage(channel_id=1, embeds=[_embed(index)]))
+        await dispatcher.join()
+
+    asyncio.run(scenario())
+
+    assert [len(call["embeds"]) for call in channel.calls] == [10, 2]
+    stats = dispatcher.stats()
+    assert stats.messages_sent == 2
+    assert stats.embeds_sent == 12
+    assert stats.embeds_per_message == {10: 1, 2: 1}
+
+
+def test_dispatcher_does_not_coalesce_content_messages():
+    channel = _FakeChannel()
+    dispatcher = OutboundDispatcher({1: channel}.get)
+
+    async def scenario():
+        dispatcher.submit(OutboundMessage(channel_id=1, embeds=[_embed(0)]))
+        dispatcher.submit(OutboundMessage(channel_id=1, content="hello"))
+        dispatcher.submit(OutboundMessage(channel_id=1, embeds=[_embed(1)]))
+        await dispatcher.join()
+
+    asyncio.run(scenario())
+
+    assert [call["content"] for call in channel.calls] == [None, "hello", None]
+
+
+def test_dispatcher_requeues_after_rate_limit():
+    rate_limited = discord.HTTPException(_FakeResponse(), "rate limited")
+    channel = _FakeChannel(failures=[rate_limited])
+    dispatcher = OutboundDispatcher({1: channel}.get)
+
+    async def scenario():
+        dispatcher.submit(OutboundMessage(channel_id=1, embeds=[_embed(0)]))
+        await dispatcher.join()
+
+    asyncio.run(scenario())
+
+    assert len(channel.calls) == 1
+    assert dispatcher.stats().rate_limited == 1
+
+
+def test_dispatcher_retries_server_errors_with_backoff():
+    server_error = discord.HTTPException(_ServerErrorResponse(), "unavailable")
+    channel = _FakeChannel(failures=[server_error, asyncio.TimeoutError()])
+    dispatcher = OutboundDispatcher(
+        {1: channel}.get, retry_policy=RetryPolicy(base_delay=0.01)
+    )
+
+    async def scenario():
+        dispatcher.submit(OutboundMessage(channel_id=1, embeds=[_embed(0)]))
+        await dispatcher.join()
+
+    asyncio.run(scenario())
+
+    assert len(channel.calls) == 1
+    stats = dispatcher.stats()
+    assert stats.retried == 2
+    assert stats.dead_lettered == 0
+    assert stats.retry_pending == 0
+
+
+def test_dispatcher_retries_ahead_of_messages_queued_meanwhile():
+    server_error = discord.HTTPException(_ServerErrorResponse(), "unavailable")
+    channel = _FakeChannel(failures=[server_error])
+    dispatcher = OutboundDispatcher(
+        {1: channel}.get, retry_policy=RetryPolicy(base_delay=0.01)
+    )
+
+    async def scenario():
+        released = asyncio.Event()
+        send = channel.send
+
+        async def slow_send(content=None, *, embeds=None):
+            if content == "second":
+                await released.wait()
+            await send(content, embeds=embeds)
+
+        channel.send = slow_send
+        dispatcher.submit(OutboundMessage(channel_id=1, content="first"))
+        dispatcher.submit(OutboundMessage(channel_id=1, content="second"))
+        await asyncio.sleep(0)
+        dispatcher.submit(OutboundMessage(channel_id=1, content="third"))
+        # "first" failed and becomes due while "second" is still sending.
+        await asyncio.sleep(0.1)
+        released.set()
+        await dispatcher.join()
+
+    asyncio.run(scenario())
+
+    assert [call["content"] for call in channel.calls] == [
+        "second",
+        "first",
+        "third",
+    ]
+    assert dispatcher.stats().retry_pending == 0
+
+
+def test_dispatcher_dead_letters_exhausted_and_rejected_messages():
+    failures = [
+        discord.HTTPException(_ServerErrorResponse(), "unavailable") for _ in range(3)
+    ]
+    failures.append(discord.HTTPException(_ForbiddenResponse(), "forbidden"))
+    channel = _FakeChannel(failures=failures)
+    dispatcher = OutboundDispatcher(
+        {1: channel}.get,
+        rate_limit=100,
+        retry_policy=RetryPolicy(max_attempts=3, base_delay=0.0),
+    )
+
+    async def scenario():
+        dispatcher.submit(OutboundMessage(channel_id=1, embeds=[_embed(0)]))
+        await dispatcher.join()
+        dispatcher.submit(OutboundMessage(channel_id=1, content="hello"))
+        await dispatcher.join()
+
+    asyncio.run(scenario())
+
+    letters = dispatcher.dead_letters.list()
+    assert [(letter.summary(), letter.attempts) for letter in letters] == [
+        ("hello", 1),
+        ("Embed 0", 3),
+    ]
+    assert "403" in letters[0].error
+    assert dispatcher.stats().dead_lettered == 2
+
+    async def replay():
+        dispatcher.replay(dispatcher.dead_letters.take())
+        await dispatcher.join()
+
+    asyncio.run(replay())
+
+    assert [call["content"] for call in channel.calls] == [None, "hello"]
+    assert len(dispatcher.dead_letters) == 0
+
+
+def test_dispatcher_reports_delivered_and_dead_lettered_messages_done():
+    forbidden = discord.HTTPException(_ForbiddenResponse(), "forbidden")
+    channel = _FakeChannel(failures=[forbidden])
+    dispatcher = OutboundDispatcher({1: channel}.get)
+    done = []
+    both = Countdown(lambda: done.append("both"), count=2)
+
+    async def scenario():
+        dispatcher.submit(
+            OutboundMessage(
+                channel_id=1, content="rejected", on_done=lambda: done.append("x")
+            )
+        )
+        await dispatcher.join()
+        assert done == ["x"]
+        for index in range(2):
+            dispatcher.submit(
+                OutboundMessage(channel_id=1, embeds=[_embed(index)], on_done=both.done)
+            )
+        await dispatcher.join()
+
+    asyncio.run(scenario())
+
+    assert done == ["x", "both"]
+    assert len(channel.calls) == 1
+
+
+def test_route_budget_waits_when_exhausted():
+    budget = RouteBudget(limit=2, period=5.0)
+
+    assert budget.delay(0.0) == 0.0
+    budget.consume()
+    budget.consume()
+    assert budget.delay(1.0) == 4.0
+    assert budget.delay(5.0) == 0.0
@@ -0,0 +1,158 @@
+import asyncio
+import json
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from jira_events import registry
+from jira_events.projection import project_payload
+from jira_events.registry import JiraEventRegistry
+from ourdiscordbot.aiohttp_app import create_aiohttp_app
+from ourdiscordbot.http_app import create_flask_app
+from ourdiscordbot.jira_handler import render_jira_events
+from ourdiscordbot.payloads import PayloadParser, decode_json
+
+
+def _bulky_status_payload():
+    return {
+        "webhookEvent": "jira:issue_updated",
+        "timestamp": 1700000000000,
+        "user": {"displayName": "Jane", "avatarUrls": {"48x48": "https://x"}},
+        "issue": {
+            "id": "10001",
+            "key": "DCBOT-7",
+            "self": "https://example.atlassian.net/rest/api/2/issue/10001",
+            "fields": {
+                "summary": "Ship it",
+                "project": {"key": "DCBOT", "name": "Discord Bot"},
+                "priority": {"name": "High"},
+                "assignee": {"displayName": "Sam"},
+                "description": "x" * 10000,
+                "attachment": [{"id": str(n)} for n in range(50)],
+                "customfield_10010": {"value": "large"},
+            },
+        },
+        "changelog": {
+            "id": "55",
+            "items": [{"field": "status", "fromString": "To Do", "toString": "Done"}],
+        },
+    }
+
+
+def test_project_payload_keeps_declared_fields_only():
+    projected = project_payload(
+        _bulky_status_payload(), frozenset(("summary", "assignee"))
+    )
+
+    fields = projected["issue"]["fields"]
+    assert set(fields) == {"summary", "assignee", "project", "priority"}
+    assert projected["user"] == {"displayName": "Jane"}
+    assert projected["changelog"]["items"][0]["toString"] == "Done"
+
+
+def test_project_payload_disabled_when_requirements_unknown():
+    payload = _bulky_status_payload()
+    assert project_payload(payload, None) is payload
+
+
+def test_required_issue_fields_is_none_with_undeclared_handler():
+    local = JiraEventRegistry()
+    local.register(("a",), lambda data: None, fields=("summary",))
+    local.register(("b",), lambda data: None, fields=("labels",))
+    assert local.required_issue_fields() == {"summary", "labels"}
+
+    local.register(("c",), lambda data: None)
+    assert local.required_issue_fields() is None
+
+
+def test_projected_payload_renders_the_same_embed():
+    payload = _bulky_status_payload()
+    # The shared registry may hold undeclared handlers registered by other
+    # tests, so rebuild the requirements from the declared ones only.
+    declared = JiraEventRegistry()
+    for event_type, registration in registry._handlers.items():
+        if registration.fields is not None:
+            declared.register(
+                (event_type,), registration.func, fields=registration.fields
+            )
+    projected = project_payload(payload, declared.required_issue_fields())
+
+    original = render_jira_events(payload)
+    reduced = render_jira_events(projected)
+
+    assert [event for event, _ in reduced] == [event for event, _ in original]
+    assert [embed.to_dict() for _, embed in reduced] == [
+        embed.to_dict() for _, embed in original
+    ]
+
+
+def test_parser_decodes_bytes():
+    assert PayloadParser().parse(b'{"a": [1, 2]}') == {"a": [1, 2]}
+    assert decode_json('{"b": null}') == {"b": None}
+
+
+def test_flask_rejects_oversized_payload_with_413():
+    handled = []
+    app = create_flask_app(
+        jira_secret="secret",
+        handle_event=handled.append,
+        parser=PayloadParser(max_bytes=1024),
+    )
+    body = json.dumps({"issue": {"fields": {"description": "x" * 2048}}})
+
+    with app.test_client() as client:
+        response = client.post(
+            "/webhooks/jira?secret=secret",
+            data=body,
+            content_type="application/json",
+        )
+
+    assert response.status_code == 413
+    assert handled == []
+
+
+def test_aiohttp_rejects_oversized_payload_with_413():
+    handled = []
+    app = create_aiohttp_app(
+        jira_secret="secret",
+        handle_event=handled.append,
+        parser=PayloadParser(max_bytes=1024),
+    )
+    body = json.dumps({"issue": {"fields": {"description": "x" * 2048}}})
+
+    async def runner():
+        async with TestClient(TestServer(app)) as client:
+            response = await client.post(
+                "/webhooks/jira?secret=secret",
+                data=body,
+                headers={"Content-Type": "application/json"},
+            )
+            return response.status
+
+    assert asyncio.run(runner()) == 413
+    assert handled == []
+
+
+def test_flask_projects_payload_before_handling():
+    handled = []
+    app = create_flask_app(
+        jira_secret="secret",
+        handle_event=handled.append,
+        parser=PayloadParser(registry=_declared_registry()),
+    )
+
+    with app.test_client() as client:
+        response = client.post(
+            "/webhooks/jira?secret=secret", json=_bulky_status_payload()
+        )
+
+    assert response.status_code == 200
+    fields = handled[0]["issue"]["fields"]
+    assert "description" not in fields
+    assert "customfield_10010" not in fields
+    assert fields["summary"] == "Ship it"
+
+
+def _declared_registry():
+    local = JiraEventRegistry()
+    local.register(("jira:issue_updated",), lambda data: None, fields=("summary",))
+    return local
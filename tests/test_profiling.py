@@ -0,0 +1,158 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import discord
+import pytest
+
+from jira_events import JiraEventRegistry, profiling, registry
+from ourdiscordbot import profiler as profiler_module
+from ourdiscordbot.discord_client import _respond_with_profile
+from ourdiscordbot.jira_handler import render_jira_events
+from ourdiscordbot.profiler import ProfileBusy, profile_to_file
+from ourdiscordbot.settings import Settings
+
+
+@pytest.fixture
+def stage_profiling():
+    yield profiling.enable_stage_profiling(registry)
+    profiling.disable_stage_profiling(registry)
+
+
+def test_registry_swaps_in_a_timed_dispatch_only_while_profiling():
+    local = JiraEventRegistry()
+    local.register(["custom"], lambda data, event_type=None: event_type)
+    stages = profiling.StageProfiler()
+
+    local.set_profiler(stages)
+    assert local.dispatch("Custom", {}) == "Custom"
+    [timing] = stages.timings()
+    assert (timing.kind, timing.calls) == ("handler", 1)
+    assert timing.name.endswith("[custom]")
+
+    local.set_profiler(None)
+    assert "dispatch" not in vars(local)
+    assert local.dispatch("custom", {}) == "custom"
+    assert stages.timings()[0].calls == 1
+
+
+def test_stage_profiling_times_classifiers_handlers_and_stages(stage_profiling):
+    render_jira_events(
+        {
+            "webhookEvent": "jira:issue_updated",
+            "issue": {"key": "DCBOT-1", "fields": {"summary": "Profiled"}},
+            "changelog": {
+                "items": [
+                    {"field": "status", "fromString": "To Do", "toString": "Done"}
+                ]
+            },
+        }
+    )
+
+    timed = {(timing.kind, timing.name) for timing in stage_profiling.timings()}
+    assert ("stage", "render_jira_events") in timed
+    assert ("stage", "determine_event_types") in timed
+    assert ("classifier", "classify_status_transition") in timed
+    assert (
+        "handler",
+        "handle_status_transition [jira:issue_status_changed]",
+    ) in timed
+
+
+def _spin(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampling_profiler_writes_collapsed_stacks(tmp_path):
+    stop = threading.Event()
+    worker = threading.Thread(target=_spin, args=(stop,), name="busy worker")
+    worker.start()
+    try:
+        result = profile_to_file(0.3, str(tmp_path), interval=0.002)
+    finally:
+        stop.set()
+        worker.join()
+
+    lines = open(result.path).read().splitlines()
+    spinning = [line for line in lines if line.startswith("busy_worker;")]
+    assert spinning
+    stack, count = spinning[0].rsplit(" ", 1)
+    assert "test_profiling:_spin" in stack.split(";")
+    assert int(count) > 0
+    assert result.samples >= sum(int(line.rsplit(" ", 1)[1]) for line in spinning)
+    assert "test_profiling:_spin" in dict(result.top_frames)
+
+
+def test_only_one_profile_runs_at_a_time(tmp_path):
+    with profiler_module._running:
+        with pytest.raises(ProfileBusy):
+            profile_to_file(0.1, str(tmp_path))
+
+
+def _profile_command(settings, text, *, guild_id=10, user_id=1, administrator=True):
+    sent = []
+
+    async def send(content, **kwargs):
+        sent.append((content, kwargs))
+
+    message = SimpleNamespace(
+        content=text,
+        channel=SimpleNamespace(send=send),
+        guild=SimpleNamespace(id=guild_id),
+        author=SimpleNamespace(
+            id=user_id,
+            guild_permissions=SimpleNamespace(administrator=administrator),
+        ),
+    )
+    asyncio.run(_respond_with_profile(message, settings))
+    return sent
+
+
+def test_profile_command_is_for_operators_and_toggles_stages():
+    settings = Settings(
+        discord_bot_token="token",
+        discord_channel_id=1,
+        jira_webhook_secret="secret",
+        port=8080,
+        operator_guild_id=10,
+        operator_user_ids=(42,),
+    )
+
+    def last_reply(text, **kwargs):
+        return _profile_command(settings, text, **kwargs)[-1][0]
+
+    unconfigured = Settings("token", 1, "secret", 8080)
+    assert "operators" in _profile_command(unconfigured, "!profile stages")[-1][0]
+    assert "operators" in last_reply("!profile stages", administrator=False)
+    assert "operators" in last_reply("!profile stages", guild_id=11)
+    assert "off" in last_reply(
+        "!profile stages", guild_id=11, user_id=42, administrator=False
+    )
+    try:
+        assert "on" in last_reply("!profile stages on")
+        render_jira_events(
+            {"webhookEvent": "jira:issue_created", "issue": {"key": "A-1"}}
+        )
+        assert "render_jira_events" in last_reply("!profile stages")
+    finally:
+        last_reply("!profile stages off")
+    assert profiling.active is None
+
+
+def test_profile_command_reports_clamped_time_and_removes_the_upload(tmp_path):
+    settings = Settings(
+        discord_bot_token="token",
+        discord_channel_id=1,
+        jira_webhook_secret="secret",
+        port=8080,
+        profile_dir=str(tmp_path),
+        operator_user_ids=(1,),
+    )
+
+    sent = _profile_command(settings, "!profile 0.001")
+
+    assert sent[0][0] == ":stopwatch: Sampling stacks for 0.1s..."
+    assert "over 0.1s" in sent[1][0]
+    assert isinstance(sent[1][1]["file"], discord.File)
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,155 @@
+import asyncio
+from types import SimpleNamespace
+
+import discord
+
+from ourdiscordbot.discord_client import _respond_with_dead_letters
+from ourdiscordbot.outbound import OutboundDispatcher
+from ourdiscordbot.retry import DeadLetterStore, RetryPolicy, RetryScheduler
+
+
+def test_retry_policy_caps_jittered_backoff():
+    policy = RetryPolicy(max_attempts=4, base_delay=1.0, max_delay=5.0)
+
+    assert policy.delay(1, rng=lambda: 1.0) == 1.0
+    assert policy.delay(3, rng=lambda: 1.0) == 4.0
+    assert policy.delay(10, rng=lambda: 1.0) == 5.0
+    assert policy.delay(3, rng=lambda: 0.5) == 2.0
+    assert not policy.exhausted(3)
+    assert policy.exhausted(4)
+
+
+def test_retry_scheduler_uses_one_timer_for_many_retries():
+    fired = []
+
+    async def scenario():
+        scheduler = RetryScheduler(fired.append)
+        for index in range(5000):
+            scheduler.schedule(index, 0.05 - (index % 50) * 0.001)
+        assert len(scheduler) == 5000
+        pending_timers = [
+            handle
+            for handle in asyncio.get_running_loop()._scheduled
+            if not handle.cancelled()
+        ]
+        assert len(pending_timers) == 1
+        while len(scheduler):
+            await asyncio.sleep(scheduler.next_delay())
+            await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+
+    assert sorted(fired) == list(range(5000))
+    # Earlier deadlines fire first.
+    assert fired[0] % 50 == 49
+
+
+def test_dead_letter_store_evicts_oldest_and_takes_by_id():
+    store = DeadLetterStore(max_entries=2)
+    for index in range(3):
+        store.add(channel_id=1, content=f"m{index}", embeds=(), error="x", attempts=1)
+
+    assert [letter.id for letter in store.list()] == [3, 2]
+    assert store.evicted == 1
+    assert [letter.content for letter in store.take([2, 99])] == ["m1"]
+    assert len(store) == 1
+
+
+class _Channel:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, content=None, **kwargs):
+        self.sent.append(content)
+
+
+def _message(content, manage_messages=True):
+    return SimpleNamespace(
+        content=content,
+        channel=_Channel(),
+        author=SimpleNamespace(
+            guild_permissions=SimpleNamespace(manage_messages=manage_messages)
+        ),
+    )
+
+
+def test_deadletters_command_lists_and_replays():
+    delivered = _Channel()
+    dispatcher = OutboundDispatcher({7: delivered}.get)
+    dispatcher.dead_letters.add(
+        channel_id=7,
+        content=None,
+        embeds=[discord.Embed(title="[DCBOT-1] Status Updated")],
+        error="503 Service Unavailable",
+        attempts=5,
+    )
+
+    async def scenario():
+        listing = _message("!deadletters")
+        await _respond_with_dead_letters(listing, dispatcher)
+
+        denied = _message("!deadletters replay all", manage_messages=False)
+        await _respond_with_dead_letters(denied, dispatcher)
+
+        replay = _message("!deadletters replay #1")
+        await _respond_with_dead_letters(replay, dispatcher)
+        await dispatcher.join()
+        return listing.channel.sent, denied.channel.sent, replay.channel.sent
+
+    listing, denied, replay = asyncio.run(scenario())
+
+    assert "`#1`" in listing[0]
+    assert "DCBOT-1" in listing[0]
+    assert "Manage Messages" in denied[0]
+    assert "Requeued 1" in replay[0]
+    assert len(delivered.sent) == 1
+    assert len(dispatcher.dead_letters) == 0
+
+
+def test_deadletters_command_only_sees_visible_channels():
+    dispatcher = OutboundDispatcher({7: _Channel(), 8: _Channel()}.get)
+    for channel_id in (7, 8, 7):
+        dispatcher.dead_letters.add(
+            channel_id=channel_id,
+            content=f"for {channel_id}",
+            embeds=[],
+            error="403 Forbidden",
+            attempts=1,
+        )
+
+    def visible(channel_id):
+        return channel_id == 8
+
+    async def scenario():
+        listing = _message("!deadletters")
+        await _respond_with_dead_letters(listing, dispatcher, visible)
+        replay = _message("!deadletters replay 1 2")
+        await _respond_with_dead_letters(replay, dispatcher, visible)
+        replay_all = _message("!deadletters replay all")
+        await _respond_with_dead_letters(replay_all, dispatcher, visible)
+        await dispatcher.join()
+        return listing.channel.sent, replay.channel.sent, replay_all.channel.sent
+
+    listing, replay, replay_all = asyncio.run(scenario())
+
+    assert listing[0].startswith("**Dead letters: 1**")
+    assert "`#2`" in listing[0] and "`#1`" not in listing[0]
+    assert "Requeued 1" in replay[0]
+    assert "Requeued 0" in replay_all[0]
+    assert [letter.id for letter in dispatcher.dead_letters.list()] == [3, 1]
+
+
+def test_settings_read_retry_options(monkeypatch):
+    from ourdiscordbot.settings import Settings
+
+    monkeypatch.setenv("RETRY_MAX_ATTEMPTS", "3")
+    monkeypatch.setenv("RETRY_BASE_SECONDS", "0.5")
+    monkeypatch.setenv("RETRY_MAX_SECONDS", "60")
+    monkeypatch.setenv("DEAD_LETTER_MAX", "bogus")
+
+    settings = Settings.from_env()
+
+    assert settings.retry_max_attempts == 3
+    assert settings.retry_base_seconds == 0.5
+    assert settings.retry_max_seconds == 60.0
+    assert settings.dead_letter_max == 1000
@@ -0,0 +1,222 @@
+import json
+from unittest.mock import MagicMock
+
+import discord
+import pytest
+
+from ourdiscordbot.discord_client import DiscordNotifier
+from ourdiscordbot.pipeline import JiraEventPipeline
+from ourdiscordbot.routing import RoutingError, RoutingTable, load_routing_table
+
+CONFIG = {
+    "default_channels": [1],
+    "routes": [
+        {"name": "bot", "project": "DCBOT", "channels": [10]},
+        {
+            "project": ["DCBOT", "web"],
+            "priority": ["Highest", "High"],
+            "channels": [20],
+        },
+        {"label": "security", "channels": [30, 10]},
+        {"issue_type": "Incident", "event": "jira:issue_created", "channels": [40]},
+    ],
+}
+
+
+def _event(project="DCBOT", issue_type="Task", priority="Medium", labels=()):
+    return {
+        "issue": {
+            "key": f"{project}-1",
+            "fields": {
+                "project": {"key": project, "name": f"{project} project"},
+                "issuetype": {"name": issue_type},
+                "priority": {"name": priority},
+                "labels": list(labels),
+            },
+        }
+    }
+
+
+def test_routing_table_matches_every_dimension():
+    table = RoutingTable.from_config(CONFIG)
+
+    assert table.route("jira:issue_updated", _event()) == (10,)
+    assert table.route("jira:issue_updated", _event(priority="HIGH")) == (10, 20)
+    assert table.route("jira:issue_updated", _event(project="WEB")) == (1,)
+    assert table.route(
+        "jira:issue_updated", _event(project="WEB", priority="Highest")
+    ) == (20,)
+    assert table.route(
+        "jira:issue_updated", _event(project="OPS", labels=["Security", "ui"])
+    ) == (30, 10)
+    assert table.route("jira:issue_created", _event("OPS", "Incident")) == (40,)
+    assert table.route("jira:issue_updated", _event("OPS", "Incident")) == (1,)
+    assert table.route("jira:issue_updated", {}) == (1,)
+
+
+def test_routing_table_matches_linear_scan_on_random_rules():
+    from benchmarks.bench_routing import build_config, build_events, linear_route
+
+    config = build_config(2000, projects=20)
+    table = RoutingTable.from_config(config)
+
+    for event_type, data in build_events(500, projects=20):
+        assert table.route(event_type, data) == linear_route(config, event_type, data)
+
+
+def test_routing_table_caches_lookups():
+    table = RoutingTable.from_config(CONFIG)
+
+    for _ in range(3):
+        table.route("jira:issue_updated", _event(labels=["b", "a"]))
+    table.route("jira:issue_updated", _event(labels=["a", "b"]))
+
+    info = table.cache_info()
+    assert (info.hits, info.misses) == (3, 1)
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        [],
+        {"routes": [{"project": "DCBOT"}]},
+        {"routes": [{"project": "DCBOT", "channels": ["general"]}]},
+        {"routes": [{"projects": "DCBOT", "channels": [1]}]},
+        {"routes": [{"label": {"a": 1}, "channels": [1]}]},
+    ],
+)
+def test_routing_config_errors(config):
+    with pytest.raises(RoutingError):
+        RoutingTable.from_config(config)
+
+
+def test_load_routing_table_reads_json(tmp_path):
+    path = tmp_path / "routes.json"
+    path.write_text(json.dumps({"routes": CONFIG["routes"]}))
+
+    table = load_routing_table(str(path), default_channels=[5])
+
+    assert len(table) == 4
+    assert table.default_channels == (5,)
+    with pytest.raises(RoutingError):
+        load_routing_table(str(tmp_path / "missing.json"))
+
+
+class _FakeLoop:
+    def is_running(self):
+        return True
+
+    def call_soon_threadsafe(self, callback, *args):
+        callback(*args)
+
+
+def test_notifier_sends_to_many_channels_and_caches_lookups():
+    client = MagicMock()
+    client.loop = _FakeLoop()
+    client.get_channel.side_effect = lambda channel_id: (
+        object() if channel_id != 99 else None
+    )
+    dispatcher = MagicMock()
+    notifier = DiscordNotifier(client, 1, dispatcher)
+
+    for _ in range(3):
+        assert notifier.send(embed=discord.Embed(title="x"), channel_ids=(10, 20, 99))
+
+    submitted = [call.args[0].channel_id for call in dispatcher.submit.call_args_list]
+    assert submitted == [10, 20] * 3
+    assert [call.args[0] for call in client.get_channel.call_args_list] == [
+        10,
+        20,
+        99,
+        99,
+        99,
+    ]
+    assert notifier.send(embed=discord.Embed(title="x"), channel_ids=(99,)) is False
+
+    notifier.clear_channel_cache()
+    notifier.send(embed=discord.Embed(title="x"))
+    assert client.get_channel.call_args.args == (1,)
+
+
+def test_pipeline_groups_embeds_by_route():
+    table = RoutingTable.from_config(CONFIG)
+    notifier = MagicMock()
+    first, second = discord.Embed(title="a"), discord.Embed(title="b")
+    pipeline = JiraEventPipeline(
+        lambda data: [("jira:issue_updated", first), ("jira:issue_created", second)],
+        notifier,
+        router=table,
+    )
+
+    assert pipeline.handle(_event("OPS", "Incident")) is True
+
+    calls = [call.kwargs for call in notifier.send.call_args_list]
+    assert calls == [
+        {"embed": first, "channel_ids": (1,)},
+        {"embed": second, "channel_ids": (40,)},
+    ]
+
+
+def test_pipeline_drops_events_without_a_route():
+    table = RoutingTable.from_config({"routes": CONFIG["routes"]})
+    notifier = MagicMock()
+    pipeline = JiraEventPipeline(
+        lambda data: [("jira:issue_updated", discord.Embed(title="a"))],
+        notifier,
+        router=table,
+    )
+
+    assert pipeline.deliver(_event("OPS")) is True
+    notifier.send.assert_not_called()
+
+
+def test_pipeline_reports_delivery_once_every_route_is_done():
+    table = RoutingTable.from_config(CONFIG)
+    notifier = MagicMock()
+    notifier.send.return_value = True
+    pipeline = JiraEventPipeline(
+        lambda data: [
+            ("jira:issue_updated", discord.Embed(title="a")),
+            ("jira:issue_created", discord.Embed(title="b")),
+        ],
+        notifier,
+        router=table,
+    )
+    delivered = []
+
+    def on_delivered():
+        delivered.append(True)
+
+    assert pipeline.deliver(_event("OPS", "Incident"), on_delivered) is True
+
+    callbacks = [call.kwargs["on_done"] for call in notifier.send.call_args_list]
+    assert len(callbacks) == 2
+    callbacks[0]()
+    assert delivered == []
+    callbacks[1]()
+    assert delivered == [True]
+
+
+def test_pipeline_retries_only_the_routes_that_failed():
+    table = RoutingTable.from_config(CONFIG)
+    notifier = MagicMock()
+    notifier.send.side_effect = [True, False, True]
+    rendered = [
+        ("jira:issue_updated", discord.Embed(title="a")),
+        ("jira:issue_created", discord.Embed(title="b")),
+    ]
+    renders = []
+
+    def render(data):
+        renders.append(data)
+        return rendered
+
+    pipeline = JiraEventPipeline(render, notifier, router=table)
+    payload = _event("OPS", "Incident")
+
+    assert pipeline.deliver(payload) is False
+    assert pipeline.deliver(payload) is True
+
+    channels = [call.kwargs["channel_ids"] for call in notifier.send.call_args_list]
+    assert channels == [(1,), (40,), (40,)]
+    assert len(renders) == 1
@@ -0,0 +1,203 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from jira_events import registry, status_transition
+from jira_events.registry import JiraEventRegistry
+from jira_events.smart_templates import (
+    Accessor,
+    SmartTemplate,
+    SmartTemplateError,
+    load_smart_templates,
+    register_smart_templates,
+)
+from jira_events.status_transition import handle_status_transition
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "jira_smart_templates"
+
+
+def _templates():
+    return {template.name: template for template in load_smart_templates(TEMPLATE_DIR)}
+
+
+def _status_payload():
+    return {
+        "webhookEvent": "jira:issue_updated",
+        "user": {"displayName": "Jane_Doe"},
+        "issue": {
+            "key": "DCBOT-7",
+            "self": "https://example.atlassian.net/rest/api/2/issue/10001",
+            "fields": {
+                "summary": "Ship it",
+                "priority": {"name": "High"},
+                "assignee": {"displayName": "Sam"},
+            },
+        },
+        "changelog": {
+            "items": [{"field": "status", "fromString": "To Do", "toString": "Done"}]
+        },
+    }
+
+
+def _pull_request_payload():
+    return {
+        "repository": {"name": "ourdiscordbot"},
+        "pullrequest": {
+            "title": "Add *smart* templates",
+            "author": {"display_name": "Jo"},
+            "source": {"branch": {"name": "feature"}},
+            "destination": {"branch": {"name": "main"}},
+            "links": {"html": {"href": "https://example.org/pr/1"}},
+        },
+    }
+
+
+def test_accessor_walks_dicts_lists_and_join():
+    data = {"issue": {"fields": {"labels": ["a", "b"], "versions": [{"n": 1}]}}}
+
+    assert Accessor('issue.fields.labels.join(", ")')(data, None) == "a, b"
+    assert Accessor("issue.fields.labels.last")(data, None) == "b"
+    assert Accessor("issue.fields.versions.first.n")(data, None) == 1
+    assert Accessor("issue.fields.versions.3.n")(data, None) is None
+    assert Accessor("issue.fields.missing.name")(data, None) is None
+    assert Accessor("fieldChange.toString")(data, {"toString": "Done"}) == "Done"
+
+
+def test_accessor_rejects_unsupported_expressions():
+    with pytest.raises(SmartTemplateError):
+        Accessor("issue.fields.labels.map(x)")
+
+
+def test_repository_templates_compile():
+    templates = _templates()
+
+    assert set(templates) == {
+        "issue_assignee_changed",
+        "issue_created",
+        "issue_status_changed",
+        "pull_request_created",
+    }
+    assert templates["issue_status_changed"].issue_fields() == {
+        "summary",
+        "priority",
+        "assignee",
+    }
+    # Pull request payloads live outside the projected keys.
+    assert templates["pull_request_created"].issue_fields() is None
+
+
+def test_status_template_matches_handler_fields():
+    payload = _status_payload()
+
+    embed = _templates()["issue_status_changed"].render(payload)
+    expected = handle_status_transition(payload)
+
+    assert embed.title == expected.title
+    assert embed.url == expected.url
+    assert [(f.name, f.value) for f in embed.fields] == [
+        (f.name, f.value) for f in expected.fields
+    ]
+    assert embed.footer.text == "Priority: High | Assignee: Sam"
+
+
+def test_template_requires_its_changelog_field():
+    payload = _status_payload()
+    payload["changelog"]["items"][0]["field"] = "labels"
+
+    assert _templates()["issue_status_changed"].render(payload) is None
+
+
+def test_pull_request_template_renders_and_escapes_values():
+    embed = _templates()["pull_request_created"].render(_pull_request_payload())
+
+    assert embed.title == "Add \\*smart\\* templates"
+    assert embed.url == "https://example.org/pr/1"
+    assert embed.description is None
+    assert [(f.name, f.value) for f in embed.fields] == [
+        ("Author", "Jo"),
+        ("Source", "feature"),
+        ("Destination", "main"),
+    ]
+    assert embed.footer.text == "ourdiscordbot"
+
+
+def test_register_keeps_hand_written_handlers_unless_overridden():
+    local = JiraEventRegistry()
+    status_transition.register(local)
+    templates = list(_templates().values())
+
+    registered = register_smart_templates(local, templates)
+
+    assert "issue_status_changed" not in registered
+    assert "jira:issue_status_changed" not in registered
+    assert "pull_request_created" in registered
+    assert local.get_handler("issue_status_changed").func is handle_status_transition
+    assert local.dispatch("pull_request_created", _pull_request_payload()).title
+
+    register_smart_templates(local, templates, override=True)
+    assert isinstance(local.get_handler("issue_status_changed").func, SmartTemplate)
+    assert registry.get_handler("pull_request_created") is None
+
+
+def test_overriding_template_renders_classified_status_changes():
+    from ourdiscordbot.jira_handler import render_jira_events
+
+    template = SmartTemplate(
+        "issue_status_changed",
+        {
+            "changelogField": "status",
+            "title": "[{{issue.key}}] Moved to {{fieldChange.toString}}",
+        },
+    )
+    assert template.event_types == (
+        "jira:issue_status_changed",
+        "issue_status_changed",
+    )
+
+    try:
+        register_smart_templates(registry, [template], override=True)
+        rendered = render_jira_events(_status_payload())
+    finally:
+        status_transition.register(registry)
+
+    assert [(event_type, embed.title) for event_type, embed in rendered] == [
+        ("jira:issue_status_changed", "[DCBOT-7] Moved to Done")
+    ]
+
+
+def test_invalid_template_files_are_skipped(tmp_path):
+    (tmp_path / "broken.json").write_text("{not json")
+    (tmp_path / "untitled.json").write_text(json.dumps({"discordTemplate": {}}))
+    (tmp_path / "payload_only.json").write_text(json.dumps({"issue": {}}))
+    (tmp_path / "custom.json").write_text(
+        json.dumps(
+            {
+                "discordTemplate": {
+                    "eventTypes": ["custom:deployed"],
+                    "title": "Deployed {{service}}",
+                    "color": "#22c55e",
+                }
+            }
+        )
+    )
+
+    templates = load_smart_templates(tmp_path)
+
+    assert [template.name for template in templates] == ["custom"]
+    assert templates[0].event_types == ("custom:deployed",)
+    embed = templates[0].render({"service": "api"})
+    assert embed.title == "Deployed api"
+    assert embed.color.value == 0x22C55E
+
+
+def test_settings_read_smart_template_options(monkeypatch):
+    from ourdiscordbot.settings import Settings
+
+    monkeypatch.setenv("SMART_TEMPLATES_DIR", "jira_smart_templates")
+    monkeypatch.setenv("SMART_TEMPLATES_OVERRIDE", "true")
+
+    settings = Settings.from_env()
+
+    assert settings.smart_templates_dir == "jira_smart_templates"
+    assert settings.smart_templates_override is True
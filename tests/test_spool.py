@@ -0,0 +1,171 @@
+import threading
+
+from ourdiscordbot.http_app import create_flask_app
+from ourdiscordbot.spool import EventSpool, SpoolDeliveryWorker
+
+
+def test_spool_survives_reopen_until_delivered(tmp_path):
+    path = str(tmp_path / "spool.db")
+    spool = EventSpool(path)
+    first = spool.append({"n": 1})
+    second = spool.append({"n": 2})
+    spool.close()
+
+    reopened = EventSpool(path)
+    assert reopened.pending() == 2
+    assert [seq for seq, _ in reopened.read()] == [first, second]
+
+    reopened.mark_delivered(first)
+    assert [seq for seq, _ in reopened.read()] == [second]
+    assert reopened.stats().delivered == 1
+    reopened.close()
+
+
+def test_concurrent_appends_share_commits(tmp_path):
+    spool = EventSpool(str(tmp_path / "spool.db"), commit_interval=0.05)
+    seqs = []
+    lock = threading.Lock()
+
+    def append(index):
+        seq = spool.append({"n": index})
+        with lock:
+            seqs.append(seq)
+
+    threads = [threading.Thread(target=append, args=(i,)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = spool.stats()
+    assert sorted(seqs) == list(range(1, 21))
+    assert stats.appended == 20
+    assert stats.commits < 20
+    assert stats.batch_max > 1
+    spool.close()
+
+
+def test_spool_rejects_when_full(tmp_path):
+    spool = EventSpool(str(tmp_path / "spool.db"), max_pending=1)
+
+    assert spool.append({"n": 1}) is not None
+    assert spool.append({"n": 2}) is None
+    assert spool.stats().rejected == 1
+    spool.close()
+
+
+def test_worker_replays_in_order_once_discord_is_ready(tmp_path):
+    spool = EventSpool(str(tmp_path / "spool.db"), compact_every=2)
+    for index in range(5):
+        spool.append({"n": index})
+
+    ready = threading.Event()
+    delivered = []
+
+    def deliver(data, acknowledge):
+        if not ready.is_set():
+            return False
+        delivered.append(data["n"])
+        acknowledge()
+        return True
+
+    worker = SpoolDeliveryWorker(spool, deliver, retry_initial=10.0)
+    worker.start()
+    assert not worker.join(timeout=0.2)
+    assert delivered == []
+
+    ready.set()
+    worker.wake()
+    assert worker.join(timeout=5)
+
+    assert delivered == [0, 1, 2, 3, 4]
+    stats = worker.stats()
+    assert stats.pending == 0
+    assert stats.retries >= 1
+    assert spool.read() == []
+    worker.close(timeout=1)
+    spool.close()
+
+
+def test_worker_drops_events_that_fail_to_render(tmp_path):
+    spool = EventSpool(str(tmp_path / "spool.db"))
+    delivered = []
+
+    def deliver(data, acknowledge):
+        if data.get("poison"):
+            raise RuntimeError("boom")
+        delivered.append(data["n"])
+        acknowledge()
+        return True
+
+    worker = SpoolDeliveryWorker(spool, deliver)
+    worker.submit({"poison": True})
+    worker.submit({"n": 1})
+    assert worker.join(timeout=5)
+
+    assert delivered == [1]
+    assert spool.pending() == 0
+    worker.close(timeout=1)
+    spool.close()
+
+
+def test_worker_keeps_rows_until_delivery_is_acknowledged(tmp_path):
+    spool = EventSpool(str(tmp_path / "spool.db"))
+    acknowledgements = []
+
+    def deliver(data, acknowledge):
+        acknowledgements.append(acknowledge)
+        return True
+
+    worker = SpoolDeliveryWorker(spool, deliver)
+    worker.submit({"n": 1})
+    worker.submit({"n": 2})
+
+    # Both were handed over, but Discord has neither yet.
+    assert not worker.join(timeout=0.2)
+    assert len(acknowledgements) == 2
+    assert spool.pending() == 2
+
+    acknowledgements[1]()
+    acknowledgements[1]()
+    assert not worker.join(timeout=0.2)
+    assert [data for _, data in spool.read()] == [b'{"n":1}']
+
+    acknowledgements[0]()
+    assert worker.join(timeout=5)
+    assert spool.pending() == 0
+    assert spool.stats().delivered == 2
+    worker.close(timeout=1)
+    spool.close()
+
+
+def test_flask_spools_before_acknowledging(tmp_path):
+    spool = EventSpool(str(tmp_path / "spool.db"), max_pending=1)
+    worker = SpoolDeliveryWorker(spool, lambda data, ack: False, retry_initial=10.0)
+    app = create_flask_app(
+        jira_secret="secret", handle_event=lambda data: None, spool=worker
+    )
+
+    with app.test_client() as client:
+        accepted = client.post("/webhooks/jira?secret=secret", json={"n": 1})
+        rejected = client.post("/webhooks/jira?secret=secret", json={"n": 2})
+
+    assert accepted.status_code == 202
+    assert rejected.status_code == 503
+    assert [body for _, body in spool.read()] == [b'{"n":1}']
+    worker.close(timeout=1)
+    spool.close()
+
+
+def test_settings_read_spool_options(monkeypatch, tmp_path):
+    from ourdiscordbot.settings import Settings
+
+    monkeypatch.setenv("SPOOL_PATH", str(tmp_path / "spool.db"))
+    monkeypatch.setenv("SPOOL_COMMIT_INTERVAL_SECONDS", "0.002")
+    monkeypatch.setenv("SPOOL_MAX_PENDING", "0")
+
+    settings = Settings.from_env()
+
+    assert settings.spool_path == str(tmp_path / "spool.db")
+    assert settings.spool_commit_interval == 0.002
+    assert settings.spool_max_pending == 1
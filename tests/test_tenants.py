@@ -0,0 +1,239 @@
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from ourdiscordbot.aiohttp_app import create_aiohttp_app
+from ourdiscordbot.dedup import DedupCache
+from ourdiscordbot.discord_client import DiscordNotifier, _guild_tenants
+from ourdiscordbot.http_app import create_flask_app
+from ourdiscordbot.tenants import (
+    TENANT_KEY,
+    RateLimiter,
+    TenantRegistry,
+    TenantRouter,
+    parse_tenants,
+)
+
+TENANTS = {
+    "tenants": {
+        "team-a": {"secret": "alpha", "channels": [100]},
+        "team-b": {
+            "secret": "bravo",
+            "channels": [200],
+            "routes": [{"priority": "Highest", "channels": [201]}],
+            "rate_per_second": 1,
+            "burst": 2,
+        },
+    }
+}
+
+PAYLOAD = {
+    "webhookEvent": "jira:issue_created",
+    "timestamp": 1700000000000,
+    "issue": {
+        "id": "1",
+        "key": "DCBOT-1",
+        "fields": {"priority": {"name": "Highest"}},
+    },
+}
+
+
+def _write(path, config):
+    path.write_text(json.dumps(config))
+    return str(path)
+
+
+def test_registry_authenticates_per_tenant_secret(tmp_path):
+    registry = TenantRegistry(_write(tmp_path / "tenants.json", TENANTS))
+
+    assert registry.authenticate("team-a", "alpha").channels == (100,)
+    assert registry.authenticate("team-a", "bravo") is None
+    assert registry.authenticate("team-c", "alpha") is None
+    assert registry.authenticate("team-b", None) is None
+    assert registry.stats().rejected == 3
+    assert "alpha" not in repr(registry.get("team-a"))
+
+
+def test_parse_tenants_skips_invalid_entries(monkeypatch):
+    monkeypatch.setenv("TEAM_C_SECRET", "charlie")
+    tenants = parse_tenants(
+        {
+            "tenants": {
+                "team-c": {"secret_env": "TEAM_C_SECRET", "channels": 300},
+                "no-secret": {"channels": [1]},
+                "no-channels": {"secret": "x"},
+                "bad id!": {"secret": "x", "channels": [1]},
+            }
+        }
+    )
+
+    assert list(tenants) == ["team-c"]
+    assert tenants["team-c"].secret == "charlie"
+
+
+def test_registry_hot_reloads_and_keeps_last_good_config(tmp_path):
+    path = tmp_path / "tenants.json"
+    registry = TenantRegistry(_write(path, TENANTS), reload_interval=0)
+    limiter = registry.get("team-b").limiter
+
+    updated = json.loads(json.dumps(TENANTS))
+    updated["tenants"]["team-c"] = {"secret": "charlie", "channels": [300]}
+    _write(path, updated)
+
+    assert registry.authenticate("team-c", "charlie") is not None
+    # Unchanged limits keep their bucket across reloads.
+    assert registry.get("team-b").limiter is limiter
+
+    path.write_text("{not json")
+    assert registry.get("team-c") is not None
+    assert registry.stats().reload_errors == 1
+    assert registry.stats().tenants == 3
+
+
+def test_registry_loads_hundreds_of_tenants(tmp_path):
+    config = {
+        "tenants": {
+            f"team-{index}": {
+                "secret": f"secret-{index}",
+                "channels": [index + 1],
+                "routes": [{"project": f"P{index}", "channels": [index + 1000]}],
+                "rate_per_second": 5,
+            }
+            for index in range(500)
+        }
+    }
+    started = time.perf_counter()
+    registry = TenantRegistry(_write(tmp_path / "tenants.json", config))
+
+    assert len(registry) == 500
+    assert time.perf_counter() - started < 2
+    assert registry.authenticate("team-499", "secret-499") is not None
+
+
+def test_tenant_router_uses_tenant_rules(tmp_path):
+    registry = TenantRegistry(_write(tmp_path / "tenants.json", TENANTS))
+    router = TenantRouter(registry, default_channels=(1,))
+
+    def tagged(tenant_id, priority):
+        data = json.loads(json.dumps(PAYLOAD))
+        data["issue"]["fields"]["priority"]["name"] = priority
+        data[TENANT_KEY] = tenant_id
+        return data
+
+    assert router.route("jira:issue_created", tagged("team-a", "Highest")) == (100,)
+    assert router.route("jira:issue_created", tagged("team-b", "Highest")) == (201,)
+    assert router.route("jira:issue_created", tagged("team-b", "Low")) == (200,)
+    assert router.route("jira:issue_created", tagged("gone", "Low")) == ()
+    assert router.route("jira:issue_created", PAYLOAD) == (1,)
+
+
+def test_rate_limiter_refills_over_time():
+    limiter = RateLimiter(rate=1000, burst=2)
+
+    assert limiter.acquire() and limiter.acquire()
+    assert not limiter.acquire()
+    assert limiter.retry_after() == 1
+    time.sleep(0.01)
+    assert limiter.acquire()
+
+
+def test_flask_tenant_webhook_tags_dedups_and_throttles(tmp_path):
+    registry = TenantRegistry(_write(tmp_path / "tenants.json", TENANTS))
+    handled = []
+    app = create_flask_app(
+        jira_secret=None,
+        handle_event=handled.append,
+        dedup=DedupCache(),
+        tenants=registry,
+    )
+    client = app.test_client()
+
+    def status(url, payload=PAYLOAD):
+        return client.post(url, json=payload).status_code
+
+    assert status("/webhooks/jira?secret=") == 403
+    assert status("/webhooks/jira/team-a?secret=bravo") == 403
+    assert status("/webhooks/jira/team-a?secret=alpha") == 200
+    # The same delivery for another tenant is not a duplicate.
+    assert status("/webhooks/jira/team-b?secret=bravo") == 200
+    assert status("/webhooks/jira/team-b?secret=bravo", {}) == 200
+    throttled = client.post("/webhooks/jira/team-b?secret=bravo", json={})
+
+    assert throttled.status_code == 429
+    assert throttled.headers["Retry-After"] == "1"
+    assert [data.get(TENANT_KEY) for data in handled] == ["team-a", "team-b", "team-b"]
+    assert registry.stats().throttled == 1
+
+
+def test_aiohttp_tenant_webhook(tmp_path):
+    registry = TenantRegistry(_write(tmp_path / "tenants.json", TENANTS))
+    handled = []
+    app = create_aiohttp_app(
+        jira_secret="secret", handle_event=handled.append, tenants=registry
+    )
+
+    async def scenario(client):
+        statuses = []
+        for url in (
+            "/webhooks/jira/team-a?secret=wrong",
+            "/webhooks/jira/team-a?secret=alpha",
+            "/webhooks/jira?secret=secret",
+        ):
+            response = await client.post(url, json=PAYLOAD)
+            statuses.append(response.status)
+        return statuses
+
+    async def runner():
+        async with TestClient(TestServer(app)) as client:
+            return await scenario(client)
+
+    assert asyncio.run(runner()) == [403, 200, 200]
+    assert [data.get(TENANT_KEY) for data in handled] == ["team-a", None]
+
+
+def test_guilds_own_the_tenants_whose_channels_they_hold(tmp_path):
+    registry = TenantRegistry(_write(tmp_path / "tenants.json", TENANTS))
+    guild_a, guild_b = SimpleNamespace(id=1), SimpleNamespace(id=2)
+    channels = {
+        5: SimpleNamespace(guild=guild_a),
+        100: SimpleNamespace(guild=guild_a),
+        200: SimpleNamespace(guild=guild_b),
+        201: SimpleNamespace(guild=guild_b),
+    }
+    notifier = DiscordNotifier(SimpleNamespace(get_channel=channels.get), 5)
+
+    assert _guild_tenants(guild_a, notifier, registry) == {"team-a", None}
+    assert _guild_tenants(guild_b, notifier, registry) == {"team-b"}
+    assert _guild_tenants(SimpleNamespace(id=3), notifier, registry) == frozenset()
+    assert _guild_tenants(None, notifier, registry) == frozenset()
+    assert _guild_tenants(guild_b, notifier, None) is None
+
+
+def test_default_endpoint_drops_a_forged_tenant(tmp_path):
+    registry = TenantRegistry(_write(tmp_path / "tenants.json", TENANTS))
+    forged = dict(PAYLOAD, **{TENANT_KEY: "team-a"})
+    flask_handled, aiohttp_handled = [], []
+
+    flask_app = create_flask_app(
+        jira_secret="secret", handle_event=flask_handled.append, tenants=registry
+    )
+    response = flask_app.test_client().post("/webhooks/jira?secret=secret", json=forged)
+    assert response.status_code == 200
+
+    aiohttp_app = create_aiohttp_app(
+        jira_secret="secret", handle_event=aiohttp_handled.append, tenants=registry
+    )
+
+    async def runner():
+        async with TestClient(TestServer(aiohttp_app)) as client:
+            response = await client.post("/webhooks/jira?secret=secret", json=forged)
+            return response.status
+
+    assert asyncio.run(runner()) == 200
+    assert [TENANT_KEY in data for data in flask_handled + aiohttp_handled] == [
+        False,
+        False,
+    ]
@@ -0,0 +1,65 @@
+import random
+from datetime import timezone
+
+import pytest
+
+from jira_events import common
+from jira_events.common import parse_jira_datetime
+
+ALPHABET = "0123456789+-:.TZ x٣"
+
+
+def _jira_timestamp(rng: random.Random) -> str:
+    offset = rng.choice((0, 0, 60, 330, 480, 545, 600, 840, 1439, 1440))
+    sign = rng.choice("+-")
+    return (
+        f"{rng.randint(1, 9999):04d}-{rng.randint(0, 13):02d}-{rng.randint(0, 32):02d}"
+        f"T{rng.randint(0, 24):02d}:{rng.randint(0, 60):02d}:{rng.randint(0, 60):02d}"
+        f".{rng.randint(0, 999):03d}{sign}{offset // 60:02d}{offset % 60:02d}"
+    )
+
+
+def _mutate(rng: random.Random, value: str) -> str:
+    chars = list(value)
+    for _ in range(rng.randint(1, 3)):
+        action = rng.random()
+        position = rng.randrange(len(chars) + 1)
+        if action < 0.5 and position < len(chars):
+            chars[position] = rng.choice(ALPHABET)
+        elif action < 0.75:
+            chars.insert(position, rng.choice(ALPHABET))
+        elif chars:
+            del chars[min(position, len(chars) - 1)]
+    return "".join(chars)
+
+
+def test_parse_jira_datetime_reads_jira_format_on_the_fast_path():
+    parsed = parse_jira_datetime("2025-10-18T11:58:18.965+0800")
+
+    assert parsed.isoformat() == "2025-10-18T11:58:18.965000+08:00"
+    assert parse_jira_datetime("2025-10-18T11:58:18.965-0000").tzinfo is timezone.utc
+    assert common._parse_jira_format("2025-10-18T11:58:18.965Z    ") is None
+    assert parse_jira_datetime("2025-10-18T11:58:18Z").isoformat() == (
+        "2025-10-18T11:58:18+00:00"
+    )
+    assert parse_jira_datetime(" ") is None
+
+
+@pytest.mark.parametrize("native", [True, False], ids=["fromisoformat", "digits"])
+def test_parse_jira_datetime_matches_the_general_parser_on_fuzzed_input(
+    monkeypatch, native
+):
+    # Before Python 3.11 the fast path reads digits in place instead.
+    monkeypatch.setattr(common, "_NATIVE_BASIC_OFFSETS", native)
+    rng = random.Random(20251018)
+    for _ in range(20000):
+        value = _jira_timestamp(rng)
+        if rng.random() < 0.3:
+            value = _mutate(rng, value)
+
+        expected = common._parse_iso_timestamp(value)
+        common._parse_timestamp_cached.cache_clear()
+
+        assert repr(parse_jira_datetime(value)) == repr(expected), value
+        # Cached results match too.
+        assert repr(parse_jira_datetime(value)) == repr(expected), value
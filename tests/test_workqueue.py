@@ -0,0 +1,291 @@
+import threading
+import time
+
+import discord
+import pytest
+
+from jira_events import IssueStateStore
+from ourdiscordbot.payloads import decode_json
+from ourdiscordbot.runtime import build_ingest_app
+from ourdiscordbot.settings import Settings
+from ourdiscordbot.workqueue import (
+    RELEASE_LEASE_SCRIPT,
+    RENEW_LEASE_SCRIPT,
+    LeaderLease,
+    QueueNotifier,
+    QueueSender,
+    RedisWorkQueue,
+    SQLiteWorkQueue,
+    decode_message,
+)
+
+
+class _RedisStandIn:
+    """The subset of redis-py list/string commands the queue uses, in memory."""
+
+    def __init__(self):
+        self.lists = {}
+        self.values = {}
+
+    def _list(self, key):
+        return self.lists.setdefault(key, [])
+
+    def lpush(self, key, value):
+        self._list(key).insert(0, value)
+
+    def rpush(self, key, value):
+        self._list(key).append(value)
+
+    def lmove(self, source, destination, src_side, dest_side):
+        items = self._list(source)
+        if not items:
+            return None
+        value = items.pop(0 if src_side == "LEFT" else -1)
+        if dest_side == "LEFT":
+            self._list(destination).insert(0, value)
+        else:
+            self._list(destination).append(value)
+        return value
+
+    def blmove(self, source, destination, timeout, src_side, dest_side):
+        return self.lmove(source, destination, src_side, dest_side)
+
+    def lrem(self, key, count, value):
+        items = self._list(key)
+        if value in items:
+            items.remove(value)
+            return 1
+        return 0
+
+    def llen(self, key):
+        return len(self._list(key))
+
+    def get(self, key):
+        value, expires = self.values.get(key, (None, 0))
+        return value if expires > time.monotonic() else None
+
+    def set(self, key, value, nx=False, px=None):
+        if nx and self.get(key) is not None:
+            return None
+        self.values[key] = (value, time.monotonic() + px / 1000)
+        return True
+
+    def eval(self, script, numkeys, key, owner, *args):
+        if self.get(key) != owner:
+            return 0
+        if script == RENEW_LEASE_SCRIPT:
+            self.values[key] = (owner, time.monotonic() + int(args[0]) / 1000)
+        elif script == RELEASE_LEASE_SCRIPT:
+            del self.values[key]
+        return 1
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def queue(request, tmp_path):
+    if request.param == "sqlite":
+        backend = SQLiteWorkQueue(str(tmp_path / "queue.db"))
+    else:
+        backend = RedisWorkQueue(_RedisStandIn())
+    yield backend
+    backend.close()
+
+
+def test_work_queue_is_fifo_with_ack_release_and_recover(queue):
+    for body in (b"1", b"2", b"3"):
+        queue.put(body)
+
+    first_id, first = queue.claim(timeout=0)
+    second_id, second = queue.claim(timeout=0)
+    assert (first, second) == (b"1", b"2")
+
+    queue.ack(first_id)
+    queue.release(second_id)
+    assert queue.claim(timeout=0)[1] == b"2"
+    assert queue.depth() == 2
+
+    # A new consumer takes over whatever the previous one left claimed.
+    assert queue.recover() == 1
+    assert [queue.claim(timeout=0)[1] for _ in range(2)] == [b"2", b"3"]
+    assert queue.claim(timeout=0) is None
+
+
+def test_leader_lease_admits_one_owner(queue):
+    first = LeaderLease(queue, ttl=0.2, owner="a")
+    second = LeaderLease(queue, ttl=0.2, owner="b")
+
+    assert first.acquire()
+    assert not second.acquire()
+    assert first.acquire()  # renewal
+
+    time.sleep(0.25)
+    assert second.acquire()
+    assert not first.acquire()
+
+    second.release()
+    assert first.acquire()
+
+
+def test_queue_notifier_round_trips_embeds(queue):
+    notifier = QueueNotifier(queue)
+    embed = discord.Embed(title="DCBOT-1", color=discord.Color.red(), url="https://x")
+    embed.add_field(name="From", value="To Do")
+
+    assert notifier.send(embeds=[embed, discord.Embed(title="b")], channel_ids=(5, 6))
+
+    content, embeds, channel_ids = decode_message(queue.claim(timeout=0)[1])
+    assert content is None
+    assert [e.to_dict() for e in embeds][0] == embed.to_dict()
+    assert channel_ids == [5, 6]
+
+
+def test_queue_sender_retries_until_discord_accepts(queue):
+    queue.put(b"not json")
+    QueueNotifier(queue).send(embed=discord.Embed(title="DCBOT-1"))
+    sent = []
+    ready = threading.Event()
+
+    def send(*, content, embeds, channel_ids, on_done):
+        if not ready.is_set():
+            ready.set()
+            return False
+        sent.append((embeds[0].title, channel_ids))
+        on_done()
+        return True
+
+    sender = QueueSender(queue, send, claim_timeout=0.01, retry_initial=0.01)
+    sender.start()
+    deadline = time.monotonic() + 2
+    while not sent and time.monotonic() < deadline:
+        time.sleep(0.01)
+    sender.close(timeout=1)
+
+    assert sent == [("DCBOT-1", None)]
+    stats = sender.stats()
+    assert (stats.sent, stats.retries, stats.dropped) == (1, 1, 1)
+    assert queue.depth() == 0
+
+
+def test_queue_sender_keeps_messages_until_discord_is_done(queue):
+    notifier = QueueNotifier(queue)
+    for title in ("DCBOT-1", "DCBOT-2"):
+        notifier.send(embed=discord.Embed(title=title))
+    queued = []
+
+    def enqueue(*, content, embeds, channel_ids, on_done):
+        # Accepted by the outbound dispatcher but not yet posted.
+        queued.append((embeds[0].title, on_done))
+        return True
+
+    sender = QueueSender(queue, enqueue, claim_timeout=0.01)
+    sender.start()
+    deadline = time.monotonic() + 2
+    while len(queued) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    queued[0][1]()
+    # Leadership ends before Discord posted the second message.
+    sender.close(timeout=1)
+    assert (sender.stats().sent, queue.depth()) == (1, 1)
+
+    delivered = []
+
+    def deliver(*, content, embeds, channel_ids, on_done):
+        delivered.append(embeds[0].title)
+        on_done()
+        return True
+
+    successor = QueueSender(queue, deliver, claim_timeout=0.01)
+    successor.start()
+    deadline = time.monotonic() + 2
+    while not delivered and time.monotonic() < deadline:
+        time.sleep(0.01)
+    successor.close(timeout=1)
+
+    assert successor.stats().recovered == 1
+    assert delivered == ["DCBOT-2"]
+    assert queue.depth() == 0
+
+
+def test_queue_sender_applies_history_forwarded_by_ingest_workers(queue):
+    payload = {
+        "webhookEvent": "jira:issue_updated",
+        "timestamp": 1760788800000,
+        "issue": {
+            "key": "DCBOT-8",
+            "fields": {
+                "summary": "Not forwarded",
+                "status": {"name": "In Review"},
+                "assignee": {"displayName": "Bob"},
+            },
+        },
+        "changelog": {
+            "created": "2025-10-18T12:05:00.000+0000",
+            "items": [
+                {"field": "summary", "fromString": "a", "toString": "b"},
+                {"field": "status", "fromString": "To Do", "toString": "In Review"},
+            ],
+        },
+    }
+    local = IssueStateStore()
+    local.observe(payload)
+    QueueNotifier(queue).observe(payload)
+    QueueNotifier(queue).observe({"webhookEvent": "jira:issue_created"})
+    assert queue.depth() == 1
+
+    owner = IssueStateStore()
+    sender = QueueSender(
+        queue, lambda **kwargs: True, observe=owner.observe, claim_timeout=0.01
+    )
+    sender.start()
+    deadline = time.monotonic() + 2
+    while not sender.stats().observed and time.monotonic() < deadline:
+        time.sleep(0.01)
+    sender.close(timeout=1)
+
+    applied, expected = owner.get("DCBOT-8"), local.get("DCBOT-8")
+    for name in expected.__slots__:
+        assert getattr(applied, name) == getattr(expected, name), name
+    assert (sender.stats().sent, queue.depth()) == (0, 0)
+
+
+def test_ingest_app_queues_rendered_embeds(tmp_path):
+    settings = Settings(
+        discord_bot_token=None,
+        discord_channel_id=None,
+        jira_webhook_secret="secret",
+        port=0,
+        ingest_workers=0,
+        runtime_role="ingest",
+        work_queue_url=f"sqlite:///{tmp_path / 'queue.db'}",
+    )
+    _, queue, app = build_ingest_app(settings)
+
+    response = app.test_client().post(
+        "/webhooks/jira?secret=secret",
+        json={
+            "webhookEvent": "jira:issue_created",
+            "issue": {
+                "key": "DCBOT-7",
+                "fields": {"summary": "Queued", "project": {"name": "Bot"}},
+            },
+        },
+    )
+
+    assert response.status_code == 200
+    # The issue's history goes to the sender, which owns the state store.
+    history = decode_json(queue.claim(timeout=0)[1])["observe"]
+    assert history["issue"]["key"] == "DCBOT-7"
+    _, embeds, channel_ids = decode_message(queue.claim(timeout=0)[1])
+    assert "DCBOT-7" in embeds[0].title
+    assert channel_ids is None
+    queue.close()
+
+
+def test_required_settings_follow_runtime_role():
+    ingest = Settings(None, None, "secret", 8080, runtime_role="ingest")
+    sender = Settings("token", 1, None, 8080, runtime_role="sender")
+
+    assert ingest.requires_secrets() == ["WORK_QUEUE_URL"]
+    assert sender.requires_secrets() == ["WORK_QUEUE_URL"]
+    assert Settings("token", 1, None, 8080).requires_secrets() == [
+        "JIRA_WEBHOOK_SECRET"
+    ]